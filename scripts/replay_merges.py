@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""Replay a Polymarket CSV export through the merge scheduler.
+
+Compares the gas-aware scheduler against the fixed hourly sweep on the
+same fills: batches sent, gas spent and capital left idle in balanced pairs.
+
+Usage:
+    python scripts/replay_merges.py <csv_path> [--start-at UNIX_TIMESTAMP]
+        [--gas-gwei 50] [--bankroll 500] [--matic-usd 0.40]
+"""
+
+import argparse
+import sys
+from decimal import Decimal
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from calc_pnl import parse_csv  # noqa: E402
+
+from grid_maker.merge_scheduler import (  # noqa: E402
+    MergePolicy,
+    fills_from_csv_rows,
+    fixed_interval_policy,
+    replay,
+)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay fills through the merge scheduler")
+    parser.add_argument("csv_path", help="Path to the CSV file")
+    parser.add_argument("--start-at", type=int, default=0, help="Unix timestamp to start from")
+    parser.add_argument("--gas-gwei", type=float, default=50.0, help="Constant gas price")
+    parser.add_argument("--bankroll", type=Decimal, default=Decimal("500"))
+    parser.add_argument("--matic-usd", type=Decimal, default=Decimal("0.40"))
+    parser.add_argument("--interval", type=float, default=3600.0, help="Max merge interval (sec)")
+    args = parser.parse_args()
+
+    fills = fills_from_csv_rows(parse_csv(args.csv_path, args.start_at))
+    if not fills:
+        print("No Up/Down buys in range.")
+        return
+
+    gas_wei = int(args.gas_gwei * 10**9)
+    policies = {
+        "fixed": fixed_interval_policy(args.interval),
+        "scheduler": MergePolicy(max_interval_s=args.interval),
+    }
+    print(f"{len(fills)} fills │ gas={args.gas_gwei} gwei │ bankroll=${args.bankroll}")
+    print(f"{'policy':<10} {'batches':>8} {'merged':>10} {'gas $':>10} {'idle $·h':>12}")
+    for name, policy in policies.items():
+        r = replay(
+            fills, policy,
+            bankroll=args.bankroll, gas_price_wei=gas_wei, native_price_usd=args.matic_usd,
+        )
+        print(
+            f"{name:<10} {r.batches:>8} {r.merged_shares:>10.2f} "
+            f"{r.gas_usd:>10.4f} {r.locked_usd_hours:>12.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -12,8 +12,8 @@ from pathlib import Path
 import yaml
 from dotenv import load_dotenv
 from eth_account import Account
-from web3 import Web3
 
+from shared.chain import get_web3
 from shared.client import init_client
 
 from grid_maker.config import load_grid_maker_config
@@ -111,7 +111,7 @@ def main():
     w3 = None
     account = None
     if not cfg.dry_run and private_key and rpc_url:
-        w3 = Web3(Web3.HTTPProvider(rpc_url))
+        w3 = get_web3(rpc_url)
         account = Account.from_key(private_key)
         log.info("INIT Web3+Account ready (addr=%s)", account.address)
     elif not cfg.dry_run:
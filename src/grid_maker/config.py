@@ -6,6 +6,8 @@ from dataclasses import dataclass, field
 from decimal import Decimal
 from typing import Any, Optional
 
+from shared.gas import URGENCY_PERCENTILES
+
 ZERO = Decimal("0")
 
 # Default gabagool sizing table (asset -> timeframe -> shares)
@@ -39,10 +41,22 @@ class GridMakerConfig:
 
     # Merge (batch only — gabagool merges every ~60 min)
     min_merge_shares: Decimal = Decimal("10")
+    # Longest balanced pairs wait for a merge, whatever the gas
     merge_batch_interval_sec: int = 3600
+    # Gas-aware scheduling inside that window (see merge_scheduler):
+    # merge early when batch gas / capital freed <= cheap ratio, or when
+    # locked pairs >= utilization trigger × bankroll and gas <= max ratio
+    merge_min_interval_sec: int = 60
+    merge_cheap_gas_ratio: Decimal = Decimal("0.001")
+    merge_max_gas_ratio: Decimal = Decimal("0.01")
+    merge_utilization_trigger: Decimal = Decimal("0.25")
 
     # Gas
     max_gas_price_gwei: int = 200
+    # Merges/redeems due together go out as one Safe MultiSend tx up to this gas
+    max_batch_gas: int = 6_000_000
+    # EIP-1559 tip percentile from recent blocks: low | normal | high
+    gas_urgency: str = "normal"
     matic_price_usd: Decimal = Decimal("0.40")
 
     # Redemption
@@ -57,6 +71,23 @@ class GridMakerConfig:
     max_entry_price: Decimal = Decimal("0.99")
     min_entry_price: Decimal = Decimal("0.01")
 
+    # Warm start — local market metadata cache ("" disables)
+    market_cache_path: str = "data/grid_maker_markets.db"
+    # Confirmed CTF approvals survive restarts here ("" keeps them in memory)
+    approvals_path: str = "data/approvals.json"
+    # Crash-safe engine state (fills, grids, redemptions, PnL, orders) — "" disables
+    journal_dir: str = "data/grid_maker_state"
+
+    # Server clock sync for end_time math (0 disables — uses raw local time)
+    clock_sync_interval_sec: float = 30.0
+
+    # Reconcile _filled_shares against on-chain CTF balances (0 disables):
+    # full pass over all tracked tokens / incremental pass over dirty tokens
+    reconcile_interval_sec: float = 300.0
+    reconcile_incremental_sec: float = 5.0
+    # Activity this recent is left alone — fills settle on-chain with a lag
+    reconcile_settle_grace_sec: float = 30.0
+
     def get_size_for(self, asset: str, timeframe: str) -> Optional[int]:
         """Return target shares for an asset×timeframe combo, or None if not traded."""
         return self.grid_sizes.get(asset, {}).get(timeframe)
@@ -86,8 +117,26 @@ def validate_config(cfg: GridMakerConfig) -> None:
         errors.append(f"min_merge_shares must be > 0, got {cfg.min_merge_shares}")
     if cfg.merge_batch_interval_sec <= 0:
         errors.append(f"merge_batch_interval_sec must be > 0, got {cfg.merge_batch_interval_sec}")
+    if not (0 <= cfg.merge_min_interval_sec <= cfg.merge_batch_interval_sec):
+        errors.append(
+            f"merge_min_interval_sec must be in [0, merge_batch_interval_sec], "
+            f"got {cfg.merge_min_interval_sec}"
+        )
+    if not (ZERO <= cfg.merge_cheap_gas_ratio <= cfg.merge_max_gas_ratio):
+        errors.append(
+            "merge gas ratios invalid: "
+            f"0 <= {cfg.merge_cheap_gas_ratio} <= {cfg.merge_max_gas_ratio}"
+        )
+    if cfg.merge_utilization_trigger <= ZERO:
+        errors.append(f"merge_utilization_trigger must be > 0, got {cfg.merge_utilization_trigger}")
     if cfg.max_gas_price_gwei <= 0:
         errors.append(f"max_gas_price_gwei must be > 0, got {cfg.max_gas_price_gwei}")
+    if cfg.max_batch_gas < 500_000:
+        errors.append(f"max_batch_gas must be >= 500000, got {cfg.max_batch_gas}")
+    if cfg.gas_urgency not in URGENCY_PERCENTILES:
+        errors.append(
+            f"gas_urgency must be one of {sorted(URGENCY_PERCENTILES)}, got {cfg.gas_urgency!r}"
+        )
     if cfg.refresh_millis < 100:
         errors.append(f"refresh_millis must be >= 100, got {cfg.refresh_millis}")
     if not (ZERO < cfg.min_entry_price < cfg.max_entry_price <= Decimal("1")):
@@ -98,6 +147,13 @@ def validate_config(cfg: GridMakerConfig) -> None:
         errors.append(f"redeem_delay_sec must be >= 0, got {cfg.redeem_delay_sec}")
     if cfg.redeem_max_attempts <= 0:
         errors.append(f"redeem_max_attempts must be > 0, got {cfg.redeem_max_attempts}")
+    if cfg.clock_sync_interval_sec < 0:
+        errors.append(f"clock_sync_interval_sec must be >= 0, got {cfg.clock_sync_interval_sec}")
+    for name in (
+        "reconcile_interval_sec", "reconcile_incremental_sec", "reconcile_settle_grace_sec",
+    ):
+        if getattr(cfg, name) < 0:
+            errors.append(f"{name} must be >= 0, got {getattr(cfg, name)}")
 
     if errors:
         raise ValueError("GridMakerConfig validation failed:\n  " + "\n  ".join(errors))
@@ -137,7 +193,13 @@ def load_grid_maker_config(raw: dict[str, Any]) -> GridMakerConfig:
         entry_delay_sec=int(gm.get("entry_delay_sec", 5)),
         min_merge_shares=Decimal(str(gm.get("min_merge_shares", "10"))),
         merge_batch_interval_sec=int(gm.get("merge_batch_interval_sec", 3600)),
+        merge_min_interval_sec=int(gm.get("merge_min_interval_sec", 60)),
+        merge_cheap_gas_ratio=Decimal(str(gm.get("merge_cheap_gas_ratio", "0.001"))),
+        merge_max_gas_ratio=Decimal(str(gm.get("merge_max_gas_ratio", "0.01"))),
+        merge_utilization_trigger=Decimal(str(gm.get("merge_utilization_trigger", "0.25"))),
         max_gas_price_gwei=int(gm.get("max_gas_price_gwei", 200)),
+        max_batch_gas=int(gm.get("max_batch_gas", 6_000_000)),
+        gas_urgency=str(gm.get("gas_urgency", "normal")),
         matic_price_usd=Decimal(str(gm.get("matic_price_usd", "0.40"))),
         redeem_delay_sec=int(gm.get("redeem_delay_sec", 60)),
         redeem_max_attempts=int(gm.get("redeem_max_attempts", 3)),
@@ -145,6 +207,13 @@ def load_grid_maker_config(raw: dict[str, Any]) -> GridMakerConfig:
         compound_interval_sec=int(gm.get("compound_interval_sec", 3600)),
         max_entry_price=Decimal(str(gm.get("max_entry_price", "0.99"))),
         min_entry_price=Decimal(str(gm.get("min_entry_price", "0.01"))),
+        market_cache_path=str(gm.get("market_cache_path", "data/grid_maker_markets.db")),
+        approvals_path=str(gm.get("approvals_path", "data/approvals.json")),
+        journal_dir=str(gm.get("journal_dir", "data/grid_maker_state")),
+        clock_sync_interval_sec=float(gm.get("clock_sync_interval_sec", 30.0)),
+        reconcile_interval_sec=float(gm.get("reconcile_interval_sec", 300.0)),
+        reconcile_incremental_sec=float(gm.get("reconcile_incremental_sec", 5.0)),
+        reconcile_settle_grace_sec=float(gm.get("reconcile_settle_grace_sec", 30.0)),
     )
     validate_config(cfg)
     return cfg
@@ -5,7 +5,8 @@ merges balanced pairs via batch sweep, and redeems winning positions.
 Revenue comes from maker rebates + (1 - combined_vwap).
 
 Static grid only: full-range $0.01-$0.99, fire-and-forget, no repricing.
-Batch merge only: sweep all markets every merge_batch_interval_sec.
+Batch merge only: merge_scheduler picks when to sweep all markets, from
+gas cost vs capital freed — at least every merge_batch_interval_sec.
 No deliberate taker orders — organic GTC crossings happen naturally.
 """
 
@@ -13,7 +14,7 @@ from __future__ import annotations
 
 import asyncio
 import logging
-import time
+from concurrent.futures import Future, ThreadPoolExecutor
 from dataclasses import dataclass, field
 from decimal import Decimal
 
@@ -23,8 +24,19 @@ from grid_maker.capital import (
     compound_bankroll,
 )
 from grid_maker.config import GridMakerConfig
-from grid_maker.market_data import discover_markets
-from shared.market_data import get_top_of_book, prefetch_order_books
+from grid_maker.journal import StateJournal
+from grid_maker.market_data import discover_markets, seed_known_markets
+from grid_maker.merge_scheduler import MergeCandidate, MergePolicy, decide_merge
+from grid_maker.reconciler import Reconciler
+from shared.async_client import AsyncClobClient
+from shared.clock import ClockSync, default_sources
+from shared.gas import GasOracle
+from shared.market_cache import MarketCache
+from shared.market_data import (
+    get_top_of_book,
+    prefetch_order_books,
+    prefetch_order_books_async,
+)
 from shared.models import (
     C_BOLD,
     C_DIM,
@@ -36,12 +48,36 @@ from shared.models import (
     ZERO,
     Direction,
     GabagoolMarket,
+    OrderIntent,
+    OrderState,
 )
 from shared.order_mgr import OrderManager
-from shared.redeem import CTF_DECIMALS, merge_positions, redeem_positions
+from shared.receipts import ReceiptWatcher
+from shared.redeem import (
+    CTF_DECIMALS,
+    MERGE_GAS,
+    NEG_RISK_MERGE_GAS,
+    SAFE_TX_OVERHEAD_GAS,
+    BalanceReader,
+    SafeCall,
+    build_merge_call,
+    build_redeem_call,
+    execute_batch,
+    execute_batch_async,
+    load_approvals,
+    preflight_approvals,
+)
+from shared.resilience import endpoint_stats, get_endpoint
 
 log = logging.getLogger("gm.engine")
 
+# Keep ended markets cached for a day so fills left in markets that ended
+# while the bot was down still get their redemption queued on restart
+_MARKET_CACHE_RETENTION_SEC = 86400
+
+# How often per-endpoint latency percentiles are logged
+_LATENCY_REPORT_INTERVAL_SEC = 300.0
+
 # Slug prefix → canonical asset name for grid_sizes lookup
 _SLUG_PREFIX_TO_ASSET = {"btc": "bitcoin", "eth": "ethereum"}
 
@@ -67,6 +103,15 @@ def _parse_market_asset_tf(market: GabagoolMarket) -> tuple[str, str] | None:
     return asset, tf
 
 
+def _market_row(m: GabagoolMarket) -> list:
+    return [m.slug, m.up_token_id, m.down_token_id, m.end_time, m.market_type,
+            m.condition_id, m.neg_risk]
+
+
+def _market_from_row(row: list) -> GabagoolMarket:
+    return GabagoolMarket(*row)
+
+
 @dataclass
 class _PendingRedemption:
     market: GabagoolMarket
@@ -77,6 +122,14 @@ class _PendingRedemption:
     last_attempt_at: float = 0.0
 
 
+@dataclass
+class _ChainOp:
+    """A merge or redeem riding an on-chain MultiSend batch."""
+    kind: str                # "merge" | "redeem"
+    market: GabagoolMarket
+    shares: Decimal          # merge: balanced pairs
+
+
 class GridMakerEngine:
     def __init__(self, client, cfg: GridMakerConfig, w3=None, account=None,
                  rpc_url: str = "", funder_address: str = ""):
@@ -87,11 +140,21 @@ class GridMakerEngine:
         self._rpc_url = rpc_url
         self._funder = funder_address
         self._order_mgr = OrderManager(dry_run=cfg.dry_run)
+        # Async CLOB facade — set in run(); None keeps the sync path (tests, tools)
+        self._aclient: AsyncClobClient | None = None
+        self._order_queue: list[OrderIntent] = []  # placements batched per tick
+        # Server-corrected clock for every end_time comparison
+        self._clock = ClockSync(default_sources(rpc_url))
 
         # Per-market state
         self._markets: list[GabagoolMarket] = []
         self._last_discovery: float = 0.0
         self._discovery_interval: float = 10.0
+        # Handoff from the background discovery loop, applied at tick start
+        self._discovered: list[GabagoolMarket] | None = None
+        self._market_cache: MarketCache | None = (
+            MarketCache(cfg.market_cache_path) if cfg.market_cache_path else None
+        )
 
         # Per-token filled shares tracking (only from fills, not chain sync)
         self._filled_shares: dict[str, Decimal] = {}  # token_id -> shares filled
@@ -99,6 +162,16 @@ class GridMakerEngine:
         # Merge tracking
         self._last_merge_at: dict[str, float] = {}  # slug -> epoch
         self._last_batch_merge_at: float = 0.0
+        self._merge_policy = MergePolicy(
+            min_merge_shares=cfg.min_merge_shares,
+            min_interval_s=cfg.merge_min_interval_sec,
+            max_interval_s=cfg.merge_batch_interval_sec,
+            cheap_gas_ratio=cfg.merge_cheap_gas_ratio,
+            max_gas_ratio=cfg.merge_max_gas_ratio,
+            utilization_trigger=cfg.merge_utilization_trigger,
+            batch_overhead_gas=SAFE_TX_OVERHEAD_GAS,
+            max_batch_gas=cfg.max_batch_gas,
+        )
         self._completed_markets: set[str] = set()
 
         # Compounding
@@ -108,7 +181,20 @@ class GridMakerEngine:
 
         # Redemption tracking
         self._pending_redemptions: dict[str, _PendingRedemption] = {}  # slug -> redemption info
-        self._pending_redeem_task: dict[str, asyncio.Task] = {}        # slug -> running task
+
+        # On-chain batching — merges/redeems collected per tick go out as one
+        # MultiSend job on a single worker (serialises Safe/EOA nonces)
+        self._chain_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="chain")
+        self._chain_queue: list[tuple[_ChainOp, SafeCall]] = []  # collected this tick
+        self._chain_job: Future | None = None
+        self._chain_ops: dict[str, _ChainOp] = {}  # call label -> op in the running job
+        # Fee history + per-call-kind gas limits, shared by every chain job
+        self._gas: GasOracle | None = GasOracle(w3, cfg.gas_urgency) if w3 is not None else None
+        # Set in run(): confirmations are awaited on the loop instead of the worker
+        self._receipts: ReceiptWatcher | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+        # Crash-safe state journal, opened in run()
+        self._journal: StateJournal | None = None
 
         # Static grid state
         self._grid_spec: dict[str, list[tuple[Decimal, Decimal]]] = {}  # token_id -> intended grid
@@ -117,6 +203,19 @@ class GridMakerEngine:
         # First-seen tracking for entry delay
         self._first_seen_at: dict[str, float] = {}  # slug -> epoch when first discovered
 
+        self._last_latency_report: float = 0.0
+
+        # On-chain balance reconciliation of _filled_shares (live only)
+        self._reconciler: Reconciler | None = None
+        if not cfg.dry_run and w3 is not None and funder_address and cfg.reconcile_interval_sec > 0:
+            reader = BalanceReader(w3)
+            self._reconciler = Reconciler(
+                lambda token_ids: reader.read(funder_address, token_ids).tokens,
+                full_interval_s=cfg.reconcile_interval_sec,
+                incremental_interval_s=cfg.reconcile_incremental_sec,
+                settle_grace_s=cfg.reconcile_settle_grace_sec,
+            )
+
     async def run(self) -> None:
         """Main loop — discover markets and tick."""
         interval = self._cfg.refresh_millis / 1000.0
@@ -152,32 +251,239 @@ class GridMakerEngine:
             self._cfg.min_seconds_to_end,
         )
 
-        # Restore grid state from existing CLOB orders on restart
-        self._restore_grid_state()
+        # Sync to server time before any end_time math
+        background = []
+        if self._cfg.clock_sync_interval_sec > 0:
+            await asyncio.to_thread(self._clock.sample_all)
+            log.info("CLOCK │ %s", self._clock.stats())
+            background.append(asyncio.create_task(
+                self._clock.run(self._cfg.clock_sync_interval_sec),
+            ))
 
-        while True:
+        # Approvals off the merge/redeem critical path
+        if not self._cfg.dry_run and self._w3 is not None and self._account is not None:
+            await asyncio.to_thread(self._preflight_approvals)
+
+        # Replay persisted engine state before anything trades
+        if self._cfg.journal_dir:
+            self._journal = StateJournal(self._cfg.journal_dir)
             try:
-                await asyncio.to_thread(self._tick)
+                self._apply_journal_state(await asyncio.to_thread(self._journal.load))
             except Exception as e:
-                log.error("TICK_ERROR │ %s", e, exc_info=True)
-            await asyncio.sleep(interval)
+                log.error("%sJOURNAL_RESTORE_FAILED │ %s%s", C_RED, e, C_RESET)
+            self._journal.start()
+
+        # Warm start from the local market cache, then validate in background
+        self._warm_start(self._clock.now())
+        background.append(asyncio.create_task(self._discovery_loop()))
+
+        # Restore grid state from existing CLOB orders on restart
+        self._restore_grid_state()
+
+        self._aclient = AsyncClobClient(self._client)
+        self._loop = asyncio.get_running_loop()
+        if not self._cfg.dry_run and self._rpc_url:
+            self._receipts = ReceiptWatcher(self._rpc_url)
+            background.append(asyncio.create_task(self._receipts.run()))
+        try:
+            while True:
+                try:
+                    await self._tick_async()
+                except Exception as e:
+                    log.error("TICK_ERROR │ %s", e, exc_info=True)
+                await asyncio.sleep(interval)
+        finally:
+            for task in background:
+                task.cancel()
+            await self._aclient.aclose()
+            if self._receipts is not None:
+                await self._receipts.aclose()
+            if self._journal is not None:
+                self._journal.submit(self._state_view())
+                await asyncio.to_thread(self._journal.close)
+            self._chain_executor.shutdown(wait=False)
+
+    def _preflight_approvals(self) -> None:
+        if self._cfg.approvals_path:
+            loaded = load_approvals(self._cfg.approvals_path)
+            log.info("APPROVALS │ %d cached pairs from %s", loaded, self._cfg.approvals_path)
+        try:
+            preflight_approvals(
+                self._w3, self._account, self._funder,
+                max_gas_price_gwei=self._cfg.max_gas_price_gwei,
+                gas_oracle=self._gas,
+            )
+        except Exception as e:
+            # Not fatal — _ensure_approval still checks before each batch
+            log.error("%sAPPROVAL_PREFLIGHT_FAILED │ %s%s", C_RED, e, C_RESET)
+
+    # -----------------------------------------------------------------
+    # State journal
+    # -----------------------------------------------------------------
+
+    def _state_view(self) -> dict[str, dict]:
+        """Snapshot of restart-relevant state, handed to the journal writer.
+
+        Built between ticks so it is consistent; values are fresh containers
+        because the writer diffs them on its own thread.
+        """
+        orders = {}
+        for token_orders in self._order_mgr.get_all_open_orders().values():
+            for o in token_orders:
+                if not o.order_id:
+                    continue  # post-error sentinel
+                orders[o.order_id] = [
+                    o.token_id, _market_row(o.market) if o.market else None,
+                    o.direction.value if o.direction else None,
+                    o.price, o.size, o.placed_at, o.side, o.matched_size,
+                ]
+        return {
+            "filled": dict(self._filled_shares),
+            "grid": {t: [list(level) for level in grid] for t, grid in self._grid_spec.items()},
+            "redeem": {
+                slug: [_market_row(pr.market), pr.up_shares, pr.down_shares,
+                       pr.eligible_at, pr.attempts, pr.last_attempt_at]
+                for slug, pr in self._pending_redemptions.items()
+            },
+            "first_seen": dict(self._first_seen_at),
+            "completed": dict.fromkeys(self._completed_markets, True),
+            "meta": {
+                "session_pnl": self._session_pnl,
+                "last_batch_merge_at": self._last_batch_merge_at,
+                "last_compound_at": self._last_compound_at,
+                "effective_bankroll": self._effective_bankroll,
+                "bankroll_usd": self._cfg.bankroll_usd,
+            },
+            "orders": orders,
+        }
+
+    def _apply_journal_state(self, state: dict[str, dict]) -> None:
+        """Rebuild engine and OrderManager state from a replayed journal."""
+        if not state:
+            return
+        self._filled_shares.update(state.get("filled", {}))
+        for token_id, grid in state.get("grid", {}).items():
+            self._grid_spec[token_id] = [(price, size) for price, size in grid]
+        for slug, row in state.get("redeem", {}).items():
+            market_row, up, down, eligible_at, attempts, last_attempt_at = row
+            self._pending_redemptions[slug] = _PendingRedemption(
+                market=_market_from_row(market_row), up_shares=up, down_shares=down,
+                eligible_at=eligible_at, attempts=attempts, last_attempt_at=last_attempt_at,
+            )
+        for slug, first_seen_at in state.get("first_seen", {}).items():
+            self._first_seen_at.setdefault(slug, first_seen_at)
+        self._completed_markets.update(state.get("completed", {}))
+
+        meta = state.get("meta", {})
+        self._session_pnl = meta.get("session_pnl", self._session_pnl)
+        self._last_batch_merge_at = meta.get("last_batch_merge_at", self._last_batch_merge_at)
+        self._last_compound_at = meta.get("last_compound_at", self._last_compound_at)
+        # A changed bankroll_usd in config overrides the compounded one
+        if meta.get("bankroll_usd") == self._cfg.bankroll_usd:
+            self._effective_bankroll = meta.get("effective_bankroll", self._effective_bankroll)
+
+        orders = [
+            OrderState(
+                order_id=order_id,
+                market=_market_from_row(market_row) if market_row else None,
+                token_id=token_id,
+                direction=Direction(direction) if direction else None,
+                price=price, size=size, placed_at=placed_at, side=side,
+                matched_size=matched_size,
+            )
+            for order_id, (token_id, market_row, direction, price, size,
+                           placed_at, side, matched_size) in state.get("orders", {}).items()
+        ]
+        restored_orders = self._order_mgr.restore_orders(orders)
+        log.info(
+            "%sJOURNAL_RESTORE │ fills=%d grids=%d redemptions=%d orders=%d │ pnl=$%s%s",
+            C_GREEN, len(self._filled_shares), len(self._grid_spec),
+            len(self._pending_redemptions), restored_orders, self._session_pnl, C_RESET,
+        )
+
+    async def _tick_async(self) -> None:
+        """One tick with its network I/O fanned out on the event loop.
 
-    def _tick(self) -> None:
-        """Single tick: discover, prefetch books, evaluate each market."""
-        now = time.time()
+        Books and open orders are fetched concurrently before the tick body,
+        the tick queues its placements, and the queue is posted as one
+        concurrent batch afterwards.
+        """
+        markets = self._markets + (self._discovered or [])
+        reads = [prefetch_order_books_async(self._aclient, markets)]
+        if not self._cfg.dry_run and markets:
+            reads.append(self._fetch_open_orders())
+        results = await asyncio.gather(*reads)
+        open_orders = results[1] if len(results) > 1 else None
+
+        await asyncio.to_thread(self._tick, open_orders)
+        await self._flush_orders()
+        if self._journal is not None:
+            self._journal.submit(self._state_view())
+
+    async def _fetch_open_orders(self) -> list | None:
+        try:
+            return await get_endpoint("clob.get_orders").acall(self._aclient.get_orders, hedge=True)
+        except Exception as e:
+            # None lets the tick fall back to its own fetch/poll path
+            log.debug("ASYNC_ORDERS_FETCH_FAILED │ %s", e)
+            return None
 
-        # Periodic discovery
-        if now - self._last_discovery > self._discovery_interval:
-            self._discover(now)
+    async def _flush_orders(self) -> None:
+        if not self._order_queue:
+            return
+        intents, self._order_queue = self._order_queue, []
+        await self._order_mgr.place_orders_async(self._client, self._aclient, intents)
+
+    def _place(
+        self, market: GabagoolMarket, token_id: str, direction: Direction,
+        price: Decimal, size: Decimal, seconds_to_end: int, reason: str,
+    ) -> None:
+        """Queue a placement for the post-tick batch, or place now on the sync path."""
+        if self._aclient is None:
+            self._order_mgr.place_order(
+                self._client, market, token_id,
+                direction, price, size, seconds_to_end,
+                reason=reason,
+            )
+            return
+        self._order_queue.append(OrderIntent(
+            market=market,
+            token_id=token_id,
+            direction=direction,
+            price=price,
+            size=size,
+            seconds_to_end=seconds_to_end,
+            reason=reason,
+        ))
+
+    def _tick(self, open_orders: list | None = None) -> None:
+        """Single tick: apply discovery, prefetch books, evaluate each market."""
+        now = self._clock.now()
+
+        # Apply markets found by the background discovery loop
+        discovered = self._discovered
+        if discovered is not None:
+            self._discovered = None
+            self._apply_discovery(discovered, now)
+
+        # Settle the previous on-chain batch if it confirmed
+        self._harvest_chain_job(now)
 
         if not self._markets:
             return
 
-        # Prefetch all order books in one batch
-        prefetch_order_books(self._client, self._markets)
+        # Prefetch all order books in one batch (already done by _tick_async)
+        if self._aclient is None:
+            prefetch_order_books(self._client, self._markets)
 
         # Check pending orders for fills — bulk mode for large order counts
-        self._order_mgr.check_pending_orders_bulk(self._client, on_fill=self._on_fill)
+        self._order_mgr.check_pending_orders_bulk(
+            self._client, on_fill=self._on_fill, open_orders=open_orders,
+        )
+
+        # Correct fill accounting from the chain before sizing merges
+        if self._reconciler is not None:
+            self._reconcile(now)
 
         # Evaluate each market
         for market in list(self._markets):
@@ -191,17 +497,74 @@ class GridMakerEngine:
         # Process redemptions for expired markets
         self._check_redemptions(now)
 
+        # Send this tick's merges + redeems as one batched Safe tx
+        self._submit_chain_batch()
+
         # Periodic compounding
         if self._cfg.compound and now - self._last_compound_at > self._cfg.compound_interval_sec:
             self._compound(now)
 
-    def _discover(self, now: float) -> None:
-        """Discover active markets."""
-        new_markets = discover_markets(
+        if now - self._last_latency_report > _LATENCY_REPORT_INTERVAL_SEC:
+            self._report_latency(now)
+
+    def _warm_start(self, now: float) -> None:
+        """Load active markets from the local cache so trading resumes at once.
+
+        Markets that ended within the retention window while the bot was
+        down are cleaned up, queueing redemptions for fills still held.
+        """
+        if self._market_cache is None:
+            return
+        try:
+            cached = self._market_cache.load(now, ended_since=now - _MARKET_CACHE_RETENTION_SEC)
+        except Exception as e:
+            log.warning("WARM_START_FAILED │ %s", e)
+            return
+
+        for m, _ in cached:
+            if m.end_time > now or m.slug in self._pending_redemptions:
+                continue
+            if self._filled_shares.get(m.up_token_id, ZERO) > ZERO or \
+               self._filled_shares.get(m.down_token_id, ZERO) > ZERO:
+                self._cleanup_market(m, "ended while offline")
+        cached = [(m, seen) for m, seen in cached if m.end_time > now]
+        if not cached:
+            return
+
+        cached = cached[:self._cfg.max_markets]
+        markets = [m for m, _ in cached]
+        seed_known_markets(markets)
+        for m, first_seen_at in cached:
+            self._first_seen_at.setdefault(m.slug, first_seen_at)
+        self._markets = markets
+        self._last_discovery = now
+        log.info("WARM_START │ %d markets restored from cache", len(markets))
+
+    async def _discovery_loop(self) -> None:
+        """Discover markets off the tick path; _tick applies the result."""
+        while True:
+            try:
+                markets = await asyncio.to_thread(self._discover_and_cache)
+                self._discovered = markets
+            except Exception as e:
+                log.warning("DISCOVERY_ERROR │ %s", e)
+            await asyncio.sleep(self._discovery_interval)
+
+    def _discover_and_cache(self) -> list[GabagoolMarket]:
+        """Run Gamma discovery and persist the result (runs in a worker thread)."""
+        markets = discover_markets(
             self._cfg.assets,
             self._cfg.timeframes,
             self._cfg.max_markets,
         )
+        if self._market_cache is not None and markets:
+            now = self._clock.now()
+            self._market_cache.save(markets, now)
+            self._market_cache.prune(now - _MARKET_CACHE_RETENTION_SEC)
+        return markets
+
+    def _apply_discovery(self, new_markets: list[GabagoolMarket], now: float) -> None:
+        """Replace the active market set with freshly discovered markets."""
         if new_markets:
             active_slugs = {m.slug for m in new_markets}
 
@@ -321,11 +684,7 @@ class GridMakerEngine:
             self._active_grid_levels[token_id] = set()
 
             for price, sz in grid:
-                self._order_mgr.place_order(
-                    self._client, market, token_id,
-                    direction, price, sz, seconds_to_end,
-                    reason="GRID_INIT",
-                )
+                self._place(market, token_id, direction, price, sz, seconds_to_end, "GRID_INIT")
                 self._active_grid_levels[token_id].add(price)
 
         n_levels = len(self._grid_spec.get(market.up_token_id, []))
@@ -362,10 +721,8 @@ class GridMakerEngine:
 
             for price in sorted(missing):
                 sz = spec_lookup[price]
-                self._order_mgr.place_order(
-                    self._client, market, token_id,
-                    direction, price, sz, seconds_to_end,
-                    reason="GRID_REPLENISH",
+                self._place(
+                    market, token_id, direction, price, sz, seconds_to_end, "GRID_REPLENISH",
                 )
                 active.add(price)
 
@@ -384,7 +741,7 @@ class GridMakerEngine:
             return
 
         try:
-            open_orders = self._client.get_orders()
+            open_orders = get_endpoint("clob.get_orders").call(self._client.get_orders, hedge=True)
         except Exception as e:
             log.warning("RESTORE_GRID_FAILED: %s", e)
             return
@@ -422,11 +779,16 @@ class GridMakerEngine:
     # -----------------------------------------------------------------
 
     def _batch_merge(self, now: float) -> None:
-        """Sweep all markets for merge opportunities on a timer."""
-        if now - self._last_batch_merge_at < self._cfg.merge_batch_interval_sec:
+        """Merge balanced pairs across markets when the scheduler says so."""
+        if self._chain_job is not None:
+            return  # previous batch still confirming — sweep again next tick
+
+        since_last = now - self._last_batch_merge_at
+        if since_last < self._merge_policy.min_interval_s:
             return
 
-        merged_count = 0
+        markets: dict[str, tuple[GabagoolMarket, Decimal]] = {}
+        candidates: list[MergeCandidate] = []
         for market in self._markets:
             if market.slug in self._completed_markets:
                 continue
@@ -438,27 +800,63 @@ class GridMakerEngine:
             if balanced < self._cfg.min_merge_shares:
                 continue
 
+            markets[market.slug] = (market, balanced)
+            candidates.append(MergeCandidate(
+                market.slug, balanced, NEG_RISK_MERGE_GAS if market.neg_risk else MERGE_GAS,
+            ))
+        if not candidates:
+            return
+
+        decision = decide_merge(
+            candidates,
+            since_last_s=since_last,
+            bankroll=self._effective_bankroll,
+            gas_price_wei=self._merge_gas_price(),
+            native_price_usd=self._cfg.matic_price_usd,
+            policy=self._merge_policy,
+        )
+        if not decision.merge:
+            log.debug(
+                "MERGE_WAIT │ %s │ %d markets │ locked=$%s gas=$%s util=%.2f",
+                decision.reason, len(candidates), decision.locked_usd,
+                f"{decision.gas_usd:.4f}" if decision.gas_usd is not None else "?",
+                decision.utilization,
+            )
+            return
+
+        for slug in decision.slugs:
+            market, balanced = markets[slug]
             self._execute_merge(market, balanced, now)
-            merged_count += 1
 
         self._last_batch_merge_at = now
-        if merged_count:
-            log.info(
-                "%sBATCH_MERGE │ %d markets merged%s",
-                C_GREEN, merged_count, C_RESET,
-            )
+        log.info(
+            "%sBATCH_MERGE │ %d markets │ %s │ locked=$%s gas=$%s util=%.2f%s",
+            C_GREEN, len(decision.slugs), decision.reason, decision.locked_usd,
+            f"{decision.gas_usd:.4f}" if decision.gas_usd is not None else "?",
+            decision.utilization, C_RESET,
+        )
+
+    def _merge_gas_price(self) -> int | None:
+        """Expected gas price (wei) for the next block, or None if unknown."""
+        if self._gas is None:
+            return None
+        try:
+            return self._gas.fees().expected_price
+        except Exception as e:
+            log.warning("MERGE_GAS_QUOTE_FAILED │ %s", e)
+            return None
 
     def _execute_merge(
         self, market: GabagoolMarket, balanced: Decimal, now: float,
     ) -> None:
-        """Execute a merge for a market with balanced shares."""
+        """Merge a market's balanced shares.
+
+        Dry-run settles at once; live queues the merge for the tick's batch.
+        """
         if not market.condition_id:
             log.warning("MERGE_SKIP %s │ no condition_id", market.slug[:30])
             return
 
-        up_filled = self._filled_shares.get(market.up_token_id, ZERO)
-        down_filled = self._filled_shares.get(market.down_token_id, ZERO)
-
         # Merge amount in base units (6 decimals for CTF)
         merge_amount = int(balanced * 10**6)
 
@@ -477,34 +875,175 @@ class GridMakerEngine:
                 C_GREEN, market.slug[:30], pnl, gas_cost, C_RESET,
             )
         elif self._w3 and self._account and self._funder:
-            try:
-                result = merge_positions(
-                    self._w3, self._account, self._funder,
-                    market.condition_id, merge_amount,
-                    neg_risk=market.neg_risk,
-                    max_gas_price_gwei=self._cfg.max_gas_price_gwei,
-                )
-                gas_usd = Decimal(result.gas_cost_wei) / Decimal(10**18) * self._cfg.matic_price_usd
-                pnl = balanced * ONE - gas_usd
-                self._session_pnl += pnl
-                log.info(
-                    "%sMERGE_CONFIRMED %s │ tx=%s pnl=$%s%s",
-                    C_GREEN, market.slug[:30], result.tx_hash, pnl, C_RESET,
-                )
-            except Exception as e:
-                log.error("%sMERGE_FAILED %s │ %s%s", C_RED, market.slug[:30], e, C_RESET)
-                return
+            # Settled when the batch confirms (_harvest_chain_job)
+            call = build_merge_call(
+                market.condition_id, merge_amount, market.neg_risk,
+                label=f"merge:{market.slug}",
+            )
+            self._chain_queue.append((_ChainOp("merge", market, balanced), call))
+            return
+
+        self._settle_merge(market, balanced, now)
+
+    def _settle_merge(self, market: GabagoolMarket, balanced: Decimal, now: float) -> None:
+        """Book a completed merge against filled shares."""
+        up_filled = self._filled_shares.get(market.up_token_id, ZERO)
+        down_filled = self._filled_shares.get(market.down_token_id, ZERO)
 
         # Reduce filled shares
         self._filled_shares[market.up_token_id] = up_filled - balanced
         self._filled_shares[market.down_token_id] = down_filled - balanced
         self._last_merge_at[market.slug] = now
+        self._mark_dirty(market, now)
 
         # Mark completed if everything merged
         if self._filled_shares.get(market.up_token_id, ZERO) <= ZERO and \
            self._filled_shares.get(market.down_token_id, ZERO) <= ZERO:
             self._completed_markets.add(market.slug)
 
+    # -----------------------------------------------------------------
+    # On-chain batch (merges + redeems via Safe MultiSend)
+    # -----------------------------------------------------------------
+
+    def _submit_chain_batch(self) -> None:
+        """Hand this tick's merges and redeems to the chain worker as one job."""
+        if not self._chain_queue or self._chain_job is not None:
+            return
+        queued, self._chain_queue = self._chain_queue, []
+        self._chain_ops = {call.label: op for op, call in queued}
+        n_merge = sum(1 for op, _ in queued if op.kind == "merge")
+        log.info(
+            "CHAIN_BATCH │ %d merges + %d redeems │ max_gas=%d",
+            n_merge, len(queued) - n_merge, self._cfg.max_batch_gas,
+        )
+        calls = [call for _, call in queued]
+        if self._receipts is not None and self._loop is not None:
+            # Called from the tick thread — run on the loop, harvest via the
+            # concurrent Future like the worker path
+            self._chain_job = asyncio.run_coroutine_threadsafe(
+                execute_batch_async(
+                    self._w3, self._account, self._funder, calls, self._receipts,
+                    max_gas_price_gwei=self._cfg.max_gas_price_gwei,
+                    max_batch_gas=self._cfg.max_batch_gas,
+                    gas_oracle=self._gas,
+                ),
+                self._loop,
+            )
+            return
+        self._chain_job = self._chain_executor.submit(
+            execute_batch, self._w3, self._account, self._funder, calls,
+            max_gas_price_gwei=self._cfg.max_gas_price_gwei,
+            max_batch_gas=self._cfg.max_batch_gas,
+            gas_oracle=self._gas,
+        )
+
+    def _harvest_chain_job(self, now: float) -> None:
+        """Apply the finished batch's per-chunk results to merges/redemptions."""
+        job = self._chain_job
+        if job is None or not job.done():
+            return
+        self._chain_job = None
+        ops, self._chain_ops = self._chain_ops, {}
+
+        try:
+            batches = job.result()
+        except Exception as e:  # approval tx failed — nothing was sent
+            for op in ops.values():
+                self._fail_chain_op(op, e)
+            return
+
+        for batch in batches:
+            gas_usd = ZERO
+            if batch.result is not None:
+                # Split the shared tx cost evenly across its calls
+                gas_usd = (
+                    Decimal(batch.result.gas_cost_wei) / Decimal(10**18)
+                    * self._cfg.matic_price_usd / len(batch.calls)
+                )
+            for call in batch.calls:
+                op = ops.get(call.label)
+                if op is None:
+                    continue
+                if batch.error is None:
+                    self._complete_chain_op(op, batch.result.tx_hash, gas_usd, now)
+                else:
+                    self._fail_chain_op(op, batch.error)
+
+    def _complete_chain_op(self, op: _ChainOp, tx_hash: str, gas_usd: Decimal, now: float) -> None:
+        slug = op.market.slug
+        if op.kind == "merge":
+            pnl = op.shares * ONE - gas_usd
+            self._session_pnl += pnl
+            log.info(
+                "%sMERGE_CONFIRMED %s │ tx=%s pnl=$%s%s",
+                C_GREEN, slug[:30], tx_hash, pnl, C_RESET,
+            )
+            self._settle_merge(op.market, op.shares, now)
+            return
+
+        self._mark_dirty(op.market, now)
+        pr = self._pending_redemptions.pop(slug, None)
+        if pr:
+            winning = max(pr.up_shares, pr.down_shares)
+            self._session_pnl += winning
+            self._filled_shares.pop(pr.market.up_token_id, None)
+            self._filled_shares.pop(pr.market.down_token_id, None)
+        log.info(
+            "%sREDEEM_CONFIRMED %s │ tx=%s%s",
+            C_GREEN, slug[:40], tx_hash, C_RESET,
+        )
+
+    def _fail_chain_op(self, op: _ChainOp, error: Exception) -> None:
+        slug = op.market.slug
+        if op.kind == "merge":
+            log.error("%sMERGE_FAILED %s │ %s%s", C_RED, slug[:30], error, C_RESET)
+            return
+        pr = self._pending_redemptions.get(slug)
+        if pr:
+            pr.attempts += 1
+        log.warning("REDEEM_FAILED %s │ %s", slug[:40], error)
+
+    # -----------------------------------------------------------------
+    # Chain reconciliation
+    # -----------------------------------------------------------------
+
+    def _mark_dirty(self, market: GabagoolMarket, now: float) -> None:
+        if self._reconciler is not None:
+            self._reconciler.mark_dirty(market.up_token_id, now)
+            self._reconciler.mark_dirty(market.down_token_id, now)
+
+    def _reconcile(self, now: float) -> None:
+        """Diff on-chain CTF balances against _filled_shares and adopt the chain's."""
+        mode = self._reconciler.due(now)
+        if mode is None:
+            return
+
+        markets = list(self._markets) + [pr.market for pr in self._pending_redemptions.values()]
+        tokens = [t for m in markets for t in (m.up_token_id, m.down_token_id)]
+        in_chain = list(self._chain_ops.values()) + [op for op, _ in self._chain_queue]
+        busy = {t for op in in_chain for t in (op.market.up_token_id, op.market.down_token_id)}
+        try:
+            corrections = self._reconciler.reconcile(
+                self._filled_shares, tokens, now, busy=busy, full=(mode == "full"),
+            )
+        except Exception as e:
+            log.warning("RECONCILE_FAILED │ %s │ %s", mode, e)
+            return
+        if not corrections:
+            return
+
+        chain = {c.token_id: c.chain for c in corrections}
+        for c in corrections:
+            self._filled_shares[c.token_id] = c.chain
+            log.warning(
+                "%sRECONCILE │ token=%s… │ engine=%s chain=%s%s",
+                C_YELLOW, c.token_id[:12], c.engine, c.chain, C_RESET,
+            )
+        # Redemption sizing follows the corrected balances
+        for pr in self._pending_redemptions.values():
+            pr.up_shares = chain.get(pr.market.up_token_id, pr.up_shares)
+            pr.down_shares = chain.get(pr.market.down_token_id, pr.down_shares)
+
     # -----------------------------------------------------------------
     # Fill callback
     # -----------------------------------------------------------------
@@ -516,6 +1055,8 @@ class GridMakerEngine:
 
         token_id = order_state.token_id
         self._filled_shares[token_id] = self._filled_shares.get(token_id, ZERO) + delta
+        if self._reconciler is not None:
+            self._reconciler.mark_dirty(token_id, self._clock.now())
 
         direction = order_state.direction.value if order_state.direction else "?"
         market_slug = order_state.market.slug[:30] if order_state.market else "?"
@@ -568,35 +1109,10 @@ class GridMakerEngine:
         log.info("%sCLEANUP %s │ %s%s", C_DIM, market.slug[:40], reason, C_RESET)
 
     def _check_redemptions(self, now: float) -> None:
-        """Process pending redemptions for expired markets."""
-        # Phase A — harvest completed tasks
-        for slug in list(self._pending_redeem_task):
-            task = self._pending_redeem_task[slug]
-            if not task.done():
-                continue
-            del self._pending_redeem_task[slug]
-            try:
-                result = task.result()
-                pr = self._pending_redemptions.pop(slug, None)
-                if pr:
-                    winning = max(pr.up_shares, pr.down_shares)
-                    self._session_pnl += winning
-                    self._filled_shares.pop(pr.market.up_token_id, None)
-                    self._filled_shares.pop(pr.market.down_token_id, None)
-                log.info(
-                    "%sREDEEM_CONFIRMED %s │ tx=%s%s",
-                    C_GREEN, slug[:40], result.tx_hash, C_RESET,
-                )
-            except Exception as e:
-                pr = self._pending_redemptions.get(slug)
-                if pr:
-                    pr.attempts += 1
-                log.warning("REDEEM_FAILED %s │ %s", slug[:40], e)
-
-        # Phase B — launch new redemptions
+        """Queue eligible redemptions into the tick's on-chain batch."""
         for slug, pr in list(self._pending_redemptions.items()):
-            if slug in self._pending_redeem_task:
-                continue
+            if f"redeem:{slug}" in self._chain_ops:
+                continue  # riding the in-flight batch
             if now < pr.eligible_at:
                 continue
             if pr.attempts >= self._cfg.redeem_max_attempts:
@@ -619,18 +1135,24 @@ class GridMakerEngine:
                 self._pending_redemptions.pop(slug)
                 continue
 
-            # Live: launch async redeem
+            if self._chain_job is not None:
+                continue  # joins the next batch
+
+            # Live: queue for the batched Safe tx
             redeem_amount = 0
             if pr.market.neg_risk:
                 redeem_amount = int(max(pr.up_shares, pr.down_shares) * 10**CTF_DECIMALS)
             pr.last_attempt_at = now
-            task = asyncio.ensure_future(asyncio.to_thread(
-                redeem_positions, self._w3, self._account, self._funder,
-                pr.market.condition_id, neg_risk=pr.market.neg_risk,
-                amount=redeem_amount,
-                max_gas_price_gwei=self._cfg.max_gas_price_gwei,
-            ))
-            self._pending_redeem_task[slug] = task
+            try:
+                call = build_redeem_call(
+                    pr.market.condition_id, pr.market.neg_risk, redeem_amount,
+                    label=f"redeem:{slug}",
+                )
+            except ValueError as e:
+                pr.attempts += 1
+                log.warning("REDEEM_FAILED %s │ %s", slug[:40], e)
+                continue
+            self._chain_queue.append((_ChainOp("redeem", pr.market, ZERO), call))
 
     def _compound(self, now: float) -> None:
         """Recalculate effective bankroll from session P&L."""
@@ -642,3 +1164,16 @@ class GridMakerEngine:
             )
             self._effective_bankroll = new_bankroll
         self._last_compound_at = now
+
+    def _report_latency(self, now: float) -> None:
+        """Log rolling p50/p95/p99 and breaker state per REST endpoint."""
+        self._last_latency_report = now
+        log.info("CLOCK │ %s", self._clock.stats())
+        for name, st in sorted(endpoint_stats().items()):
+            if not st["samples"]:
+                continue
+            log.info(
+                "LATENCY │ %-16s │ p50=%sms p95=%sms p99=%sms (slo %dms) │ n=%d hedges=%d │ %s",
+                name, st["p50_ms"], st["p95_ms"], st["p99_ms"], st["slo_p95_ms"],
+                st["samples"], st["hedges"], st["state"],
+            )
@@ -0,0 +1,355 @@
+"""Crash-safe engine state — append-only journal plus compacted snapshots.
+
+Fill accounting, grid specs, the redemption queue, first-seen times, PnL
+and tracked orders used to live only in memory, so a restart lost the
+redemption queue and PnL.  The engine now hands the journal a view of that
+state after every tick; a background thread diffs it against what is
+already on disk and appends only the changed keys.
+
+On-disk layout (``directory``):
+    state.snap     one frame: the full state at the last compaction
+    state.journal  frames: put/del records since that snapshot
+
+Every frame is ``u32 length ‖ u32 crc32 ‖ payload``; a torn or corrupt
+tail (crash mid-write) fails the length/CRC check, replay stops there and
+the file is truncated back to the last good frame.  Records carry absolute
+values, so replaying a record twice (crash between snapshot rename and
+journal truncate) is harmless.
+
+Payloads use a small tagged binary codec (None/bool/int/float/str/Decimal/
+list/map) — compact, and Decimal round-trips exactly.
+
+Usage:
+    journal = StateJournal("data/grid_maker_state")
+    state = journal.load()          # {section: {key: value}}
+    journal.start()
+    journal.submit(engine_state)    # non-blocking, latest view wins
+    journal.close()                 # final write + snapshot
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import struct
+import threading
+import time
+import zlib
+from decimal import Decimal
+from pathlib import Path
+from typing import Any, Optional
+
+log = logging.getLogger("gm.journal")
+
+DEFAULT_SNAPSHOT_EVERY = 20_000      # records
+DEFAULT_SNAPSHOT_INTERVAL_SEC = 300.0
+
+State = dict[str, dict[Any, Any]]
+
+# ── Codec ──
+
+_T_NONE, _T_TRUE, _T_FALSE, _T_INT, _T_FLOAT, _T_STR, _T_DEC, _T_LIST, _T_MAP = range(9)
+_F64 = struct.Struct("<d")
+
+
+def _put_varint(out: bytearray, n: int) -> None:
+    while n >= 0x80:
+        out.append((n & 0x7F) | 0x80)
+        n >>= 7
+    out.append(n)
+
+
+def _get_varint(buf: bytes, pos: int) -> tuple[int, int]:
+    n = shift = 0
+    while True:
+        b = buf[pos]
+        pos += 1
+        n |= (b & 0x7F) << shift
+        if b < 0x80:
+            return n, pos
+        shift += 7
+
+
+def _encode(out: bytearray, v: Any) -> None:
+    if v is None:
+        out.append(_T_NONE)
+    elif v is True:
+        out.append(_T_TRUE)
+    elif v is False:
+        out.append(_T_FALSE)
+    elif isinstance(v, int):
+        out.append(_T_INT)
+        _put_varint(out, (v << 1) if v >= 0 else ((-v << 1) - 1))  # zigzag
+    elif isinstance(v, float):
+        out.append(_T_FLOAT)
+        out += _F64.pack(v)
+    elif isinstance(v, str):
+        raw = v.encode("utf-8")
+        out.append(_T_STR)
+        _put_varint(out, len(raw))
+        out += raw
+    elif isinstance(v, Decimal):
+        raw = str(v).encode("ascii")
+        out.append(_T_DEC)
+        _put_varint(out, len(raw))
+        out += raw
+    elif isinstance(v, (list, tuple)):
+        out.append(_T_LIST)
+        _put_varint(out, len(v))
+        for item in v:
+            _encode(out, item)
+    elif isinstance(v, dict):
+        out.append(_T_MAP)
+        _put_varint(out, len(v))
+        for key, item in v.items():
+            _encode(out, key)
+            _encode(out, item)
+    else:
+        raise TypeError(f"journal codec can't encode {type(v).__name__}")
+
+
+def _decode(buf: bytes, pos: int) -> tuple[Any, int]:
+    tag = buf[pos]
+    pos += 1
+    if tag == _T_NONE:
+        return None, pos
+    if tag == _T_TRUE:
+        return True, pos
+    if tag == _T_FALSE:
+        return False, pos
+    if tag == _T_INT:
+        z, pos = _get_varint(buf, pos)
+        return (z >> 1) if not z & 1 else -((z + 1) >> 1), pos
+    if tag == _T_FLOAT:
+        return _F64.unpack_from(buf, pos)[0], pos + 8
+    if tag in (_T_STR, _T_DEC):
+        n, pos = _get_varint(buf, pos)
+        raw = buf[pos:pos + n].decode("utf-8")
+        return (raw if tag == _T_STR else Decimal(raw)), pos + n
+    if tag == _T_LIST:
+        n, pos = _get_varint(buf, pos)
+        items = []
+        for _ in range(n):
+            item, pos = _decode(buf, pos)
+            items.append(item)
+        return items, pos
+    if tag == _T_MAP:
+        n, pos = _get_varint(buf, pos)
+        result = {}
+        for _ in range(n):
+            key, pos = _decode(buf, pos)
+            result[key], pos = _decode(buf, pos)
+        return result, pos
+    raise ValueError(f"bad journal tag {tag}")
+
+
+def encode_value(v: Any) -> bytes:
+    out = bytearray()
+    _encode(out, v)
+    return bytes(out)
+
+
+def decode_value(buf: bytes) -> Any:
+    value, pos = _decode(buf, 0)
+    if pos != len(buf):
+        raise ValueError("trailing bytes after journal value")
+    return value
+
+
+# ── Framing ──
+
+_HEADER = struct.Struct("<II")  # payload length, crc32
+
+
+def frame(payload: bytes) -> bytes:
+    return _HEADER.pack(len(payload), zlib.crc32(payload)) + payload
+
+
+def read_frames(data: bytes) -> tuple[list[bytes], int]:
+    """Split ``data`` into payloads. Returns (payloads, bytes of valid frames)."""
+    payloads: list[bytes] = []
+    pos = 0
+    while pos + _HEADER.size <= len(data):
+        length, crc = _HEADER.unpack_from(data, pos)
+        end = pos + _HEADER.size + length
+        if end > len(data):
+            break  # torn write
+        payload = data[pos + _HEADER.size:end]
+        if zlib.crc32(payload) != crc:
+            break
+        payloads.append(payload)
+        pos = end
+    return payloads, pos
+
+
+# ── Journal ──
+
+_OP_PUT = "p"
+_OP_DEL = "d"
+
+
+def _apply(state: State, record: list) -> None:
+    op, section, key = record[0], record[1], record[2]
+    if op == _OP_PUT:
+        state.setdefault(section, {})[key] = record[3]
+    elif op == _OP_DEL:
+        state.get(section, {}).pop(key, None)
+
+
+class StateJournal:
+    """Diffs submitted state views and persists them on a writer thread."""
+
+    def __init__(
+        self,
+        directory: str,
+        snapshot_every: int = DEFAULT_SNAPSHOT_EVERY,
+        snapshot_interval_s: float = DEFAULT_SNAPSHOT_INTERVAL_SEC,
+        fsync: bool = False,
+    ) -> None:
+        self._dir = Path(directory)
+        self._dir.mkdir(parents=True, exist_ok=True)
+        self._snap_path = self._dir / "state.snap"
+        self._journal_path = self._dir / "state.journal"
+        self._snapshot_every = snapshot_every
+        self._snapshot_interval_s = snapshot_interval_s
+        self._fsync = fsync
+
+        self._written: State = {}          # what disk holds (writer thread only)
+        self._records_since_snapshot = 0
+        self._last_snapshot_at = time.monotonic()
+        self._file = None
+
+        self._pending: Optional[State] = None
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stop = False
+        self._thread: Optional[threading.Thread] = None
+        self.records_written = 0
+        self.snapshots_written = 0
+
+    # -----------------------------------------------------------------
+    # Startup
+    # -----------------------------------------------------------------
+
+    def load(self) -> State:
+        """Replay snapshot + journal. Truncates a torn journal tail."""
+        state: State = {}
+        if self._snap_path.exists():
+            payloads, _ = read_frames(self._snap_path.read_bytes())
+            if payloads:
+                state = decode_value(payloads[0])
+            else:
+                log.warning("JOURNAL │ snapshot unreadable, replaying journal only")
+
+        replayed = 0
+        if self._journal_path.exists():
+            data = self._journal_path.read_bytes()
+            payloads, valid = read_frames(data)
+            for payload in payloads:
+                _apply(state, decode_value(payload))
+            replayed = len(payloads)
+            if valid < len(data):
+                log.warning("JOURNAL │ dropping %d torn bytes at tail", len(data) - valid)
+                with open(self._journal_path, "r+b") as f:
+                    f.truncate(valid)
+
+        self._written = {section: dict(values) for section, values in state.items()}
+        self._records_since_snapshot = replayed
+        log.info(
+            "JOURNAL_LOADED │ %s │ %d journal records │ %s",
+            self._dir, replayed,
+            ", ".join(f"{s}={len(v)}" for s, v in sorted(state.items())) or "empty",
+        )
+        return state
+
+    def start(self) -> None:
+        self._file = open(self._journal_path, "ab")
+        self._thread = threading.Thread(target=self._run, name="journal", daemon=True)
+        self._thread.start()
+
+    # -----------------------------------------------------------------
+    # Tick-side API
+    # -----------------------------------------------------------------
+
+    def submit(self, state: State) -> None:
+        """Hand over the latest state view. Never blocks on I/O."""
+        with self._lock:
+            self._pending = state
+        self._wakeup.set()
+
+    def close(self) -> None:
+        """Write the last submitted view, compact, and stop the writer."""
+        self._stop = True
+        self._wakeup.set()
+        if self._thread is not None:
+            self._thread.join(timeout=10)
+            self._thread = None
+        else:
+            self._drain()
+        if self._file is not None:
+            self._snapshot()
+            self._file.close()
+            self._file = None
+
+    # -----------------------------------------------------------------
+    # Writer thread
+    # -----------------------------------------------------------------
+
+    def _run(self) -> None:
+        while not self._stop:
+            self._wakeup.wait(timeout=1.0)
+            self._wakeup.clear()
+            try:
+                self._drain()
+            except Exception as e:
+                log.error("JOURNAL_WRITE_FAILED │ %s", e)
+        self._drain()
+
+    def _drain(self) -> None:
+        with self._lock:
+            state, self._pending = self._pending, None
+        if state is None or self._file is None:
+            return
+        records = self._diff(state)
+        if records:
+            self._file.write(b"".join(frame(encode_value(r)) for r in records))
+            self._file.flush()
+            if self._fsync:
+                os.fsync(self._file.fileno())
+            self.records_written += len(records)
+            self._records_since_snapshot += len(records)
+
+        if self._records_since_snapshot and (
+            self._records_since_snapshot >= self._snapshot_every
+            or time.monotonic() - self._last_snapshot_at >= self._snapshot_interval_s
+        ):
+            self._snapshot()
+
+    def _diff(self, state: State) -> list[list]:
+        records: list[list] = []
+        for section in set(state) | set(self._written):
+            new = state.get(section, {})
+            old = self._written.setdefault(section, {})
+            for key, value in new.items():
+                if key not in old or old[key] != value:
+                    records.append([_OP_PUT, section, key, value])
+                    old[key] = value
+            for key in [k for k in old if k not in new]:
+                records.append([_OP_DEL, section, key])
+                del old[key]
+        return records
+
+    def _snapshot(self) -> None:
+        """Write the full state atomically, then restart the journal."""
+        tmp = self._snap_path.with_suffix(".tmp")
+        with open(tmp, "wb") as f:
+            f.write(frame(encode_value(self._written)))
+            f.flush()
+            os.fsync(f.fileno())
+        tmp.replace(self._snap_path)
+        # A crash here replays already-snapshotted puts — idempotent
+        self._file.close()
+        self._file = open(self._journal_path, "wb")
+        self._records_since_snapshot = 0
+        self._last_snapshot_at = time.monotonic()
+        self.snapshots_written += 1
@@ -1,6 +1,8 @@
 """Market discovery for grid-maker strategy — 5m, 15m, 1h timeframes.
 
 Reuses shared market_data for 5m/15m discovery, adds 1h slug generation.
+All candidate slugs for every asset × timeframe resolve through one bulk
+Gamma request; the SlugPredictor skips windows that are already known.
 """
 
 from __future__ import annotations
@@ -8,15 +10,14 @@ from __future__ import annotations
 import logging
 import time
 
-import requests
-
 from shared.market_data import (
-    GAMMA_HOST,
     _ASSET_PREFIXES_5M,
     _ASSET_PREFIXES_15M,
+    SlugPredictor,
     _candidate_5m_slugs,
     _candidate_15m_slugs,
-    _fetch_market_by_slug,
+    _gamma_get_events,
+    _parse_event,
 )
 from shared.models import GabagoolMarket
 
@@ -28,6 +29,19 @@ _ASSET_PREFIXES_1H = {
     "ethereum": "eth",
 }
 
+# Tag search is only a fallback for 1h slugs that don't follow the epoch
+# pattern — results are remembered by the predictor, so search sparingly.
+_TAG_SEARCH_INTERVAL_SEC = 60.0
+
+_predictor = SlugPredictor()
+_tag_search_cache: dict[str, tuple[list[GabagoolMarket], float]] = {}  # asset -> (markets, epoch)
+
+
+def seed_known_markets(markets: list[GabagoolMarket]) -> None:
+    """Pre-populate the slug predictor (e.g. from the on-disk market cache)."""
+    for market in markets:
+        _predictor.add(market)
+
 
 def _candidate_1h_slugs(asset_prefix: str, now_epoch: float) -> list[str]:
     """Generate candidate slugs for 1h updown markets.
@@ -46,20 +60,18 @@ def _search_1h_markets(asset: str) -> list[GabagoolMarket]:
     """Search Gamma API for active 1h Up/Down markets by tag/category.
 
     Fallback for 1h markets whose slugs don't follow the epoch pattern.
+    The search response already carries full event data, so events are
+    parsed in place instead of re-fetched one slug at a time.
     """
     now = time.time()
     markets: list[GabagoolMarket] = []
 
     try:
-        resp = requests.get(
-            f"{GAMMA_HOST}/events",
-            params={
-                "tag": f"{asset}-1h",
-                "closed": "false",
-                "limit": 10,
-            },
-            timeout=10,
-        )
+        resp = _gamma_get_events({
+            "tag": f"{asset}-1h",
+            "closed": "false",
+            "limit": 10,
+        })
         if resp.status_code != 200:
             return []
 
@@ -68,7 +80,7 @@ def _search_1h_markets(asset: str) -> list[GabagoolMarket]:
             slug = event.get("slug", "")
             if "up" not in slug.lower() and "down" not in slug.lower():
                 continue
-            market = _fetch_market_by_slug(slug)
+            market = _parse_event(event, slug)
             if market and market.end_time > now:
                 markets.append(market)
     except Exception as e:
@@ -84,52 +96,41 @@ def discover_markets(
 ) -> list[GabagoolMarket]:
     """Discover active Up/Down markets for given assets and timeframes."""
     now = time.time()
-    markets: list[GabagoolMarket] = []
-    seen_slugs: set[str] = set()
+    candidates: list[str] = []
 
     for asset in assets:
-        # 5m markets
         if "5m" in timeframes:
             prefix = _ASSET_PREFIXES_5M.get(asset)
             if prefix:
-                for slug in _candidate_5m_slugs(prefix, now):
-                    if slug in seen_slugs:
-                        continue
-                    seen_slugs.add(slug)
-                    market = _fetch_market_by_slug(slug)
-                    if market and market.end_time > now:
-                        markets.append(market)
-
-        # 15m markets
+                candidates.extend(_candidate_5m_slugs(prefix, now))
         if "15m" in timeframes:
             prefix = _ASSET_PREFIXES_15M.get(asset)
             if prefix:
-                for slug in _candidate_15m_slugs(prefix, now):
-                    if slug in seen_slugs:
-                        continue
-                    seen_slugs.add(slug)
-                    market = _fetch_market_by_slug(slug)
-                    if market and market.end_time > now:
-                        markets.append(market)
-
-        # 1h markets
+                candidates.extend(_candidate_15m_slugs(prefix, now))
         if "1h" in timeframes:
             prefix = _ASSET_PREFIXES_1H.get(asset)
             if prefix:
-                # Try epoch-based slugs first
-                for slug in _candidate_1h_slugs(prefix, now):
-                    if slug in seen_slugs:
-                        continue
-                    seen_slugs.add(slug)
-                    market = _fetch_market_by_slug(slug)
-                    if market and market.end_time > now:
-                        markets.append(market)
-
-                # Fallback: search by tag
-                for market in _search_1h_markets(asset):
-                    if market.slug not in seen_slugs:
-                        seen_slugs.add(market.slug)
-                        markets.append(market)
+                candidates.extend(_candidate_1h_slugs(prefix, now))
+
+    # One bulk Gamma request for every unknown window across all assets
+    markets = _predictor.resolve(list(dict.fromkeys(candidates)), now)
+    seen_slugs = {m.slug for m in markets}
+
+    # Fallback: search 1h markets by tag, at most once per interval per asset
+    if "1h" in timeframes:
+        for asset in assets:
+            if asset not in _ASSET_PREFIXES_1H:
+                continue
+            cached = _tag_search_cache.get(asset)
+            if cached is None or now - cached[1] >= _TAG_SEARCH_INTERVAL_SEC:
+                cached = (_search_1h_markets(asset), now)
+                _tag_search_cache[asset] = cached
+                for market in cached[0]:
+                    _predictor.add(market)
+            for market in cached[0]:
+                if market.slug not in seen_slugs and market.end_time > now:
+                    seen_slugs.add(market.slug)
+                    markets.append(market)
 
     # Cap at max_markets
     markets = markets[:max_markets]
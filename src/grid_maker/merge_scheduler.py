@@ -0,0 +1,260 @@
+"""Gas-aware merge scheduling.
+
+Balanced Up+Down pairs are worth $1 each but sit idle as capital until they
+are merged back into USDC.  The old sweep merged everything once per
+``merge_batch_interval_sec`` regardless of gas, batch size or how much of
+the bankroll those pairs tied up.  decide_merge() weighs the same inputs
+the operator would:
+
+- locked capital — value of the balanced pairs a merge would free;
+- gas cost — the whole batch (per-call gas plus Safe overhead per MultiSend
+  chunk) at the current expected gas price, in USD;
+- utilization — locked capital as a fraction of the bankroll;
+- batchability — overhead is paid per chunk, so bigger batches are cheaper
+  per dollar freed.
+
+A batch goes out when gas is cheap relative to the capital freed, when the
+bankroll is capital-bound and gas is merely acceptable, or when
+``max_interval_s`` has passed regardless (the old behaviour, as a backstop).
+
+Everything here is pure, so replay() can re-run a recorded fill log (e.g.
+the Polymarket CSV export read by scripts/calc_pnl.py) under different
+policies offline.
+
+Usage:
+    decision = decide_merge(candidates, since_last_s=..., bankroll=...,
+                            gas_price_wei=oracle.fees().expected_price,
+                            native_price_usd=Decimal("0.40"), policy=policy)
+    if decision.merge:
+        merge(decision.slugs)
+"""
+
+from __future__ import annotations
+
+import math
+from dataclasses import dataclass, field
+from decimal import Decimal
+from typing import Callable, Iterable, Optional, Union
+
+from shared.models import ZERO
+
+WEI_PER_NATIVE = Decimal(10**18)
+
+# Gas per merge call and per Safe tx — mirrors shared.redeem's budgets
+DEFAULT_MERGE_GAS = 180_000
+DEFAULT_BATCH_OVERHEAD_GAS = 80_000
+
+
+@dataclass(frozen=True)
+class MergePolicy:
+    min_merge_shares: Decimal = Decimal("10")
+    min_interval_s: float = 60.0           # never merge more often than this
+    max_interval_s: float = 3600.0         # always merge at least this often
+    cheap_gas_ratio: Decimal = Decimal("0.001")   # gas/locked below this: merge
+    max_gas_ratio: Decimal = Decimal("0.01")      # ...below this when capital-bound
+    utilization_trigger: Decimal = Decimal("0.25")  # locked/bankroll = capital-bound
+    batch_overhead_gas: int = DEFAULT_BATCH_OVERHEAD_GAS
+    max_batch_gas: int = 6_000_000
+
+
+def fixed_interval_policy(
+    interval_s: float, min_merge_shares: Decimal = Decimal("10"),
+) -> MergePolicy:
+    """The pre-scheduler behaviour: merge everything every ``interval_s``."""
+    return MergePolicy(
+        min_merge_shares=min_merge_shares,
+        min_interval_s=interval_s,
+        max_interval_s=interval_s,
+        cheap_gas_ratio=ZERO,
+        max_gas_ratio=ZERO,
+    )
+
+
+@dataclass(frozen=True)
+class MergeCandidate:
+    slug: str
+    shares: Decimal       # balanced pairs available to merge
+    gas: int = DEFAULT_MERGE_GAS
+
+
+@dataclass(frozen=True)
+class MergeDecision:
+    merge: bool
+    # interval | cheap | capital | cooldown | expensive | no_gas_quote | none
+    reason: str
+    slugs: tuple[str, ...] = ()
+    locked_usd: Decimal = ZERO
+    gas_usd: Optional[Decimal] = None
+    utilization: Decimal = ZERO
+
+    @property
+    def gas_ratio(self) -> Optional[Decimal]:
+        if self.gas_usd is None or self.locked_usd <= ZERO:
+            return None
+        return self.gas_usd / self.locked_usd
+
+
+def batch_gas(call_gas: Iterable[int], overhead: int, max_batch_gas: int) -> int:
+    """Total gas for the calls, chunked greedily like redeem.pack_batches."""
+    total = 0
+    used = 0
+    for gas in call_gas:
+        if used and used + gas > max_batch_gas:
+            total += used
+            used = 0
+        if not used:
+            used = overhead
+        used += gas
+    return total + used
+
+
+def decide_merge(
+    candidates: list[MergeCandidate],
+    *,
+    since_last_s: float,
+    bankroll: Decimal,
+    gas_price_wei: Optional[int],
+    native_price_usd: Decimal,
+    policy: MergePolicy,
+) -> MergeDecision:
+    """Whether to send a merge batch now, and which markets ride it."""
+    eligible = [c for c in candidates if c.shares >= policy.min_merge_shares]
+    if not eligible:
+        return MergeDecision(False, "none")
+
+    slugs = tuple(c.slug for c in eligible)
+    locked = sum((c.shares for c in eligible), ZERO)  # $1 per pair
+    utilization = locked / bankroll if bankroll > ZERO else Decimal(1)
+
+    gas_usd = None
+    if gas_price_wei is not None:
+        gas = batch_gas((c.gas for c in eligible), policy.batch_overhead_gas, policy.max_batch_gas)
+        gas_usd = Decimal(gas * gas_price_wei) / WEI_PER_NATIVE * native_price_usd
+
+    def decision(merge: bool, reason: str) -> MergeDecision:
+        return MergeDecision(merge, reason, slugs if merge else (), locked, gas_usd, utilization)
+
+    if since_last_s >= policy.max_interval_s:
+        return decision(True, "interval")
+    if since_last_s < policy.min_interval_s:
+        return decision(False, "cooldown")
+    if gas_usd is None:
+        return decision(False, "no_gas_quote")
+
+    ratio = gas_usd / locked
+    if ratio <= policy.cheap_gas_ratio:
+        return decision(True, "cheap")
+    if utilization >= policy.utilization_trigger and ratio <= policy.max_gas_ratio:
+        return decision(True, "capital")
+    return decision(False, "expensive")
+
+
+# ── Offline replay ──
+
+
+@dataclass(frozen=True)
+class FillEvent:
+    ts: float
+    market: str
+    outcome: str          # "UP" | "DOWN"
+    shares: Decimal
+    neg_risk: bool = False
+
+
+@dataclass
+class ReplayResult:
+    merges: list[tuple[float, MergeDecision]] = field(default_factory=list)
+    merged_shares: Decimal = ZERO
+    gas_usd: Decimal = ZERO
+    locked_usd_hours: Decimal = ZERO    # balanced-pair capital × time left idle
+    end_locked_usd: Decimal = ZERO
+
+    @property
+    def batches(self) -> int:
+        return len(self.merges)
+
+
+def fills_from_csv_rows(rows: Iterable[dict]) -> list[FillEvent]:
+    """Buy rows of a Polymarket activity CSV export as fill events."""
+    fills = [
+        FillEvent(
+            ts=float(row["timestamp"]),
+            market=row["marketName"],
+            outcome=row["tokenName"].upper(),
+            shares=Decimal(row["tokenAmount"]),
+        )
+        for row in rows
+        if row.get("action") == "Buy" and row.get("tokenName", "").upper() in ("UP", "DOWN")
+    ]
+    fills.sort(key=lambda f: f.ts)
+    return fills
+
+
+def replay(
+    fills: list[FillEvent],
+    policy: MergePolicy,
+    *,
+    bankroll: Decimal,
+    gas_price_wei: Union[int, Callable[[float], Optional[int]]],
+    native_price_usd: Decimal,
+    tick_s: float = 10.0,
+    merge_gas: int = DEFAULT_MERGE_GAS,
+    neg_risk_merge_gas: int = 300_000,
+) -> ReplayResult:
+    """Re-run ``fills`` through decide_merge on a ``tick_s`` clock.
+
+    ``gas_price_wei`` is a constant or a function of time (a recorded gas
+    series).  Merges settle instantly; the cost of waiting shows up as
+    ``locked_usd_hours``.
+    """
+    result = ReplayResult()
+    if not fills:
+        return result
+    price_at = gas_price_wei if callable(gas_price_wei) else (lambda _t: gas_price_wei)
+
+    held: dict[str, dict[str, Decimal]] = {}
+    neg_risk: dict[str, bool] = {}
+    last_merge = -math.inf
+    i = 0
+    t = fills[0].ts
+    end = fills[-1].ts + policy.max_interval_s
+    while t <= end:
+        while i < len(fills) and fills[i].ts <= t:
+            f = fills[i]
+            side = held.setdefault(f.market, {"UP": ZERO, "DOWN": ZERO})
+            side[f.outcome] = side.get(f.outcome, ZERO) + f.shares
+            neg_risk[f.market] = f.neg_risk
+            i += 1
+
+        candidates = [
+            MergeCandidate(
+                m, min(s["UP"], s["DOWN"]), neg_risk_merge_gas if neg_risk[m] else merge_gas,
+            )
+            for m, s in held.items()
+            if min(s["UP"], s["DOWN"]) > ZERO
+        ]
+        decision = decide_merge(
+            candidates,
+            since_last_s=t - last_merge,
+            bankroll=bankroll,
+            gas_price_wei=price_at(t),
+            native_price_usd=native_price_usd,
+            policy=policy,
+        )
+        if decision.merge:
+            by_slug = {c.slug: c for c in candidates}
+            for slug in decision.slugs:
+                pairs = by_slug[slug].shares
+                held[slug]["UP"] -= pairs
+                held[slug]["DOWN"] -= pairs
+                result.merged_shares += pairs
+            result.gas_usd += decision.gas_usd or ZERO
+            result.merges.append((t, decision))
+            last_merge = t
+
+        locked = sum((min(s["UP"], s["DOWN"]) for s in held.values()), ZERO)
+        result.locked_usd_hours += locked * Decimal(str(tick_s)) / 3600
+        t += tick_s
+
+    result.end_locked_usd = sum((min(s["UP"], s["DOWN"]) for s in held.values()), ZERO)
+    return result
@@ -0,0 +1,132 @@
+"""Chain-state reconciler for the engine's fill accounting.
+
+``_filled_shares`` is built from fill callbacks, so it starts empty after a
+restart and drifts whenever a fill is missed or a merge settles
+differently than booked.  Merge sizing is only as right as that number.
+
+The Reconciler periodically reads the Safe's CTF balances for every token
+the engine cares about (one Multicall3 eth_call via BalanceReader) and
+reports where the engine's view differs from the chain:
+
+- full pass — every active and pending-redemption token, every
+  ``full_interval_s`` (and on the first tick, which restores fills after
+  a restart);
+- incremental pass — only tokens marked dirty (fill, merge, redeem) since
+  they were last read, every ``incremental_interval_s``.
+
+CLOB fills settle on-chain a few blocks after the match, so a token with
+activity in the last ``settle_grace_s`` — or with a merge/redeem still in
+flight — is left dirty and read on a later pass instead of "corrected"
+back to a stale balance.
+"""
+
+from __future__ import annotations
+
+import logging
+from dataclasses import dataclass
+from decimal import Decimal
+from typing import Callable, Iterable
+
+from shared.models import ZERO
+
+log = logging.getLogger("gm.reconciler")
+
+SHARE_UNIT = Decimal(10**6)  # CTF tokens use 6 decimals
+DEFAULT_TOLERANCE = Decimal("0.01")
+
+
+@dataclass(frozen=True)
+class Correction:
+    token_id: str
+    engine: Decimal   # _filled_shares before
+    chain: Decimal    # on-chain balance (shares)
+
+
+class Reconciler:
+    """Decides which tokens to read and diffs balances against the engine."""
+
+    def __init__(
+        self,
+        read_balances: Callable[[list[str]], dict[str, int]],
+        full_interval_s: float = 300.0,
+        incremental_interval_s: float = 5.0,
+        settle_grace_s: float = 30.0,
+        tolerance: Decimal = DEFAULT_TOLERANCE,
+    ) -> None:
+        self._read = read_balances
+        self._full_interval_s = full_interval_s
+        self._incremental_interval_s = incremental_interval_s
+        self._settle_grace_s = settle_grace_s
+        self._tolerance = tolerance
+        self._dirty: dict[str, float] = {}  # token -> last activity (epoch)
+        self._last_full = 0.0
+        self._last_incremental = 0.0
+        self.passes = 0
+        self.corrections = 0
+
+    def mark_dirty(self, token_id: str, now: float) -> None:
+        """Record activity on a token so the next incremental pass reads it."""
+        self._dirty[token_id] = now
+
+    @property
+    def dirty(self) -> set[str]:
+        return set(self._dirty)
+
+    def due(self, now: float) -> str | None:
+        """"full", "incremental" or None."""
+        if now - self._last_full >= self._full_interval_s:
+            return "full"
+        if self._dirty and now - self._last_incremental >= self._incremental_interval_s:
+            return "incremental"
+        return None
+
+    def reconcile(
+        self,
+        filled: dict[str, Decimal],
+        tokens: Iterable[str],
+        now: float,
+        busy: set[str] = frozenset(),
+        full: bool = False,
+    ) -> list[Correction]:
+        """Read chain balances and return the tokens whose engine count is off.
+
+        ``tokens`` is the universe a full pass reads; ``busy`` are tokens with
+        merges/redeems queued or in flight.  Does not mutate ``filled``.
+        """
+        if full:
+            self._last_full = now
+        self._last_incremental = now
+
+        universe = list(dict.fromkeys(tokens))
+        candidates = universe if full else [t for t in universe if t in self._dirty]
+        settled = [
+            t for t in candidates
+            if t not in busy and now - self._dirty.get(t, 0.0) >= self._settle_grace_s
+        ]
+        # Dirty tokens the engine no longer tracks have nothing to reconcile
+        tracked = set(universe)
+        for token in list(self._dirty):
+            if token not in tracked:
+                self._dirty.pop(token, None)
+        if not settled:
+            return []
+
+        balances = self._read(settled)
+        self.passes += 1
+
+        corrections: list[Correction] = []
+        for token in settled:
+            raw = balances.get(token)
+            if raw is None:
+                continue
+            self._dirty.pop(token, None)
+            chain = Decimal(raw) / SHARE_UNIT
+            engine = filled.get(token, ZERO)
+            if abs(chain - engine) >= self._tolerance:
+                corrections.append(Correction(token, engine, chain))
+        self.corrections += len(corrections)
+        log.debug(
+            "RECONCILE_PASS │ %s │ read=%d corrected=%d │ dirty=%d",
+            "full" if full else "incremental", len(settled), len(corrections), len(self._dirty),
+        )
+        return corrections
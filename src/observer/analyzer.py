@@ -3,7 +3,9 @@
 from __future__ import annotations
 
 import logging
-from datetime import datetime
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone
 from typing import Any
 
 from observer.models import (
@@ -19,19 +21,45 @@ from observer.models import (
 
 log = logging.getLogger("obs.analyzer")
 
+# Closed windows kept in memory (aggregates only; trades live in the DB)
+DEFAULT_MAX_CLOSED = 500
+# Windows close this long after market end — late merges still match
+DEFAULT_CLOSE_GRACE_SEC = 3600.0
+# Trades for a closed window are ignored this long after its market end,
+# so a late trade can't reopen it once it has left the closed list
+DEFAULT_CLOSED_GUARD_SEC = 86400.0
+
+# Slug timeframe -> window length: {prefix}-updown-{tf}-{start epoch}
+_TIMEFRAME_SEC = {"5m": 300, "15m": 900, "1h": 3600, "4h": 14400}
+
 
 class TradeAnalyzer:
     """Correlates trades into MarketWindow objects and computes strategy metrics."""
 
-    def __init__(self) -> None:
+    def __init__(
+        self,
+        max_closed: int = DEFAULT_MAX_CLOSED,
+        close_grace_s: float = DEFAULT_CLOSE_GRACE_SEC,
+        closed_guard_s: float = DEFAULT_CLOSED_GUARD_SEC,
+    ) -> None:
         self._windows: dict[str, MarketWindow] = {}  # slug -> window
-        self._closed: list[MarketWindow] = []
+        self._closed: OrderedDict[str, MarketWindow] = OrderedDict()  # oldest first, bounded
+        self._max_closed = max(1, max_closed)
+        self._close_grace_s = close_grace_s
+        self._closed_guard_s = closed_guard_s
+        self._closed_until: OrderedDict[str, float] = OrderedDict()  # slug -> ignore trades until
+        self._token_slug: dict[str, str] = {}         # token_id -> slug (active windows)
+        self._slug_tokens: dict[str, set[str]] = {}   # slug -> token_ids, for close
 
     def ingest_trades(self, trades: list[ObservedTrade]) -> None:
         """Add new trades and update their market windows."""
         for trade in trades:
+            if trade.slug in self._closed_until:
+                log.debug("TRADE_AFTER_CLOSE │ %s │ %s", trade.slug, trade.tx_hash[:10])
+                continue
             window = self._get_or_create_window(trade)
             window.trades.append(trade)
+            window.trade_count += 1
             window.last_trade_at = trade.timestamp
             if not window.first_trade_at:
                 window.first_trade_at = trade.timestamp
@@ -40,27 +68,23 @@ class TradeAnalyzer:
                 window.event_slug = trade.event_slug
             if trade.title and not window.title:
                 window.title = trade.title
+            if trade.asset and trade.asset not in self._token_slug:
+                self._token_slug[trade.asset] = window.slug
+                self._slug_tokens.setdefault(window.slug, set()).add(trade.asset)
 
             self._update_vwap(window, trade)
-            self._update_status(window)
+            self._update_status(window, trade)
 
     def ingest_merges(self, merges: list[ObservedMerge]) -> None:
         """Associate merges with market windows by token_id matching."""
         for merge in merges:
-            matched = False
-            for window in self._windows.values():
-                for trade in window.trades:
-                    if trade.asset == merge.token_id:
-                        window.merges.append(merge)
-                        window.merged_shares += merge.shares
-                        window.status = "MERGED"
-                        matched = True
-                        _log_window_merge(window, merge)
-                        break
-                if matched:
-                    break
-
-            if not matched:
+            window = self._windows.get(self._token_slug.get(merge.token_id, ""))
+            if window:
+                window.merges.append(merge)
+                window.merged_shares += merge.shares
+                window.status = "MERGED"
+                _log_window_merge(window, merge)
+            else:
                 log.debug(
                     "MERGE_UNMATCHED │ token=%s tx=%s",
                     merge.token_id[:16], merge.tx_hash[:10],
@@ -88,14 +112,42 @@ class TradeAnalyzer:
         return list(self._windows.values())
 
     def get_closed_windows(self) -> list[MarketWindow]:
-        return list(self._closed)
+        return list(self._closed.values())
 
-    def close_window(self, slug: str) -> MarketWindow | None:
-        """Mark a window as CLOSED and move to the closed list."""
+    def set_end_time(self, slug: str, end_date: str) -> None:
+        """Record a market end time from the positions API (ISO ``endDate``)."""
+        window = self._windows.get(slug)
+        if window and not window.end_ts:
+            window.end_ts = _parse_end_date(end_date)
+
+    def expire(self, now: float | None = None) -> list[MarketWindow]:
+        """Close every window whose market ended more than the grace period ago."""
+        now = time.time() if now is None else now
+        due = [
+            slug for slug, w in self._windows.items()
+            if w.end_ts and now >= w.end_ts + self._close_grace_s
+        ]
+        closed = [w for w in (self.close_window(slug, now) for slug in due) if w]
+        while self._closed_until and next(iter(self._closed_until.values())) <= now:
+            self._closed_until.popitem(last=False)
+        return closed
+
+    def close_window(self, slug: str, now: float | None = None) -> MarketWindow | None:
+        """Mark a window as CLOSED, compact it to aggregates and move it to the closed list."""
         window = self._windows.pop(slug, None)
+        for token_id in self._slug_tokens.pop(slug, ()):
+            self._token_slug.pop(token_id, None)
         if window:
             window.status = "CLOSED"
-            self._closed.append(window)
+            window.trades = []
+            window.merges = []
+            self._closed[slug] = window
+            while len(self._closed) > self._max_closed:
+                self._closed.popitem(last=False)
+            ended = window.end_ts or (time.time() if now is None else now)
+            self._closed_until[slug] = max(
+                self._closed_until.pop(slug, 0.0), ended + self._closed_guard_s,
+            )
             _log_window_closed(window)
         return window
 
@@ -117,7 +169,9 @@ class TradeAnalyzer:
 
     def _get_or_create_window(self, trade: ObservedTrade) -> MarketWindow:
         if trade.slug not in self._windows:
-            self._windows[trade.slug] = MarketWindow(slug=trade.slug)
+            self._windows[trade.slug] = MarketWindow(
+                slug=trade.slug, end_ts=_end_ts_from_slug(trade.slug),
+            )
             log.info(
                 "%sWINDOW_OPEN%s │ %s │ %s",
                 C_BOLD, C_RESET, trade.slug, trade.title,
@@ -147,12 +201,15 @@ class TradeAnalyzer:
         else:
             window.estimated_edge = 0.0
 
-    def _update_status(self, window: MarketWindow) -> None:
-        """Update window status based on trade state."""
-        has_up = any(t.outcome == "Up" and t.side == "BUY" for t in window.trades)
-        has_down = any(t.outcome == "Down" and t.side == "BUY" for t in window.trades)
+    def _update_status(self, window: MarketWindow, trade: ObservedTrade) -> None:
+        """Update window status with one new trade."""
+        if trade.side == "BUY":
+            if trade.outcome == "Up" and not window.first_up_at:
+                window.first_up_at = trade.timestamp
+            elif trade.outcome == "Down" and not window.first_down_at:
+                window.first_down_at = trade.timestamp
 
-        if has_up and has_down and window.status == "OPEN":
+        if window.first_up_at and window.first_down_at and window.status == "OPEN":
             window.status = "HEDGED"
             window.hedge_delay_sec = _compute_hedge_delay(window)
             _log_window_hedged(window)
@@ -160,16 +217,8 @@ class TradeAnalyzer:
 
 def _compute_hedge_delay(window: MarketWindow) -> float:
     """Compute seconds between first Up buy and first Down buy."""
-    first_up: str = ""
-    first_down: str = ""
-
-    for t in window.trades:
-        if t.side != "BUY":
-            continue
-        if t.outcome == "Up" and not first_up:
-            first_up = t.timestamp
-        elif t.outcome == "Down" and not first_down:
-            first_down = t.timestamp
+    first_up = str(window.first_up_at)
+    first_down = str(window.first_down_at)
 
     if not first_up or not first_down:
         return 0.0
@@ -185,11 +234,35 @@ def _compute_hedge_delay(window: MarketWindow) -> float:
         return 0.0
 
 
+def _end_ts_from_slug(slug: str) -> float:
+    """Market end from a ``{prefix}-updown-{tf}-{epoch}`` slug (0 if not one)."""
+    parts = slug.split("-")
+    if len(parts) < 4 or parts[1] != "updown" or parts[2] not in _TIMEFRAME_SEC:
+        return 0.0
+    try:
+        return float(int(parts[-1]) + _TIMEFRAME_SEC[parts[2]])
+    except ValueError:
+        return 0.0
+
+
+def _parse_end_date(end_date: str) -> float:
+    """ISO date/datetime (``...Z`` allowed) to unix seconds, 0 if unparseable."""
+    if not end_date:
+        return 0.0
+    try:
+        dt = datetime.fromisoformat(end_date.replace("Z", "+00:00"))
+    except (ValueError, TypeError):
+        return 0.0
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return dt.timestamp()
+
+
 def _window_summary(window: MarketWindow) -> dict[str, Any]:
     return {
         "slug": window.slug,
         "status": window.status,
-        "trades": len(window.trades),
+        "trades": window.trade_count,
         "up_shares": round(window.up_shares, 2),
         "down_shares": round(window.down_shares, 2),
         "up_vwap": round(window.up_vwap, 4),
@@ -237,7 +310,7 @@ def _log_window_closed(window: MarketWindow) -> None:
         C_DIM,
         C_RESET,
         window.slug,
-        len(window.trades),
+        window.trade_count,
         window.up_shares,
         window.down_shares,
         window.merged_shares,
@@ -4,10 +4,15 @@ from __future__ import annotations
 
 import logging
 import os
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from typing import Any
 
 from web3 import Web3
 
+from shared.chain import get_contract, get_web3
+from shared.redeem import BalanceReader
+
 log = logging.getLogger("obs.balance")
 
 # USDC.e contract on Polygon (6 decimals)
@@ -24,6 +29,17 @@ POLYMARKET_ADDRESSES = {
 # Transfer(address indexed from, address indexed to, uint256 value)
 TRANSFER_TOPIC = "0xddf252ad1be2c89b69c2b068fc378daa952ba7f163c4a11628f55a4df523b3ef"
 
+# Transfer scanning
+DEFAULT_CHUNK_BLOCKS = 2_000
+MAX_CHUNK_BLOCKS = 50_000
+MIN_CHUNK_BLOCKS = 16
+DEFAULT_SCAN_WORKERS = 4
+DEFAULT_LOOKBACK_BLOCKS = 2_000   # first scan: ~1h of Polygon blocks
+BLOCK_TS_CACHE_SIZE = 10_000
+
+# Substrings providers use when an eth_getLogs range returns too much
+_RANGE_LIMIT_HINTS = ("too many", "more than", "limit", "exceed", "range", "too large", "timeout")
+
 # ERC-20 ABI (minimal — just balanceOf)
 USDC_ABI = [
     {
@@ -39,27 +55,47 @@ USDC_ABI = [
 class BalanceTracker:
     """Tracks USDC balance and transfer history for a proxy address."""
 
-    def __init__(self, proxy_address: str) -> None:
+    def __init__(
+        self,
+        proxy_address: str,
+        chunk_blocks: int = DEFAULT_CHUNK_BLOCKS,
+        scan_workers: int = DEFAULT_SCAN_WORKERS,
+        lookback_blocks: int = DEFAULT_LOOKBACK_BLOCKS,
+    ) -> None:
         self._proxy = Web3.to_checksum_address(proxy_address)
         self._proxy_lower = proxy_address.lower()
+        self._usdc_checksum = Web3.to_checksum_address(USDC_ADDRESS)
+        proxy_topic = "0x" + "0" * 24 + self._proxy_lower[2:]
+        # Server-side filters: proxy as sender, proxy as recipient
+        self._topic_filters = [[TRANSFER_TOPIC, proxy_topic], [TRANSFER_TOPIC, None, proxy_topic]]
+        self._chunk_blocks = max(MIN_CHUNK_BLOCKS, chunk_blocks)
+        self._max_chunk_blocks = max(self._chunk_blocks, MAX_CHUNK_BLOCKS)
+        self._workers = max(1, scan_workers)
+        self._lookback_blocks = lookback_blocks
+        self._transfer_cursor = 0
+        self._block_ts: OrderedDict[int, int] = OrderedDict()  # block -> unix ts
         self._rpc_url = os.environ.get("POLYGON_RPC_URL", "")
+        self._reader: BalanceReader | None = None
+        # On-chain share balances of the last poll (asset -> shares)
+        self.token_balances: dict[str, float] = {}
+        # Errors swallowed by the last poll_balance() / scan_new_transfers()
+        self.balance_error: Exception | None = None
+        self.transfer_error: Exception | None = None
 
         if not self._rpc_url:
             log.warning("POLYGON_RPC_URL not set — balance tracking disabled")
             self._w3 = None
             self._usdc_contract = None
         else:
-            self._w3 = Web3(Web3.HTTPProvider(self._rpc_url))
+            self._w3 = get_web3(self._rpc_url)
             if not self._w3.is_connected():
                 log.error("RPC_CONNECT_FAIL │ url=%s", self._rpc_url)
                 self._w3 = None
                 self._usdc_contract = None
             else:
-                usdc_checksum = Web3.to_checksum_address(USDC_ADDRESS)
-                self._usdc_contract = self._w3.eth.contract(
-                    address=usdc_checksum,
-                    abi=USDC_ABI,
-                )
+                usdc_checksum = self._usdc_checksum
+                self._usdc_contract = get_contract(self._w3, usdc_checksum, USDC_ABI)
+                self._reader = BalanceReader(self._w3)
                 log.info(
                     "BALANCE_TRACKER_INIT │ proxy=%s │ usdc=%s",
                     self._proxy[:10],
@@ -69,22 +105,38 @@ class BalanceTracker:
     def poll_balance(self, position_data: list[dict[str, Any]]) -> tuple[float, float]:
         """Poll USDC balance and compute total position value.
 
+        USDC and the on-chain share balance of every position's asset are
+        read in one Multicall3 eth_call; shares land in ``token_balances``.
+
         Args:
-            position_data: List of position dicts with 'current_value' field.
+            position_data: List of position dicts with 'current_value' field
+                (and 'asset' token id for the on-chain share read).
 
         Returns:
             (usdc_balance, total_position_value) — both in USD.
         """
-        if not self._w3 or not self._usdc_contract:
+        self.balance_error = None
+        if not self._w3 or not self._reader:
             return 0.0, 0.0
 
+        assets = [str(pos["asset"]) for pos in position_data if pos.get("asset")]
         try:
-            # On-chain USDC balance (6 decimals)
-            raw_balance = self._usdc_contract.functions.balanceOf(self._proxy).call()
-            usdc_balance = raw_balance / 1e6
+            # On-chain balances (6 decimals)
+            snapshot = self._reader.read(self._proxy, assets)
+            usdc_balance = snapshot.usdc / 1e6
         except Exception as exc:
             log.warning("BALANCE_POLL_FAIL │ %s", exc)
+            self.balance_error = exc
             return 0.0, 0.0
+        self.token_balances = {asset: raw / 1e6 for asset, raw in snapshot.tokens.items()}
+
+        for pos in position_data:
+            onchain = self.token_balances.get(str(pos.get("asset", "")))
+            if onchain is not None and abs(onchain - pos.get("size", 0.0)) >= 0.01:
+                log.debug(
+                    "POSITION_DRIFT │ %s %s │ api=%.2f chain=%.2f",
+                    pos.get("slug", "?"), pos.get("outcome", "?"), pos.get("size", 0.0), onchain,
+                )
 
         # Sum current_value from positions
         total_position_value = sum(pos.get("current_value", 0.0) for pos in position_data)
@@ -98,6 +150,28 @@ class BalanceTracker:
 
         return usdc_balance, total_position_value
 
+    def scan_new_transfers(self) -> list[dict[str, Any]]:
+        """Transfers since the block cursor; advances it past what was scanned.
+
+        The first scan (no cursor) starts ``lookback_blocks`` behind the tip.
+        A range that could not be fetched stays behind the cursor and is
+        retried on the next call; ``transfer_error`` then holds its error.
+        """
+        self.transfer_error = None
+        if not self._w3:
+            return []
+        try:
+            latest = int(self._w3.eth.block_number)
+        except Exception as exc:
+            log.warning("TRANSFER_SCAN_FAIL │ block_number │ %s", exc)
+            self.transfer_error = exc
+            return []
+        start = self._transfer_cursor or max(0, latest - self._lookback_blocks)
+        if start > latest:
+            return []
+        transfers, self._transfer_cursor = self._scan_range(start, latest)
+        return transfers
+
     def scan_transfers(self, from_block: int, to_block: int) -> list[dict[str, Any]]:
         """Scan USDC transfer events involving the proxy address.
 
@@ -109,6 +183,7 @@ class BalanceTracker:
             List of transfer dicts with keys:
                 - ts: block timestamp (Unix seconds)
                 - tx_hash: transaction hash
+                - log_index: position of the Transfer log in its block
                 - from_address: sender address (lowercase)
                 - to_address: recipient address (lowercase)
                 - amount: USDC amount (float)
@@ -117,87 +192,161 @@ class BalanceTracker:
         """
         if not self._w3 or not self._usdc_contract:
             return []
+        transfers, _ = self._scan_range(from_block, to_block)
+        return transfers
 
-        try:
-            usdc_checksum = Web3.to_checksum_address(USDC_ADDRESS)
+    def _scan_range(self, from_block: int, to_block: int) -> tuple[list[dict[str, Any]], int]:
+        """Transfers in [from_block, to_block] and the first block not yet scanned.
 
-            # Build filter for Transfer events involving proxy (from OR to)
-            # eth_getLogs with topic[1]=from OR topic[2]=to
-            logs = self._w3.eth.get_logs(
-                {
-                    "fromBlock": from_block,
-                    "toBlock": to_block,
-                    "address": usdc_checksum,
-                    "topics": [
-                        TRANSFER_TOPIC,
-                        # Use None to match any sender, then filter in Python
-                    ],
-                }
-            )
-        except Exception as exc:
-            log.warning(
-                "TRANSFER_SCAN_FAIL │ from=%d to=%d │ %s",
-                from_block,
-                to_block,
-                exc,
-            )
-            return []
+        Two server-side filtered queries per chunk (proxy as sender, proxy as
+        recipient), all chunks fetched in parallel.  Chunks the node rejects
+        as too large are bisected; the chunk size then adapts for next time.
+        """
+        chunk = self._chunk_blocks
+        ranges = [
+            (a, min(a + chunk - 1, to_block))
+            for a in range(from_block, to_block + 1, chunk)
+        ]
+        jobs = [(topics, a, b) for a, b in ranges for topics in self._topic_filters]
+        with ThreadPoolExecutor(max_workers=self._workers) as pool:
+            futures = [pool.submit(self._fetch_logs, *job) for job in jobs]
+            outcomes = []
+            for fut in futures:
+                try:
+                    outcomes.append(fut.result())
+                except Exception as exc:
+                    outcomes.append(exc)
+
+        logs: list[Any] = []
+        cursor = to_block + 1
+        smallest = chunk
+        for (_, a, _), outcome in zip(jobs, outcomes):
+            if isinstance(outcome, Exception):
+                if a < cursor:
+                    cursor = a
+                    self.transfer_error = outcome
+                    log.warning(
+                        "TRANSFER_SCAN_FAIL │ blocks %d+ │ %s │ retrying next scan", a, outcome,
+                    )
+                continue
+            chunk_logs, span = outcome
+            if span is not None:
+                smallest = min(smallest, span)
+            logs.extend(chunk_logs)
+
+        if smallest < chunk:
+            self._chunk_blocks = max(MIN_CHUNK_BLOCKS, smallest)
+        elif cursor > to_block:
+            self._chunk_blocks = min(self._max_chunk_blocks, chunk * 2)
 
         transfers: list[dict[str, Any]] = []
+        seen: set[tuple[str, int]] = set()
         for entry in logs:
-            tx_hash = entry["transactionHash"].hex()
-            block_number = entry["blockNumber"]
+            if entry["blockNumber"] >= cursor:
+                continue  # re-fetched with the failed range next scan
+            tx_hash = Web3.to_hex(entry["transactionHash"])
+            key = (tx_hash, int(entry.get("logIndex", 0)))
+            if key in seen:
+                continue  # self-transfer matches both queries
+            seen.add(key)
 
-            # Decode topics: topic[0] = event sig, topic[1] = from, topic[2] = to
             topics = entry["topics"]
-            if len(topics) < 3:
-                continue
-
-            from_addr = _extract_address(topics[1])
-            to_addr = _extract_address(topics[2])
-
-            # Filter: only include transfers where proxy is from or to
-            if from_addr != self._proxy_lower and to_addr != self._proxy_lower:
-                continue
-
-            # Decode amount from data field (uint256, 32 bytes)
-            data = entry["data"]
-            if not data or data == "0x":
+            if len(topics) < 3 or not entry["data"]:
                 continue
-            amount_raw = int(data.hex(), 16)
-            amount = amount_raw / 1e6
-
-            # Classify transfer type
-            transfer_type = self._classify_transfer(from_addr, to_addr)
-
-            # Fetch block timestamp
-            try:
-                block = self._w3.eth.get_block(block_number)
-                ts = int(block["timestamp"])
-            except Exception:
-                ts = 0
-
+            from_addr = _extract_address(bytes(topics[1]))
+            to_addr = _extract_address(bytes(topics[2]))
             transfers.append(
                 {
-                    "ts": ts,
+                    "ts": 0,
                     "tx_hash": tx_hash,
+                    "log_index": key[1],
                     "from_address": from_addr,
                     "to_address": to_addr,
-                    "amount": amount,
-                    "block_number": block_number,
-                    "transfer_type": transfer_type,
+                    "amount": int.from_bytes(bytes(entry["data"]), "big") / 1e6,
+                    "block_number": entry["blockNumber"],
+                    "transfer_type": self._classify_transfer(from_addr, to_addr),
                 }
             )
 
+        stamps = self._block_timestamps({t["block_number"] for t in transfers})
+        for t in transfers:
+            t["ts"] = stamps.get(t["block_number"], 0)
+        transfers.sort(key=lambda t: t["block_number"])
+
         if transfers:
             log.info(
-                "TRANSFER_SCAN │ blocks=%d-%d │ found=%d",
+                "TRANSFER_SCAN │ blocks=%d-%d │ found=%d │ chunk=%d",
                 from_block,
-                to_block,
+                min(cursor - 1, to_block),
                 len(transfers),
+                self._chunk_blocks,
             )
+        return transfers, cursor
 
-        return transfers
+    def _fetch_logs(
+        self, topics: list, from_block: int, to_block: int,
+    ) -> tuple[list[Any], int | None]:
+        """Logs for one range, bisecting while the node says it is too large.
+
+        Returns the logs and, if the range had to be split, the span it
+        was cut down to (None if it went through whole).
+        """
+        try:
+            logs = self._w3.eth.get_logs(
+                {
+                    "fromBlock": from_block,
+                    "toBlock": to_block,
+                    "address": self._usdc_checksum,
+                    "topics": topics,
+                }
+            )
+            return list(logs), None
+        except Exception as exc:
+            if to_block - from_block + 1 <= MIN_CHUNK_BLOCKS or not _is_range_limit(exc):
+                raise
+        mid = (from_block + to_block) // 2
+        half = mid - from_block + 1
+        left, left_span = self._fetch_logs(topics, from_block, mid)
+        right, right_span = self._fetch_logs(topics, mid + 1, to_block)
+        return left + right, min(left_span or half, right_span or half)
+
+    def _block_timestamps(self, blocks: set[int]) -> dict[int, int]:
+        """Block timestamps, served from the LRU cache where possible."""
+        stamps: dict[int, int] = {}
+        missing: list[int] = []
+        for number in blocks:
+            if number in self._block_ts:
+                self._block_ts.move_to_end(number)
+                stamps[number] = self._block_ts[number]
+            else:
+                missing.append(number)
+        if missing:
+            with ThreadPoolExecutor(max_workers=self._workers) as pool:
+                fetched = list(pool.map(self._fetch_block_ts, missing))
+            for number, ts in zip(missing, fetched):
+                if ts is None:
+                    continue
+                stamps[number] = ts
+                self._block_ts[number] = ts
+            while len(self._block_ts) > BLOCK_TS_CACHE_SIZE:
+                self._block_ts.popitem(last=False)
+        return stamps
+
+    def _fetch_block_ts(self, number: int) -> int | None:
+        try:
+            return int(self._w3.eth.get_block(number)["timestamp"])
+        except Exception as exc:
+            log.debug("BLOCK_TS_FAIL │ %d │ %s", number, exc)
+            return None
+
+    @property
+    def transfer_cursor(self) -> int:
+        """Next block the transfer scan will read (0 = not started)."""
+        return self._transfer_cursor
+
+    @transfer_cursor.setter
+    def transfer_cursor(self, block: int) -> None:
+        self._transfer_cursor = max(0, int(block))
 
     def _classify_transfer(self, from_addr: str, to_addr: str) -> str:
         """Classify a transfer based on from/to addresses.
@@ -239,3 +388,9 @@ def _extract_address(topic: bytes) -> str:
         return ""
     addr_bytes = topic[-20:]
     return "0x" + addr_bytes.hex().lower()
+
+
+def _is_range_limit(exc: Exception) -> bool:
+    """Whether an eth_getLogs error means "ask for a smaller block range"."""
+    msg = str(exc).lower()
+    return any(hint in msg for hint in _RANGE_LIMIT_HINTS)
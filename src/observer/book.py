@@ -2,6 +2,7 @@
 
 from __future__ import annotations
 
+import asyncio
 import logging
 import time
 from typing import Any
@@ -57,6 +58,52 @@ class BookPoller:
 
         return snapshots
 
+    async def apoll(self, aclient, token_ids: list[str]) -> list[BookSnapshot]:
+        """poll() over an AsyncClobClient — batches go out concurrently, no thread hop.
+
+        Batches are still started MIN_REQUEST_INTERVAL apart so the CLOB
+        rate limit holds; they just don't wait for each other to finish.
+        """
+        if not token_ids:
+            return []
+
+        tasks = []
+        for i in range(0, len(token_ids), MAX_BATCH_SIZE):
+            batch = token_ids[i : i + MAX_BATCH_SIZE]
+            await self._arate_limit()
+            tasks.append(asyncio.create_task(self._afetch_batch(aclient, batch)))
+
+        snapshots: list[BookSnapshot] = []
+        for batch_snaps in await asyncio.gather(*tasks):
+            snapshots.extend(batch_snaps)
+
+        if snapshots:
+            log.info(
+                "BOOK_POLL │ requested=%d tokens │ received=%d snapshots",
+                len(token_ids),
+                len(snapshots),
+            )
+        else:
+            log.debug("BOOK_POLL │ no snapshots for %d tokens", len(token_ids))
+
+        return snapshots
+
+    async def _arate_limit(self) -> None:
+        now = time.monotonic()
+        elapsed = now - self._last_request_at
+        if elapsed < MIN_REQUEST_INTERVAL:
+            await asyncio.sleep(MIN_REQUEST_INTERVAL - elapsed)
+        self._last_request_at = time.monotonic()
+
+    async def _afetch_batch(self, aclient, token_ids: list[str]) -> list[BookSnapshot]:
+        try:
+            items = await aclient.get_order_books(token_ids)
+        except Exception as exc:
+            log.warning("BOOK_FETCH_FAIL │ %s", exc)
+            return []
+        now = time.time()
+        return [snap for item in items if (snap := _parse_book(item, now))]
+
     def _rate_limit(self) -> None:
         """Enforce minimum interval between requests."""
         now = time.monotonic()
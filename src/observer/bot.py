@@ -8,9 +8,11 @@ import re
 import sys
 import time
 import uuid
+from dataclasses import dataclass
 from datetime import datetime
 from pathlib import Path
 
+import requests
 import yaml
 from dotenv import load_dotenv
 
@@ -20,12 +22,14 @@ from observer.book import BookPoller
 from observer.btc_price import BtcPriceTracker
 from observer.config import load_observer_config
 from observer.models import C_RESET, C_YELLOW
-from observer.onchain import MergeDetector
-from observer.persistence.db import init_db, get_engine
+from observer.onchain import MergeDetector, RoleDecodeQueue
+from observer.persistence.db import init_db, get_engine, load_scan_cursor
 from observer.persistence.schema import obs_sessions
 from observer.persistence.writer import ObserverWriter
 from observer.poller import ActivityPoller
 from observer.positions import PositionPoller, detect_merges_from_changes
+from observer.scheduler import BudgetAdapter, RateBudget, SourceScheduler
+from shared.async_client import AsyncClobClient
 
 
 def _parse_args() -> argparse.Namespace:
@@ -97,192 +101,359 @@ def _setup_logging(level_str: str) -> None:
 log = logging.getLogger("obs.bot")
 
 
-async def _run(cfg) -> None:
-    """Main async loop — poll activity, positions, merges, and analyze."""
-    # Initialize persistence
-    session_id = f"obs_{datetime.now():%Y%m%d_%H%M%S}_{uuid.uuid4().hex[:6]}"
-    engine = init_db()
+@dataclass
+class _Wallet:
+    """One observed proxy: its own pollers, analyzer, session and writer."""
+
+    proxy: str
+    session_id: str
+    writer: ObserverWriter
+    poller: ActivityPoller
+    pos_poller: PositionPoller
+    merge_detector: MergeDetector
+    balance_tracker: BalanceTracker
+    role_queue: RoleDecodeQueue
+    analyzer: TradeAnalyzer
+    transfer_cursor_name: str
 
+    @property
+    def tag(self) -> str:
+        return self.proxy[:10]
+
+
+def _open_wallet(cfg, engine, proxy: str, http: requests.Session) -> _Wallet:
+    """Record an obs_sessions row for ``proxy`` and build its pollers."""
+    session_id = f"obs_{datetime.now():%Y%m%d_%H%M%S}_{uuid.uuid4().hex[:6]}"
     config_snapshot = json.dumps({
-        "proxy_address": cfg.proxy_address,
+        "proxy_address": proxy,
+        "wallets": list(cfg.wallets),
         "poll_interval_sec": cfg.poll_interval_sec,
         "activity_limit": cfg.activity_limit,
         "positions_limit": cfg.positions_limit,
         "backfill_on_start": cfg.backfill_on_start,
+        "backfill_hours": cfg.backfill_hours,
     })
     with engine.begin() as conn:
         conn.execute(obs_sessions.insert().values(
             id=session_id,
             started_at=time.time(),
-            proxy_address=cfg.proxy_address,
+            proxy_address=proxy,
             config_snapshot=config_snapshot,
         ))
 
-    writer = ObserverWriter(session_id)
-    flush_task = asyncio.create_task(writer.run_flush_loop())
+    merge_detector = MergeDetector(
+        proxy,
+        page_size=cfg.etherscan_page_size,
+        receipt_batch_size=cfg.receipt_batch_size,
+        backend=cfg.merge_backend,
+        scan_workers=cfg.merge_scan_workers,
+        logs_chunk_blocks=cfg.logs_chunk_blocks,
+        session=http,
+    )
+    balance_tracker = BalanceTracker(
+        proxy,
+        chunk_blocks=cfg.transfer_chunk_blocks,
+        scan_workers=cfg.transfer_scan_workers,
+    )
+    transfer_cursor_name = f"usdc_transfers:{proxy.lower()}"
+    balance_tracker.transfer_cursor = load_scan_cursor(engine, transfer_cursor_name)
+    return _Wallet(
+        proxy=proxy,
+        session_id=session_id,
+        writer=ObserverWriter(
+            session_id, position_snapshot_interval_s=cfg.position_snapshot_interval_sec,
+        ),
+        poller=ActivityPoller(
+            proxy,
+            limit=cfg.activity_limit,
+            dedup_window_s=cfg.activity_dedup_window_sec,
+            session=http,
+        ),
+        pos_poller=PositionPoller(proxy, limit=cfg.positions_limit, session=http),
+        merge_detector=merge_detector,
+        balance_tracker=balance_tracker,
+        role_queue=RoleDecodeQueue(merge_detector, batch_size=cfg.receipt_batch_size),
+        analyzer=TradeAnalyzer(
+            max_closed=cfg.max_closed_windows,
+            close_grace_s=cfg.window_close_grace_sec,
+        ),
+        transfer_cursor_name=transfer_cursor_name,
+    )
+
+
+async def _backfill(cfg, w: _Wallet) -> None:
+    trades = await asyncio.to_thread(w.poller.backfill, cfg.backfill_hours, cfg.backfill_workers)
+    w.analyzer.ingest_trades(trades)
+    await w.writer.enqueue_trades(trades)
+    # Roles for backfilled trades are decoded by the roles task
+    w.role_queue.submit(trades)
+
+    positions = await asyncio.to_thread(w.pos_poller.snapshot)
+    await w.writer.enqueue_positions(positions)
+
+    merges = await asyncio.to_thread(w.merge_detector.poll_merges)
+    w.analyzer.ingest_merges(merges)
+    await w.writer.enqueue_merges(merges)
+
 
-    poller = ActivityPoller(cfg.proxy_address, limit=cfg.activity_limit)
-    pos_poller = PositionPoller(cfg.proxy_address, limit=cfg.positions_limit)
-    merge_detector = MergeDetector(cfg.proxy_address, page_size=cfg.etherscan_page_size)
-    analyzer = TradeAnalyzer()
-    price_tracker = BtcPriceTracker()
+def _raise_if_failed(error: Exception | None) -> None:
+    """Re-raise an error a poller swallowed, so the scheduler backs the source off."""
+    if error is not None:
+        raise error
+
+
+def _add_wallet_sources(scheduler: SourceScheduler, cfg, w: _Wallet, tagged: bool) -> None:
+    """Register one wallet's poll tasks (their HTTP requests draw from the shared budget)."""
+    poll = cfg.poll_interval_sec
+    writer, analyzer = w.writer, w.analyzer
+
+    async def poll_activity() -> None:
+        new_trades = await asyncio.to_thread(w.poller.poll)
+        _raise_if_failed(w.poller.last_error)
+        if new_trades:
+            analyzer.ingest_trades(new_trades)
+            await writer.enqueue_trades(new_trades)
+            w.role_queue.submit(new_trades)
+
+    async def decode_roles() -> None:
+        # Batched receipt fetches; trades were persisted without waiting on this
+        for trade, role in await w.role_queue.drain():
+            if role:
+                log.info(
+                    "ROLE │ %s │ %s │ %s %s │ %s",
+                    w.tag, role, trade.side, trade.outcome, trade.slug,
+                )
+                await writer.update_trade_role(trade.tx_hash, role)
+
+    async def poll_positions() -> None:
+        positions, changes = await asyncio.to_thread(w.pos_poller.poll)
+        _raise_if_failed(w.pos_poller.last_error)
+        for p in positions:
+            if p.end_date:
+                analyzer.set_end_time(p.slug, p.end_date)
+        await writer.enqueue_positions(positions, changes)
+        await writer.enqueue_position_changes(changes)
+
+        # Detect merges and redemptions from position decreases
+        merges, redemptions = detect_merges_from_changes(changes)
+        for m in merges:
+            analyzer.ingest_merge_from_position(m["slug"], m["shares"])
+            await writer.enqueue_detected_merge(m["slug"], m["shares"])
+        for r in redemptions:
+            log.info(
+                "REDEMPTION │ %s │ %s │ %s │ %.1f shares (%.1f → %.1f)",
+                w.tag, r["slug"], r["outcome"], r["shares"],
+                r["from_size"], r["to_size"],
+            )
+        await writer.enqueue_redemptions(redemptions)
+
+    async def poll_balance() -> None:
+        # Convert positions to dicts with current_value
+        position_data = [
+            {
+                "asset": p.asset,
+                "current_value": p.current_value,
+                "slug": p.slug,
+                "outcome": p.outcome,
+                "size": p.size,
+            }
+            for p in w.pos_poller._prev.values()
+        ]
+        usdc_balance, total_position_value = await asyncio.to_thread(
+            w.balance_tracker.poll_balance, position_data
+        )
+        _raise_if_failed(w.balance_tracker.balance_error)
+        await writer.enqueue_balance_snapshot(usdc_balance, total_position_value)
+        log.info(
+            "BALANCE │ %s │ usdc=$%.2f positions=$%.2f equity=$%.2f",
+            w.tag,
+            usdc_balance,
+            total_position_value,
+            usdc_balance + total_position_value,
+        )
+
+    async def scan_transfers() -> None:
+        transfers = await asyncio.to_thread(w.balance_tracker.scan_new_transfers)
+        for t in transfers:
+            log.info(
+                "TRANSFER │ %s │ %s │ $%.2f │ %s → %s",
+                w.tag, t["transfer_type"], t["amount"],
+                t["from_address"][:10], t["to_address"][:10],
+            )
+        await writer.enqueue_usdc_transfers(transfers)
+        if w.balance_tracker.transfer_cursor:
+            await writer.enqueue_scan_cursor(
+                w.transfer_cursor_name, w.balance_tracker.transfer_cursor,
+            )
+        # Ranges that did scan are kept; a failed range still backs the source off
+        _raise_if_failed(w.balance_tracker.transfer_error)
+
+    async def poll_merges() -> None:
+        merges = await asyncio.to_thread(w.merge_detector.poll_merges)
+        if merges:
+            analyzer.ingest_merges(merges)
+            await writer.enqueue_merges(merges)
+
+        # Also close expired windows and persist the ones that changed
+        closed = analyzer.expire()
+        await writer.enqueue_market_windows(analyzer.get_all_windows() + closed)
+        _raise_if_failed(w.merge_detector.last_error)
+
+    def name(base: str) -> str:
+        return f"{base}:{w.tag}" if tagged else base
+
+    scheduler.add(name("activity"), poll_activity, poll)
+    scheduler.add(name("roles"), decode_roles, cfg.role_decode_interval_sec)
+    scheduler.add(name("positions"), poll_positions, poll * 3)
+    scheduler.add(
+        name("balance"), poll_balance, cfg.balance_poll_interval_sec, initial_delay_s=0,
+    )
+    scheduler.add(name("merges"), poll_merges, poll * 6)
+    if cfg.transfer_scan_interval_sec > 0:
+        scheduler.add(
+            name("transfers"), scan_transfers, cfg.transfer_scan_interval_sec,
+            initial_delay_s=0,
+        )
+
+
+async def _run(cfg) -> None:
+    """Main async loop — backfill, then poll each source on its own task.
+
+    Every wallet in ``cfg.wallets`` gets its own session, writer and
+    pollers.  Prices and order books are fetched once for all wallets and
+    recorded under the first wallet's session; book polls cover the union
+    of every wallet's active tokens.
+    """
+    engine = init_db()
+
+    # One pooled HTTP session for every wallet's data-API and Etherscan calls;
+    # each request it sends draws from the shared rate budget
+    budget = (
+        RateBudget(cfg.wallet_rate_per_sec, burst=cfg.wallet_rate_burst)
+        if cfg.wallet_rate_per_sec > 0 else None
+    )
+    http = requests.Session()
+    adapter = BudgetAdapter(
+        budget, pool_connections=16, pool_maxsize=max(16, 4 * len(cfg.wallets)),
+    )
+    http.mount("https://", adapter)
+    http.mount("http://", adapter)
+
+    wallets = [_open_wallet(cfg, engine, proxy, http) for proxy in cfg.wallets]
+    primary = wallets[0]
+    flush_tasks = [asyncio.create_task(w.writer.run_flush_loop()) for w in wallets]
+
+    # Shared across wallets
+    price_tracker = BtcPriceTracker(
+        feed=cfg.price_feed,
+        ws_url=cfg.binance_ws_url,
+        return_interval_s=cfg.poll_interval_sec,
+    )
     book_poller = BookPoller()
-    balance_tracker = BalanceTracker(cfg.proxy_address)
-    _last_balance_poll = 0.0
+    clob = AsyncClobClient()  # public reads only — shared pool for book polls
+    latest_price = {"snap": None}
 
     try:
         # Initial backfill
         if cfg.backfill_on_start:
-            trades = await asyncio.to_thread(poller.backfill)
-            analyzer.ingest_trades(trades)
-            await writer.enqueue_trades(trades)
-            # Decode roles for backfilled trades
-            for trade in trades:
-                role = await asyncio.to_thread(merge_detector.decode_role, trade.tx_hash)
-                if role:
-                    log.info("ROLE │ %s │ %s %s │ %s", role, trade.side, trade.outcome, trade.slug)
-                    await writer.update_trade_role(trade.tx_hash, role)
-
-            positions = await asyncio.to_thread(pos_poller.snapshot)
-            await writer.enqueue_positions(positions)
-
-            merges = await asyncio.to_thread(merge_detector.poll_merges)
-            analyzer.ingest_merges(merges)
-            await writer.enqueue_merges(merges)
+            await asyncio.gather(*(_backfill(cfg, w) for w in wallets))
 
             price_snap = await asyncio.to_thread(price_tracker.snapshot)
-            await writer.enqueue_price_snapshot(price_snap)
+            latest_price["snap"] = price_snap
+            await primary.writer.enqueue_price_snapshot(price_snap)
+
+        for w in wallets:
+            log.info(
+                "READY │ session=%s │ proxy=%s │ poll=%ds │ seen=%d trades │ %d windows",
+                w.session_id,
+                w.tag,
+                cfg.poll_interval_sec,
+                w.poller.seen_count,
+                w.analyzer.active_count,
+            )
 
-        log.info(
-            "READY │ session=%s │ proxy=%s │ poll=%ds │ seen=%d trades │ %d windows",
-            session_id,
-            cfg.proxy_address[:10],
-            cfg.poll_interval_sec,
-            poller.seen_count,
-            analyzer.active_count,
-        )
+        # One task per data source — a slow source no longer delays the others
+        poll = cfg.poll_interval_sec
 
-        # Main polling loop
-        tick = 0
-        while True:
-            await asyncio.sleep(cfg.poll_interval_sec)
-            tick += 1
-
-            # Activity poll
-            new_trades = await asyncio.to_thread(poller.poll)
-            if new_trades:
-                analyzer.ingest_trades(new_trades)
-                await writer.enqueue_trades(new_trades)
-                # Decode roles for new trades
-                for trade in new_trades:
-                    role = await asyncio.to_thread(merge_detector.decode_role, trade.tx_hash)
-                    if role:
-                        log.info("ROLE │ %s │ %s %s │ %s", role, trade.side, trade.outcome, trade.slug)
-                        await writer.update_trade_role(trade.tx_hash, role)
-
-            # Price poll (every tick)
+        async def poll_prices() -> None:
             price_snap = await asyncio.to_thread(price_tracker.poll)
-            await writer.enqueue_price_snapshot(price_snap)
-
-            # Book snapshot poll (every book_poll_interval ticks)
-            if tick % cfg.book_poll_interval == 0:
-                token_ids = pos_poller.active_token_ids
-                if token_ids:
-                    snapshots = await asyncio.to_thread(book_poller.poll, token_ids)
-                    await writer.enqueue_book_snapshots(snapshots)
-
-            # Position poll (every 3rd tick)
-            if tick % 3 == 0:
-                positions, changes = await asyncio.to_thread(pos_poller.poll)
-                await writer.enqueue_positions(positions)
-                await writer.enqueue_position_changes(changes)
-
-                # Detect merges and redemptions from position decreases
-                merges, redemptions = detect_merges_from_changes(changes)
-                for m in merges:
-                    analyzer.ingest_merge_from_position(m["slug"], m["shares"])
-                    await writer.enqueue_detected_merge(m["slug"], m["shares"])
-                for r in redemptions:
-                    log.info(
-                        "REDEMPTION │ %s │ %s │ %.1f shares (%.1f → %.1f)",
-                        r["slug"], r["outcome"], r["shares"],
-                        r["from_size"], r["to_size"],
-                    )
-                await writer.enqueue_redemptions(redemptions)
-
-            # Balance poll (every balance_poll_interval_sec)
-            current_time = time.time()
-            if current_time - _last_balance_poll >= cfg.balance_poll_interval_sec:
-                _last_balance_poll = current_time
-                # Convert positions to dicts with current_value
-                position_data = [
-                    {
-                        "current_value": p.current_value,
-                        "slug": p.slug,
-                        "outcome": p.outcome,
-                        "size": p.size,
-                    }
-                    for p in pos_poller._prev.values()
-                ]
-                usdc_balance, total_position_value = await asyncio.to_thread(
-                    balance_tracker.poll_balance, position_data
-                )
-                await writer.enqueue_balance_snapshot(usdc_balance, total_position_value)
-                log.info(
-                    "BALANCE │ usdc=$%.2f positions=$%.2f equity=$%.2f",
-                    usdc_balance,
-                    total_position_value,
-                    usdc_balance + total_position_value,
-                )
-                # TODO: Add transfer scanning later (expensive, requires block range calculation)
-
-            # Merge poll (every 6th tick)
-            if tick % 6 == 0:
-                merges = await asyncio.to_thread(merge_detector.poll_merges)
-                if merges:
-                    analyzer.ingest_merges(merges)
-                    await writer.enqueue_merges(merges)
-
-                # Also persist market windows on merge tick
-                all_windows = analyzer.get_all_windows()
-                await writer.enqueue_market_windows(all_windows)
-
-            # Periodic summary (every 30th tick)
-            if tick % 30 == 0:
-                s = analyzer.summary()
+            latest_price["snap"] = price_snap
+            await primary.writer.enqueue_price_snapshot(price_snap)
+
+        async def poll_books() -> None:
+            # Tokens held by several wallets are fetched once
+            token_ids = list(dict.fromkeys(
+                tid for w in wallets for tid in w.pos_poller.active_token_ids
+            ))
+            if token_ids:
+                snapshots = await book_poller.apoll(clob, token_ids)
+                await primary.writer.enqueue_book_snapshots(snapshots)
+
+        async def log_summary() -> None:
+            for w in wallets:
+                s = w.analyzer.summary()
                 log.info(
-                    "SUMMARY │ active=%d closed=%d │ seen=%d trades │ %d positions │ db=%d rows",
+                    "SUMMARY │ %s │ active=%d closed=%d │ seen=%d trades │ %d positions"
+                    " │ db=%d rows",
+                    w.tag,
                     s["active"],
                     s["closed"],
-                    poller.seen_count,
-                    pos_poller.position_count,
-                    writer.stats["total_written"],
+                    w.poller.seen_count,
+                    w.pos_poller.position_count,
+                    w.writer.stats["total_written"],
                 )
+            price_snap = latest_price["snap"]
+            if price_snap is not None:
                 log.info(
-                    "PRICES │ btc=$%.2f eth=$%.2f │ btc_1m=%.3f%% btc_5m=%.3f%% vol_5m=%.4f%% range_5m=%.3f%%",
+                    "PRICES │ btc=$%.2f eth=$%.2f │ btc_1m=%.3f%% btc_5m=%.3f%%"
+                    " vol_5m=%.4f%% range_5m=%.3f%%",
                     price_snap.btc_price, price_snap.eth_price,
                     price_snap.btc_pct_change_1m, price_snap.btc_pct_change_5m,
                     price_snap.btc_rolling_vol_5m, price_snap.btc_range_pct_5m,
                 )
+            log.info(
+                "SOURCES │ %s",
+                " │ ".join(
+                    f"{name} {st['last_duration_ms']}ms fail={st['failures']}"
+                    for name, st in scheduler.stats().items()
+                ),
+            )
+
+        scheduler = SourceScheduler(jitter=cfg.poll_jitter, max_backoff_s=cfg.max_backoff_sec)
+        for w in wallets:
+            _add_wallet_sources(scheduler, cfg, w, tagged=len(wallets) > 1)
+        scheduler.add("prices", poll_prices, poll)
+        if cfg.price_feed == "stream":
+            # Never returns; reconnects internally. A crash is retried with backoff.
+            scheduler.add("price_stream", price_tracker.run_stream, poll, initial_delay_s=0)
+        scheduler.add("books", poll_books, poll * cfg.book_poll_interval)
+        scheduler.add("summary", log_summary, poll * 30)
+        await scheduler.run()
 
     finally:
         # Record session end
-        flush_task.cancel()
-        try:
-            await flush_task
-        except asyncio.CancelledError:
-            pass
+        for task in flush_tasks:
+            task.cancel()
+        await asyncio.gather(*flush_tasks, return_exceptions=True)
 
         # Final flush of any remaining buffer
-        await writer._flush()
+        for w in wallets:
+            await w.writer._flush()
+        await clob.aclose()
 
+        ended_at = time.time()
         with engine.begin() as conn:
-            conn.execute(
-                obs_sessions.update()
-                .where(obs_sessions.c.id == session_id)
-                .values(ended_at=time.time())
+            for w in wallets:
+                conn.execute(
+                    obs_sessions.update()
+                    .where(obs_sessions.c.id == w.session_id)
+                    .values(ended_at=ended_at)
+                )
+        for w in wallets:
+            log.info(
+                "DB │ session %s ended, %d rows written",
+                w.session_id, w.writer.stats["total_written"],
             )
-        log.info("DB │ session %s ended, %d rows written", session_id, writer.stats["total_written"])
 
 
 def main():
@@ -300,8 +471,8 @@ def main():
         sys.exit(0)
 
     log.info(
-        "INIT │ proxy=%s │ poll=%ds │ backfill=%s",
-        cfg.proxy_address[:10],
+        "INIT │ proxies=%s │ poll=%ds │ backfill=%s",
+        ",".join(p[:10] for p in cfg.wallets),
         cfg.poll_interval_sec,
         cfg.backfill_on_start,
     )
@@ -1,118 +1,132 @@
-"""BTC and ETH price tracker via Binance public API.
-
-Polls spot prices at each tick, stores a rolling window of prices,
-and computes volatility metrics (pct change, rolling vol, range).
+"""BTC and ETH price tracker via Binance.
+
+Prices come either from the public REST ticker (one request for both
+symbols per tick) or, with ``price_feed: stream``, from the combined
+aggTrade WebSocket stream, in which case a tick just reads the latest
+streamed price.  Either way prices land in a shared.price_feed
+PriceSeries, which keeps pct change, rolling vol and range over 1m/5m
+time windows incrementally instead of rescanning a history per tick.
 """
 
 from __future__ import annotations
 
+import json
 import logging
 import time
-from collections import deque
-from statistics import stdev
+from typing import Optional
 
 import requests
 
 from observer.models import BtcPriceSnapshot
+from shared.price_feed import BINANCE_WS_URL, BinanceStream
 
 log = logging.getLogger("obs.btc_price")
 
 BINANCE_TICKER_URL = "https://api.binance.com/api/v3/ticker/price"
 REQUEST_TIMEOUT = 5
 
-# Default 360 ticks = 1 hour at 10s intervals
-DEFAULT_MAX_LEN = 360
+SYMBOLS = ("BTCUSDT", "ETHUSDT")
+PRICE_FEEDS = ("rest", "stream")
+
+# Metric windows (seconds)
+WINDOW_1M = 60.0
+WINDOW_5M = 300.0
 
-# Tick counts for metric windows
-TICKS_1M = 6    # 6 ticks * 10s = 60s
-TICKS_5M = 30   # 30 ticks * 10s = 300s
+# Returns are sampled at the observer's poll cadence so rolling vol keeps
+# the meaning it had with 10s REST ticks, whatever the feed.
+DEFAULT_RETURN_INTERVAL_SEC = 10.0
+
+# Stream prices older than this fall back to a REST fetch
+STREAM_STALE_SEC = 30.0
 
 
 class BtcPriceTracker:
-    """Polls Binance for BTC/ETH spot prices and computes volatility metrics."""
+    """Tracks BTC/ETH spot prices and computes volatility metrics."""
+
+    def __init__(
+        self,
+        feed: str = "rest",
+        ws_url: str = BINANCE_WS_URL,
+        return_interval_s: float = DEFAULT_RETURN_INTERVAL_SEC,
+        session: Optional[requests.Session] = None,
+    ):
+        if feed not in PRICE_FEEDS:
+            raise ValueError(f"price feed must be one of {PRICE_FEEDS}, got {feed!r}")
+        self._feed = feed
+        self._stream = BinanceStream(
+            SYMBOLS, url=ws_url,
+            windows_s=(WINDOW_1M, WINDOW_5M),
+            return_interval_s=return_interval_s,
+        )
+        self._btc = self._stream.series("BTCUSDT")
+        self._eth = self._stream.series("ETHUSDT")
+        self._session = session or requests.Session()
 
-    def __init__(self, max_len: int = DEFAULT_MAX_LEN):
-        self._btc_prices: deque[float] = deque(maxlen=max_len)
-        self._eth_prices: deque[float] = deque(maxlen=max_len)
+    @property
+    def stream(self) -> BinanceStream:
+        return self._stream
 
-    def _fetch_price(self, symbol: str) -> float:
-        """Fetch current spot price from Binance."""
-        resp = requests.get(
+    async def run_stream(self) -> None:
+        """Consume the WebSocket stream until cancelled (stream feed only)."""
+        await self._stream.run()
+
+    def _fetch_prices(self) -> dict[str, float]:
+        """Fetch current spot prices for all symbols in one request."""
+        resp = self._session.get(
             BINANCE_TICKER_URL,
-            params={"symbol": symbol},
+            params={"symbols": json.dumps(list(SYMBOLS), separators=(",", ":"))},
             timeout=REQUEST_TIMEOUT,
         )
         resp.raise_for_status()
-        return float(resp.json()["price"])
-
-    def _pct_change(self, prices: deque[float], ticks: int) -> float:
-        """Percent change over the last N ticks. Returns 0.0 if insufficient data."""
-        if len(prices) < ticks + 1:
-            return 0.0
-        old = prices[-(ticks + 1)]
-        cur = prices[-1]
-        if old == 0:
-            return 0.0
-        return (cur - old) / old * 100.0
-
-    def _rolling_vol(self, prices: deque[float], ticks: int) -> float:
-        """Standard deviation of 1-tick percent returns over the last N ticks."""
-        if len(prices) < ticks + 1:
-            return 0.0
-        window = list(prices)[-ticks - 1:]
-        returns = []
-        for i in range(1, len(window)):
-            if window[i - 1] != 0:
-                returns.append((window[i] - window[i - 1]) / window[i - 1] * 100.0)
-        if len(returns) < 2:
-            return 0.0
-        return stdev(returns)
-
-    def _range_pct(self, prices: deque[float], ticks: int) -> float:
-        """(max - min) / mean over the last N ticks."""
-        if len(prices) < ticks:
-            return 0.0
-        window = list(prices)[-ticks:]
-        mn = min(window)
-        mx = max(window)
-        mean = sum(window) / len(window)
-        if mean == 0:
-            return 0.0
-        return (mx - mn) / mean * 100.0
-
-    def _build_snapshot(self, btc: float, eth: float) -> BtcPriceSnapshot:
-        """Append prices and compute all metrics."""
-        self._btc_prices.append(btc)
-        self._eth_prices.append(eth)
+        return {row["symbol"]: float(row["price"]) for row in resp.json()}
+
+    def _stream_fresh(self, now: float) -> bool:
+        return all(
+            s.updates and now - s.last_ts <= STREAM_STALE_SEC
+            for s in (self._btc, self._eth)
+        )
 
+    def _refresh(self) -> None:
+        """Bring both series up to date — from the stream if live, else REST."""
+        now = time.time()
+        if self._feed == "stream" and self._stream_fresh(now):
+            return
+        if self._feed == "stream":
+            log.debug("STREAM_STALE │ falling back to REST ticker")
+        prices = self._fetch_prices()
+        self._btc.update(now, prices["BTCUSDT"])
+        self._eth.update(now, prices["ETHUSDT"])
+
+    def _build_snapshot(self) -> BtcPriceSnapshot:
+        """Read the latest prices and window metrics."""
+        btc_1m, btc_5m = self._btc.stats(WINDOW_1M), self._btc.stats(WINDOW_5M)
+        eth_1m, eth_5m = self._eth.stats(WINDOW_1M), self._eth.stats(WINDOW_5M)
         return BtcPriceSnapshot(
             timestamp=time.time(),
-            btc_price=btc,
-            eth_price=eth,
-            btc_pct_change_1m=self._pct_change(self._btc_prices, TICKS_1M),
-            btc_pct_change_5m=self._pct_change(self._btc_prices, TICKS_5M),
-            btc_rolling_vol_5m=self._rolling_vol(self._btc_prices, TICKS_5M),
-            btc_range_pct_5m=self._range_pct(self._btc_prices, TICKS_5M),
-            eth_pct_change_1m=self._pct_change(self._eth_prices, TICKS_1M),
-            eth_pct_change_5m=self._pct_change(self._eth_prices, TICKS_5M),
+            btc_price=self._btc.last_price,
+            eth_price=self._eth.last_price,
+            btc_pct_change_1m=btc_1m.pct_change,
+            btc_pct_change_5m=btc_5m.pct_change,
+            btc_rolling_vol_5m=btc_5m.vol,
+            btc_range_pct_5m=btc_5m.range_pct,
+            eth_pct_change_1m=eth_1m.pct_change,
+            eth_pct_change_5m=eth_5m.pct_change,
         )
 
     def snapshot(self) -> BtcPriceSnapshot:
         """Initial fetch — logs startup info."""
-        btc = self._fetch_price("BTCUSDT")
-        eth = self._fetch_price("ETHUSDT")
-        snap = self._build_snapshot(btc, eth)
+        self._refresh()
+        snap = self._build_snapshot()
         log.info(
-            "INIT │ btc=$%.2f eth=$%.2f │ window=%d/%d",
-            btc, eth, len(self._btc_prices), self._btc_prices.maxlen,
+            "INIT │ btc=$%.2f eth=$%.2f │ feed=%s",
+            snap.btc_price, snap.eth_price, self._feed,
         )
         return snap
 
     def poll(self) -> BtcPriceSnapshot:
         """Tick fetch — logs price and volatility metrics."""
-        btc = self._fetch_price("BTCUSDT")
-        eth = self._fetch_price("ETHUSDT")
-        snap = self._build_snapshot(btc, eth)
+        self._refresh()
+        snap = self._build_snapshot()
         log.debug(
             "TICK │ btc=$%.2f eth=$%.2f │ btc_1m=%.3f%% btc_5m=%.3f%% vol_5m=%.4f%% range_5m=%.3f%%",
             snap.btc_price, snap.eth_price,
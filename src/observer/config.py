@@ -10,15 +10,52 @@ from typing import Any
 class ObserverConfig:
     enabled: bool = True
     proxy_address: str = "0x6031b6eed1c97e853c6e0f03ad3ce3529351f96d"
+    # Watch several wallets in one process; empty = just proxy_address
+    proxy_addresses: tuple[str, ...] = ()
+    # Shared budget for the wallets' HTTP requests (requests/s, burst); 0 = unlimited
+    wallet_rate_per_sec: float = 5.0
+    wallet_rate_burst: int = 10
     poll_interval_sec: int = 10
     activity_limit: int = 50
     positions_limit: int = 100
     etherscan_page_size: int = 50
+    receipt_batch_size: int = 50          # receipts per JSON-RPC batch request
+    # Merge (burn) scanning: "etherscan" (token1155tx) or "rpc" (eth_getLogs)
+    merge_backend: str = "etherscan"
+    merge_scan_workers: int = 3
+    logs_chunk_blocks: int = 2000
     backfill_on_start: bool = True
+    # 0 = newest activity page only; else page through this many hours in parallel
+    backfill_hours: float = 0.0
+    backfill_workers: int = 8
+    # Activity dedup keys are kept this long behind the newest timestamp
+    activity_dedup_window_sec: float = 3600.0
+    # BTC/ETH prices: "rest" (ticker per tick) or "stream" (Binance WebSocket)
+    price_feed: str = "rest"
+    binance_ws_url: str = "wss://stream.binance.com:9443"
+    # Market windows close this long after market end; closed ones kept in memory
+    window_close_grace_sec: float = 3600.0
+    max_closed_windows: int = 500
     book_poll_interval: int = 3
     balance_poll_interval_sec: int = 300
+    # obs_positions: full snapshot this often, changed positions only in between (0 = always full)
+    position_snapshot_interval_sec: float = 3600.0
+    # USDC transfer scan (deposits, withdrawals, rebates); 0 disables
+    transfer_scan_interval_sec: int = 60
+    transfer_chunk_blocks: int = 2000
+    transfer_scan_workers: int = 4
+    role_decode_interval_sec: float = 1.0
+    # Per-source scheduling: ± jitter fraction, failure backoff cap
+    poll_jitter: float = 0.1
+    max_backoff_sec: float = 300.0
     log_level: str = "INFO"
 
+    @property
+    def wallets(self) -> tuple[str, ...]:
+        """Proxy addresses to observe, deduplicated, in config order."""
+        addrs = self.proxy_addresses or (self.proxy_address,)
+        return tuple(dict.fromkeys(a.lower() for a in addrs))
+
 
 def load_observer_config(raw: dict[str, Any]) -> ObserverConfig:
     obs = raw.get("observer", {})
@@ -27,12 +64,33 @@ def load_observer_config(raw: dict[str, Any]) -> ObserverConfig:
     return ObserverConfig(
         enabled=obs.get("enabled", True),
         proxy_address=obs.get("proxy_address", "0x6031b6eed1c97e853c6e0f03ad3ce3529351f96d"),
+        proxy_addresses=tuple(str(a) for a in obs.get("proxy_addresses") or ()),
+        wallet_rate_per_sec=float(obs.get("wallet_rate_per_sec", 5.0)),
+        wallet_rate_burst=int(obs.get("wallet_rate_burst", 10)),
         poll_interval_sec=int(obs.get("poll_interval_sec", 10)),
         activity_limit=int(obs.get("activity_limit", 50)),
         positions_limit=int(obs.get("positions_limit", 100)),
         etherscan_page_size=int(obs.get("etherscan_page_size", 50)),
+        receipt_batch_size=int(obs.get("receipt_batch_size", 50)),
+        merge_backend=str(obs.get("merge_backend", "etherscan")),
+        merge_scan_workers=int(obs.get("merge_scan_workers", 3)),
+        logs_chunk_blocks=int(obs.get("logs_chunk_blocks", 2000)),
         backfill_on_start=obs.get("backfill_on_start", True),
+        backfill_hours=float(obs.get("backfill_hours", 0.0)),
+        backfill_workers=int(obs.get("backfill_workers", 8)),
+        activity_dedup_window_sec=float(obs.get("activity_dedup_window_sec", 3600.0)),
+        price_feed=str(obs.get("price_feed", "rest")),
+        binance_ws_url=str(obs.get("binance_ws_url", "wss://stream.binance.com:9443")),
+        window_close_grace_sec=float(obs.get("window_close_grace_sec", 3600.0)),
+        max_closed_windows=int(obs.get("max_closed_windows", 500)),
         book_poll_interval=int(obs.get("book_poll_interval", 3)),
         balance_poll_interval_sec=int(obs.get("balance_poll_interval_sec", 300)),
+        position_snapshot_interval_sec=float(obs.get("position_snapshot_interval_sec", 3600.0)),
+        transfer_scan_interval_sec=int(obs.get("transfer_scan_interval_sec", 60)),
+        transfer_chunk_blocks=int(obs.get("transfer_chunk_blocks", 2000)),
+        transfer_scan_workers=int(obs.get("transfer_scan_workers", 4)),
+        role_decode_interval_sec=float(obs.get("role_decode_interval_sec", 1.0)),
+        poll_jitter=float(obs.get("poll_jitter", 0.1)),
+        max_backoff_sec=float(obs.get("max_backoff_sec", 300.0)),
         log_level=obs.get("log_level", "INFO"),
     )
@@ -88,6 +88,10 @@ class MarketWindow:
     first_trade_at: str = ""
     last_trade_at: str = ""
     hedge_delay_sec: float = 0.0  # seconds between first UP and first DOWN trade
+    first_up_at: str = ""    # timestamp of the first Up BUY
+    first_down_at: str = ""  # timestamp of the first Down BUY
+    trade_count: int = 0     # survives compaction of ``trades`` on close
+    end_ts: float = 0.0      # market end (unix), 0 = unknown
     merged_shares: float = 0.0
     status: str = "OPEN"  # "OPEN", "HEDGED", "MERGED", "CLOSED"
 
@@ -1,14 +1,37 @@
-"""On-chain analysis — merge detection and maker/taker role decoding."""
+"""On-chain analysis — merge detection and maker/taker role decoding.
+
+Roles come from the OrderFilled logs in each trade's receipt.  Receipts are
+fetched as JSON-RPC batches (one HTTP request per ``receipt_batch_size``
+hashes) and kept in a bounded LRU, so decode_role and decode_fill_details
+on the same tx share one fetch.  RoleDecodeQueue takes trades off the poll
+path: activity enqueues them and a separate task drains the queue in
+batches.
+
+Merges are ERC-1155 burns from the proxy, scanned incrementally from a
+block cursor with one of two backends:
+
+- "etherscan" — token1155tx from ``startblock=cursor`` ascending; when a
+  gap spans more than one page, the remaining pages are fetched in
+  parallel.
+- "rpc" — eth_getLogs for CTF TransferSingle/TransferBatch with
+  from=proxy, to=0x0, over ``logs_chunk_blocks`` ranges sent as one
+  JSON-RPC batch (no Etherscan key or rate limit needed).
+"""
 
 from __future__ import annotations
 
+import asyncio
 import logging
 import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from typing import Any
 
 import requests
+from eth_abi import decode as abi_decode
 
-from observer.models import C_GREEN, C_RESET, ObservedMerge
+from observer.models import C_GREEN, C_RESET, ObservedMerge, ObservedTrade
 
 log = logging.getLogger("obs.onchain")
 
@@ -18,55 +41,92 @@ BURN_ADDRESS = "0x0000000000000000000000000000000000000000"
 # OrderFilled event signature (Polymarket CTF Exchange)
 ORDER_FILLED_TOPIC = "0xd0a08e8c493f9c94f29311604c9de1b4e8c8d4c06bd0c789af57f2d65bfec0f6"
 
+# Conditional Tokens (ERC-1155) and its transfer events
+CTF_ADDRESS = "0x4d97dcd97ec945f40cf65f87097ace5ea0476045"
+TRANSFER_SINGLE_TOPIC = "0xc3d58168c5ae7397731d063d5bbf3d657854427343f4c083240f7aacaa2d0f62"
+TRANSFER_BATCH_TOPIC = "0x4a39dc06d4c0dbc64b70af90fd698a233a518aa5d07e595d983b8c0526c8f7fb"
+
+DEFAULT_RECEIPT_BATCH_SIZE = 50
+DEFAULT_RECEIPT_CACHE_SIZE = 4096
+MERGE_BACKENDS = ("etherscan", "rpc")
+ETHERSCAN_MAX_RESULTS = 10_000   # page × offset cap
+DEFAULT_SCAN_WORKERS = 3         # Etherscan free tier allows ~5 req/s
+DEFAULT_LOGS_CHUNK_BLOCKS = 2_000
+DEFAULT_LOGS_LOOKBACK_BLOCKS = 2_000  # first rpc scan: ~1h of Polygon blocks
+
 
 class MergeDetector:
     """Detects ERC-1155 burns (merges) and decodes maker/taker from OrderFilled logs."""
 
-    def __init__(self, proxy_address: str, page_size: int = 50) -> None:
+    def __init__(
+        self,
+        proxy_address: str,
+        page_size: int = 50,
+        receipt_batch_size: int = DEFAULT_RECEIPT_BATCH_SIZE,
+        receipt_cache_size: int = DEFAULT_RECEIPT_CACHE_SIZE,
+        backend: str = "etherscan",
+        scan_workers: int = DEFAULT_SCAN_WORKERS,
+        logs_chunk_blocks: int = DEFAULT_LOGS_CHUNK_BLOCKS,
+        session: requests.Session | None = None,
+    ) -> None:
+        if backend not in MERGE_BACKENDS:
+            raise ValueError(f"unknown merge backend {backend!r}")
         self._proxy = proxy_address.lower()
         self._page_size = page_size
-        self._seen_merge_tx: set[str] = set()
+        self._backend = backend
+        self._scan_workers = max(1, scan_workers)
+        self._logs_chunk_blocks = max(1, logs_chunk_blocks)
+        self._merge_cursor = 0  # next block to scan (etherscan: inclusive re-scan)
+        self._seen_merge_tx: dict[str, int] = {}  # tx hash -> block, pruned behind the cursor
+        self._merge_count = 0
+        # Error swallowed by the last poll_merges() (None if it succeeded)
+        self.last_error: Exception | None = None
+        self._http = session or requests.Session()
+        self._receipt_batch_size = max(1, receipt_batch_size)
+        self._receipt_cache_size = receipt_cache_size
+        self._receipts: OrderedDict[str, dict[str, Any]] = OrderedDict()  # tx hash -> receipt
+        self._receipts_lock = threading.Lock()
+        self._rpc = session or requests.Session()
+        self.rpc_requests = 0
         self._etherscan_key = os.environ.get("ETHERSCAN_API_KEY", "")
         self._rpc_url = os.environ.get("POLYGON_RPC_URL", "")
 
-        if not self._etherscan_key:
+        if backend == "etherscan" and not self._etherscan_key:
             log.warning("ETHERSCAN_API_KEY not set — merge detection disabled")
         if not self._rpc_url:
             log.warning("POLYGON_RPC_URL not set — maker/taker decoding disabled")
 
     def poll_merges(self) -> list[ObservedMerge]:
-        """Poll Etherscan for ERC-1155 burns from the proxy address."""
-        if not self._etherscan_key:
-            return []
-
+        """Scan for ERC-1155 burns from the proxy address since the block cursor."""
+        self.last_error = None
         try:
-            resp = requests.get(
-                ETHERSCAN_API,
-                params={
-                    "module": "account",
-                    "action": "token1155tx",
-                    "address": self._proxy,
-                    "page": 1,
-                    "offset": self._page_size,
-                    "sort": "desc",
-                    "apikey": self._etherscan_key,
-                },
-                timeout=10,
-            )
-            resp.raise_for_status()
-            data = resp.json()
+            if self._backend == "rpc":
+                if not self._rpc_url:
+                    return []
+                transfers, cursor = self._scan_burn_logs()
+            else:
+                if not self._etherscan_key:
+                    return []
+                transfers, cursor = self._scan_etherscan()
         except (requests.ConnectionError, requests.Timeout) as exc:
             log.warning("MERGE_POLL_FAIL │ %s", exc)
+            self.last_error = exc
             return []
         except Exception as exc:
             log.debug("MERGE_POLL_ERROR │ %s", exc)
+            self.last_error = exc
             return []
 
-        if data.get("status") != "1":
-            return []
+        merges = self._accept_burns(transfers)
+        self._merge_cursor = max(self._merge_cursor, cursor)
+        stale = [h for h, block in self._seen_merge_tx.items() if block < self._merge_cursor]
+        for tx_hash in stale:
+            del self._seen_merge_tx[tx_hash]
+        return merges
 
+    def _accept_burns(self, transfers: list[dict[str, Any]]) -> list[ObservedMerge]:
         merges: list[ObservedMerge] = []
-        for tx in data.get("result", []):
+        for tx in transfers:
             tx_hash = tx.get("hash", "")
             to_addr = tx.get("to", "").lower()
 
@@ -76,7 +136,6 @@ class MergeDetector:
             if tx_hash in self._seen_merge_tx:
                 continue
 
-            self._seen_merge_tx.add(tx_hash)
             merge = ObservedMerge(
                 timestamp=int(tx.get("timeStamp", 0)),
                 tx_hash=tx_hash,
@@ -84,6 +143,8 @@ class MergeDetector:
                 shares=float(tx.get("tokenValue", 0)),
                 block_number=int(tx.get("blockNumber", 0)),
             )
+            self._seen_merge_tx[tx_hash] = merge.block_number
+            self._merge_count += 1
             merges.append(merge)
             log.info(
                 "%sMERGE%s │ shares=%.1f │ token=%s │ block=%d │ tx=%s",
@@ -97,6 +158,133 @@ class MergeDetector:
 
         return merges
 
+    # -----------------------------------------------------------------
+    # Etherscan backend
+    # -----------------------------------------------------------------
+
+    def _etherscan_page(
+        self, page: int, sort: str, startblock: int | None = None,
+    ) -> list[dict[str, Any]]:
+        params: dict[str, Any] = {
+            "module": "account",
+            "action": "token1155tx",
+            "address": self._proxy,
+            "page": page,
+            "offset": self._page_size,
+            "sort": sort,
+            "apikey": self._etherscan_key,
+        }
+        if startblock is not None:
+            params["startblock"] = startblock
+            params["endblock"] = 99_999_999
+        resp = self._http.get(ETHERSCAN_API, params=params, timeout=10)
+        resp.raise_for_status()
+        data = resp.json()
+        if data.get("status") != "1":
+            return []  # includes "No transactions found"
+        return data.get("result", [])
+
+    def _scan_etherscan(self) -> tuple[list[dict[str, Any]], int]:
+        """Transfers since the cursor and the next cursor.
+
+        The first scan only reads the newest page to find the chain tip.
+        Afterwards pages run ascending from ``startblock=cursor``; a gap
+        wider than one page is paged through ``scan_workers`` at a time.
+        """
+        if not self._merge_cursor:
+            items = self._etherscan_page(1, "desc")
+        else:
+            cursor = self._merge_cursor
+            items = self._etherscan_page(1, "asc", cursor)
+            if len(items) >= self._page_size:
+                max_page = ETHERSCAN_MAX_RESULTS // self._page_size
+                page = 2
+                with ThreadPoolExecutor(max_workers=self._scan_workers) as pool:
+                    while page <= max_page:
+                        pages = range(page, min(page + self._scan_workers, max_page + 1))
+                        batches = list(pool.map(
+                            lambda p: self._etherscan_page(p, "asc", cursor), pages,
+                        ))
+                        for batch in batches:
+                            items.extend(batch)
+                        if any(len(b) < self._page_size for b in batches):
+                            break
+                        page += len(pages)
+                log.info("MERGE_GAP │ %d transfers since block %d", len(items), cursor)
+        # Inclusive: the newest block is re-read next time (dedup covers it)
+        cursor = max((int(tx.get("blockNumber", 0)) for tx in items), default=self._merge_cursor)
+        return items, cursor
+
+    # -----------------------------------------------------------------
+    # eth_getLogs backend
+    # -----------------------------------------------------------------
+
+    def _scan_burn_logs(self) -> tuple[list[dict[str, Any]], int]:
+        """Burn transfers from CTF logs since the cursor and the next cursor."""
+        (latest_hex,) = self._rpc_batch([("eth_blockNumber", [])])
+        latest = int(latest_hex, 16)
+        start = self._merge_cursor or max(0, latest - DEFAULT_LOGS_LOOKBACK_BLOCKS)
+        if start > latest:
+            return [], start
+
+        proxy_topic = "0x" + "0" * 24 + self._proxy[2:]
+        zero_topic = "0x" + "0" * 64
+        ranges = [
+            (b, min(b + self._logs_chunk_blocks - 1, latest))
+            for b in range(start, latest + 1, self._logs_chunk_blocks)
+        ]
+        results = self._rpc_batch([
+            ("eth_getLogs", [{
+                "address": CTF_ADDRESS,
+                "fromBlock": hex(a),
+                "toBlock": hex(b),
+                "topics": [
+                    [TRANSFER_SINGLE_TOPIC, TRANSFER_BATCH_TOPIC], None, proxy_topic, zero_topic,
+                ],
+            }])
+            for a, b in ranges
+        ])
+
+        logs: list[dict[str, Any]] = []
+        cursor = latest + 1
+        for (a, _), result in zip(ranges, results):
+            if result is None:
+                cursor = a  # failed chunk (e.g. too many results) — rescan from here
+                log.warning("MERGE_LOGS_CHUNK_FAIL │ blocks %d+ │ retrying next poll", a)
+                break
+            logs.extend(result)
+
+        timestamps = self._block_timestamps(logs)
+        transfers: list[dict[str, Any]] = []
+        for entry in logs:
+            block = int(entry["blockNumber"], 16)
+            for token_id, value in _decode_transfer(entry):
+                transfers.append({
+                    "hash": entry.get("transactionHash", ""),
+                    "to": BURN_ADDRESS,
+                    "tokenID": str(token_id),
+                    "tokenValue": str(value),
+                    "blockNumber": block,
+                    "timeStamp": timestamps.get(block, 0),
+                })
+        return transfers, cursor
+
+    def _block_timestamps(self, logs: list[dict[str, Any]]) -> dict[int, int]:
+        stamps: dict[int, int] = {}
+        missing: list[int] = []
+        for entry in logs:
+            block = int(entry["blockNumber"], 16)
+            if entry.get("blockTimestamp"):
+                stamps[block] = int(entry["blockTimestamp"], 16)
+            elif block not in stamps and block not in missing:
+                missing.append(block)
+        if missing:
+            blocks = self._rpc_batch([("eth_getBlockByNumber", [hex(b), False]) for b in missing])
+            for number, block in zip(missing, blocks):
+                if block:
+                    stamps[number] = int(block["timestamp"], 16)
+        return stamps
+
     def decode_role(self, tx_hash: str) -> str:
         """Decode maker/taker role from OrderFilled event in a transaction receipt.
 
@@ -104,34 +292,25 @@ class MergeDetector:
         """
         if not self._rpc_url:
             return ""
+        return self.decode_roles([tx_hash]).get(tx_hash, "")
 
-        try:
-            receipt = self._get_receipt(tx_hash)
-            if not receipt:
-                return ""
-
-            logs = receipt.get("result", {}).get("logs", [])
-            for entry in logs:
-                topics = entry.get("topics", [])
-                if len(topics) < 4:
-                    continue
-                if topics[0] != ORDER_FILLED_TOPIC:
-                    continue
-
-                # topic[2] = maker address (indexed, 32-byte padded)
-                maker = _extract_address(topics[2])
-                # topic[3] = taker address (indexed, 32-byte padded)
-                taker = _extract_address(topics[3])
+    def decode_roles(self, tx_hashes: list[str]) -> dict[str, str]:
+        """Roles for many txs with batched receipt fetches.
 
-                if maker == self._proxy:
-                    return "MAKER"
-                if taker == self._proxy:
-                    return "TAKER"
-
-            return ""
-        except Exception as exc:
-            log.debug("ROLE_DECODE_FAIL │ tx=%s │ %s", tx_hash[:10], exc)
-            return ""
+        Hashes whose receipt isn't available (not mined yet, RPC failure)
+        are absent from the result; the rest map to "MAKER"/"TAKER"/"".
+        """
+        if not self._rpc_url:
+            return dict.fromkeys(tx_hashes, "")
+        receipts = self.fetch_receipts(tx_hashes)
+        roles: dict[str, str] = {}
+        for tx_hash, receipt in receipts.items():
+            try:
+                roles[tx_hash] = self._role_from_receipt(receipt)
+            except Exception as exc:
+                log.debug("ROLE_DECODE_FAIL │ tx=%s │ %s", tx_hash[:10], exc)
+                roles[tx_hash] = ""
+        return roles
 
     def decode_fill_details(self, tx_hash: str) -> dict[str, Any]:
         """Decode full OrderFilled event data including amounts and fee.
@@ -147,22 +326,8 @@ class MergeDetector:
             if not receipt:
                 return {}
 
-            logs = receipt.get("result", {}).get("logs", [])
-            for entry in logs:
-                topics = entry.get("topics", [])
-                if len(topics) < 4:
-                    continue
-                if topics[0] != ORDER_FILLED_TOPIC:
-                    continue
-
-                maker = _extract_address(topics[2])
-                taker = _extract_address(topics[3])
-                role = ""
-                if maker == self._proxy:
-                    role = "MAKER"
-                elif taker == self._proxy:
-                    role = "TAKER"
-
+            for entry in receipt.get("logs", []):
+                role = self._role_from_log(entry)
                 if not role:
                     continue
 
@@ -177,31 +342,146 @@ class MergeDetector:
             log.debug("FILL_DECODE_FAIL │ tx=%s │ %s", tx_hash[:10], exc)
             return {}
 
+    def _role_from_receipt(self, receipt: dict[str, Any]) -> str:
+        for entry in receipt.get("logs", []):
+            role = self._role_from_log(entry)
+            if role:
+                return role
+        return ""
+
+    def _role_from_log(self, entry: dict[str, Any]) -> str:
+        """"MAKER"/"TAKER" if ``entry`` is an OrderFilled naming the proxy, else ""."""
+        topics = entry.get("topics", [])
+        if len(topics) < 4 or topics[0] != ORDER_FILLED_TOPIC:
+            return ""
+        # topic[2] = maker address, topic[3] = taker address (indexed, 32-byte padded)
+        if _extract_address(topics[2]) == self._proxy:
+            return "MAKER"
+        if _extract_address(topics[3]) == self._proxy:
+            return "TAKER"
+        return ""
+
+    # -----------------------------------------------------------------
+    # Receipts (batched JSON-RPC + LRU)
+    # -----------------------------------------------------------------
+
     def _get_receipt(self, tx_hash: str) -> dict[str, Any] | None:
-        """Fetch transaction receipt via JSON-RPC."""
+        """Receipt for one tx (cached), or None."""
+        return self.fetch_receipts([tx_hash]).get(tx_hash)
+
+    def fetch_receipts(self, tx_hashes: list[str]) -> dict[str, dict[str, Any]]:
+        """Receipts for ``tx_hashes``: cache hits, then one batch request per chunk."""
+        found: dict[str, dict[str, Any]] = {}
+        missing: list[str] = []
+        with self._receipts_lock:
+            for tx_hash in dict.fromkeys(tx_hashes):
+                receipt = self._receipts.get(tx_hash)
+                if receipt is None:
+                    missing.append(tx_hash)
+                else:
+                    self._receipts.move_to_end(tx_hash)
+                    found[tx_hash] = receipt
+
+        for i in range(0, len(missing), self._receipt_batch_size):
+            fetched = self._fetch_receipt_batch(missing[i:i + self._receipt_batch_size])
+            found.update(fetched)
+            with self._receipts_lock:
+                for tx_hash, receipt in fetched.items():
+                    self._receipts[tx_hash] = receipt
+                    self._receipts.move_to_end(tx_hash)
+                while len(self._receipts) > self._receipt_cache_size:
+                    self._receipts.popitem(last=False)
+        return found
+
+    def _fetch_receipt_batch(self, tx_hashes: list[str]) -> dict[str, dict[str, Any]]:
+        """One JSON-RPC batch of eth_getTransactionReceipt. Pending txs are omitted."""
         try:
-            resp = requests.post(
-                self._rpc_url,
-                json={
-                    "jsonrpc": "2.0",
-                    "method": "eth_getTransactionReceipt",
-                    "params": [tx_hash],
-                    "id": 1,
-                },
-                timeout=10,
-            )
-            resp.raise_for_status()
-            return resp.json()
+            results = self._rpc_batch([("eth_getTransactionReceipt", [h]) for h in tx_hashes])
         except (requests.ConnectionError, requests.Timeout) as exc:
             log.warning("RPC_FAIL │ %s", exc)
-            return None
+            return {}
         except Exception as exc:
             log.debug("RPC_ERROR │ %s", exc)
-            return None
+            return {}
+        return {h: r for h, r in zip(tx_hashes, results) if r}
+
+    def _rpc_batch(self, calls: list[tuple[str, list]]) -> list[Any]:
+        """Send ``calls`` as one JSON-RPC batch; results in order, None per failed call."""
+        payload = [
+            {"jsonrpc": "2.0", "method": method, "params": params, "id": i}
+            for i, (method, params) in enumerate(calls)
+        ]
+        self.rpc_requests += 1
+        resp = self._rpc.post(self._rpc_url, json=payload, timeout=10)
+        resp.raise_for_status()
+        body = resp.json()
+        if isinstance(body, dict):  # some providers answer a rejected batch with one error
+            raise RuntimeError(f"batch rejected: {body.get('error')}")
+        results: list[Any] = [None] * len(calls)
+        for item in body:
+            idx = item.get("id")
+            if isinstance(idx, int) and 0 <= idx < len(calls) and "error" not in item:
+                results[idx] = item.get("result")
+        return results
 
     @property
     def seen_merge_count(self) -> int:
-        return len(self._seen_merge_tx)
+        return self._merge_count
+
+    @property
+    def merge_cursor(self) -> int:
+        return self._merge_cursor
+
+
+class RoleDecodeQueue:
+    """Trades waiting for a maker/taker role, decoded in batches off the poll path."""
+
+    def __init__(self, detector: MergeDetector, batch_size: int = DEFAULT_RECEIPT_BATCH_SIZE,
+                 max_attempts: int = 5) -> None:
+        self._detector = detector
+        self._batch_size = max(1, batch_size)
+        self._max_attempts = max_attempts
+        self._pending: list[tuple[ObservedTrade, int]] = []  # (trade, attempts so far)
+
+    def submit(self, trades: list[ObservedTrade]) -> None:
+        self._pending.extend((t, 0) for t in trades if t.tx_hash)
+
+    @property
+    def pending(self) -> int:
+        return len(self._pending)
+
+    async def drain(self) -> list[tuple[ObservedTrade, str]]:
+        """Decode everything queued so far; returns (trade, role) pairs.
+
+        Trades whose receipt isn't available yet stay queued and are
+        retried on the next drain, up to ``max_attempts``.
+        """
+        batch, self._pending = self._pending, []
+        decoded: list[tuple[ObservedTrade, str]] = []
+        retry: list[tuple[ObservedTrade, int]] = []
+        for i in range(0, len(batch), self._batch_size):
+            chunk = batch[i:i + self._batch_size]
+            roles = await asyncio.to_thread(
+                self._detector.decode_roles, [t.tx_hash for t, _ in chunk],
+            )
+            for trade, attempts in chunk:
+                role = roles.get(trade.tx_hash)
+                if role is not None:
+                    decoded.append((trade, role))
+                elif attempts + 1 < self._max_attempts:
+                    retry.append((trade, attempts + 1))
+        self._pending = retry + self._pending
+        return decoded
+
+
+def _decode_transfer(entry: dict[str, Any]) -> list[tuple[int, int]]:
+    """(token id, value) pairs from a TransferSingle/TransferBatch log."""
+    data = bytes.fromhex(entry.get("data", "0x")[2:])
+    if entry["topics"][0] == TRANSFER_SINGLE_TOPIC:
+        token_id, value = abi_decode(["uint256", "uint256"], data)
+        return [(token_id, value)]
+    ids, values = abi_decode(["uint256[]", "uint256[]"], data)
+    return list(zip(ids, values))
 
 
 def _extract_address(topic: str) -> str:
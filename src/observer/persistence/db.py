@@ -10,10 +10,15 @@ from __future__ import annotations
 import logging
 from pathlib import Path
 
-from sqlalchemy import create_engine, event, text
+from sqlalchemy import create_engine, event, func, or_, select, text
 from sqlalchemy.engine import Engine as SAEngine
 
-from observer.persistence.schema import metadata
+from observer.persistence.schema import (
+    metadata,
+    obs_positions,
+    obs_scan_cursors,
+    obs_usdc_transfers,
+)
 
 log = logging.getLogger("obs.persistence")
 
@@ -56,6 +61,9 @@ def _migrate(engine: SAEngine) -> None:
     migrations = [
         ("obs_positions", "mergeable", "INTEGER DEFAULT 0"),
         ("obs_positions", "redeemable", "INTEGER DEFAULT 0"),
+        # Rows written before change-only persistence are all full snapshots
+        ("obs_positions", "kind", "VARCHAR(10) DEFAULT 'snapshot'"),
+        ("obs_usdc_transfers", "log_index", "INTEGER"),
     ]
     with engine.begin() as conn:
         for table, column, col_type in migrations:
@@ -64,6 +72,78 @@ def _migrate(engine: SAEngine) -> None:
                 log.info("DB │ migrated %s.%s", table, column)
             except Exception:
                 pass  # column already exists
+    _rekey_usdc_transfers(engine)
+
+
+def _rekey_usdc_transfers(engine: SAEngine) -> None:
+    """Swap the old UNIQUE(tx_hash) on obs_usdc_transfers for (tx_hash, log_index).
+
+    SQLite can't drop a column constraint, so the table is rebuilt once.
+    Rows copied over keep log_index NULL.
+    """
+    if engine.dialect.name != "sqlite":
+        return
+    table = obs_usdc_transfers.name
+    with engine.begin() as conn:
+        old_unique = False
+        for idx in conn.execute(text(f"PRAGMA index_list({table})")).mappings():
+            if idx["unique"] and idx["origin"] == "u":
+                cols = [r["name"] for r in conn.execute(
+                    text(f"PRAGMA index_info('{idx['name']}')")
+                ).mappings()]
+                old_unique = old_unique or cols == ["tx_hash"]
+        if not old_unique:
+            return
+        cols = ", ".join(c.name for c in obs_usdc_transfers.columns)
+        conn.execute(text(f"ALTER TABLE {table} RENAME TO {table}_old"))
+        for index in obs_usdc_transfers.indexes:
+            conn.execute(text(f"DROP INDEX IF EXISTS {index.name}"))
+        obs_usdc_transfers.create(conn)
+        conn.execute(text(f"INSERT INTO {table} ({cols}) SELECT {cols} FROM {table}_old"))
+        conn.execute(text(f"DROP TABLE {table}_old"))
+    log.info("DB │ migrated %s unique key to (tx_hash, log_index)", table)
+
+
+def load_scan_cursor(engine: SAEngine, name: str) -> int:
+    """Last persisted block cursor for a chain scan (0 if never saved)."""
+    with engine.connect() as conn:
+        block = conn.execute(
+            select(obs_scan_cursors.c.block).where(obs_scan_cursors.c.name == name)
+        ).scalar()
+    return int(block or 0)
+
+
+def positions_at(engine: SAEngine, session_id: str, ts: float) -> dict[str, dict]:
+    """Reconstruct a session's positions as of ``ts`` (asset -> row).
+
+    Starts from the latest full snapshot at or before ``ts`` and replays the
+    delta and closed rows written after it.
+    """
+    p = obs_positions
+    is_snapshot = or_(p.c.kind == "snapshot", p.c.kind.is_(None))
+    in_session = p.c.session_id == session_id
+    state: dict[str, dict] = {}
+    with engine.connect() as conn:
+        snap_ts = conn.execute(
+            select(func.max(p.c.ts)).where(in_session, is_snapshot, p.c.ts <= ts)
+        ).scalar()
+        after = p.c.ts <= ts
+        if snap_ts is not None:
+            for row in conn.execute(
+                select(p).where(in_session, is_snapshot, p.c.ts == snap_ts)
+            ).mappings():
+                state[row["asset"]] = dict(row)
+            after = (p.c.ts > snap_ts) & after
+        for row in conn.execute(
+            select(p)
+            .where(in_session, after, p.c.kind.in_(("delta", "closed")))
+            .order_by(p.c.ts, p.c.id)
+        ).mappings():
+            if row["kind"] == "closed":
+                state.pop(row["asset"], None)
+            else:
+                state[row["asset"]] = dict(row)
+    return state
 
 
 def get_engine() -> SAEngine:
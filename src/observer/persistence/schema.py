@@ -80,6 +80,8 @@ obs_positions = Table(
     Column("redeemable", Integer),
     Column("slug", String(120)),
     Column("outcome", String(10)),
+    # "snapshot" (full state at ts), "delta" (changed position) or "closed"
+    Column("kind", String(10)),
     Column("session_id", String(50)),
     Index("ix_obs_positions_ts", "ts"),
     Index("ix_obs_positions_slug", "slug"),
@@ -192,7 +194,8 @@ obs_usdc_transfers = Table(
     metadata,
     Column("id", Integer, primary_key=True, autoincrement=True),
     Column("ts", Float, nullable=False),
-    Column("tx_hash", String(80), unique=True),
+    Column("tx_hash", String(80)),
+    Column("log_index", Integer),  # one tx can move USDC several times
     Column("from_address", String(50)),
     Column("to_address", String(50)),
     Column("amount", Float),
@@ -200,4 +203,13 @@ obs_usdc_transfers = Table(
     Column("transfer_type", String(20)),
     Column("session_id", String(50)),
     Index("ix_obs_transfers_ts", "ts"),
+    Index("ux_obs_transfers_tx_log", "tx_hash", "log_index", unique=True),
+)
+
+obs_scan_cursors = Table(
+    "obs_scan_cursors",
+    metadata,
+    Column("name", String(120), primary_key=True),
+    Column("block", Integer, nullable=False),
+    Column("updated_at", Float),
 )
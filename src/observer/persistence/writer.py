@@ -12,6 +12,7 @@ import time
 from datetime import datetime
 
 from sqlalchemy import Table
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 
 from observer.models import (
     BookSnapshot,
@@ -31,6 +32,7 @@ from observer.persistence.schema import (
     obs_positions,
     obs_prices,
     obs_redemptions,
+    obs_scan_cursors,
     obs_trades,
     obs_usdc_transfers,
 )
@@ -38,14 +40,29 @@ from observer.persistence.schema import (
 log = logging.getLogger("obs.persistence.writer")
 
 FLUSH_INTERVAL_SEC = 2.0
+# Full obs_positions snapshot this often; only changed positions in between
+DEFAULT_POSITION_SNAPSHOT_SEC = 3600.0
+# A change in any of these writes a delta row; mark-to-market fields
+# (cur_price, current_value, cash_pnl) refresh with the next snapshot
+POSITION_DELTA_FIELDS = ("size", "mergeable", "redeemable")
 
 
 class ObserverWriter:
-    def __init__(self, session_id: str):
+    def __init__(
+        self,
+        session_id: str,
+        position_snapshot_interval_s: float = DEFAULT_POSITION_SNAPSHOT_SEC,
+    ):
         self._session_id = session_id
+        self._position_snapshot_interval_s = position_snapshot_interval_s
+        self._last_position_snapshot = 0.0
+        # Last POSITION_DELTA_FIELDS queued per held asset, for change-only rows
+        self._position_rows: dict[str, tuple] = {}
         self._buffer: list[tuple[Table, dict]] = []
         self._lock = asyncio.Lock()
         self._known_window_slugs: set[str] = set()
+        # Last values queued per open window; unchanged windows aren't rewritten
+        self._window_rows: dict[str, dict] = {}
         self._total_written: int = 0
         self._total_flushed: int = 0
 
@@ -125,14 +142,28 @@ class ObserverWriter:
         async with self._lock:
             self._buffer.extend(rows)
 
-    async def enqueue_positions(self, positions: list[ObservedPosition]) -> None:
-        if not positions:
+    async def enqueue_positions(
+        self,
+        positions: list[ObservedPosition],
+        changes: list[dict] | None = None,
+    ) -> None:
+        """Queue position rows: a full snapshot when one is due, else changes only.
+
+        Between snapshots a "delta" row is written for each position whose
+        size, mergeable or redeemable flag differs from the last row queued
+        for it; price moves alone wait for the next snapshot.  A "closed"
+        row is written for each CLOSED entry in ``changes``, snapshot or not,
+        so a wallet that goes flat is recorded as flat.  A snapshot interval
+        of 0 writes a full snapshot on every call.
+        """
+        closed = [ch for ch in changes or () if ch.get("field") == "CLOSED"]
+        if not positions and not closed:
             return
         now = time.time()
+        snapshot = now - self._last_position_snapshot >= self._position_snapshot_interval_s
         rows = []
         for p in positions:
-            rows.append((obs_positions, {
-                "ts": now,
+            vals = {
                 "asset": p.asset,
                 "size": p.size,
                 "avg_price": p.avg_price,
@@ -143,8 +174,29 @@ class ObserverWriter:
                 "redeemable": int(p.redeemable),
                 "slug": p.slug,
                 "outcome": p.outcome,
+            }
+            key = tuple(vals[f] for f in POSITION_DELTA_FIELDS)
+            if snapshot or self._position_rows.get(p.asset) != key:
+                rows.append((obs_positions, {
+                    "ts": now,
+                    **vals,
+                    "kind": "snapshot" if snapshot else "delta",
+                    "session_id": self._session_id,
+                }))
+            self._position_rows[p.asset] = key
+        for ch in closed:
+            self._position_rows.pop(ch.get("asset", ""), None)
+            rows.append((obs_positions, {
+                "ts": now,
+                "asset": ch.get("asset", ""),
+                "size": 0.0,
+                "slug": ch.get("slug", ""),
+                "outcome": ch.get("outcome", ""),
+                "kind": "closed",
                 "session_id": self._session_id,
             }))
+        if snapshot and positions:
+            self._last_position_snapshot = now
         async with self._lock:
             self._buffer.extend(rows)
 
@@ -168,6 +220,7 @@ class ObserverWriter:
             self._buffer.extend(rows)
 
     async def enqueue_market_windows(self, windows: list[MarketWindow]) -> None:
+        """Queue windows whose values changed since they were last queued."""
         if not windows:
             return
         async with self._lock:
@@ -189,12 +242,20 @@ class ObserverWriter:
                     "last_trade_at": w.last_trade_at,
                     "session_id": self._session_id,
                 }
+                if self._window_rows.get(w.slug) == row:
+                    continue
+                if w.status == "CLOSED":
+                    self._window_rows.pop(w.slug, None)  # final row
+                else:
+                    self._window_rows[w.slug] = row
                 if w.slug in self._known_window_slugs:
                     # Mark for update (slug, values)
                     self._buffer.append(("__update_window__", row))
                 else:
                     self._buffer.append((obs_market_windows, row))
                     self._known_window_slugs.add(w.slug)
+                if w.status == "CLOSED":
+                    self._known_window_slugs.discard(w.slug)  # no rows follow the final one
 
     async def enqueue_book_snapshots(self, snapshots: list[BookSnapshot]) -> None:
         if not snapshots:
@@ -259,6 +320,7 @@ class ObserverWriter:
             rows.append((obs_usdc_transfers, {
                 "ts": t.get("ts", time.time()),
                 "tx_hash": t.get("tx_hash", ""),
+                "log_index": t.get("log_index"),
                 "from_address": t.get("from_address", ""),
                 "to_address": t.get("to_address", ""),
                 "amount": t.get("amount", 0),
@@ -269,6 +331,15 @@ class ObserverWriter:
         async with self._lock:
             self._buffer.extend(rows)
 
+    async def enqueue_scan_cursor(self, name: str, block: int) -> None:
+        """Queue a chain-scan cursor; written in the same flush as the rows it covers."""
+        async with self._lock:
+            self._buffer.append(("__cursor__", {
+                "name": name,
+                "block": block,
+                "updated_at": time.time(),
+            }))
+
     async def update_trade_role(self, tx_hash: str, role: str) -> None:
         """Queue a role update for a specific trade by tx_hash."""
         if not tx_hash or not role:
@@ -308,12 +379,15 @@ class ObserverWriter:
         table_map: dict[str, Table] = {}
         window_updates: list[dict] = []
         role_updates: list[dict] = []
+        cursors: dict[str, dict] = {}
 
         for table_or_tag, row in batch:
             if table_or_tag == "__update_window__":
                 window_updates.append(row)
             elif table_or_tag == "__update_role__":
                 role_updates.append(row)
+            elif table_or_tag == "__cursor__":
+                cursors[row["name"]] = row  # latest wins
             else:
                 key = table_or_tag.name
                 if key not in by_table:
@@ -360,6 +434,14 @@ class ObserverWriter:
                 )
                 total += 1
 
+            for vals in cursors.values():
+                stmt = sqlite_insert(obs_scan_cursors).values(**vals)
+                conn.execute(stmt.on_conflict_do_update(
+                    index_elements=["name"],
+                    set_={"block": stmt.excluded.block, "updated_at": stmt.excluded.updated_at},
+                ))
+                total += 1
+
         return total
 
     @property
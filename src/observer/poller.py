@@ -1,8 +1,21 @@
-"""Activity API poller — polls trade activity for the target wallet."""
+"""Activity API poller — polls trade activity for the target wallet.
+
+Incremental polls follow a timestamp cursor: pages of ``limit`` items at
+or after the newest timestamp seen are fetched until a short page (or one
+reaching older data), so a burst larger than one page between polls is
+not lost.  Deep backfill splits a time range into slices and pages through
+them in parallel.
+
+Dedup keys (tx hash + asset + side + size + price — one tx can carry
+several fills) are kept only for ``dedup_window_s`` behind the cursor;
+anything older than that is already behind the cursor and skipped.
+"""
 
 from __future__ import annotations
 
 import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
 from typing import Any
 
 import requests
@@ -12,57 +25,188 @@ from observer.models import C_GREEN, C_RED, C_RESET, ObservedTrade
 log = logging.getLogger("obs.poller")
 
 ACTIVITY_URL = "https://data-api.polymarket.com/activity"
+ACTIVITY_MAX_LIMIT = 500          # API page size cap
+DEFAULT_DEDUP_WINDOW_SEC = 3600.0
+DEFAULT_MAX_PAGES = 20
+DEFAULT_BACKFILL_SLICE_SEC = 3600
 
 
 class ActivityPoller:
-    """Polls the Activity API and yields new trades, deduplicating by txHash."""
+    """Polls the Activity API and yields new trades in timestamp order."""
 
-    def __init__(self, proxy_address: str, limit: int = 50) -> None:
+    def __init__(
+        self,
+        proxy_address: str,
+        limit: int = 50,
+        dedup_window_s: float = DEFAULT_DEDUP_WINDOW_SEC,
+        max_pages: int = DEFAULT_MAX_PAGES,
+        session: requests.Session | None = None,
+    ) -> None:
         self._proxy = proxy_address
         self._limit = limit
-        self._seen_tx: set[str] = set()
+        self._dedup_window_s = dedup_window_s
+        self._max_pages = max_pages
+        self._session = session or requests.Session()
+        self._seen: dict[str, int] = {}  # activity key -> timestamp
+        self._cursor_ts = 0               # newest activity timestamp seen
+        self._total_seen = 0
+        # Error swallowed by the last poll() (None if it succeeded)
+        self.last_error: Exception | None = None
 
     def poll(self) -> list[ObservedTrade]:
-        """Fetch recent activity and return only new (unseen) trades."""
+        """Fetch activity since the cursor and return only new trades."""
+        self.last_error = None
         try:
-            resp = requests.get(
-                ACTIVITY_URL,
-                params={"user": self._proxy, "limit": self._limit},
-                timeout=10,
-            )
-            resp.raise_for_status()
-            items: list[dict[str, Any]] = resp.json()
+            items = self._fetch_since_cursor()
         except (requests.ConnectionError, requests.Timeout) as exc:
             log.warning("POLL_FAIL │ %s", exc)
+            self.last_error = exc
             return []
         except Exception as exc:
             log.debug("POLL_ERROR │ %s", exc)
+            self.last_error = exc
             return []
 
-        new_trades: list[ObservedTrade] = []
-        for item in items:
-            tx = item.get("transactionHash", "")
-            if not tx or tx in self._seen_tx:
-                continue
-            self._seen_tx.add(tx)
-            trade = _parse_trade(item)
-            if trade:
-                new_trades.append(trade)
-                _log_trade(trade)
+        trades = self._accept(items)
+        for trade in trades:
+            _log_trade(trade)
+        return trades
 
-        return new_trades
+    def backfill(self, hours: float = 0, workers: int = 8) -> list[ObservedTrade]:
+        """Initial backfill — the newest page, or every page of the last ``hours``.
 
-    def backfill(self) -> list[ObservedTrade]:
-        """Initial backfill — same as poll but logs differently."""
-        log.info("BACKFILL │ fetching last %d activities", self._limit)
-        trades = self.poll()
+        Deep backfill fetches hour-long slices of the range in parallel.
+        """
+        if hours <= 0:
+            log.info("BACKFILL │ fetching last %d activities", self._limit)
+            trades = self.poll()
+        else:
+            end = int(time.time())
+            start = end - int(hours * 3600)
+            slices = [
+                (s, min(s + DEFAULT_BACKFILL_SLICE_SEC, end))
+                for s in range(start, end, DEFAULT_BACKFILL_SLICE_SEC)
+            ]
+            log.info(
+                "BACKFILL │ %.1fh of activity │ %d slices │ %d workers",
+                hours, len(slices), workers,
+            )
+            pool = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="backfill")
+            with pool:
+                pages = list(pool.map(lambda r: self._fetch_range(*r), slices))
+            trades = self._accept([item for page in pages for item in page])
         if trades:
             log.info("BACKFILL │ loaded %d historical trades", len(trades))
         return trades
 
     @property
     def seen_count(self) -> int:
-        return len(self._seen_tx)
+        return self._total_seen
+
+    @property
+    def cursor_ts(self) -> int:
+        return self._cursor_ts
+
+    # -----------------------------------------------------------------
+    # Fetching
+    # -----------------------------------------------------------------
+
+    def _fetch_page(
+        self, offset: int, limit: int, start: int | None = None, end: int | None = None,
+    ) -> list[dict[str, Any]]:
+        params: dict[str, Any] = {
+            "user": self._proxy,
+            "limit": limit,
+            "offset": offset,
+            "sortBy": "TIMESTAMP",
+            "sortDirection": "DESC",
+        }
+        if start is not None:
+            params["start"] = start
+        if end is not None:
+            params["end"] = end
+        resp = self._session.get(ACTIVITY_URL, params=params, timeout=10)
+        resp.raise_for_status()
+        items = resp.json()
+        return items if isinstance(items, list) else []
+
+    def _fetch_since_cursor(self) -> list[dict[str, Any]]:
+        """Page newest-first until the page reaches data older than the cursor."""
+        if not self._cursor_ts:
+            return self._fetch_page(0, self._limit)  # first poll: newest page only
+
+        items: list[dict[str, Any]] = []
+        for page in range(self._max_pages):
+            batch = self._fetch_page(page * self._limit, self._limit, start=self._cursor_ts)
+            items.extend(batch)
+            if len(batch) < self._limit:
+                break
+            if min(_item_ts(it) for it in batch) < self._cursor_ts:
+                break
+        else:
+            log.warning(
+                "POLL_TRUNCATED │ more than %d pages since cursor %d",
+                self._max_pages, self._cursor_ts,
+            )
+        return items
+
+    def _fetch_range(self, start: int, end: int) -> list[dict[str, Any]]:
+        """All pages of one backfill slice. Partial on error."""
+        items: list[dict[str, Any]] = []
+        for page in range(self._max_pages):
+            try:
+                batch = self._fetch_page(page * ACTIVITY_MAX_LIMIT, ACTIVITY_MAX_LIMIT, start, end)
+            except Exception as exc:
+                log.warning("BACKFILL_SLICE_FAIL │ %d-%d page %d │ %s", start, end, page, exc)
+                break
+            items.extend(batch)
+            if len(batch) < ACTIVITY_MAX_LIMIT:
+                break
+        return items
+
+    # -----------------------------------------------------------------
+    # Dedup
+    # -----------------------------------------------------------------
+
+    def _accept(self, items: list[dict[str, Any]]) -> list[ObservedTrade]:
+        """New trades among ``items``, oldest first; advances the cursor."""
+        floor = self._cursor_ts - self._dedup_window_s if self._cursor_ts else None
+        fresh: list[tuple[int, ObservedTrade]] = []
+        for item in items:
+            if not item.get("transactionHash"):
+                continue
+            ts = _item_ts(item)
+            if floor is not None and ts < floor:
+                continue  # behind the cursor and out of the dedup window
+            key = _activity_key(item)
+            if key in self._seen:
+                continue
+            self._seen[key] = ts
+            self._total_seen += 1
+            self._cursor_ts = max(self._cursor_ts, ts)
+            trade = _parse_trade(item)
+            if trade:
+                fresh.append((ts, trade))
+
+        cutoff = self._cursor_ts - self._dedup_window_s
+        for key in [k for k, ts in self._seen.items() if ts < cutoff]:
+            del self._seen[key]
+
+        fresh.sort(key=lambda pair: pair[0])
+        return [trade for _, trade in fresh]
+
+
+def _activity_key(item: dict[str, Any]) -> str:
+    return "|".join(
+        str(item.get(k, "")) for k in ("transactionHash", "asset", "side", "size", "price")
+    )
+
+
+def _item_ts(item: dict[str, Any]) -> int:
+    try:
+        return int(float(item.get("timestamp") or 0))
+    except (TypeError, ValueError):
+        return 0
 
 
 def _parse_trade(item: dict[str, Any]) -> ObservedTrade | None:
@@ -17,18 +17,27 @@ POSITIONS_URL = "https://data-api.polymarket.com/positions"
 class PositionPoller:
     """Polls the Positions API and diffs snapshots to detect changes."""
 
-    def __init__(self, proxy_address: str, limit: int = 100) -> None:
+    def __init__(
+        self,
+        proxy_address: str,
+        limit: int = 100,
+        session: requests.Session | None = None,
+    ) -> None:
         self._proxy = proxy_address
         self._limit = limit
+        self._session = session or requests.Session()
         self._prev: dict[str, ObservedPosition] = {}  # asset -> position
+        # Error swallowed by the last poll() (None if it succeeded)
+        self.last_error: Exception | None = None
 
     def poll(self) -> tuple[list[ObservedPosition], list[dict[str, Any]]]:
         """Fetch positions and return (current_positions, changes).
 
         Changes are dicts with keys: asset, slug, outcome, field, old, new.
         """
+        self.last_error = None
         try:
-            resp = requests.get(
+            resp = self._session.get(
                 POSITIONS_URL,
                 params={"user": self._proxy, "limit": self._limit},
                 timeout=10,
@@ -37,9 +46,11 @@ class PositionPoller:
             items: list[dict[str, Any]] = resp.json()
         except (requests.ConnectionError, requests.Timeout) as exc:
             log.warning("POS_POLL_FAIL │ %s", exc)
+            self.last_error = exc
             return [], []
         except Exception as exc:
             log.debug("POS_POLL_ERROR │ %s", exc)
+            self.last_error = exc
             return [], []
 
         current: dict[str, ObservedPosition] = {}
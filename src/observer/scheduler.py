@@ -0,0 +1,232 @@
+"""Per-source polling tasks for the observer.
+
+The observer used to poll every data source from one serial loop, so a
+slow Etherscan or RPC call pushed back the next activity poll by its full
+duration.  SourceScheduler runs each source as its own asyncio task:
+
+- its own interval, measured start-to-start (a 2s poll on a 10s interval
+  sleeps 8s), so cadence doesn't drift with call latency;
+- jitter (± a fraction of the interval) so sources sharing an API don't
+  fire in lockstep;
+- exponential backoff on failure, capped at ``max_backoff_s``, reset on
+  the first success.
+
+Sources share the event loop, the analyzer and the writer; blocking work
+inside a source goes through ``asyncio.to_thread`` as before.
+
+A RateBudget keeps many wallets' pollers under one API budget.  Mounting
+a BudgetAdapter on the shared requests session charges it once per HTTP
+request, whatever a poll fans out to; sources added with a ``cost`` draw
+that many tokens per run instead.
+
+Usage:
+    budget = RateBudget(5.0, burst=10)
+    session.mount("https://", BudgetAdapter(budget))
+    sched = SourceScheduler(jitter=0.1)
+    sched.add("activity", poll_activity, interval_s=10)
+    sched.add("balance", poll_balance, interval_s=300)
+    await sched.run()      # until cancelled
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import random
+import threading
+import time
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Optional
+
+from requests.adapters import HTTPAdapter
+
+log = logging.getLogger("obs.scheduler")
+
+DEFAULT_JITTER = 0.1
+DEFAULT_MAX_BACKOFF_SEC = 300.0
+
+
+def next_delay(
+    interval_s: float,
+    elapsed_s: float,
+    failures: int,
+    jitter: float,
+    max_backoff_s: float,
+    rng: Callable[[float, float], float] = random.uniform,
+) -> float:
+    """Seconds to sleep before a source's next run.
+
+    Healthy: the rest of the interval (start-to-start), jittered.
+    Failing: interval × 2^failures, capped, jittered — not reduced by
+    the failed call's duration.
+    """
+    if failures:
+        base = min(max_backoff_s, interval_s * 2 ** failures)
+    else:
+        base = max(0.0, interval_s - elapsed_s)
+    if jitter and base:
+        base *= rng(1.0 - jitter, 1.0 + jitter)
+    return base
+
+
+@dataclass
+class _Source:
+    name: str
+    fn: Callable[[], Awaitable[None]]
+    interval_s: float
+    initial_delay_s: float
+    cost: float = 0.0
+    runs: int = 0
+    failures: int = 0              # consecutive
+    total_failures: int = 0
+    last_duration_s: float = 0.0
+    last_ok_at: float = 0.0
+
+
+class RateBudget:
+    """Token bucket shared by sources: ``rate_per_s`` sustained, ``burst`` at once.
+
+    Each caller reserves its tokens up front (the balance may go negative)
+    and sleeps until the reservation is covered, so waiters are served in
+    arrival order from both the event loop and worker threads.
+    """
+
+    def __init__(
+        self,
+        rate_per_s: float,
+        burst: Optional[float] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._rate = rate_per_s
+        self._capacity = burst if burst is not None else max(1.0, rate_per_s)
+        self._tokens = self._capacity
+        self._clock = clock
+        self._updated = clock()
+        self._lock = threading.Lock()
+        self.waited_s = 0.0
+        self.acquired = 0
+
+    def _reserve(self, cost: float) -> float:
+        """Take ``cost`` tokens; return how long the caller must wait for them."""
+        cost = min(cost, self._capacity)
+        with self._lock:
+            now = self._clock()
+            self._tokens = min(self._capacity, self._tokens + (now - self._updated) * self._rate)
+            self._updated = now
+            self._tokens -= cost
+            self.acquired += 1
+            wait = max(0.0, -self._tokens / self._rate)
+            self.waited_s += wait
+        return wait
+
+    async def acquire(self, cost: float = 1.0) -> None:
+        """Wait until ``cost`` tokens are available, then take them."""
+        wait = self._reserve(cost)
+        if wait:
+            await asyncio.sleep(wait)
+
+    def acquire_blocking(self, cost: float = 1.0) -> None:
+        """acquire() for worker threads."""
+        wait = self._reserve(cost)
+        if wait:
+            time.sleep(wait)
+
+
+class BudgetAdapter(HTTPAdapter):
+    """HTTPAdapter that draws one token from a RateBudget per request sent."""
+
+    def __init__(self, budget: Optional[RateBudget], **kwargs) -> None:
+        self._budget = budget
+        super().__init__(**kwargs)
+
+    def send(self, request, **kwargs):
+        if self._budget is not None:
+            self._budget.acquire_blocking()
+        return super().send(request, **kwargs)
+
+
+class SourceScheduler:
+    """Runs named async poll functions concurrently, each on its own clock."""
+
+    def __init__(
+        self,
+        jitter: float = DEFAULT_JITTER,
+        max_backoff_s: float = DEFAULT_MAX_BACKOFF_SEC,
+        budget: Optional[RateBudget] = None,
+    ) -> None:
+        self._jitter = jitter
+        self._max_backoff_s = max_backoff_s
+        self._budget = budget
+        self._sources: list[_Source] = []
+
+    def add(
+        self,
+        name: str,
+        fn: Callable[[], Awaitable[None]],
+        interval_s: float,
+        initial_delay_s: Optional[float] = None,
+        cost: float = 0.0,
+    ) -> None:
+        """Register a source. First run after ``initial_delay_s`` (default: one interval).
+
+        ``cost`` tokens are drawn from the shared budget before every run.
+        """
+        self._sources.append(_Source(
+            name, fn, interval_s, interval_s if initial_delay_s is None else initial_delay_s,
+            cost=cost,
+        ))
+
+    async def run(self) -> None:
+        """Run every source until cancelled."""
+        tasks = [
+            asyncio.create_task(self._loop(src), name=f"obs.{src.name}")
+            for src in self._sources
+        ]
+        try:
+            await asyncio.gather(*tasks)
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _loop(self, src: _Source) -> None:
+        delay = src.initial_delay_s
+        while True:
+            await asyncio.sleep(delay)
+            started = time.monotonic()
+            try:
+                if src.cost and self._budget is not None:
+                    await self._budget.acquire(src.cost)
+                await src.fn()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                src.failures += 1
+                src.total_failures += 1
+                log.warning(
+                    "SOURCE_FAILED │ %s │ attempt %d: %s",
+                    src.name, src.failures, e, exc_info=src.failures == 1,
+                )
+            else:
+                if src.failures:
+                    log.info("SOURCE_RECOVERED │ %s │ after %d failures", src.name, src.failures)
+                src.failures = 0
+                src.last_ok_at = time.time()
+            src.runs += 1
+            src.last_duration_s = time.monotonic() - started
+            delay = next_delay(
+                src.interval_s, src.last_duration_s, src.failures,
+                self._jitter, self._max_backoff_s,
+            )
+
+    def stats(self) -> dict[str, dict]:
+        return {
+            src.name: {
+                "runs": src.runs,
+                "failures": src.failures,
+                "total_failures": src.total_failures,
+                "last_duration_ms": round(src.last_duration_s * 1000),
+                "last_ok_at": src.last_ok_at,
+            }
+            for src in self._sources
+        }
@@ -0,0 +1,211 @@
+"""Asyncio-native facade over the CLOB endpoints the bots use.
+
+py_clob_client is synchronous, so every call used to cost a thread hop via
+asyncio.to_thread and requests within a tick ran one after another.  This
+facade speaks the same HTTP API over one shared httpx.AsyncClient
+connection pool (HTTP/2), so a tick can fan out dozens of book reads and
+hundreds of order posts concurrently from the event loop.
+
+Request signing still comes from the sync client: L2 HMAC headers and
+builder headers are pure CPU, and create_order() (EIP-712 signing) is
+batched into a single thread hop by the caller.
+
+Reads work without credentials (observer); order endpoints need the
+authenticated sync client that init_client() returns.
+
+Usage:
+    aclient = AsyncClobClient(client)
+    books = await aclient.get_order_books(token_ids)
+    resps = await asyncio.gather(*(aclient.post_order(o, OrderType.GTC) for o in signed))
+    await aclient.aclose()
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+from typing import Any, Optional
+
+import httpx
+from py_clob_client.clob_types import RequestArgs
+from py_clob_client.endpoints import (
+    CANCEL,
+    CANCEL_ORDERS,
+    GET_ORDER,
+    GET_ORDER_BOOK,
+    GET_ORDER_BOOKS,
+    ORDERS,
+    POST_ORDER,
+)
+from py_clob_client.headers.headers import create_level_2_headers
+from py_clob_client.utilities import order_to_json
+
+from shared.client import CLOB_HOST
+
+log = logging.getLogger("shared.async_client")
+
+END_CURSOR = "LTE="
+MAX_BOOKS_PER_REQUEST = 500
+
+# Pool sizing — HTTP/2 multiplexes, so a few connections carry many streams
+DEFAULT_MAX_CONNECTIONS = 20
+DEFAULT_MAX_IN_FLIGHT = 64
+DEFAULT_TIMEOUT_S = 10.0
+
+
+class ClobHTTPError(RuntimeError):
+    """Non-200 response from the CLOB."""
+
+    def __init__(self, status_code: int, body: str) -> None:
+        super().__init__(f"CLOB HTTP {status_code}: {body[:200]}")
+        self.status_code = status_code
+        self.body = body
+
+
+class AsyncClobClient:
+    """Async CLOB client sharing one connection pool across all callers.
+
+    ``max_in_flight`` bounds concurrent requests so a 200-order burst
+    can't exceed the pool or trip the CLOB rate limiter all at once.
+    """
+
+    def __init__(
+        self,
+        sync_client=None,
+        host: str = CLOB_HOST,
+        max_connections: int = DEFAULT_MAX_CONNECTIONS,
+        max_in_flight: int = DEFAULT_MAX_IN_FLIGHT,
+        timeout: float = DEFAULT_TIMEOUT_S,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+    ) -> None:
+        self._sync = sync_client
+        self._host = host.rstrip("/")
+        self._sem = asyncio.Semaphore(max_in_flight)
+        self._http = httpx.AsyncClient(
+            http2=transport is None,
+            timeout=timeout,
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_connections,
+            ),
+            headers={
+                "User-Agent": "py_clob_client",
+                "Accept": "*/*",
+                "Content-Type": "application/json",
+            },
+            transport=transport,
+        )
+
+    async def aclose(self) -> None:
+        await self._http.aclose()
+
+    # -----------------------------------------------------------------
+    # Transport
+    # -----------------------------------------------------------------
+
+    async def _request(
+        self,
+        method: str,
+        path: str,
+        headers: Optional[dict] = None,
+        body: Optional[str] = None,
+        json_body: Any = None,
+    ) -> Any:
+        async with self._sem:
+            resp = await self._http.request(
+                method,
+                f"{self._host}{path}",
+                headers=headers,
+                content=body.encode("utf-8") if body is not None else None,
+                json=json_body if body is None else None,
+            )
+        if resp.status_code != 200:
+            raise ClobHTTPError(resp.status_code, resp.text)
+        try:
+            return resp.json()
+        except ValueError:
+            return resp.text
+
+    def _l2_headers(
+        self, method: str, path: str, body: Any = None, serialized: Optional[str] = None,
+    ) -> dict:
+        """L2 HMAC headers (plus builder headers when configured) from the sync client."""
+        client = self._sync
+        if client is None:
+            raise RuntimeError("AsyncClobClient needs an authenticated sync client for L2 calls")
+        client.assert_level_2_auth()
+        request_args = RequestArgs(
+            method=method, request_path=path, body=body, serialized_body=serialized,
+        )
+        headers = create_level_2_headers(client.signer, client.creds, request_args)
+        if method == "POST" and client.can_builder_auth():
+            builder_headers = client._generate_builder_headers(request_args, headers)
+            if builder_headers is not None:
+                return builder_headers
+        return headers
+
+    # -----------------------------------------------------------------
+    # Books (public)
+    # -----------------------------------------------------------------
+
+    async def get_order_books(self, token_ids: list[str]) -> list[dict]:
+        """POST /books — chunks of MAX_BOOKS_PER_REQUEST fetched concurrently."""
+        if not token_ids:
+            return []
+        chunks = [
+            token_ids[i:i + MAX_BOOKS_PER_REQUEST]
+            for i in range(0, len(token_ids), MAX_BOOKS_PER_REQUEST)
+        ]
+        results = await asyncio.gather(*(
+            self._request("POST", GET_ORDER_BOOKS, json_body=[{"token_id": t} for t in chunk])
+            for chunk in chunks
+        ))
+        books: list[dict] = []
+        for r in results:
+            if isinstance(r, list):
+                books.extend(r)
+        return books
+
+    async def get_order_book(self, token_id: str) -> dict:
+        """GET /book for a single token."""
+        return await self._request("GET", f"{GET_ORDER_BOOK}?token_id={token_id}")
+
+    # -----------------------------------------------------------------
+    # Orders (L2 auth)
+    # -----------------------------------------------------------------
+
+    async def get_orders(self) -> list[dict]:
+        """GET /data/orders — all open orders for the API key, following next_cursor."""
+        headers = self._l2_headers("GET", ORDERS)
+        results: list[dict] = []
+        cursor = "MA=="
+        while cursor != END_CURSOR:
+            page = await self._request("GET", f"{ORDERS}?next_cursor={cursor}", headers=headers)
+            results.extend(page.get("data") or [])
+            cursor = page.get("next_cursor") or END_CURSOR
+        return results
+
+    async def get_order(self, order_id: str) -> dict:
+        path = f"{GET_ORDER}{order_id}"
+        return await self._request("GET", path, headers=self._l2_headers("GET", path))
+
+    async def post_order(self, order, order_type, post_only: bool = False) -> dict:
+        """POST /order with an order already signed by the sync client's create_order()."""
+        body = order_to_json(order, self._sync.creds.api_key, order_type, post_only)
+        serialized = json.dumps(body, separators=(",", ":"), ensure_ascii=False)
+        headers = self._l2_headers("POST", POST_ORDER, body, serialized)
+        return await self._request("POST", POST_ORDER, headers=headers, body=serialized)
+
+    async def cancel(self, order_id: str) -> dict:
+        """DELETE /order for one order id."""
+        body = {"orderID": order_id}
+        serialized = json.dumps(body, separators=(",", ":"), ensure_ascii=False)
+        headers = self._l2_headers("DELETE", CANCEL, body, serialized)
+        return await self._request("DELETE", CANCEL, headers=headers, body=serialized)
+
+    async def cancel_orders(self, order_ids: list[str]) -> dict:
+        """DELETE /orders — cancel many ids in one request."""
+        serialized = json.dumps(order_ids, separators=(",", ":"), ensure_ascii=False)
+        headers = self._l2_headers("DELETE", CANCEL_ORDERS, order_ids, serialized)
+        return await self._request("DELETE", CANCEL_ORDERS, headers=headers, body=serialized)
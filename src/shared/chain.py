@@ -0,0 +1,83 @@
+"""Process-wide Web3 providers and prebuilt contract objects.
+
+Building a provider opens a fresh HTTP session, and ``w3.eth.contract()``
+re-processes its ABI on every call.  Both used to happen per transaction
+(and per balance read).  This registry pays that setup once:
+
+- get_web3(rpc_url) — one Web3 per RPC URL on a pooled keep-alive session.
+- get_contract(w3, address, abi) — one contract object per (provider,
+  address, ABI); entries die with their provider.
+
+Usage:
+    w3 = get_web3(rpc_url)
+    safe = get_contract(w3, safe_address, SAFE_ABI)
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+import weakref
+from typing import Any
+
+import requests
+from requests.adapters import HTTPAdapter
+from web3 import Web3
+
+log = logging.getLogger("shared.chain")
+
+DEFAULT_POOL_SIZE = 16
+DEFAULT_REQUEST_TIMEOUT_SEC = 15.0
+
+_providers: dict[str, Web3] = {}
+# provider -> {(address, id(abi)): contract}
+_contracts: weakref.WeakKeyDictionary[Any, dict[tuple[str, int], Any]] = weakref.WeakKeyDictionary()
+_lock = threading.Lock()
+
+
+def _session(pool_size: int) -> requests.Session:
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def get_web3(rpc_url: str, pool_size: int = DEFAULT_POOL_SIZE) -> Web3:
+    """Return the shared Web3 for ``rpc_url``, creating it on first use."""
+    w3 = _providers.get(rpc_url)
+    if w3 is None:
+        with _lock:
+            w3 = _providers.get(rpc_url)
+            if w3 is None:
+                w3 = Web3(Web3.HTTPProvider(
+                    rpc_url,
+                    request_kwargs={"timeout": DEFAULT_REQUEST_TIMEOUT_SEC},
+                    session=_session(pool_size),
+                ))
+                _providers[rpc_url] = w3
+    return w3
+
+
+def get_contract(w3, address: str, abi: list[dict]) -> Any:
+    """Contract object for ``address`` bound to ``w3``, built once.
+
+    ``abi`` must be a module-level constant — it is keyed by identity.
+    """
+    address = Web3.to_checksum_address(address)
+    key = (address, id(abi))
+    with _lock:
+        by_key = _contracts.get(w3)
+        if by_key is None:
+            by_key = _contracts[w3] = {}
+        contract = by_key.get(key)
+        if contract is None:
+            contract = by_key[key] = w3.eth.contract(address=address, abi=abi)
+    return contract
+
+
+def reset_registry() -> None:
+    """Drop all cached providers and contracts (tests, or an RPC URL change)."""
+    with _lock:
+        _providers.clear()
+        _contracts.clear()
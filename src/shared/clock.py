@@ -0,0 +1,207 @@
+"""Clock-offset and round-trip latency estimator against exchange/server time.
+
+Entry timing compares local time with market.end_time (entry_delay_sec,
+min_seconds_to_end), so a drifting host clock shifts every boundary-timed
+post.  ClockSync samples server time from CLOB, Gamma and the Polygon RPC,
+estimates each source's offset NTP-style and smooths offset and RTT with an
+EWMA.  ``now()`` returns local time corrected by the combined offset.
+
+Per sample (t0/t1 = local send/receive, T = server time):
+    rtt    = t1 - t0
+    offset = T + resolution/2 - (t0 + t1)/2
+
+Servers report whole seconds (CLOB /time, HTTP Date) or block time, so
+``resolution`` removes the truncation bias; averaging many samples taken
+at random sub-second phases recovers sub-second accuracy.  Sources are
+combined by inverse variance, var = (rtt/2)² + resolution²/12, so the
+low-latency, fine-grained sources dominate.
+
+Usage:
+    clock = ClockSync(default_sources(rpc_url))
+    clock.sample_all()                       # blocking initial sync
+    task = asyncio.create_task(clock.run())  # background refresh
+    seconds_to_end = market.end_time - clock.now()
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from email.utils import parsedate_to_datetime
+from typing import Callable, Optional
+
+import requests
+
+from shared.client import CLOB_HOST
+from shared.market_data import GAMMA_HOST
+
+log = logging.getLogger("shared.clock")
+
+DEFAULT_SYNC_INTERVAL_SEC = 30.0
+EWMA_ALPHA = 0.2
+MAX_SAMPLE_RTT_SEC = 2.0      # slower round-trips say more about the network than the clock
+OFFSET_WARN_SEC = 0.5         # log when the host clock is this far off
+_REQUEST_TIMEOUT_SEC = 5.0
+
+
+@dataclass(frozen=True)
+class ClockSource:
+    name: str
+    fetch: Callable[[], Optional[float]]  # server epoch seconds, or None
+    resolution_s: float = 1.0             # server timestamp granularity
+
+
+@dataclass
+class ClockEstimate:
+    offset_s: float = 0.0    # server − local, EWMA
+    rtt_s: float = 0.0       # round-trip, EWMA
+    samples: int = 0
+    updated_at: float = 0.0  # local epoch of last accepted sample
+
+    def variance(self, resolution_s: float) -> float:
+        return (self.rtt_s / 2) ** 2 + resolution_s ** 2 / 12
+
+
+def _fetch_clob_time() -> Optional[float]:
+    resp = requests.get(f"{CLOB_HOST}/time", timeout=_REQUEST_TIMEOUT_SEC)
+    resp.raise_for_status()
+    return float(resp.text.strip())
+
+
+def _fetch_gamma_date() -> Optional[float]:
+    resp = requests.head(f"{GAMMA_HOST}/events", timeout=_REQUEST_TIMEOUT_SEC)
+    date = resp.headers.get("Date")
+    return parsedate_to_datetime(date).timestamp() if date else None
+
+
+def _rpc_block_time_fetcher(rpc_url: str) -> Callable[[], Optional[float]]:
+    def fetch() -> Optional[float]:
+        resp = requests.post(
+            rpc_url,
+            json={
+                "jsonrpc": "2.0", "id": 1,
+                "method": "eth_getBlockByNumber", "params": ["latest", False],
+            },
+            timeout=_REQUEST_TIMEOUT_SEC,
+        )
+        resp.raise_for_status()
+        block = resp.json().get("result") or {}
+        ts = block.get("timestamp")
+        return float(int(ts, 16)) if ts else None
+    return fetch
+
+
+def default_sources(rpc_url: str = "") -> list[ClockSource]:
+    """CLOB /time, Gamma Date header and (if configured) the RPC head block."""
+    sources = [
+        ClockSource("clob", _fetch_clob_time, resolution_s=1.0),
+        ClockSource("gamma", _fetch_gamma_date, resolution_s=1.0),
+    ]
+    if rpc_url:
+        # Polygon head block is ~2s granular and already a block old on arrival
+        sources.append(ClockSource("rpc", _rpc_block_time_fetcher(rpc_url), resolution_s=2.0))
+    return sources
+
+
+class ClockSync:
+    """Smoothed per-source offset/RTT and a corrected clock.
+
+    Sampling runs in worker threads; now() is lock-free (reads one float).
+    """
+
+    def __init__(self, sources: list[ClockSource], alpha: float = EWMA_ALPHA) -> None:
+        self._sources = {s.name: s for s in sources}
+        self._alpha = alpha
+        self._estimates: dict[str, ClockEstimate] = {s.name: ClockEstimate() for s in sources}
+        self._offset_s = 0.0
+        self._lock = threading.Lock()
+        self._warned = False
+
+    def now(self) -> float:
+        """Local epoch seconds corrected to server time."""
+        return time.time() + self._offset_s
+
+    @property
+    def offset_s(self) -> float:
+        return self._offset_s
+
+    def estimate(self, name: str) -> ClockEstimate:
+        return self._estimates[name]
+
+    def record(self, name: str, t0: float, server_time: float, t1: float) -> bool:
+        """Fold one sample into the source's estimate. Returns False if rejected."""
+        rtt = t1 - t0
+        if rtt < 0 or rtt > MAX_SAMPLE_RTT_SEC:
+            return False
+        source = self._sources[name]
+        offset = server_time + source.resolution_s / 2 - (t0 + t1) / 2
+
+        with self._lock:
+            est = self._estimates[name]
+            if est.samples == 0:
+                est.offset_s, est.rtt_s = offset, rtt
+            else:
+                est.offset_s += self._alpha * (offset - est.offset_s)
+                est.rtt_s += self._alpha * (rtt - est.rtt_s)
+            est.samples += 1
+            est.updated_at = t1
+            self._offset_s = self._combine()
+        return True
+
+    def _combine(self) -> float:
+        """Inverse-variance weighted offset across sources with samples."""
+        num = den = 0.0
+        for name, est in self._estimates.items():
+            if est.samples == 0:
+                continue
+            var = max(est.variance(self._sources[name].resolution_s), 1e-6)
+            num += est.offset_s / var
+            den += 1.0 / var
+        return num / den if den else 0.0
+
+    def sample(self, name: str) -> bool:
+        """Query one source and record the result (blocking)."""
+        source = self._sources[name]
+        try:
+            t0 = time.time()
+            server_time = source.fetch()
+            t1 = time.time()
+        except Exception as e:
+            log.debug("CLOCK_SAMPLE_FAILED │ %s │ %s", name, e)
+            return False
+        if server_time is None:
+            return False
+        return self.record(name, t0, server_time, t1)
+
+    def sample_all(self) -> None:
+        for name in self._sources:
+            self.sample(name)
+        self._check_skew()
+
+    def _check_skew(self) -> None:
+        skewed = abs(self._offset_s) >= OFFSET_WARN_SEC
+        if skewed and not self._warned:
+            log.warning("CLOCK_SKEW │ host clock off by %+.3fs vs server time", self._offset_s)
+        self._warned = skewed
+
+    async def run(self, interval: float = DEFAULT_SYNC_INTERVAL_SEC) -> None:
+        """Background refresh — one sampling round per interval."""
+        while True:
+            await asyncio.gather(*(
+                asyncio.to_thread(self.sample, name) for name in self._sources
+            ))
+            self._check_skew()
+            log.debug("CLOCK │ %s", self.stats())
+            await asyncio.sleep(interval)
+
+    def stats(self) -> dict[str, object]:
+        return {
+            "offset_ms": round(self._offset_s * 1000, 1),
+            **{
+                f"{name}_rtt_ms": round(est.rtt_s * 1000, 1)
+                for name, est in self._estimates.items() if est.samples
+            },
+        }
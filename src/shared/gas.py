@@ -0,0 +1,172 @@
+"""Cached gas oracle — EIP-1559 fees from fee history, gas limits per call type.
+
+Every Safe transaction used to read ``eth_gasPrice``, pay 1.5× of it as a
+legacy gasPrice and run ``eth_estimateGas``.  GasOracle replaces both reads:
+
+- Fees — one ``eth_feeHistory`` call (next base fee plus priority-fee
+  percentiles over the last few blocks) is cached for about a block, and
+  turned into ``maxFeePerGas`` / ``maxPriorityFeePerGas`` at the requested
+  urgency.  maxFee leaves headroom for base-fee rises; the tx only pays
+  base + tip, so it overpays far less than a flat 1.5× gasPrice.
+- Gas limits — a merge, redeem or approval costs about the same every time,
+  so the latest successful estimate per call kind (merge/redeem × CTF or
+  neg-risk, approval, or a MultiSend batch of them) is cached with a safety
+  margin and reused for ``estimate_ttl_s`` instead of another
+  ``eth_estimateGas``.  A revert drops it, so the next tx re-estimates.
+
+Usage:
+    oracle = GasOracle(w3, urgency="normal")
+    quote = oracle.fees()
+    gas = oracle.gas_limit("merge:ctf", lambda: w3.eth.estimate_gas(tx), fallback=500_000)
+"""
+
+from __future__ import annotations
+
+import logging
+import math
+import threading
+import time
+from collections import Counter
+from typing import Callable, Iterable, NamedTuple, Optional
+
+log = logging.getLogger("shared.gas")
+
+# Reward percentile sampled from fee history for each urgency
+URGENCY_PERCENTILES: dict[str, int] = {"low": 25, "normal": 50, "high": 90}
+DEFAULT_URGENCY = "normal"
+
+FEE_HISTORY_BLOCKS = 10
+FEE_TTL_SEC = 2.0                       # ~one Polygon block
+BASE_FEE_HEADROOM = 2                   # maxFee covers the base fee doubling
+MIN_PRIORITY_FEE_WEI = 30 * 10**9       # Polygon validators ignore tips below ~25-30 gwei
+ESTIMATE_MARGIN = 1.25
+ESTIMATE_TTL_SEC = 6 * 3600.0
+
+# Gas-limit cache keys
+GAS_KIND_APPROVAL = "approval"
+
+
+def gas_kind(action: str, neg_risk: bool) -> str:
+    """Cache key for a merge/redeem call, e.g. ``merge:negrisk``."""
+    return f"{action}:{'negrisk' if neg_risk else 'ctf'}"
+
+
+def batch_gas_kind(kinds: Iterable[str]) -> str:
+    """Cache key for a MultiSend batch, e.g. ``multisend:merge:ctf*2,merge:negrisk*1``.
+
+    Returns "" (not cached) if any call has no kind.
+    """
+    counts = Counter(kinds)
+    if not counts or "" in counts:
+        return ""
+    return "multisend:" + ",".join(f"{k}*{n}" for k, n in sorted(counts.items()))
+
+
+class FeeQuote(NamedTuple):
+    max_fee_per_gas: int
+    max_priority_fee_per_gas: int
+    base_fee: int              # next block's base fee
+
+    @property
+    def expected_price(self) -> int:
+        """What the tx pays per gas if included next block."""
+        return self.base_fee + self.max_priority_fee_per_gas
+
+
+class GasOracle:
+    """Thread-safe fee and gas-limit cache shared by every sender on one chain."""
+
+    def __init__(
+        self,
+        w3,
+        urgency: str = DEFAULT_URGENCY,
+        fee_ttl_s: float = FEE_TTL_SEC,
+        estimate_ttl_s: float = ESTIMATE_TTL_SEC,
+        history_blocks: int = FEE_HISTORY_BLOCKS,
+    ) -> None:
+        if urgency not in URGENCY_PERCENTILES:
+            raise ValueError(f"unknown gas urgency {urgency!r}")
+        self._w3 = w3
+        self._urgency = urgency
+        self._fee_ttl_s = fee_ttl_s
+        self._estimate_ttl_s = estimate_ttl_s
+        self._history_blocks = history_blocks
+        self._lock = threading.Lock()
+        # (fetched_at, next base fee, {percentile: median reward})
+        self._history: Optional[tuple[float, int, dict[int, int]]] = None
+        self._estimates: dict[str, tuple[int, float]] = {}  # kind -> (gas limit, cached_at)
+        self.fee_fetches = 0
+        self.estimate_calls = 0
+
+    # -----------------------------------------------------------------
+    # Fees
+    # -----------------------------------------------------------------
+
+    def fees(self, urgency: Optional[str] = None) -> FeeQuote:
+        urgency = urgency or self._urgency
+        pct = URGENCY_PERCENTILES[urgency]
+        base_fee, rewards = self._fee_history()
+        priority = max(MIN_PRIORITY_FEE_WEI, rewards.get(pct, 0))
+        return FeeQuote(
+            max_fee_per_gas=base_fee * BASE_FEE_HEADROOM + priority,
+            max_priority_fee_per_gas=priority,
+            base_fee=base_fee,
+        )
+
+    def _fee_history(self) -> tuple[int, dict[int, int]]:
+        with self._lock:
+            cached = self._history
+            if cached is not None and time.monotonic() - cached[0] < self._fee_ttl_s:
+                return cached[1], cached[2]
+
+            percentiles = sorted(URGENCY_PERCENTILES.values())
+            history = self._w3.eth.fee_history(self._history_blocks, "latest", percentiles)
+            self.fee_fetches += 1
+            # baseFeePerGas has one extra entry: the next block's base fee
+            base_fee = int(history["baseFeePerGas"][-1])
+            rewards: dict[int, int] = {}
+            for i, pct in enumerate(percentiles):
+                samples = sorted(int(r[i]) for r in history.get("reward") or [] if len(r) > i)
+                rewards[pct] = samples[len(samples) // 2] if samples else 0
+            self._history = (time.monotonic(), base_fee, rewards)
+            return base_fee, rewards
+
+    # -----------------------------------------------------------------
+    # Gas limits
+    # -----------------------------------------------------------------
+
+    def gas_limit(
+        self,
+        kind: str,
+        estimate: Optional[Callable[[], int]],
+        fallback: int,
+    ) -> int:
+        """Cached limit for ``kind`` while within TTL; else estimate (if given) and cache it.
+
+        ``estimate=None`` means estimating isn't possible right now (e.g.
+        pipelined Safe txs) — on a cache miss ``fallback`` is used.
+        """
+        now = time.monotonic()
+        with self._lock:
+            cached = self._estimates.get(kind)
+            if cached is not None and now - cached[1] < self._estimate_ttl_s:
+                return cached[0]
+        if estimate is None:
+            return fallback
+        try:
+            self.estimate_calls += 1
+            limit = max(21_000, math.ceil(estimate() * ESTIMATE_MARGIN))
+        except Exception as e:
+            log.warning("GAS_ESTIMATE_FAILED │ %s │ using fallback %d: %s", kind, fallback, e)
+            return fallback
+        with self._lock:
+            self._estimates[kind] = (limit, now)
+        return limit
+
+    def invalidate(self, kind: Optional[str] = None) -> None:
+        """Drop a cached estimate (e.g. after an out-of-gas revert), or all of them."""
+        with self._lock:
+            if kind is None:
+                self._estimates.clear()
+            else:
+                self._estimates.pop(kind, None)
@@ -0,0 +1,126 @@
+"""Persistent market metadata cache — slug → GabagoolMarket in a local SQLite file.
+
+A market's tokens, condition_id, neg_risk flag and end_time never change once
+listed, so they survive restarts.  Loading the cache is a single local read,
+which lets the grid-maker resume managing markets immediately while Gamma
+discovery re-validates in the background.
+
+Usage:
+    cache = MarketCache("data/grid_maker_markets.db")
+    for market, first_seen_at in cache.load(time.time()):
+        ...
+    cache.save(markets)
+"""
+
+from __future__ import annotations
+
+import logging
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+from shared.models import GabagoolMarket
+
+log = logging.getLogger("shared.market_cache")
+
+DEFAULT_CACHE_PATH = "data/grid_maker_markets.db"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS markets (
+    slug          TEXT PRIMARY KEY,
+    up_token_id   TEXT NOT NULL,
+    down_token_id TEXT NOT NULL,
+    end_time      REAL NOT NULL,
+    market_type   TEXT NOT NULL,
+    condition_id  TEXT NOT NULL DEFAULT '',
+    neg_risk      INTEGER NOT NULL DEFAULT 0,
+    first_seen_at REAL NOT NULL
+)
+"""
+
+
+class MarketCache:
+    """Thread-safe SQLite store of discovered markets.
+
+    Written from the discovery thread, read synchronously at startup.
+    """
+
+    def __init__(self, path: str = DEFAULT_CACHE_PATH) -> None:
+        db_path = Path(path)
+        db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(db_path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(_SCHEMA)
+        self._conn.commit()
+
+    def load(
+        self, now: float, ended_since: float | None = None,
+    ) -> list[tuple[GabagoolMarket, float]]:
+        """Return (market, first_seen_at) for every cached market still active.
+
+        With ``ended_since``, markets that ended after it are included too.
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT slug, up_token_id, down_token_id, end_time, market_type, "
+                "condition_id, neg_risk, first_seen_at FROM markets "
+                "WHERE end_time > ? ORDER BY end_time",
+                (now if ended_since is None else min(now, ended_since),),
+            ).fetchall()
+        return [
+            (
+                GabagoolMarket(
+                    slug=slug,
+                    up_token_id=up,
+                    down_token_id=down,
+                    end_time=end_time,
+                    market_type=market_type,
+                    condition_id=condition_id,
+                    neg_risk=bool(neg_risk),
+                ),
+                first_seen_at,
+            )
+            for slug, up, down, end_time, market_type, condition_id, neg_risk, first_seen_at
+            in rows
+        ]
+
+    def save(self, markets: list[GabagoolMarket], now: float | None = None) -> None:
+        """Upsert markets. first_seen_at is kept from the first insert."""
+        if not markets:
+            return
+        now = time.time() if now is None else now
+        rows = [
+            (
+                m.slug, m.up_token_id, m.down_token_id, m.end_time, m.market_type,
+                m.condition_id, int(m.neg_risk), now,
+            )
+            for m in markets
+        ]
+        with self._lock:
+            self._conn.executemany(
+                "INSERT INTO markets (slug, up_token_id, down_token_id, end_time, "
+                "market_type, condition_id, neg_risk, first_seen_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT(slug) DO UPDATE SET "
+                "up_token_id=excluded.up_token_id, down_token_id=excluded.down_token_id, "
+                "end_time=excluded.end_time, market_type=excluded.market_type, "
+                "condition_id=excluded.condition_id, neg_risk=excluded.neg_risk",
+                rows,
+            )
+            self._conn.commit()
+
+    def prune(self, before: float) -> int:
+        """Delete markets that ended before ``before``. Returns rows removed."""
+        with self._lock:
+            cur = self._conn.execute("DELETE FROM markets WHERE end_time < ?", (before,))
+            self._conn.commit()
+        if cur.rowcount:
+            log.debug("MARKET_CACHE │ pruned %d expired markets", cur.rowcount)
+        return cur.rowcount
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
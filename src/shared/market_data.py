@@ -17,6 +17,7 @@ import requests
 from py_clob_client.clob_types import BookParams
 
 from shared.models import GabagoolMarket, TopOfBook
+from shared.resilience import get_endpoint
 
 log = logging.getLogger("shared.market_data")
 
@@ -35,6 +36,9 @@ _full_book_cache: dict[str, tuple[list[tuple[Decimal, Decimal]], list[tuple[Deci
 
 GAMMA_HOST = "https://gamma-api.polymarket.com"
 
+# Max slugs per bulk /events request — keeps the query string well under URL limits
+GAMMA_SLUGS_PER_REQUEST = 50
+
 
 # ---------------------------------------------------------------------------
 # Slug generation
@@ -96,85 +100,228 @@ def _parse_json_field(value) -> list:
     return []
 
 
+def _parse_event(event: dict, slug: str = "") -> Optional[GabagoolMarket]:
+    """Parse a Gamma event dict into a GabagoolMarket.
+
+    Returns None for closed events and events that are not binary Up/Down.
+    """
+    if event.get("closed", False):
+        return None
+
+    # Determine market type
+    event_slug = event.get("slug", slug)
+    if "updown-5m" in event_slug:
+        market_type = "updown-5m"
+    elif "updown-15m" in event_slug:
+        market_type = "updown-15m"
+    elif "up-or-down" in event_slug:
+        market_type = "up-or-down"
+    else:
+        return None
+
+    # Parse end time
+    end_time = _parse_end_time(event, event_slug, market_type)
+    if end_time is None:
+        return None
+
+    # Get first market's tokens
+    markets = event.get("markets", [])
+    if not markets:
+        return None
+    first_market = markets[0]
+
+    token_ids = _parse_json_field(first_market.get("clobTokenIds"))
+    outcomes = _parse_json_field(first_market.get("outcomes"))
+
+    up_token = None
+    down_token = None
+    for i, outcome in enumerate(outcomes):
+        if i >= len(token_ids):
+            break
+        token_id = token_ids[i]
+        if not token_id:
+            continue
+        outcome_lower = outcome.lower().strip()
+        if outcome_lower == "up":
+            up_token = token_id
+        elif outcome_lower == "down":
+            down_token = token_id
+
+    if not up_token or not down_token:
+        return None
+
+    condition_id = first_market.get("conditionId", "")
+    neg_risk = bool(first_market.get("negRisk", False))
+
+    return GabagoolMarket(
+        slug=event_slug,
+        up_token_id=up_token,
+        down_token_id=down_token,
+        end_time=end_time,
+        market_type=market_type,
+        condition_id=condition_id,
+        neg_risk=neg_risk,
+    )
+
+
+def _gamma_get_events(params) -> requests.Response:
+    """GET /events through the Gamma circuit breaker (hedged — reads are idempotent)."""
+    return get_endpoint("gamma.events").call(
+        requests.get, f"{GAMMA_HOST}/events", params=params, timeout=10, hedge=True,
+    )
+
+
 def _fetch_market_by_slug(slug: str) -> Optional[GabagoolMarket]:
     """Fetch market details from Gamma API by slug."""
     try:
-        resp = requests.get(
-            f"{GAMMA_HOST}/events",
-            params={"slug": slug},
-            timeout=10,
-        )
+        resp = _gamma_get_events({"slug": slug})
         if resp.status_code != 200:
             return None
         events = resp.json()
         if not events:
             return None
+        return _parse_event(events[0], slug)
 
-        event = events[0]
-        if event.get("closed", False):
-            return None
+    except (requests.ConnectionError, requests.Timeout) as e:
+        log.warning("Network error fetching market %s: %s", slug, e)
+        return None
+    except Exception as e:
+        log.debug("Error fetching market %s: %s", slug, e)
+        return None
 
-        # Determine market type
-        event_slug = event.get("slug", slug)
-        if "updown-5m" in event_slug:
-            market_type = "updown-5m"
-        elif "updown-15m" in event_slug:
-            market_type = "updown-15m"
-        elif "up-or-down" in event_slug:
-            market_type = "up-or-down"
-        else:
-            return None
 
-        # Parse end time
-        end_time = _parse_end_time(event, event_slug, market_type)
-        if end_time is None:
-            return None
+def fetch_markets_by_slugs(slugs: list[str]) -> Optional[dict[str, Optional[GabagoolMarket]]]:
+    """Resolve many slugs with one Gamma request per GAMMA_SLUGS_PER_REQUEST chunk.
 
-        # Get first market's tokens
-        markets = event.get("markets", [])
-        if not markets:
+    Gamma accepts a repeated ``slug`` query param on /events, so all candidate
+    windows for every asset and timeframe resolve in a single round-trip.
+
+    Returns {slug: market} for every event Gamma returned — the value is None
+    when the event exists but is closed.  Slugs absent from the result do not
+    exist yet, or are listed before their markets, tokens or end time are
+    filled in; either way they are worth asking again.  Returns None if any
+    chunk failed, so callers don't mistake a network error for "market not
+    listed".
+    """
+    found: dict[str, Optional[GabagoolMarket]] = {}
+    for i in range(0, len(slugs), GAMMA_SLUGS_PER_REQUEST):
+        chunk = slugs[i:i + GAMMA_SLUGS_PER_REQUEST]
+        try:
+            resp = _gamma_get_events([("slug", s) for s in chunk])
+            if resp.status_code != 200:
+                log.warning("Gamma bulk lookup HTTP %d (%d slugs)", resp.status_code, len(chunk))
+                return None
+            events = resp.json() or []
+        except (requests.ConnectionError, requests.Timeout) as e:
+            log.warning("Network error in Gamma bulk lookup (%d slugs): %s", len(chunk), e)
+            return None
+        except Exception as e:
+            log.debug("Gamma bulk lookup failed (%d slugs): %s", len(chunk), e)
             return None
-        first_market = markets[0]
-
-        token_ids = _parse_json_field(first_market.get("clobTokenIds"))
-        outcomes = _parse_json_field(first_market.get("outcomes"))
-
-        up_token = None
-        down_token = None
-        for i, outcome in enumerate(outcomes):
-            if i >= len(token_ids):
-                break
-            token_id = token_ids[i]
-            if not token_id:
+
+        for event in events:
+            event_slug = event.get("slug", "")
+            if not event_slug:
                 continue
-            outcome_lower = outcome.lower().strip()
-            if outcome_lower == "up":
-                up_token = token_id
-            elif outcome_lower == "down":
-                down_token = token_id
+            market = _parse_event(event, event_slug)
+            if market is None and not event.get("closed", False):
+                continue  # listed but not filled in yet — retry like a miss
+            found[event_slug] = market
+    return found
 
-        if not up_token or not down_token:
-            return None
 
-        condition_id = first_market.get("conditionId", "")
-        neg_risk = bool(first_market.get("negRisk", False))
-
-        return GabagoolMarket(
-            slug=event_slug,
-            up_token_id=up_token,
-            down_token_id=down_token,
-            end_time=end_time,
-            market_type=market_type,
-            condition_id=condition_id,
-            neg_risk=neg_risk,
-        )
+# ---------------------------------------------------------------------------
+# Slug prediction — only query windows we don't already know
+# ---------------------------------------------------------------------------
 
-    except (requests.ConnectionError, requests.Timeout) as e:
-        log.warning("Network error fetching market %s: %s", slug, e)
-        return None
-    except Exception as e:
-        log.debug("Error fetching market %s: %s", slug, e)
-        return None
+class SlugPredictor:
+    """Remembers which candidate slugs are resolved so discovery skips them.
+
+    Window slugs are deterministic ({prefix}-updown-{tf}-{epoch}), and a
+    market's tokens/condition never change once listed.  So a slug only needs
+    to hit Gamma until it resolves:
+
+    - known:  resolved to a market — served from memory until it expires
+    - dead:   Gamma returned it closed — never re-queried
+    - missed: not listed, or listed incomplete — re-queried after ``miss_retry_sec``
+    """
+
+    def __init__(self, miss_retry_sec: float = 30.0) -> None:
+        self._miss_retry_sec = miss_retry_sec
+        self._known: dict[str, GabagoolMarket] = {}
+        self._dead: set[str] = set()
+        self._missed_at: dict[str, float] = {}  # slug -> epoch of last miss
+
+    def pending(self, candidates: list[str], now: float) -> list[str]:
+        """Return the candidate slugs that still need a Gamma lookup."""
+        out: list[str] = []
+        for slug in candidates:
+            if slug in self._known or slug in self._dead:
+                continue
+            missed = self._missed_at.get(slug)
+            if missed is not None and now - missed < self._miss_retry_sec:
+                continue
+            out.append(slug)
+        return out
+
+    def record(
+        self,
+        queried: list[str],
+        found: dict[str, Optional[GabagoolMarket]],
+        now: float,
+    ) -> None:
+        """Record the outcome of a bulk lookup for ``queried`` slugs."""
+        for slug, market in found.items():
+            self._missed_at.pop(slug, None)
+            if market is None:
+                self._dead.add(slug)
+            else:
+                self._known[slug] = market
+        for slug in queried:
+            if slug not in found:
+                self._missed_at[slug] = now
+
+    def add(self, market: GabagoolMarket) -> None:
+        """Register a market resolved outside the bulk path (e.g. tag search)."""
+        self._known[market.slug] = market
+        self._missed_at.pop(market.slug, None)
+
+    def known_markets(self) -> list[GabagoolMarket]:
+        return list(self._known.values())
+
+    def prune(self, candidates: set[str], now: float) -> None:
+        """Forget expired markets and slugs that left the candidate range."""
+        for slug, market in list(self._known.items()):
+            if market.end_time <= now:
+                del self._known[slug]
+        self._dead &= candidates
+        for slug in list(self._missed_at):
+            if slug not in candidates:
+                del self._missed_at[slug]
+
+    def resolve(self, candidates: list[str], now: float) -> list[GabagoolMarket]:
+        """Look up unknown candidates in one bulk request, return active markets.
+
+        Markets come back in candidate order.  On a failed lookup the already
+        known markets are still returned.
+        """
+        self.prune(set(candidates), now)
+        to_query = self.pending(candidates, now)
+        if to_query:
+            found = fetch_markets_by_slugs(to_query)
+            if found is not None:
+                self.record(to_query, found, now)
+                log.debug(
+                    "GAMMA_BULK │ queried=%d resolved=%d",
+                    len(to_query), sum(1 for m in found.values() if m is not None),
+                )
+
+        markets: list[GabagoolMarket] = []
+        for slug in candidates:
+            market = self._known.get(slug)
+            if market and market.end_time > now:
+                markets.append(market)
+        return markets
 
 
 def _parse_end_time(event: dict, slug: str, market_type: str) -> Optional[float]:
@@ -213,34 +360,23 @@ def _parse_end_time(event: dict, slug: str, market_type: str) -> Optional[float]
 # Discovery
 # ---------------------------------------------------------------------------
 
+_predictor = SlugPredictor()
+
+
 def discover_markets(assets: tuple[str, ...]) -> list[GabagoolMarket]:
     """Discover active Up/Down markets for given assets via Gamma API."""
     now = time.time()
-    markets: list[GabagoolMarket] = []
-    seen_slugs: set[str] = set()
+    candidates: list[str] = []
 
     for asset in assets:
-        # 5m markets
         prefix_5m = _ASSET_PREFIXES_5M.get(asset)
         if prefix_5m:
-            for slug in _candidate_5m_slugs(prefix_5m, now):
-                if slug in seen_slugs:
-                    continue
-                seen_slugs.add(slug)
-                market = _fetch_market_by_slug(slug)
-                if market and market.end_time > now:
-                    markets.append(market)
-
-        # 15m markets
+            candidates.extend(_candidate_5m_slugs(prefix_5m, now))
         prefix_15m = _ASSET_PREFIXES_15M.get(asset)
         if prefix_15m:
-            for slug in _candidate_15m_slugs(prefix_15m, now):
-                if slug in seen_slugs:
-                    continue
-                seen_slugs.add(slug)
-                market = _fetch_market_by_slug(slug)
-                if market and market.end_time > now:
-                    markets.append(market)
+            candidates.extend(_candidate_15m_slugs(prefix_15m, now))
+
+    markets = _predictor.resolve(list(dict.fromkeys(candidates)), now)
 
     if markets:
         log.info("Discovered %d active markets", len(markets))
@@ -353,7 +489,7 @@ def get_top_of_book(client, token_id: str) -> Optional[TopOfBook]:
             return tob
 
     try:
-        book = client.get_order_book(token_id)
+        book = get_endpoint("clob.book").call(client.get_order_book, token_id, hedge=True)
         tob = _parse_book_to_tob(book, token_id)
         _tob_cache[token_id] = (tob, time.monotonic())
         return tob
@@ -382,23 +518,44 @@ def prefetch_order_books(client, markets: list[GabagoolMarket]) -> None:
         token_id_set.add(m.down_token_id)
 
     try:
-        raw_books = client.get_order_books(params)
-        now_mono = time.monotonic()
-        for book in raw_books:
-            # Match by asset_id — batch response order is NOT guaranteed
-            tid = getattr(book, "asset_id", None)
-            if isinstance(book, dict):
-                tid = book.get("asset_id", tid)
-            if not tid or tid not in token_id_set:
-                continue
-            tob = _parse_book_to_tob(book, tid)
-            _tob_cache[tid] = (tob, now_mono)
+        raw_books = get_endpoint("clob.books").call(client.get_order_books, params, hedge=True)
+        ingest_order_books(raw_books, token_id_set)
+    except (ConnectionError, TimeoutError, OSError) as e:
+        log.warning("Batch order book network error: %s", e)
+    except Exception as e:
+        log.debug("Batch order book fetch failed: %s", e)
+
+
+async def prefetch_order_books_async(aclient, markets: list[GabagoolMarket]) -> None:
+    """prefetch_order_books over an AsyncClobClient — no thread hop, same cache."""
+    if not markets:
+        return
+    token_ids = [tid for m in markets for tid in (m.up_token_id, m.down_token_id)]
+    try:
+        raw_books = await get_endpoint("clob.books").acall(
+            aclient.get_order_books, token_ids, hedge=True,
+        )
+        ingest_order_books(raw_books, set(token_ids))
     except (ConnectionError, TimeoutError, OSError) as e:
         log.warning("Batch order book network error: %s", e)
     except Exception as e:
         log.debug("Batch order book fetch failed: %s", e)
 
 
+def ingest_order_books(raw_books, token_ids: set[str]) -> None:
+    """Populate the TOB and full-book caches from a batch /books response."""
+    now_mono = time.monotonic()
+    for book in raw_books:
+        # Match by asset_id — batch response order is NOT guaranteed
+        tid = getattr(book, "asset_id", None)
+        if isinstance(book, dict):
+            tid = book.get("asset_id", tid)
+        if not tid or tid not in token_ids:
+            continue
+        tob = _parse_book_to_tob(book, tid)
+        _tob_cache[tid] = (tob, now_mono)
+
+
 # ---------------------------------------------------------------------------
 # Depth-based fill simulation for dry-run orders
 # ---------------------------------------------------------------------------
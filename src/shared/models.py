@@ -45,6 +45,22 @@ class GabagoolMarket:
     neg_risk: bool = False  # NegRisk markets use NegRiskAdapter for merge/redeem
 
 
+@dataclass(frozen=True)
+class OrderIntent:
+    """An order to place — queued during a tick, posted in one concurrent batch."""
+    market: GabagoolMarket
+    token_id: str
+    direction: Direction
+    price: Decimal
+    size: Decimal
+    seconds_to_end: int
+    reason: str = "QUOTE"
+    order_type: Optional[object] = None  # py_clob_client OrderType; None = GTC
+    side: str = "BUY"
+    reserved_hedge_notional: Decimal = field(default_factory=lambda: Decimal("0"))
+    entry_dynamic_edge: Decimal = field(default_factory=lambda: Decimal("0"))
+
+
 @dataclass(frozen=True)
 class OrderState:
     order_id: str
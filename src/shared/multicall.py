@@ -0,0 +1,77 @@
+"""Multicall3 batching — many read-only contract calls in one ``eth_call``.
+
+Multicall3 is deployed at the same address on every EVM chain.  aggregate3
+runs each sub-call with its own failure flag, so one bad sub-call doesn't
+sink the batch.  Calldata is built from precomputed selectors with eth_abi,
+so no web3 contract objects are needed per read.
+
+Usage:
+    results = aggregate3(w3, [
+        Call3(USDC, encode_balance_of(wallet)),
+        Call3(MULTICALL3_ADDRESS, GET_BLOCK_NUMBER_DATA),
+    ])
+    usdc = decode_uint(results[0])
+"""
+
+from __future__ import annotations
+
+from typing import NamedTuple, Optional
+
+from eth_abi import decode, encode
+
+MULTICALL3_ADDRESS = "0xcA11bde05977b3631167028862bE2a173976CA11"
+
+# 4-byte selectors
+SEL_BALANCE_OF = bytes.fromhex("70a08231")          # balanceOf(address)
+SEL_BALANCE_OF_BATCH = bytes.fromhex("4e1273f4")    # balanceOfBatch(address[],uint256[])
+SEL_IS_APPROVED_FOR_ALL = bytes.fromhex("e985e9c5")  # isApprovedForAll(address,address)
+SEL_GET_BLOCK_NUMBER = bytes.fromhex("42cbb15c")    # getBlockNumber()
+SEL_AGGREGATE3 = bytes.fromhex("82ad56cb")          # aggregate3((address,bool,bytes)[])
+
+GET_BLOCK_NUMBER_DATA = SEL_GET_BLOCK_NUMBER
+
+
+class Call3(NamedTuple):
+    target: str
+    data: bytes
+    allow_failure: bool = True
+
+
+def encode_balance_of(owner: str) -> bytes:
+    return SEL_BALANCE_OF + encode(["address"], [owner])
+
+
+def encode_balance_of_batch(owner: str, token_ids: list[int]) -> bytes:
+    return SEL_BALANCE_OF_BATCH + encode(
+        ["address[]", "uint256[]"], [[owner] * len(token_ids), token_ids],
+    )
+
+
+def encode_is_approved_for_all(owner: str, operator: str) -> bytes:
+    return SEL_IS_APPROVED_FOR_ALL + encode(["address", "address"], [owner, operator])
+
+
+def encode_aggregate3(calls: list[Call3]) -> bytes:
+    return SEL_AGGREGATE3 + encode(
+        ["(address,bool,bytes)[]"],
+        [[(c.target, c.allow_failure, c.data) for c in calls]],
+    )
+
+
+def aggregate3(w3, calls: list[Call3], block: str | int = "latest") -> list[Optional[bytes]]:
+    """Run ``calls`` in one eth_call. Failed sub-calls come back as None."""
+    raw = w3.eth.call({"to": MULTICALL3_ADDRESS, "data": encode_aggregate3(calls)}, block)
+    (results,) = decode(["(bool,bytes)[]"], bytes(raw))
+    return [data if ok else None for ok, data in results]
+
+
+def decode_uint(data: Optional[bytes]) -> Optional[int]:
+    return decode(["uint256"], data)[0] if data else None
+
+
+def decode_uint_array(data: Optional[bytes]) -> Optional[list[int]]:
+    return list(decode(["uint256[]"], data)[0]) if data else None
+
+
+def decode_bool(data: Optional[bytes]) -> Optional[bool]:
+    return decode(["bool"], data)[0] if data else None
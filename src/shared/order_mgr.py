@@ -5,6 +5,7 @@ Tracks multiple orders per token_id.
 
 from __future__ import annotations
 
+import asyncio
 import logging
 import math
 import time
@@ -24,8 +25,10 @@ from shared.models import (
     ZERO,
     Direction,
     GabagoolMarket,
+    OrderIntent,
     OrderState,
 )
+from shared.resilience import CircuitOpenError, get_endpoint
 
 log = logging.getLogger("shared.orders")
 
@@ -33,6 +36,13 @@ ORDER_STALE_TIMEOUT_S = 7200.0
 ORDER_STATUS_POLL_INTERVAL_S = 1.0
 
 
+def _order_label(intent: OrderIntent) -> str:
+    return (
+        f"{intent.market.slug[:40]} │ {intent.direction.value} "
+        f"@ {intent.price} x{intent.size} ({intent.reason}, {intent.seconds_to_end}s left)"
+    )
+
+
 class OrderManager:
     def __init__(self, dry_run: bool = True):
         self._orders: dict[str, list[OrderState]] = {}  # token_id -> list[OrderState]
@@ -80,170 +90,260 @@ class OrderManager:
         entry_dynamic_edge: Decimal = ZERO,
     ) -> bool:
         """Place a BUY or SELL order. Returns True on success."""
-        label = (
-            f"{market.slug[:40]} │ {direction.value} "
-            f"@ {price} x{size} ({reason}, {seconds_to_end}s left)"
+        intent = OrderIntent(
+            market=market,
+            token_id=token_id,
+            direction=direction,
+            price=price,
+            size=size,
+            seconds_to_end=seconds_to_end,
+            reason=reason,
+            order_type=order_type,
+            side=side,
+            reserved_hedge_notional=reserved_hedge_notional,
+            entry_dynamic_edge=entry_dynamic_edge,
         )
 
         if self._dry_run:
-            log.info("DRY %s", label)
-            state = OrderState(
-                order_id=f"dry-{int(time.time()*1000)}",
-                market=market,
-                token_id=token_id,
-                direction=direction,
-                price=price,
-                size=size,
-                placed_at=time.time(),
-                side=side,
-                matched_size=ZERO,  # starts unfilled — exposure accumulates
-                seconds_to_end_at_entry=seconds_to_end,
-                reserved_hedge_notional=reserved_hedge_notional,
-                entry_dynamic_edge=entry_dynamic_edge,
-            )
-            if token_id not in self._orders:
-                self._orders[token_id] = []
-            self._orders[token_id].append(state)
-            # Don't fire on_fill here; check_pending_orders will simulate
-            # the fill using book-depth-aware logic.
+            self._place_dry(intent)
             return True
 
-        try:
-            ot = order_type or OrderType.GTC
-
-            # FOK (taker) orders require price*size ≤ 2 decimals (maker amount)
-            # and size ≤ 4 decimals (taker amount).
-            # py_clob_client internally rounds size to 2 decimals, so we must
-            # ensure cents * (size*100) % 100 == 0.
-            # step = 100 / gcd(cents, 100) / 100.
-            if ot == OrderType.FOK:
-                cents = int(price * 100)
-                g = math.gcd(cents, 100)
-                step = Decimal(100 // g) / Decimal(100)
-                size = (size / step).to_integral_value(rounding=ROUND_DOWN) * step
-                if size <= ZERO:
-                    log.warning("FOK size rounded to zero, skipping %s", token_id[:16])
-                    return False
-
-                # Polymarket requires min $1 notional for marketable FOK BUY orders
-                min_notional = Decimal("1")
-                notional = price * size
-                if notional < min_notional:
-                    min_size = math.ceil(float(min_notional / price / step)) * step
-                    if side == "SELL":
-                        # Can't sell more than we hold — skip if position too small
-                        log.warning(
-                            "FOK_MIN_NOTIONAL %s │ SELL %s x %s = $%s < $1 │ need %s shares, skipping",
-                            token_id[:16], price, size, notional, min_size,
-                        )
-                        return False
-                    log.debug(
-                        "FOK_MIN_NOTIONAL %s │ %s x %s = $%s < $1 │ bumping to %s",
-                        token_id[:16], price, size, notional, min_size,
-                    )
-                    size = min_size
-
-                label = (
-                    f"{market.slug[:40]} │ {direction.value} "
-                    f"@ {price} x{size} ({reason}, {seconds_to_end}s left)"
-                )
+        prepared = self._prepare_live(intent)
+        if prepared is None:
+            return False
+        intent, ot = prepared
 
-            clob_side = SELL if side == "SELL" else BUY
+        label = _order_label(intent)
+        try:
+            clob_side = SELL if intent.side == "SELL" else BUY
             log.info("PLACE %s", label)
             order = client.create_order(
                 OrderArgs(
-                    token_id=token_id,
-                    price=float(price),
-                    size=float(size),
+                    token_id=intent.token_id,
+                    price=float(intent.price),
+                    size=float(intent.size),
                     side=clob_side,
                 )
             )
-            resp = client.post_order(order, ot)
-
-            # Extract order ID from response
-            order_id = None
-            if isinstance(resp, dict):
-                order_id = resp.get("orderID") or resp.get("orderId")
-            elif hasattr(resp, "orderID"):
-                order_id = resp.orderID
-            elif hasattr(resp, "order_id"):
-                order_id = resp.order_id
-
-            if not order_id:
-                log.warning("%sOrder submission returned null orderId for %s%s", C_YELLOW, market.slug, C_RESET)
-                # Insert sentinel to prevent duplicate submissions.
-                # Skip for FOK orders — they are terminal by nature,
-                # nothing on the book to track.
-                is_fok = (order_type == OrderType.FOK)
-                if not is_fok:
-                    sentinel = OrderState(
-                        order_id="",
-                        market=market,
-                        token_id=token_id,
-                        direction=direction,
-                        price=price,
-                        size=size,
-                        placed_at=time.time(),
-                        side=side,
-                        matched_size=ZERO,
-                        seconds_to_end_at_entry=seconds_to_end,
-                        reserved_hedge_notional=reserved_hedge_notional,
-                        entry_dynamic_edge=entry_dynamic_edge,
-                    )
-                    if token_id not in self._orders:
-                        self._orders[token_id] = []
-                    self._orders[token_id].append(sentinel)
-                return False
-
-            state = OrderState(
-                order_id=order_id,
-                market=market,
-                token_id=token_id,
-                direction=direction,
-                price=price,
-                size=size,
-                placed_at=time.time(),
-                side=side,
-                matched_size=ZERO,
-                seconds_to_end_at_entry=seconds_to_end,
-                reserved_hedge_notional=reserved_hedge_notional,
-                entry_dynamic_edge=entry_dynamic_edge,
-            )
-            if token_id not in self._orders:
-                self._orders[token_id] = []
-            self._orders[token_id].append(state)
-            log.info("%sPLACED %s (order=%s, type=%s)%s", C_GREEN, label, order_id, ot.value if hasattr(ot, 'value') else ot, C_RESET)
-            return True
-
+            resp = get_endpoint("clob.post_order").call(client.post_order, order, ot)
         except Exception as e:
-            error_str = str(e).lower()
-            is_balance_error = "balance" in error_str or "allowance" in error_str
-            log.error("%sFAILED %s │ %s (balance_error=%s)%s", C_RED, label, e, is_balance_error, C_RESET)
-            # Sentinel prevents duplicate submissions for GTC orders that
-            # might be on the book despite the error.  Skip for:
-            # - Balance errors: no order exists to track
-            # - FOK orders: terminal by nature, nothing on the book
-            is_fok = (order_type == OrderType.FOK)
-            if not is_balance_error and not is_fok:
-                sentinel = OrderState(
-                    order_id="",
-                    market=market,
-                    token_id=token_id,
-                    direction=direction,
-                    price=price,
-                    size=size,
-                    placed_at=time.time(),
-                    side=side,
-                    matched_size=ZERO,
-                    seconds_to_end_at_entry=seconds_to_end,
-                    reserved_hedge_notional=reserved_hedge_notional,
-                    entry_dynamic_edge=entry_dynamic_edge,
+            self._record_post_error(intent, e)
+            return False
+        return self._record_post_response(intent, ot, resp)
+
+    async def place_orders_async(self, client, aclient, intents: list[OrderIntent]) -> int:
+        """Place many orders concurrently through an AsyncClobClient.
+
+        Orders are signed in one thread hop (create_order is CPU-bound
+        EIP-712 signing plus cached tick-size lookups), then all POSTs go
+        out together on the shared connection pool.  Bookkeeping matches
+        place_order exactly.  Returns the number of orders placed.
+        """
+        if not intents:
+            return 0
+
+        if self._dry_run:
+            for intent in intents:
+                self._place_dry(intent)
+            return len(intents)
+
+        batch: list[tuple[OrderIntent, OrderType]] = []
+        for intent in intents:
+            prepared = self._prepare_live(intent)
+            if prepared is not None:
+                batch.append(prepared)
+        if not batch:
+            return 0
+
+        def _sign_all() -> list:
+            signed = []
+            for intent, _ in batch:
+                try:
+                    signed.append(client.create_order(
+                        OrderArgs(
+                            token_id=intent.token_id,
+                            price=float(intent.price),
+                            size=float(intent.size),
+                            side=SELL if intent.side == "SELL" else BUY,
+                        )
+                    ))
+                except Exception as e:
+                    signed.append(e)
+            return signed
+
+        signed = await asyncio.to_thread(_sign_all)
+
+        endpoint = get_endpoint("clob.post_order")
+
+        async def _post(order, ot):
+            if isinstance(order, Exception):
+                raise order
+            return await endpoint.acall(aclient.post_order, order, ot)
+
+        for intent, _ in batch:
+            log.info("PLACE %s", _order_label(intent))
+        results = await asyncio.gather(
+            *(_post(order, ot) for order, (_, ot) in zip(signed, batch)),
+            return_exceptions=True,
+        )
+
+        placed = 0
+        for (intent, ot), result in zip(batch, results):
+            if isinstance(result, BaseException):
+                self._record_post_error(intent, result)
+            elif self._record_post_response(intent, ot, result):
+                placed += 1
+        log.info("PLACE_BATCH │ %d/%d orders placed concurrently", placed, len(batch))
+        return placed
+
+    def _place_dry(self, intent: OrderIntent) -> None:
+        log.info("DRY %s", _order_label(intent))
+        state = OrderState(
+            order_id=f"dry-{int(time.time()*1000)}",
+            market=intent.market,
+            token_id=intent.token_id,
+            direction=intent.direction,
+            price=intent.price,
+            size=intent.size,
+            placed_at=time.time(),
+            side=intent.side,
+            matched_size=ZERO,  # starts unfilled — exposure accumulates
+            seconds_to_end_at_entry=intent.seconds_to_end,
+            reserved_hedge_notional=intent.reserved_hedge_notional,
+            entry_dynamic_edge=intent.entry_dynamic_edge,
+        )
+        self._track(state)
+        # Don't fire on_fill here; check_pending_orders will simulate
+        # the fill using book-depth-aware logic.
+
+    def _prepare_live(self, intent: OrderIntent) -> Optional[tuple[OrderIntent, OrderType]]:
+        """Resolve order type and apply FOK size rules. None means skip."""
+        ot = intent.order_type or OrderType.GTC
+        if ot != OrderType.FOK:
+            return intent, ot
+
+        # FOK (taker) orders require price*size ≤ 2 decimals (maker amount)
+        # and size ≤ 4 decimals (taker amount).
+        # py_clob_client internally rounds size to 2 decimals, so we must
+        # ensure cents * (size*100) % 100 == 0.
+        # step = 100 / gcd(cents, 100) / 100.
+        price = intent.price
+        cents = int(price * 100)
+        g = math.gcd(cents, 100)
+        step = Decimal(100 // g) / Decimal(100)
+        size = (intent.size / step).to_integral_value(rounding=ROUND_DOWN) * step
+        if size <= ZERO:
+            log.warning("FOK size rounded to zero, skipping %s", intent.token_id[:16])
+            return None
+
+        # Polymarket requires min $1 notional for marketable FOK BUY orders
+        min_notional = Decimal("1")
+        notional = price * size
+        if notional < min_notional:
+            min_size = math.ceil(float(min_notional / price / step)) * step
+            if intent.side == "SELL":
+                # Can't sell more than we hold — skip if position too small
+                log.warning(
+                    "FOK_MIN_NOTIONAL %s │ SELL %s x %s = $%s < $1 │ need %s shares, skipping",
+                    intent.token_id[:16], price, size, notional, min_size,
                 )
-                if token_id not in self._orders:
-                    self._orders[token_id] = []
-                self._orders[token_id].append(sentinel)
+                return None
+            log.debug(
+                "FOK_MIN_NOTIONAL %s │ %s x %s = $%s < $1 │ bumping to %s",
+                intent.token_id[:16], price, size, notional, min_size,
+            )
+            size = min_size
+
+        return replace(intent, size=size), ot
+
+    def _record_post_response(self, intent: OrderIntent, ot: OrderType, resp) -> bool:
+        """Track a posted order from the CLOB response. Returns True if placed."""
+        # Extract order ID from response
+        order_id = None
+        if isinstance(resp, dict):
+            order_id = resp.get("orderID") or resp.get("orderId")
+        elif hasattr(resp, "orderID"):
+            order_id = resp.orderID
+        elif hasattr(resp, "order_id"):
+            order_id = resp.order_id
+
+        if not order_id:
+            log.warning(
+                "%sOrder submission returned null orderId for %s%s",
+                C_YELLOW, intent.market.slug, C_RESET,
+            )
+            # Insert sentinel to prevent duplicate submissions.
+            # Skip for FOK orders — they are terminal by nature,
+            # nothing on the book to track.
+            if intent.order_type != OrderType.FOK:
+                self._track(self._state_for(intent, order_id=""))
             return False
 
+        self._track(self._state_for(intent, order_id=order_id))
+        log.info(
+            "%sPLACED %s (order=%s, type=%s)%s",
+            C_GREEN, _order_label(intent), order_id,
+            ot.value if hasattr(ot, 'value') else ot, C_RESET,
+        )
+        return True
+
+    def _record_post_error(self, intent: OrderIntent, e: BaseException) -> None:
+        label = _order_label(intent)
+        if isinstance(e, CircuitOpenError):
+            # Nothing was sent — no sentinel, the level retries next tick
+            log.warning("%sSKIPPED %s │ %s%s", C_YELLOW, label, e, C_RESET)
+            return
+        error_str = str(e).lower()
+        is_balance_error = "balance" in error_str or "allowance" in error_str
+        log.error(
+            "%sFAILED %s │ %s (balance_error=%s)%s",
+            C_RED, label, e, is_balance_error, C_RESET,
+        )
+        # Sentinel prevents duplicate submissions for GTC orders that
+        # might be on the book despite the error.  Skip for:
+        # - Balance errors: no order exists to track
+        # - FOK orders: terminal by nature, nothing on the book
+        if not is_balance_error and intent.order_type != OrderType.FOK:
+            self._track(self._state_for(intent, order_id=""))
+
+    @staticmethod
+    def _state_for(intent: OrderIntent, order_id: str) -> OrderState:
+        return OrderState(
+            order_id=order_id,
+            market=intent.market,
+            token_id=intent.token_id,
+            direction=intent.direction,
+            price=intent.price,
+            size=intent.size,
+            placed_at=time.time(),
+            side=intent.side,
+            matched_size=ZERO,
+            seconds_to_end_at_entry=intent.seconds_to_end,
+            reserved_hedge_notional=intent.reserved_hedge_notional,
+            entry_dynamic_edge=intent.entry_dynamic_edge,
+        )
+
+    def _track(self, state: OrderState) -> None:
+        if state.token_id not in self._orders:
+            self._orders[state.token_id] = []
+        self._orders[state.token_id].append(state)
+
+    def restore_orders(self, states: list[OrderState]) -> int:
+        """Re-track orders recovered from a state journal after a restart.
+
+        Orders already tracked (same order_id) are skipped; the next
+        check_pending_orders pass settles any that filled or died meanwhile.
+        """
+        known = {o.order_id for orders in self._orders.values() for o in orders}
+        restored = 0
+        for state in states:
+            if not state.order_id or state.order_id in known:
+                continue
+            self._track(state)
+            known.add(state.order_id)
+            restored += 1
+        return restored
+
     # -----------------------------------------------------------------
     # Cancel
     # -----------------------------------------------------------------
@@ -526,12 +626,15 @@ class OrderManager:
         self,
         client,
         on_fill: Optional[Callable[[OrderState, Decimal], None]] = None,
+        open_orders: Optional[list] = None,
     ) -> None:
         """Bulk fill detection — fetches all open orders in one API call.
 
         More efficient than check_pending_orders for large order counts
         (e.g., static grid with 196 orders/market × 5 markets).
         Falls back to individual polling if bulk fetch fails.
+        ``open_orders`` skips the fetch when the caller already prefetched
+        them (e.g. via AsyncClobClient.get_orders before the tick).
         """
         now = time.time()
 
@@ -542,7 +645,12 @@ class OrderManager:
 
         # Fetch all open orders in one call
         try:
-            open_orders = client.get_orders()
+            if open_orders is None:
+                open_orders = get_endpoint("clob.get_orders").call(client.get_orders, hedge=True)
+        except CircuitOpenError as e:
+            # Per-order polling would hammer a degraded CLOB — skip this tick
+            log.debug("BULK_FETCH_SKIPPED: %s", e)
+            return
         except Exception as e:
             log.warning("BULK_FETCH_FAILED: %s — falling back to individual polling", e)
             self.check_pending_orders(client, on_fill=on_fill)
@@ -0,0 +1,258 @@
+"""Streaming spot prices with incrementally maintained rolling statistics.
+
+BinanceStream subscribes to a combined aggTrade stream (one socket for all
+symbols) and feeds every trade into a PriceSeries.  PriceSeries keeps one
+RollingWindow per span (e.g. 60s and 300s); each update is O(1) amortized:
+
+- pct change — oldest vs newest price still inside the window;
+- volatility — sample stdev of returns via Welford add/remove, plus an
+  EWMA of squared returns that needs no window at all;
+- range — max/min from monotonic deques, mean from a running sum.
+
+Returns are sampled at most every ``return_interval_s`` so volatility keeps
+a fixed time scale however fast trades arrive.
+
+PriceSeries is locked: the stream updates it on the event loop while a REST
+fallback may update and read it from a worker thread.
+
+The stream URL is configurable, and feed()/replay() accept recorded
+messages, so a local stand-in or a capture file can replace Binance.
+
+Usage:
+    stream = BinanceStream(["BTCUSDT", "ETHUSDT"])
+    task = asyncio.create_task(stream.run())
+    stats = stream.series("BTCUSDT").stats(300)   # pct_change, vol, range_pct
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import math
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, AsyncIterable, Callable, Iterable, Optional
+
+log = logging.getLogger("shared.price_feed")
+
+BINANCE_WS_URL = "wss://stream.binance.com:9443"
+DEFAULT_WINDOWS_SEC = (60.0, 300.0)
+DEFAULT_RETURN_INTERVAL_SEC = 1.0
+DEFAULT_EWMA_HALFLIFE_SEC = 60.0
+RECONNECT_MAX_SEC = 30.0
+
+
+@dataclass(frozen=True)
+class WindowStats:
+    pct_change: float   # %
+    vol: float          # stdev of sampled % returns
+    range_pct: float    # (max - min) / mean, %
+    samples: int
+
+
+class RollingWindow:
+    """Price statistics over the trailing ``span_s`` seconds."""
+
+    def __init__(self, span_s: float) -> None:
+        self.span_s = span_s
+        self._prices: deque[tuple[float, float]] = deque()    # (ts, price)
+        self._price_sum = 0.0
+        self._maxq: deque[tuple[float, float]] = deque()      # decreasing prices
+        self._minq: deque[tuple[float, float]] = deque()      # increasing prices
+        self._returns: deque[tuple[float, float]] = deque()   # (ts, % return)
+        self._n = 0
+        self._mean = 0.0
+        self._m2 = 0.0
+
+    def add_price(self, ts: float, price: float) -> None:
+        self._prices.append((ts, price))
+        self._price_sum += price
+        while self._maxq and self._maxq[-1][1] <= price:
+            self._maxq.pop()
+        self._maxq.append((ts, price))
+        while self._minq and self._minq[-1][1] >= price:
+            self._minq.pop()
+        self._minq.append((ts, price))
+        self._evict(ts)
+
+    def add_return(self, ts: float, ret: float) -> None:
+        self._returns.append((ts, ret))
+        self._n += 1
+        delta = ret - self._mean
+        self._mean += delta / self._n
+        self._m2 += delta * (ret - self._mean)
+        self._evict(ts)
+
+    def _evict(self, now: float) -> None:
+        cutoff = now - self.span_s
+        while self._prices and self._prices[0][0] < cutoff:
+            _, price = self._prices.popleft()
+            self._price_sum -= price
+        while self._maxq and self._maxq[0][0] < cutoff:
+            self._maxq.popleft()
+        while self._minq and self._minq[0][0] < cutoff:
+            self._minq.popleft()
+        while self._returns and self._returns[0][0] < cutoff:
+            _, ret = self._returns.popleft()
+            self._n -= 1
+            if self._n == 0:
+                self._mean = self._m2 = 0.0
+                continue
+            delta = ret - self._mean
+            self._mean -= delta / self._n
+            self._m2 -= delta * (ret - self._mean)
+
+    def stats(self) -> WindowStats:
+        pct = rng = vol = 0.0
+        if len(self._prices) >= 2:
+            old, cur = self._prices[0][1], self._prices[-1][1]
+            if old:
+                pct = (cur - old) / old * 100.0
+        if self._prices:
+            mean = self._price_sum / len(self._prices)
+            if mean:
+                rng = (self._maxq[0][1] - self._minq[0][1]) / mean * 100.0
+        if self._n >= 2:
+            vol = math.sqrt(max(0.0, self._m2 / (self._n - 1)))
+        return WindowStats(pct, vol, rng, len(self._prices))
+
+
+class PriceSeries:
+    """One symbol's latest price and its rolling windows."""
+
+    def __init__(
+        self,
+        windows_s: Iterable[float] = DEFAULT_WINDOWS_SEC,
+        return_interval_s: float = DEFAULT_RETURN_INTERVAL_SEC,
+        ewma_halflife_s: float = DEFAULT_EWMA_HALFLIFE_SEC,
+    ) -> None:
+        self._windows = {float(s): RollingWindow(float(s)) for s in windows_s}
+        self._return_interval_s = return_interval_s
+        self._ewma_halflife_s = ewma_halflife_s
+        self._sample: Optional[tuple[float, float]] = None  # last return sample
+        self._ewma_var = 0.0
+        self._lock = threading.Lock()
+        self.last_price = 0.0
+        self.last_ts = 0.0
+        self.updates = 0
+
+    def update(self, ts: float, price: float) -> None:
+        if price <= 0:
+            return
+        with self._lock:
+            self._update(ts, price)
+
+    def _update(self, ts: float, price: float) -> None:
+        self.last_price, self.last_ts = price, ts
+        self.updates += 1
+        for window in self._windows.values():
+            window.add_price(ts, price)
+
+        if self._sample is None:
+            self._sample = (ts, price)
+            return
+        sample_ts, sample_price = self._sample
+        if ts - sample_ts < self._return_interval_s:
+            return
+        ret = (price - sample_price) / sample_price * 100.0
+        self._sample = (ts, price)
+        for window in self._windows.values():
+            window.add_return(ts, ret)
+        alpha = 1.0 - 0.5 ** ((ts - sample_ts) / self._ewma_halflife_s)
+        self._ewma_var += alpha * (ret * ret - self._ewma_var)
+
+    def stats(self, span_s: float) -> WindowStats:
+        with self._lock:
+            return self._windows[float(span_s)].stats()
+
+    @property
+    def ewma_vol(self) -> float:
+        """EWMA stdev of sampled % returns."""
+        with self._lock:
+            return math.sqrt(self._ewma_var)
+
+
+class BinanceStream:
+    """Binance combined aggTrade stream feeding one PriceSeries per symbol."""
+
+    def __init__(
+        self,
+        symbols: Iterable[str],
+        url: str = BINANCE_WS_URL,
+        windows_s: Iterable[float] = DEFAULT_WINDOWS_SEC,
+        return_interval_s: float = DEFAULT_RETURN_INTERVAL_SEC,
+        connect: Optional[Callable[[str], Any]] = None,
+    ) -> None:
+        self._symbols = [s.upper() for s in symbols]
+        self._url = url.rstrip("/")
+        windows_s = tuple(windows_s)
+        self._series = {
+            s: PriceSeries(windows_s, return_interval_s) for s in self._symbols
+        }
+        self._connect = connect
+        self.messages = 0
+        self.connected = False
+
+    @property
+    def stream_url(self) -> str:
+        streams = "/".join(f"{s.lower()}@aggTrade" for s in self._symbols)
+        return f"{self._url}/stream?streams={streams}"
+
+    def series(self, symbol: str) -> PriceSeries:
+        return self._series[symbol.upper()]
+
+    def feed(self, raw: str | bytes | dict) -> bool:
+        """Apply one combined-stream message. Returns False if ignored."""
+        msg = json.loads(raw) if isinstance(raw, (str, bytes)) else raw
+        data = msg.get("data", msg) if isinstance(msg, dict) else None
+        if not isinstance(data, dict):
+            return False
+        series = self._series.get(str(data.get("s", "")).upper())
+        if series is None or "p" not in data:
+            return False
+        ts = float(data.get("T") or data.get("E") or time.time() * 1000) / 1000.0
+        series.update(ts, float(data["p"]))
+        self.messages += 1
+        return True
+
+    async def replay(self, messages: AsyncIterable[str] | Iterable[str]) -> int:
+        """Feed recorded messages (sync or async iterable). Returns the count applied."""
+        applied = 0
+        if hasattr(messages, "__aiter__"):
+            async for raw in messages:
+                applied += self.feed(raw)
+        else:
+            for raw in messages:
+                applied += self.feed(raw)
+        return applied
+
+    async def run(self) -> None:
+        """Stay subscribed until cancelled, reconnecting with backoff."""
+        connect = self._connect
+        if connect is None:
+            import websockets
+
+            connect = websockets.connect
+        backoff = 1.0
+        while True:
+            try:
+                async with connect(self.stream_url) as ws:
+                    self.connected = True
+                    backoff = 1.0
+                    log.info("PRICE_STREAM │ connected │ %s", ",".join(self._symbols))
+                    async for raw in ws:
+                        try:
+                            self.feed(raw)
+                        except (ValueError, TypeError) as e:
+                            log.debug("PRICE_STREAM_BAD_MSG │ %s", e)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                log.warning("PRICE_STREAM_DROPPED │ %s │ retry in %.0fs", e, backoff)
+            finally:
+                self.connected = False
+            await asyncio.sleep(backoff)
+            backoff = min(RECONNECT_MAX_SEC, backoff * 2)
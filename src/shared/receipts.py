@@ -0,0 +1,163 @@
+"""Asyncio receipt watcher — one JSON-RPC batch per poll for every pending tx.
+
+Waiting for a Safe transaction used to park a worker thread in a
+``for attempt in range(60): time.sleep(1)`` loop, one thread per tx.
+ReceiptWatcher keeps a single poll loop on the event loop instead: every
+round sends ``eth_getTransactionReceipt`` for all pending hashes as one
+JSON-RPC batch and resolves each caller's future as its receipt lands.
+
+The poll interval starts at roughly one Polygon block and backs off while
+nothing new is mined (or the RPC errors), resetting as soon as a receipt
+arrives.  Hashes not mined within ``timeout_s`` fail with TimeoutError.
+
+Usage:
+    watcher = ReceiptWatcher(rpc_url)
+    task = asyncio.create_task(watcher.run())
+    receipt = await watcher.wait(tx_hash)   # {"status": 1, "gasUsed": ..., ...}
+    await watcher.aclose()
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from typing import Any, Optional
+
+import httpx
+
+log = logging.getLogger("shared.receipts")
+
+DEFAULT_POLL_INTERVAL_SEC = 2.0   # ~one Polygon block
+DEFAULT_MAX_POLL_INTERVAL_SEC = 8.0
+DEFAULT_RECEIPT_TIMEOUT_SEC = 120.0
+BACKOFF_FACTOR = 1.5
+MAX_BATCH_SIZE = 100              # public RPCs cap JSON-RPC batch length
+_REQUEST_TIMEOUT_SEC = 10.0
+
+
+def _hex_int(value: Any) -> int:
+    if isinstance(value, str):
+        return int(value, 16)
+    return int(value or 0)
+
+
+def parse_receipt(raw: dict) -> dict:
+    """Normalise a JSON-RPC receipt — hex quantities to int, like web3 returns."""
+    return {
+        **raw,
+        "status": _hex_int(raw.get("status")),
+        "gasUsed": _hex_int(raw.get("gasUsed")),
+        "blockNumber": _hex_int(raw.get("blockNumber")),
+        "effectiveGasPrice": _hex_int(raw.get("effectiveGasPrice")),
+    }
+
+
+class ReceiptWatcher:
+    """Single poll loop resolving receipt futures for all pending tx hashes."""
+
+    def __init__(
+        self,
+        rpc_url: str,
+        poll_interval: float = DEFAULT_POLL_INTERVAL_SEC,
+        max_poll_interval: float = DEFAULT_MAX_POLL_INTERVAL_SEC,
+        timeout_s: float = DEFAULT_RECEIPT_TIMEOUT_SEC,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+    ) -> None:
+        self._rpc_url = rpc_url
+        self._poll_interval = poll_interval
+        self._max_poll_interval = max_poll_interval
+        self._timeout_s = timeout_s
+        self._http = httpx.AsyncClient(timeout=_REQUEST_TIMEOUT_SEC, transport=transport)
+        self._pending: dict[str, tuple[asyncio.Future, float]] = {}  # hash -> (future, deadline)
+        self._wakeup = asyncio.Event()
+        self.polls = 0
+
+    @property
+    def pending(self) -> int:
+        return len(self._pending)
+
+    async def aclose(self) -> None:
+        for fut, _ in self._pending.values():
+            if not fut.done():
+                fut.cancel()
+        self._pending.clear()
+        await self._http.aclose()
+
+    def watch(self, tx_hash: str) -> asyncio.Future:
+        """Register a hash; the returned future resolves to its parsed receipt."""
+        tx_hash = tx_hash if tx_hash.startswith("0x") else "0x" + tx_hash
+        entry = self._pending.get(tx_hash)
+        if entry is None:
+            fut = asyncio.get_running_loop().create_future()
+            entry = (fut, time.monotonic() + self._timeout_s)
+            self._pending[tx_hash] = entry
+            self._wakeup.set()
+        return entry[0]
+
+    async def wait(self, tx_hash: str) -> dict:
+        # shield: one caller giving up must not cancel the shared future
+        return await asyncio.shield(self.watch(tx_hash))
+
+    async def poll_once(self) -> int:
+        """Fetch receipts for every pending hash. Returns how many resolved."""
+        self._expire()
+        hashes = list(self._pending)
+        if not hashes:
+            return 0
+        self.polls += 1
+        resolved = 0
+        for i in range(0, len(hashes), MAX_BATCH_SIZE):
+            chunk = hashes[i:i + MAX_BATCH_SIZE]
+            batch = [
+                {"jsonrpc": "2.0", "id": n, "method": "eth_getTransactionReceipt", "params": [h]}
+                for n, h in enumerate(chunk)
+            ]
+            resp = await self._http.post(self._rpc_url, json=batch)
+            resp.raise_for_status()
+            replies = resp.json()
+            if isinstance(replies, dict):  # some RPCs answer a batch error as one object
+                raise RuntimeError(f"RPC batch rejected: {replies.get('error')}")
+            for reply in replies:
+                receipt = reply.get("result")
+                idx = reply.get("id")
+                if not receipt or not isinstance(idx, int) or idx >= len(chunk):
+                    continue
+                entry = self._pending.pop(chunk[idx], None)
+                if entry is not None and not entry[0].done():
+                    entry[0].set_result(parse_receipt(receipt))
+                    resolved += 1
+        return resolved
+
+    def _expire(self) -> None:
+        now = time.monotonic()
+        for tx_hash, (fut, deadline) in list(self._pending.items()):
+            if fut.done():
+                self._pending.pop(tx_hash, None)
+            elif now >= deadline:
+                self._pending.pop(tx_hash, None)
+                fut.set_exception(TimeoutError(
+                    f"Receipt not found after {self._timeout_s:.0f}s (tx={tx_hash})"
+                ))
+
+    async def run(self) -> None:
+        """Poll while anything is pending; idle (no RPC traffic) otherwise."""
+        interval = self._poll_interval
+        while True:
+            if not self._pending:
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                interval = self._poll_interval
+                # First receipt can't exist before the tx is mined
+                await asyncio.sleep(interval)
+            try:
+                resolved = await self.poll_once()
+            except Exception as e:
+                log.warning("RECEIPT_POLL_FAILED │ %d pending │ %s", len(self._pending), e)
+                resolved = 0
+            if resolved:
+                interval = self._poll_interval
+            else:
+                interval = min(interval * BACKOFF_FACTOR, self._max_poll_interval)
+            if self._pending:
+                await asyncio.sleep(interval)
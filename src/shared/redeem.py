@@ -2,21 +2,47 @@
 
 Sends direct on-chain transactions through the user's Gnosis Safe (1-of-1),
 bypassing the rate-limited Builder Relayer entirely.
+
+execute_batch() packs many merges/redeems into one Safe transaction that
+delegatecalls MultiSendCallOnly, so N markets cost one nonce read, one
+signature, one estimate and one confirmation wait.  execute_batch_async()
+awaits confirmations on a shared ReceiptWatcher instead of sleeping in a
+worker thread.
 """
 
 from __future__ import annotations
 
+import asyncio
+import json
 import logging
 import math
+import threading
 import time
 from decimal import Decimal
+from pathlib import Path
 
-from typing import NamedTuple
+from typing import NamedTuple, Optional
 
 from eth_account import Account
 from eth_account.signers.local import LocalAccount
 from web3 import Web3
 
+from shared.chain import get_contract, get_web3
+from shared.gas import GAS_KIND_APPROVAL, GasOracle, batch_gas_kind, gas_kind
+from shared.multicall import (
+    GET_BLOCK_NUMBER_DATA,
+    MULTICALL3_ADDRESS,
+    Call3,
+    aggregate3,
+    decode_bool,
+    decode_uint,
+    decode_uint_array,
+    encode_balance_of,
+    encode_balance_of_batch,
+    encode_is_approved_for_all,
+)
+from shared.receipts import ReceiptWatcher
+
 log = logging.getLogger("shared.redeem")
 
 
@@ -24,10 +50,42 @@ class TxResult(NamedTuple):
     tx_hash: str
     gas_cost_wei: int  # gasUsed * gasPrice in native wei
 
+
+class SafeCall(NamedTuple):
+    """One inner call of a Safe transaction."""
+    to: str
+    data: bytes
+    gas: int           # budget used to pack calls under max_batch_gas
+    operator: str      # CTF approval this call needs (CTF or NegRiskAdapter)
+    label: str = ""    # caller's key for matching results (e.g. market slug)
+    kind: str = ""     # gas-estimate cache key (e.g. "merge:ctf"), see shared.gas
+
+
+class BatchResult(NamedTuple):
+    """Outcome of one Safe transaction carrying one or more calls."""
+    calls: list[SafeCall]
+    result: Optional[TxResult]
+    error: Optional[BaseException]
+
 # ── Contract addresses (Polygon mainnet) ──
 CTF_ADDRESS = "0x4D97DCd97eC945f40cF65F87097ACe5EA0476045"
 USDC_ADDRESS = "0x2791Bca1f2de4661ED88A30C99A7a9449Aa84174"
 NEG_RISK_ADAPTER = "0xd91E80cF2E7be2e162c6513ceD06f1dD0dA35296"
+# Safe v1.3.0 MultiSendCallOnly — delegatecall target for batched calls
+MULTISEND_CALL_ONLY = "0x40A2aCCbd92BCA938b02010E17A5b8929b49130D"
+
+# Safe operation types
+OP_CALL = 0
+OP_DELEGATECALL = 1
+
+# Per-call gas budgets for packing batches (observed usage plus headroom)
+MERGE_GAS = 180_000
+NEG_RISK_MERGE_GAS = 300_000
+REDEEM_GAS = 150_000
+NEG_RISK_REDEEM_GAS = 260_000
+APPROVAL_GAS = 60_000
+SAFE_TX_OVERHEAD_GAS = 80_000  # execTransaction + signature check + MultiSend loop
+DEFAULT_MAX_BATCH_GAS = 6_000_000
 
 # Null parent collection ID (standard for Polymarket top-level conditions)
 PARENT_COLLECTION_ID = bytes(32)
@@ -40,16 +98,6 @@ CTF_DECIMALS = 6
 
 # ── ABIs ──
 
-ERC20_BALANCE_ABI = [
-    {
-        "name": "balanceOf",
-        "type": "function",
-        "inputs": [{"name": "account", "type": "address"}],
-        "outputs": [{"name": "", "type": "uint256"}],
-        "stateMutability": "view",
-    }
-]
-
 MERGE_ABI = [
     {
         "name": "mergePositions",
@@ -180,53 +228,179 @@ SAFE_ABI = [
     },
 ]
 
+MULTISEND_ABI = [
+    {
+        "name": "multiSend",
+        "type": "function",
+        "inputs": [{"name": "transactions", "type": "bytes"}],
+        "outputs": [],
+    }
+]
+
 
 # ── Helpers ──
 
+# ── Calldata templates ──
+# Merge/redeem calldata differs only in conditionId and amount, so each
+# function is a fixed byte template with those words spliced in — no ABI
+# processing per call.  Layouts follow the standard ABI head/tail encoding.
+
+def _word(value: int) -> bytes:
+    return value.to_bytes(32, "big")
+
+
+def _selector(signature: str) -> bytes:
+    return Web3.keccak(text=signature)[:4]
+
+
+_USDC_WORD = bytes(12) + bytes.fromhex(USDC_ADDRESS[2:])
+_INDEX_SETS_TAIL = _word(len(INDEX_SETS)) + b"".join(_word(i) for i in INDEX_SETS)
+
+# CTF mergePositions(address,bytes32,bytes32,uint256[],uint256)
+_CTF_MERGE_SEL = _selector("mergePositions(address,bytes32,bytes32,uint256[],uint256)")
+# CTF redeemPositions(address,bytes32,bytes32,uint256[])
+_CTF_REDEEM_SEL = _selector("redeemPositions(address,bytes32,bytes32,uint256[])")
+# NegRiskAdapter mergePositions(bytes32,uint256)
+_NR_MERGE_SEL = _selector("mergePositions(bytes32,uint256)")
+# NegRiskAdapter redeemPositions(bytes32,uint256[])
+_NR_REDEEM_SEL = _selector("redeemPositions(bytes32,uint256[])")
+# setApprovalForAll(address,bool)
+_SET_APPROVAL_SEL = _selector("setApprovalForAll(address,bool)")
+# MultiSendCallOnly multiSend(bytes)
+_MULTISEND_SEL = _selector("multiSend(bytes)")
+
+_CTF_TARGET = Web3.to_checksum_address(CTF_ADDRESS)
+_NR_TARGET = Web3.to_checksum_address(NEG_RISK_ADAPTER)
+
+
+def _condition_word(condition_id: str) -> bytes:
+    raw = bytes.fromhex(condition_id.removeprefix("0x"))
+    if len(raw) != 32:
+        raise ValueError(f"condition_id must be 32 bytes, got {len(raw)}")
+    return raw
+
+
 def _encode_merge(condition_id: str, amount: int, neg_risk: bool) -> tuple[str, str]:
     """Encode merge calldata. Returns (target_address, encoded_data)."""
-    condition_bytes = bytes.fromhex(condition_id.removeprefix("0x"))
-
+    cond = _condition_word(condition_id)
     if neg_risk:
-        target = Web3.to_checksum_address(NEG_RISK_ADAPTER)
-        contract = Web3().eth.contract(address=target, abi=NEG_RISK_MERGE_ABI)
-        data = contract.encode_abi("mergePositions", [condition_bytes, amount])
-    else:
-        target = Web3.to_checksum_address(CTF_ADDRESS)
-        contract = Web3().eth.contract(address=target, abi=MERGE_ABI)
-        data = contract.encode_abi("mergePositions", [
-            Web3.to_checksum_address(USDC_ADDRESS),
-            PARENT_COLLECTION_ID,
-            condition_bytes,
-            INDEX_SETS,
-            amount,
-        ])
-    return target, data
+        data = _NR_MERGE_SEL + cond + _word(amount)
+        return _NR_TARGET, "0x" + data.hex()
+    data = (
+        _CTF_MERGE_SEL + _USDC_WORD + PARENT_COLLECTION_ID + cond
+        + _word(5 * 32)  # offset of indexSets (after the five head words)
+        + _word(amount) + _INDEX_SETS_TAIL
+    )
+    return _CTF_TARGET, "0x" + data.hex()
 
 
 def _encode_redeem(condition_id: str, neg_risk: bool, amount: int = 0) -> tuple[str, str]:
     """Encode redeem calldata. Returns (target_address, encoded_data)."""
-    condition_bytes = bytes.fromhex(condition_id.removeprefix("0x"))
-
+    cond = _condition_word(condition_id)
     if neg_risk:
-        target = Web3.to_checksum_address(NEG_RISK_ADAPTER)
-        contract = Web3().eth.contract(address=target, abi=NEG_RISK_REDEEM_ABI)
-        data = contract.encode_abi("redeemPositions", [condition_bytes, [amount, amount]])
-    else:
-        target = Web3.to_checksum_address(CTF_ADDRESS)
-        contract = Web3().eth.contract(address=target, abi=REDEEM_ABI)
-        data = contract.encode_abi("redeemPositions", [
-            Web3.to_checksum_address(USDC_ADDRESS),
-            PARENT_COLLECTION_ID,
-            condition_bytes,
-            INDEX_SETS,
-        ])
-    return target, data
+        data = _NR_REDEEM_SEL + cond + _word(2 * 32) + _word(2) + _word(amount) + _word(amount)
+        return _NR_TARGET, "0x" + data.hex()
+    data = (
+        _CTF_REDEEM_SEL + _USDC_WORD + PARENT_COLLECTION_ID + cond
+        + _word(4 * 32)  # offset of indexSets
+        + _INDEX_SETS_TAIL
+    )
+    return _CTF_TARGET, "0x" + data.hex()
+
+
+def _encode_set_approval(operator: str) -> bytes:
+    return _SET_APPROVAL_SEL + bytes(12) + bytes.fromhex(operator.removeprefix("0x")) + _word(1)
 
 
 ZERO_ADDR = "0x0000000000000000000000000000000000000000"
 
 
+class PendingTx(NamedTuple):
+    """A broadcast Safe transaction awaiting its receipt."""
+    tx_hash: str
+    gas_price: int
+    safe_address: str
+    eoa_address: str
+    kind: str = ""         # GasOracle cache key the gas limit came from
+
+
+# Errors from send_raw_transaction meaning our local nonce view is stale
+_NONCE_ERRORS = (
+    "nonce too low", "already known", "replacement transaction underpriced", "nonce too high",
+)
+
+
+class NonceManager:
+    """Local EOA + Safe nonce allocator so several txs can be in flight.
+
+    Nonces are read from chain once, then handed out locally under a lock.
+    A reservation that never reached the mempool is released (or, if later
+    nonces were already handed out, the cache is dropped).  Reverts, stale
+    nonce errors and receipt timeouts resync from chain on next use.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._next_safe: dict[str, int] = {}
+        self._next_eoa: dict[str, int] = {}
+        self._in_flight: dict[str, int] = {}  # safe -> broadcast, unconfirmed
+
+    def reserve(self, w3: Web3, safe, safe_address: str, eoa_address: str) -> tuple[int, int]:
+        """Return (safe_nonce, eoa_nonce) for the next transaction."""
+        safe_key, eoa_key = safe_address.lower(), eoa_address.lower()
+        with self._lock:
+            if safe_key not in self._next_safe:
+                self._next_safe[safe_key] = safe.functions.nonce().call()
+            if eoa_key not in self._next_eoa:
+                self._next_eoa[eoa_key] = w3.eth.get_transaction_count(eoa_address, "pending")
+            safe_nonce = self._next_safe[safe_key]
+            eoa_nonce = self._next_eoa[eoa_key]
+            self._next_safe[safe_key] = safe_nonce + 1
+            self._next_eoa[eoa_key] = eoa_nonce + 1
+            self._in_flight[safe_key] = self._in_flight.get(safe_key, 0) + 1
+        return safe_nonce, eoa_nonce
+
+    def release(self, safe_address: str, eoa_address: str, safe_nonce: int, eoa_nonce: int) -> None:
+        """Give back a reservation that was never broadcast."""
+        safe_key, eoa_key = safe_address.lower(), eoa_address.lower()
+        with self._lock:
+            self._in_flight[safe_key] = max(0, self._in_flight.get(safe_key, 0) - 1)
+            latest = (
+                self._next_safe.get(safe_key) == safe_nonce + 1
+                and self._next_eoa.get(eoa_key) == eoa_nonce + 1
+            )
+            if latest:
+                self._next_safe[safe_key] = safe_nonce
+                self._next_eoa[eoa_key] = eoa_nonce
+            else:
+                self._next_safe.pop(safe_key, None)
+                self._next_eoa.pop(eoa_key, None)
+
+    def settle(self, safe_address: str) -> None:
+        """Mark one broadcast tx as finished (confirmed, reverted or given up)."""
+        safe_key = safe_address.lower()
+        with self._lock:
+            self._in_flight[safe_key] = max(0, self._in_flight.get(safe_key, 0) - 1)
+
+    def resync(self, safe_address: str, eoa_address: str) -> None:
+        """Forget local nonces — the next reserve() re-reads them from chain."""
+        with self._lock:
+            self._next_safe.pop(safe_address.lower(), None)
+            self._next_eoa.pop(eoa_address.lower(), None)
+
+    def in_flight(self, safe_address: str) -> int:
+        return self._in_flight.get(safe_address.lower(), 0)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._next_safe.clear()
+            self._next_eoa.clear()
+            self._in_flight.clear()
+
+
+nonce_manager = NonceManager()
+
+
 def _send_safe_tx(
     w3: Web3,
     account: LocalAccount,
@@ -235,115 +409,308 @@ def _send_safe_tx(
     data: bytes,
     chain_id: int = 137,
     max_gas_price_gwei: int = 200,
+    operation: int = OP_CALL,
+    fallback_gas: int = 500_000,
+    nonces: Optional[NonceManager] = None,
+    gas_oracle: Optional[GasOracle] = None,
+    kind: str = "",
 ) -> TxResult:
     """Execute a call through a Gnosis Safe v1.3.0 (1-of-1 multisig).
 
     Builds an execTransaction call with the EOA owner's signature,
     then submits it on-chain from the EOA.  Returns TxResult with
     the tx hash and actual gas cost in native wei.
+
+    operation=OP_DELEGATECALL runs ``data`` in the Safe's context — only
+    used with MultiSendCallOnly for batches.
+
+    With a GasOracle the tx is EIP-1559 priced and the gas limit for
+    ``kind`` is cached; without one, legacy gasPrice + estimate_gas.
     """
+    nonces = nonces or nonce_manager
+    pending = _submit_safe_tx(
+        w3, account, safe_address, to, data, chain_id,
+        max_gas_price_gwei=max_gas_price_gwei,
+        operation=operation,
+        fallback_gas=fallback_gas,
+        nonces=nonces,
+        gas_oracle=gas_oracle,
+        kind=kind,
+    )
+    return _wait_for_receipt(w3, pending, nonces, gas_oracle)
+
+
+def _submit_safe_tx(
+    w3: Web3,
+    account: LocalAccount,
+    safe_address: str,
+    to: str,
+    data: bytes,
+    chain_id: int = 137,
+    max_gas_price_gwei: int = 200,
+    operation: int = OP_CALL,
+    fallback_gas: int = 500_000,
+    nonces: Optional[NonceManager] = None,
+    gas_oracle: Optional[GasOracle] = None,
+    kind: str = "",
+) -> PendingTx:
+    """Sign and broadcast a Safe execTransaction without waiting for it.
+
+    Nonces come from the NonceManager, so several submissions can be in
+    flight.  A stale-nonce rejection resyncs from chain and retries once.
+    """
+    nonces = nonces or nonce_manager
+    for attempt in range(2):
+        try:
+            return _submit_once(
+                w3, account, safe_address, to, data, chain_id,
+                max_gas_price_gwei, operation, fallback_gas, nonces,
+                gas_oracle, kind,
+            )
+        except Exception as e:
+            if attempt == 0 and any(m in str(e).lower() for m in _NONCE_ERRORS):
+                log.warning("NONCE_RESYNC safe=%s │ %s", safe_address, e)
+                nonces.resync(safe_address, account.address)
+                continue
+            raise
+    raise AssertionError("unreachable")
+
+
+def _submit_once(
+    w3: Web3,
+    account: LocalAccount,
+    safe_address: str,
+    to: str,
+    data: bytes,
+    chain_id: int,
+    max_gas_price_gwei: int,
+    operation: int,
+    fallback_gas: int,
+    nonces: NonceManager,
+    gas_oracle: Optional[GasOracle] = None,
+    kind: str = "",
+) -> PendingTx:
     safe_cs = Web3.to_checksum_address(safe_address)
     to_cs = Web3.to_checksum_address(to)
     from_addr = account.address
 
-    safe = w3.eth.contract(address=safe_cs, abi=SAFE_ABI)
-
-    # Get the Safe's current nonce
-    safe_nonce = safe.functions.nonce().call()
-
-    # Get the Safe transaction hash to sign
-    # operation=0 (Call), safeTxGas=0, baseGas=0, gasPrice=0,
-    # gasToken=0x0, refundReceiver=0x0 — EOA pays gas directly
-    safe_tx_hash = safe.functions.getTransactionHash(
-        to_cs, 0, data, 0,  # to, value, data, operation=CALL
-        0, 0, 0,             # safeTxGas, baseGas, gasPrice
-        ZERO_ADDR, ZERO_ADDR,  # gasToken, refundReceiver
-        safe_nonce,
-    ).call()
-
-    # Sign the hash with the EOA (owner of the 1-of-1 Safe)
-    signed = Account.unsafe_sign_hash(safe_tx_hash, account.key)
-    # Pack signature as r(32) + s(32) + v(1)
-    signature = (
-        signed.r.to_bytes(32, "big")
-        + signed.s.to_bytes(32, "big")
-        + signed.v.to_bytes(1, "big")
-    )
-
-    # Encode the execTransaction call
-    exec_data = safe.encode_abi("execTransaction", [
-        to_cs, 0, data, 0,
-        0, 0, 0,
-        ZERO_ADDR, ZERO_ADDR,
-        signature,
-    ])
+    safe = get_contract(w3, safe_cs, SAFE_ABI)
 
-    # Submit the outer transaction from EOA to Safe
-    eoa_nonce = w3.eth.get_transaction_count(from_addr, "latest")
-    gas_price_raw = w3.eth.gas_price
-    gas_price_gwei = gas_price_raw / 1e9
-    if gas_price_gwei > max_gas_price_gwei:
-        raise RuntimeError(
-            f"Gas price {gas_price_gwei:.0f} gwei exceeds cap {max_gas_price_gwei} gwei"
+    # Txs already in flight mean the chain's Safe nonce lags ours, so an
+    # estimate would fail the signature check — use the budget instead
+    pipelined = nonces.in_flight(safe_cs) > 0
+    safe_nonce, eoa_nonce = nonces.reserve(w3, safe, safe_cs, from_addr)
+    try:
+        # Get the Safe transaction hash to sign
+        # safeTxGas=0, baseGas=0, gasPrice=0, gasToken=0x0,
+        # refundReceiver=0x0 — EOA pays gas directly.  With safeTxGas=0 a
+        # failing inner call reverts the whole tx, so batches are atomic.
+        safe_tx_hash = safe.functions.getTransactionHash(
+            to_cs, 0, data, operation,  # to, value, data, operation
+            0, 0, 0,             # safeTxGas, baseGas, gasPrice
+            ZERO_ADDR, ZERO_ADDR,  # gasToken, refundReceiver
+            safe_nonce,
+        ).call()
+
+        # Sign the hash with the EOA (owner of the 1-of-1 Safe)
+        signed = Account.unsafe_sign_hash(safe_tx_hash, account.key)
+        # Pack signature as r(32) + s(32) + v(1)
+        signature = (
+            signed.r.to_bytes(32, "big")
+            + signed.s.to_bytes(32, "big")
+            + signed.v.to_bytes(1, "big")
         )
-    gas_price = math.ceil(gas_price_raw * 1.50)
 
-    try:
-        gas_estimate = w3.eth.estimate_gas({
+        # Encode the execTransaction call
+        exec_data = safe.encode_abi("execTransaction", [
+            to_cs, 0, data, operation,
+            0, 0, 0,
+            ZERO_ADDR, ZERO_ADDR,
+            signature,
+        ])
+
+        # Submit the outer transaction from EOA to Safe
+        tx = {
+            "chainId": chain_id,
             "from": from_addr,
             "to": safe_cs,
             "data": exec_data,
             "value": 0,
-        })
-        gas_limit = max(21_000, math.ceil(gas_estimate * 1.25))
-    except Exception as e:
-        log.warning("Gas estimate failed, using fallback 500k: %s", e)
-        gas_limit = 500_000
-
-    tx = {
-        "chainId": chain_id,
-        "from": from_addr,
-        "to": safe_cs,
-        "data": exec_data,
-        "value": 0,
-        "gas": gas_limit,
-        "gasPrice": gas_price,
-        "nonce": eoa_nonce,
-    }
+            "nonce": eoa_nonce,
+        }
+        if gas_oracle is not None:
+            quote = gas_oracle.fees()
+            price_raw = quote.expected_price
+        else:
+            price_raw = w3.eth.gas_price
+        gas_price_gwei = price_raw / 1e9
+        if gas_price_gwei > max_gas_price_gwei:
+            raise RuntimeError(
+                f"Gas price {gas_price_gwei:.0f} gwei exceeds cap {max_gas_price_gwei} gwei"
+            )
+        if gas_oracle is not None:
+            tx["maxFeePerGas"] = quote.max_fee_per_gas
+            tx["maxPriorityFeePerGas"] = quote.max_priority_fee_per_gas
+            gas_price = quote.max_fee_per_gas  # upper bound until the receipt says otherwise
+        else:
+            gas_price = math.ceil(price_raw * 1.50)
+            tx["gasPrice"] = gas_price
+
+        def estimate() -> int:
+            return w3.eth.estimate_gas({
+                "from": from_addr,
+                "to": safe_cs,
+                "data": exec_data,
+                "value": 0,
+            })
+
+        if gas_oracle is not None and kind:
+            # Cached per kind; estimated on a miss or after a revert dropped it
+            gas_limit = gas_oracle.gas_limit(kind, None if pipelined else estimate, fallback_gas)
+        elif pipelined:
+            gas_limit = fallback_gas
+        else:
+            try:
+                gas_limit = max(21_000, math.ceil(estimate() * 1.25))
+            except Exception as e:
+                log.warning("Gas estimate failed, using fallback %d: %s", fallback_gas, e)
+                gas_limit = fallback_gas
+        tx["gas"] = gas_limit
+
+        signed_tx = account.sign_transaction(tx)
+        tx_hash = w3.eth.send_raw_transaction(signed_tx.raw_transaction)
+    except Exception:
+        nonces.release(safe_cs, from_addr, safe_nonce, eoa_nonce)
+        raise
 
-    signed_tx = account.sign_transaction(tx)
-    tx_hash = w3.eth.send_raw_transaction(signed_tx.raw_transaction)
     tx_hash_hex = tx_hash.hex()
     log.info(
-        "TX_SENT hash=%s safe_nonce=%d eoa_nonce=%d gas=%d",
-        tx_hash_hex, safe_nonce, eoa_nonce, gas_limit,
+        "TX_SENT hash=%s safe_nonce=%d eoa_nonce=%d gas=%d%s",
+        tx_hash_hex, safe_nonce, eoa_nonce, gas_limit, " (pipelined)" if pipelined else "",
     )
+    return PendingTx(tx_hash_hex, gas_price, safe_cs, from_addr, kind if gas_oracle else "")
 
-    # Poll for receipt: 60 attempts x 1s
-    for attempt in range(60):
-        time.sleep(1)
-        try:
-            receipt = w3.eth.get_transaction_receipt(tx_hash)
-            if receipt is not None:
-                if receipt["status"] != 1:
-                    raise RuntimeError(
-                        f"Transaction reverted on-chain (tx={tx_hash_hex}, "
-                        f"gasUsed={receipt['gasUsed']})"
-                    )
-                gas_cost_wei = receipt["gasUsed"] * gas_price
-                log.info("TX_CONFIRMED hash=%s gasUsed=%d", tx_hash_hex, receipt["gasUsed"])
-                return TxResult(tx_hash_hex, gas_cost_wei)
-        except Exception as e:
-            if "reverted" in str(e).lower():
-                raise
-            if attempt >= 59:
-                raise RuntimeError(f"Receipt not found after 60s (tx={tx_hash_hex})") from e
 
-    raise RuntimeError(f"Receipt not found after 60s (tx={tx_hash_hex})")
+def _receipt_result(pending: PendingTx, receipt) -> TxResult:
+    """TxResult for a mined receipt; raises if the tx reverted."""
+    if receipt["status"] != 1:
+        raise RuntimeError(
+            f"Transaction reverted on-chain (tx={pending.tx_hash}, "
+            f"gasUsed={receipt['gasUsed']})"
+        )
+    log.info("TX_CONFIRMED hash=%s gasUsed=%d", pending.tx_hash, receipt["gasUsed"])
+    # EIP-1559 txs pay base + tip, not maxFee
+    price = receipt.get("effectiveGasPrice") or pending.gas_price
+    return TxResult(pending.tx_hash, receipt["gasUsed"] * price)
+
+
+def _wait_for_receipt(
+    w3: Web3,
+    pending: PendingTx,
+    nonces: Optional[NonceManager] = None,
+    gas_oracle: Optional[GasOracle] = None,
+) -> TxResult:
+    """Poll for a submitted tx's receipt (60 × 1s). Raises on revert/timeout.
+
+    Blocking fallback for scripts — the engine awaits a ReceiptWatcher.
+    A revert drops the tx's cached gas limit from ``gas_oracle``.
+    """
+    nonces = nonces or nonce_manager
+    tx_hash_hex = pending.tx_hash
+    try:
+        for attempt in range(60):
+            time.sleep(1)
+            try:
+                receipt = w3.eth.get_transaction_receipt(tx_hash_hex)
+                if receipt is not None:
+                    return _receipt_result(pending, receipt)
+            except Exception as e:
+                if "reverted" in str(e).lower():
+                    raise
+                if attempt >= 59:
+                    raise RuntimeError(f"Receipt not found after 60s (tx={tx_hash_hex})") from e
+
+        raise RuntimeError(f"Receipt not found after 60s (tx={tx_hash_hex})")
+    except Exception as e:
+        # A revert leaves the Safe nonce unused; a timeout leaves it unknown
+        nonces.resync(pending.safe_address, pending.eoa_address)
+        _drop_gas_estimate(gas_oracle, pending, e)
+        raise
+    finally:
+        nonces.settle(pending.safe_address)
+
+
+async def _await_receipt(
+    watcher: ReceiptWatcher,
+    pending: PendingTx,
+    nonces: Optional[NonceManager] = None,
+    gas_oracle: Optional[GasOracle] = None,
+) -> TxResult:
+    """Async twin of _wait_for_receipt — the watcher polls all pending txs at once."""
+    nonces = nonces or nonce_manager
+    try:
+        return _receipt_result(pending, await watcher.wait(pending.tx_hash))
+    except BaseException as e:
+        nonces.resync(pending.safe_address, pending.eoa_address)
+        _drop_gas_estimate(gas_oracle, pending, e)
+        raise
+    finally:
+        nonces.settle(pending.safe_address)
+
+
+def _drop_gas_estimate(
+    gas_oracle: Optional[GasOracle], pending: PendingTx, error: BaseException,
+) -> None:
+    """Forget the cached limit behind a reverted tx — it may have run out of gas."""
+    if gas_oracle is not None and pending.kind and _is_revert(error):
+        log.info("GAS_INVALIDATE │ %s │ tx=%s reverted", pending.kind, pending.tx_hash)
+        gas_oracle.invalidate(pending.kind)
 
 
 # ── Approval cache ──
 _approved_pairs: set[tuple[str, str]] = set()  # (safe_address, operator)
+_approvals_path: Optional[Path] = None          # JSON file backing _approved_pairs
+_approvals_lock = threading.Lock()
+
+# Operators every merge/redeem path needs approved on the CTF
+APPROVAL_OPERATORS = (CTF_ADDRESS, NEG_RISK_ADAPTER)
+
+
+def load_approvals(path: str) -> int:
+    """Back the approval cache with ``path`` and load what it holds.
+
+    setApprovalForAll is never revoked by the bot, so a pair confirmed once
+    stays valid across restarts.  Returns the number of pairs loaded.
+    """
+    global _approvals_path
+    _approvals_path = Path(path)
+    try:
+        pairs = json.loads(_approvals_path.read_text())
+    except FileNotFoundError:
+        return 0
+    except Exception as e:
+        log.warning("APPROVALS_LOAD_FAILED │ %s │ %s", path, e)
+        return 0
+    with _approvals_lock:
+        for safe, operator in pairs:
+            _approved_pairs.add((safe.lower(), operator.lower()))
+    return len(pairs)
+
+
+def _remember_approval(cache_key: tuple[str, str]) -> None:
+    with _approvals_lock:
+        if cache_key in _approved_pairs:
+            return
+        _approved_pairs.add(cache_key)
+        if _approvals_path is None:
+            return
+        try:
+            _approvals_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = _approvals_path.with_suffix(".tmp")
+            tmp.write_text(json.dumps(sorted(_approved_pairs), indent=1))
+            tmp.replace(_approvals_path)
+        except Exception as e:
+            log.warning("APPROVALS_SAVE_FAILED │ %s │ %s", _approvals_path, e)
 
 
 def _ensure_approval(
@@ -353,6 +720,7 @@ def _ensure_approval(
     operator: str,
     chain_id: int = 137,
     max_gas_price_gwei: int = 200,
+    gas_oracle: Optional[GasOracle] = None,
 ) -> None:
     """Check CTF ERC1155 isApprovedForAll and send setApprovalForAll if needed."""
     safe_cs = Web3.to_checksum_address(safe_address)
@@ -362,35 +730,446 @@ def _ensure_approval(
     if cache_key in _approved_pairs:
         return
 
-    ctf = w3.eth.contract(
-        address=Web3.to_checksum_address(CTF_ADDRESS), abi=ERC1155_ABI,
-    )
+    ctf = get_contract(w3, CTF_ADDRESS, ERC1155_ABI)
     approved = ctf.functions.isApprovedForAll(safe_cs, operator_cs).call()
     if approved:
-        _approved_pairs.add(cache_key)
+        _remember_approval(cache_key)
         return
 
     log.info("APPROVAL_NEEDED safe=%s operator=%s", safe_cs, operator_cs)
-    approval_data = ctf.encode_abi("setApprovalForAll", [operator_cs, True])
-    inner_data = bytes.fromhex(approval_data.removeprefix("0x"))
+    inner_data = _encode_set_approval(operator_cs)
     _send_safe_tx(
         w3, account, safe_address,
         CTF_ADDRESS, inner_data, chain_id,
         max_gas_price_gwei=max_gas_price_gwei,
+        gas_oracle=gas_oracle,
+        kind=GAS_KIND_APPROVAL,
     )
-    _approved_pairs.add(cache_key)
+    _remember_approval(cache_key)
     log.info("APPROVAL_GRANTED safe=%s operator=%s", safe_cs, operator_cs)
 
 
+def preflight_approvals(
+    w3: Web3,
+    account: LocalAccount,
+    safe_address: str,
+    operators: tuple[str, ...] = APPROVAL_OPERATORS,
+    chain_id: int = 137,
+    max_gas_price_gwei: int = 200,
+    gas_oracle: Optional[GasOracle] = None,
+) -> list[str]:
+    """Make sure every operator is approved before trading starts.
+
+    Uncached operators are checked in one multicall; all missing approvals
+    are granted in one Safe tx (MultiSend when more than one).  Returns the
+    operators that were granted.
+    """
+    safe_cs = Web3.to_checksum_address(safe_address)
+    unknown = [
+        Web3.to_checksum_address(op) for op in operators
+        if (safe_cs.lower(), op.lower()) not in _approved_pairs
+    ]
+    if not unknown:
+        return []
+
+    results = aggregate3(w3, [
+        Call3(_CTF_TARGET, encode_is_approved_for_all(safe_cs, op)) for op in unknown
+    ])
+    missing: list[str] = []
+    for op, data in zip(unknown, results):
+        if decode_bool(data):
+            _remember_approval((safe_cs.lower(), op.lower()))
+        else:
+            missing.append(op)
+    if not missing:
+        return []
+
+    log.info("APPROVAL_PREFLIGHT safe=%s │ granting %s", safe_cs, ", ".join(missing))
+    calls = [
+        SafeCall(CTF_ADDRESS, _encode_set_approval(op), APPROVAL_GAS, CTF_ADDRESS, label=op)
+        for op in missing
+    ]
+    if len(calls) == 1:
+        _send_safe_tx(
+            w3, account, safe_address, CTF_ADDRESS, calls[0].data, chain_id,
+            max_gas_price_gwei=max_gas_price_gwei,
+            gas_oracle=gas_oracle,
+            kind=GAS_KIND_APPROVAL,
+        )
+    else:
+        _send_safe_tx(
+            w3, account, safe_address, MULTISEND_CALL_ONLY, encode_multisend(calls), chain_id,
+            max_gas_price_gwei=max_gas_price_gwei,
+            operation=OP_DELEGATECALL,
+            fallback_gas=SAFE_TX_OVERHEAD_GAS + APPROVAL_GAS * len(calls),
+            gas_oracle=gas_oracle,
+        )
+    for op in missing:
+        _remember_approval((safe_cs.lower(), op.lower()))
+        log.info("APPROVAL_GRANTED safe=%s operator=%s", safe_cs, op)
+    return missing
+
+
+# ── MultiSend batching ──
+
+def build_merge_call(condition_id: str, amount: int, neg_risk: bool, label: str = "") -> SafeCall:
+    """SafeCall for one merge (amount in base units)."""
+    if not condition_id:
+        raise ValueError("condition_id is empty — cannot merge")
+    target, data = _encode_merge(condition_id, amount, neg_risk)
+    return SafeCall(
+        to=target,
+        data=bytes.fromhex(data.removeprefix("0x")),
+        gas=NEG_RISK_MERGE_GAS if neg_risk else MERGE_GAS,
+        operator=NEG_RISK_ADAPTER if neg_risk else CTF_ADDRESS,
+        label=label,
+        kind=gas_kind("merge", neg_risk),
+    )
+
+
+def build_redeem_call(
+    condition_id: str, neg_risk: bool, amount: int = 0, label: str = "",
+) -> SafeCall:
+    """SafeCall for one redeem (amount only used by NegRiskAdapter)."""
+    if not condition_id:
+        raise ValueError("condition_id is empty — cannot redeem")
+    target, data = _encode_redeem(condition_id, neg_risk, amount)
+    return SafeCall(
+        to=target,
+        data=bytes.fromhex(data.removeprefix("0x")),
+        gas=NEG_RISK_REDEEM_GAS if neg_risk else REDEEM_GAS,
+        operator=NEG_RISK_ADAPTER if neg_risk else CTF_ADDRESS,
+        label=label,
+        kind=gas_kind("redeem", neg_risk),
+    )
+
+
+def encode_multisend(calls: list[SafeCall]) -> bytes:
+    """Encode multiSend(bytes) calldata for MultiSendCallOnly.
+
+    Each call is packed as operation(uint8) ‖ to(20) ‖ value(uint256)
+    ‖ dataLength(uint256) ‖ data, with operation=CALL and value=0.
+    """
+    packed = b"".join(
+        bytes([OP_CALL])
+        + bytes.fromhex(Web3.to_checksum_address(c.to)[2:])
+        + (0).to_bytes(32, "big")
+        + len(c.data).to_bytes(32, "big")
+        + c.data
+        for c in calls
+    )
+    padding = -len(packed) % 32
+    return _MULTISEND_SEL + _word(32) + _word(len(packed)) + packed + bytes(padding)
+
+
+def pack_batches(calls: list[SafeCall], max_batch_gas: int) -> list[list[SafeCall]]:
+    """Greedily split calls into chunks whose gas budget fits max_batch_gas.
+
+    Merges and redeems never share a chunk — chunks are atomic, so a redeem
+    sent before its condition resolves would otherwise revert the merges
+    with it.  A call larger than the cap on its own still gets its own chunk.
+    """
+    by_action: dict[str, list[SafeCall]] = {}
+    for call in calls:
+        by_action.setdefault(call.kind.split(":")[0], []).append(call)
+
+    batches: list[list[SafeCall]] = []
+    for group in by_action.values():
+        current: list[SafeCall] = []
+        used = SAFE_TX_OVERHEAD_GAS
+        for call in group:
+            if current and used + call.gas > max_batch_gas:
+                batches.append(current)
+                current, used = [], SAFE_TX_OVERHEAD_GAS
+            current.append(call)
+            used += call.gas
+        if current:
+            batches.append(current)
+    return batches
+
+
+def simulate_calls(
+    w3: Web3, safe_address: str, calls: list[SafeCall],
+) -> tuple[list[SafeCall], list[tuple[SafeCall, Exception]]]:
+    """eth_call each call from the Safe; split into (passing, reverting).
+
+    MultiSendCallOnly makes each inner call with the Safe as msg.sender, so
+    a plain eth_call from the Safe address predicts it without a signature.
+    """
+    safe_cs = Web3.to_checksum_address(safe_address)
+    passing: list[SafeCall] = []
+    failing: list[tuple[SafeCall, Exception]] = []
+    for call in calls:
+        try:
+            w3.eth.call({
+                "from": safe_cs,
+                "to": Web3.to_checksum_address(call.to),
+                "data": call.data,
+            })
+        except Exception as e:
+            log.warning("SIMULATION_REVERT │ %s │ %s", call.label or call.kind, e)
+            failing.append((call, e))
+            continue
+        passing.append(call)
+    return passing, failing
+
+
+def execute_batch(
+    w3: Web3,
+    account: LocalAccount,
+    safe_address: str,
+    calls: list[SafeCall],
+    chain_id: int = 137,
+    max_gas_price_gwei: int = 200,
+    max_batch_gas: int = DEFAULT_MAX_BATCH_GAS,
+    gas_oracle: Optional[GasOracle] = None,
+) -> list[BatchResult]:
+    """Send all calls in as few Safe transactions as max_batch_gas allows.
+
+    Multi-call chunks delegatecall MultiSendCallOnly and are atomic — one
+    failing call reverts its whole chunk.  Single-call chunks are sent as a
+    plain CALL.  Each chunk's outcome is reported separately.
+
+    A revert leaves its Safe nonce unused, so chunks pipelined behind it
+    fail the signature check; those are re-signed and resubmitted once.
+    """
+    if not calls:
+        return []
+
+    results: list[BatchResult] = []
+    reverted = False
+    for chunk, pending, error in submit_batch(
+        w3, account, safe_address, calls, chain_id, max_gas_price_gwei, max_batch_gas, gas_oracle,
+    ):
+        if pending is not None:
+            try:
+                result = _wait_for_receipt(w3, pending, gas_oracle=gas_oracle)
+                results.append(_batch_confirmed(chunk, result))
+                continue
+            except Exception as e:
+                error = e
+            if reverted and _is_revert(error):
+                # Signed on a Safe nonce the earlier revert left unused (GS026)
+                try:
+                    pending = _submit_chunk(
+                        w3, account, safe_address, chunk, chain_id,
+                        max_gas_price_gwei, gas_oracle, resubmit=True,
+                    )
+                    result = _wait_for_receipt(w3, pending, gas_oracle=gas_oracle)
+                    results.append(_batch_confirmed(chunk, result))
+                    continue
+                except Exception as e:
+                    error = e
+            reverted = reverted or _is_revert(error)
+        results.append(_batch_failed(chunk, error))
+    return results
+
+
+async def execute_batch_async(
+    w3: Web3,
+    account: LocalAccount,
+    safe_address: str,
+    calls: list[SafeCall],
+    watcher: ReceiptWatcher,
+    chain_id: int = 137,
+    max_gas_price_gwei: int = 200,
+    max_batch_gas: int = DEFAULT_MAX_BATCH_GAS,
+    gas_oracle: Optional[GasOracle] = None,
+) -> list[BatchResult]:
+    """execute_batch() with receipts awaited on a shared ReceiptWatcher.
+
+    Signing and broadcast take one thread hop; confirmation holds no thread.
+    """
+    if not calls:
+        return []
+    submitted = await asyncio.to_thread(
+        submit_batch, w3, account, safe_address, calls,
+        chain_id, max_gas_price_gwei, max_batch_gas, gas_oracle,
+    )
+    outcomes = await asyncio.gather(*(
+        _await_receipt(watcher, pending, gas_oracle=gas_oracle)
+        for _, pending, _ in submitted if pending is not None
+    ), return_exceptions=True)
+
+    results: list[BatchResult] = []
+    reverted = False
+    it = iter(outcomes)
+    for chunk, pending, error in submitted:
+        outcome = next(it) if pending is not None else error
+        if pending is not None and reverted and _is_revert(outcome):
+            # Signed on a Safe nonce the earlier revert left unused (GS026)
+            try:
+                pending = await asyncio.to_thread(
+                    _submit_chunk, w3, account, safe_address, chunk, chain_id,
+                    max_gas_price_gwei, gas_oracle, True,
+                )
+                outcome = await _await_receipt(watcher, pending, gas_oracle=gas_oracle)
+            except Exception as e:
+                outcome = e
+        if isinstance(outcome, TxResult):
+            results.append(_batch_confirmed(chunk, outcome))
+        else:
+            reverted = reverted or (pending is not None and _is_revert(outcome))
+            results.append(_batch_failed(chunk, outcome))
+    return results
+
+
+def submit_batch(
+    w3: Web3,
+    account: LocalAccount,
+    safe_address: str,
+    calls: list[SafeCall],
+    chain_id: int = 137,
+    max_gas_price_gwei: int = 200,
+    max_batch_gas: int = DEFAULT_MAX_BATCH_GAS,
+    gas_oracle: Optional[GasOracle] = None,
+    simulate: bool = True,
+) -> list[tuple[list[SafeCall], Optional[PendingTx], Optional[Exception]]]:
+    """Approve operators, simulate, then broadcast every chunk without waiting.
+
+    Each call is simulated first and reverting calls are reported as their
+    own failed chunk, so only calls expected to succeed are pipelined.
+    Chunks go out back-to-back on locally allocated nonces, so total
+    latency is ~one block rather than one confirmation per chunk.
+    Returns (chunk, pending tx or None, submit error or None) per chunk.
+    """
+    for operator in dict.fromkeys(c.operator for c in calls):
+        _ensure_approval(
+            w3, account, safe_address, operator, chain_id,
+            max_gas_price_gwei=max_gas_price_gwei,
+            gas_oracle=gas_oracle,
+        )
+
+    submitted: list[tuple[list[SafeCall], Optional[PendingTx], Optional[Exception]]] = []
+    if simulate:
+        calls, failing = simulate_calls(w3, safe_address, calls)
+        submitted.extend(([call], None, error) for call, error in failing)
+    for chunk in pack_batches(calls, max_batch_gas):
+        try:
+            pending = _submit_chunk(
+                w3, account, safe_address, chunk, chain_id, max_gas_price_gwei, gas_oracle,
+            )
+            submitted.append((chunk, pending, None))
+        except Exception as e:
+            submitted.append((chunk, None, e))
+    return submitted
+
+
+def _submit_chunk(
+    w3: Web3,
+    account: LocalAccount,
+    safe_address: str,
+    chunk: list[SafeCall],
+    chain_id: int,
+    max_gas_price_gwei: int,
+    gas_oracle: Optional[GasOracle] = None,
+    resubmit: bool = False,
+) -> PendingTx:
+    """Broadcast one chunk — a plain CALL for one call, else MultiSend."""
+    budget = SAFE_TX_OVERHEAD_GAS + sum(c.gas for c in chunk)
+    if resubmit:
+        log.warning("BATCH_RESUBMIT │ %d calls │ re-signed after an earlier revert", len(chunk))
+    if len(chunk) == 1:
+        return _submit_safe_tx(
+            w3, account, safe_address, chunk[0].to, chunk[0].data, chain_id,
+            max_gas_price_gwei=max_gas_price_gwei,
+            fallback_gas=max(500_000, budget),
+            gas_oracle=gas_oracle,
+            kind=chunk[0].kind,
+        )
+    log.info(
+        "BATCH_INIT │ %d calls via MultiSend │ gas budget %d",
+        len(chunk), budget,
+    )
+    return _submit_safe_tx(
+        w3, account, safe_address, MULTISEND_CALL_ONLY,
+        encode_multisend(chunk), chain_id,
+        max_gas_price_gwei=max_gas_price_gwei,
+        operation=OP_DELEGATECALL,
+        fallback_gas=budget,
+        gas_oracle=gas_oracle,
+        kind=batch_gas_kind(c.kind for c in chunk),
+    )
+
+
+def _is_revert(error: Optional[BaseException]) -> bool:
+    return error is not None and "reverted" in str(error).lower()
+
+
+def _batch_confirmed(chunk: list[SafeCall], result: TxResult) -> BatchResult:
+    log.info("BATCH_CONFIRMED │ %d calls │ tx=%s", len(chunk), result.tx_hash)
+    return BatchResult(chunk, result, None)
+
+
+def _batch_failed(chunk: list[SafeCall], error: BaseException) -> BatchResult:
+    log.error("BATCH_FAILED │ %d calls │ %s", len(chunk), error)
+    return BatchResult(chunk, None, error)
+
+
+# ── Batched balance reads ──
+
+MAX_TOKENS_PER_BATCH = 500  # balanceOfBatch ids per sub-call
+
+
+class BalanceSnapshot(NamedTuple):
+    """USDC and CTF balances read in one eth_call, all in base units."""
+    usdc: int
+    tokens: dict[str, int]   # token_id -> balance
+    block_number: int
+
+
+class BalanceReader:
+    """USDC + ERC1155 balances for any number of tokens in one Multicall3 call.
+
+    Holds one provider, so repeated reads reuse its HTTP session.
+    """
+
+    def __init__(self, w3: Web3) -> None:
+        self._w3 = w3
+        self._usdc = Web3.to_checksum_address(USDC_ADDRESS)
+        self._ctf = Web3.to_checksum_address(CTF_ADDRESS)
+
+    def read(self, wallet: str, token_ids: list[str]) -> BalanceSnapshot:
+        wallet_cs = Web3.to_checksum_address(wallet)
+        ids = list(dict.fromkeys(token_ids))
+        chunks = [ids[i:i + MAX_TOKENS_PER_BATCH] for i in range(0, len(ids), MAX_TOKENS_PER_BATCH)]
+        calls = [
+            Call3(self._usdc, encode_balance_of(wallet_cs)),
+            Call3(MULTICALL3_ADDRESS, GET_BLOCK_NUMBER_DATA),
+            *(
+                Call3(self._ctf, encode_balance_of_batch(wallet_cs, [int(t) for t in chunk]))
+                for chunk in chunks
+            ),
+        ]
+        results = aggregate3(self._w3, calls)
+
+        usdc = decode_uint(results[0])
+        if usdc is None:
+            raise RuntimeError("USDC balanceOf failed in multicall")
+        tokens: dict[str, int] = {}
+        for chunk, data in zip(chunks, results[2:]):
+            balances = decode_uint_array(data)
+            if balances is None:
+                raise RuntimeError(f"CTF balanceOfBatch failed for {len(chunk)} tokens")
+            tokens.update(zip(chunk, balances))
+        return BalanceSnapshot(usdc, tokens, decode_uint(results[1]) or 0)
+
+
+_readers: dict[str, BalanceReader] = {}  # rpc_url -> reader (one provider per URL)
+
+
+def balance_reader(rpc_url: str) -> BalanceReader:
+    reader = _readers.get(rpc_url)
+    if reader is None:
+        reader = _readers[rpc_url] = BalanceReader(get_web3(rpc_url))
+    return reader
+
+
 # ── Public API ──
 
 def get_usdc_balance(rpc_url: str, wallet: str) -> Decimal:
     """Query on-chain USDC balance for a wallet. Returns human-readable Decimal."""
-    w3 = Web3(Web3.HTTPProvider(rpc_url))
-    usdc = w3.eth.contract(
-        address=Web3.to_checksum_address(USDC_ADDRESS), abi=ERC20_BALANCE_ABI,
-    )
-    raw = usdc.functions.balanceOf(Web3.to_checksum_address(wallet)).call()
+    raw = balance_reader(rpc_url).read(wallet, []).usdc
     return Decimal(raw) / Decimal(10 ** CTF_DECIMALS)
 
 
@@ -400,14 +1179,8 @@ def get_ctf_balances(
     """Query on-chain CTF ERC1155 balances for UP and DOWN positions.
     Returns (up_balance, down_balance) in base units (6 decimals).
     """
-    w3 = Web3(Web3.HTTPProvider(rpc_url))
-    ctf = w3.eth.contract(
-        address=Web3.to_checksum_address(CTF_ADDRESS), abi=ERC1155_ABI,
-    )
-    wallet_cs = Web3.to_checksum_address(wallet)
-    up_bal = ctf.functions.balanceOf(wallet_cs, int(up_token_id)).call()
-    down_bal = ctf.functions.balanceOf(wallet_cs, int(down_token_id)).call()
-    return up_bal, down_bal
+    tokens = balance_reader(rpc_url).read(wallet, [up_token_id, down_token_id]).tokens
+    return tokens[up_token_id], tokens[down_token_id]
 
 
 def merge_positions(
@@ -419,6 +1192,7 @@ def merge_positions(
     neg_risk: bool = False,
     chain_id: int = 137,
     max_gas_price_gwei: int = 200,
+    gas_oracle: Optional[GasOracle] = None,
 ) -> TxResult:
     """Merge hedged UP+DOWN positions back to USDC via Gnosis Safe.
 
@@ -438,6 +1212,7 @@ def merge_positions(
     _ensure_approval(
         w3, account, safe_address, operator, chain_id,
         max_gas_price_gwei=max_gas_price_gwei,
+        gas_oracle=gas_oracle,
     )
 
     merge_target, merge_data = _encode_merge(condition_id, amount, neg_risk)
@@ -445,6 +1220,8 @@ def merge_positions(
     result = _send_safe_tx(
         w3, account, safe_address, merge_target, inner_data, chain_id,
         max_gas_price_gwei=max_gas_price_gwei,
+        gas_oracle=gas_oracle,
+        kind=gas_kind("merge", neg_risk),
     )
     log.info("MERGE_CONFIRMED tx=%s", result.tx_hash)
     return result
@@ -459,6 +1236,7 @@ def redeem_positions(
     amount: int = 0,
     chain_id: int = 137,
     max_gas_price_gwei: int = 200,
+    gas_oracle: Optional[GasOracle] = None,
 ) -> TxResult:
     """Redeem resolved positions on-chain via Gnosis Safe.
 
@@ -478,6 +1256,7 @@ def redeem_positions(
     _ensure_approval(
         w3, account, safe_address, operator, chain_id,
         max_gas_price_gwei=max_gas_price_gwei,
+        gas_oracle=gas_oracle,
     )
 
     redeem_target, redeem_data = _encode_redeem(condition_id, neg_risk, amount)
@@ -485,6 +1264,8 @@ def redeem_positions(
     result = _send_safe_tx(
         w3, account, safe_address, redeem_target, inner_data, chain_id,
         max_gas_price_gwei=max_gas_price_gwei,
+        gas_oracle=gas_oracle,
+        kind=gas_kind("redeem", neg_risk),
     )
     log.info("REDEEM_CONFIRMED tx=%s", result.tx_hash)
     return result
@@ -0,0 +1,354 @@
+"""Per-endpoint circuit breakers, hedged reads and latency SLOs for REST calls.
+
+Tick time is decided by tail latency: one stuck Gamma/CLOB call used to hold
+_tick for its full 10s client timeout.  Every latency-critical call now goes
+through an Endpoint:
+
+- Circuit breaker — after ``failure_threshold`` consecutive failures the
+  endpoint fails fast with CircuitOpenError for ``reset_timeout_s``, then
+  lets one probe through (half-open) before closing again.  Only transport
+  errors, timeouts and 5xx count as failures; a 4xx business rejection
+  (insufficient balance, invalid price) proves the endpoint is up.
+- Hedged requests — for idempotent reads, if the first attempt hasn't
+  answered by the endpoint's observed p95, a second identical request is
+  sent and whichever returns first wins.
+- Deadline — reads stop waiting after ``deadline_s`` (the straggler finishes
+  in the background pool), so a degraded endpoint costs a bounded slice of
+  the tick instead of the transport timeout.
+- SLO — rolling p50/p95/p99 per endpoint; a p95 above target is logged.
+
+Usage:
+    books = get_endpoint("clob.books").call(client.get_order_books, params, hedge=True)
+    books = await get_endpoint("clob.books").acall(aclient.get_order_books, ids, hedge=True)
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Optional
+
+log = logging.getLogger("shared.resilience")
+
+# Hedge/deadline calls run here so the caller can stop waiting on a straggler
+_POOL = ThreadPoolExecutor(max_workers=16, thread_name_prefix="endpoint")
+
+# Need this many samples before the observed p95 drives hedging
+MIN_SAMPLES_FOR_P95 = 20
+LATENCY_WINDOW = 256
+SLO_LOG_INTERVAL_S = 60.0
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised instead of calling an endpoint whose breaker is open."""
+
+
+def _status_code(exc: BaseException) -> Optional[int]:
+    """HTTP status carried by a client exception, if any."""
+    status = getattr(exc, "status_code", None)
+    if status is None:
+        status = getattr(getattr(exc, "response", None), "status_code", None)
+    return status if isinstance(status, int) else None
+
+
+def is_failure(exc: BaseException) -> bool:
+    """True if ``exc`` means the endpoint is unhealthy (transport, timeout, 5xx)."""
+    status = _status_code(exc)
+    return status is None or status >= 500
+
+
+@dataclass(frozen=True)
+class EndpointSLO:
+    p95_ms: float            # latency target; also the hedge delay until samples exist
+    deadline_s: float = 0.0  # max wait for reads (0 = wait for the transport timeout)
+    failure_threshold: int = 5
+    reset_timeout_s: float = 15.0
+
+
+# Latency targets for the calls on the grid-maker tick path
+ENDPOINT_SLOS: dict[str, EndpointSLO] = {
+    "clob.books": EndpointSLO(p95_ms=300, deadline_s=2.0),
+    "clob.book": EndpointSLO(p95_ms=250, deadline_s=2.0),
+    "clob.get_orders": EndpointSLO(p95_ms=600, deadline_s=4.0),
+    "clob.get_order": EndpointSLO(p95_ms=250, deadline_s=2.0),
+    "clob.post_order": EndpointSLO(p95_ms=400),
+    "clob.cancel": EndpointSLO(p95_ms=300),
+    "gamma.events": EndpointSLO(p95_ms=800, deadline_s=5.0),
+}
+_DEFAULT_SLO = EndpointSLO(p95_ms=1000, deadline_s=10.0)
+
+
+class LatencyTracker:
+    """Rolling window of successful call latencies (seconds)."""
+
+    def __init__(self, maxlen: int = LATENCY_WINDOW) -> None:
+        self._samples: deque[float] = deque(maxlen=maxlen)
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float) -> None:
+        with self._lock:
+            self._samples.append(seconds)
+
+    def percentile(self, q: float) -> Optional[float]:
+        """Return the q-quantile (0..1), or None if the window is empty."""
+        with self._lock:
+            if not self._samples:
+                return None
+            ordered = sorted(self._samples)
+        idx = min(len(ordered) - 1, int(q * len(ordered)))
+        return ordered[idx]
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+
+class CircuitBreaker:
+    """Closed → open after N consecutive failures → half-open probe → closed."""
+
+    CLOSED = "CLOSED"
+    OPEN = "OPEN"
+    HALF_OPEN = "HALF_OPEN"
+
+    def __init__(self, name: str, failure_threshold: int = 5, reset_timeout_s: float = 15.0):
+        self._name = name
+        self._failure_threshold = failure_threshold
+        self._reset_timeout_s = reset_timeout_s
+        self._failures = 0
+        self._opened_at = 0.0
+        self._state = self.CLOSED
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        return self._state
+
+    def allow(self) -> bool:
+        """Return True if a call may proceed."""
+        with self._lock:
+            if self._state == self.CLOSED:
+                return True
+            if self._state == self.OPEN:
+                if time.monotonic() - self._opened_at >= self._reset_timeout_s:
+                    self._state = self.HALF_OPEN
+                    return True  # single probe
+                return False
+            return False  # HALF_OPEN: probe already in flight
+
+    def record_success(self) -> None:
+        with self._lock:
+            if self._state != self.CLOSED:
+                log.info("CIRCUIT_CLOSED │ %s", self._name)
+            self._state = self.CLOSED
+            self._failures = 0
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            if self._state == self.HALF_OPEN or self._failures >= self._failure_threshold:
+                if self._state != self.OPEN:
+                    log.warning(
+                        "CIRCUIT_OPEN │ %s │ %d consecutive failures, failing fast for %.0fs",
+                        self._name, self._failures, self._reset_timeout_s,
+                    )
+                self._state = self.OPEN
+                self._opened_at = time.monotonic()
+
+
+class Endpoint:
+    """A named REST endpoint with its breaker, latency window and SLO."""
+
+    def __init__(
+        self,
+        name: str,
+        slo: EndpointSLO,
+        is_failure: Callable[[BaseException], bool] = is_failure,
+    ) -> None:
+        self.name = name
+        self.slo = slo
+        self.is_failure = is_failure
+        self.breaker = CircuitBreaker(name, slo.failure_threshold, slo.reset_timeout_s)
+        self.latency = LatencyTracker()
+        self.hedges_sent = 0
+        self._last_slo_log = 0.0
+
+    def hedge_delay(self) -> float:
+        """Seconds to wait before hedging — observed p95, else the SLO target."""
+        if len(self.latency) >= MIN_SAMPLES_FOR_P95:
+            p95 = self.latency.percentile(0.95)
+            if p95 is not None:
+                return p95
+        return self.slo.p95_ms / 1000.0
+
+    def call(self, fn: Callable[..., Any], *args, hedge: bool = False, **kwargs) -> Any:
+        """Invoke fn through the breaker.
+
+        ``hedge=True`` marks the call as an idempotent read: it may be sent
+        twice and is abandoned after the SLO deadline.  Writes (hedge=False)
+        are sent once and waited on to completion.
+        """
+        if not self.breaker.allow():
+            raise CircuitOpenError(f"{self.name} circuit open")
+
+        start = time.monotonic()
+        try:
+            if hedge:
+                result = self._call_hedged(fn, args, kwargs)
+            else:
+                result = fn(*args, **kwargs)
+        except Exception as e:
+            self._record_error(e)
+            raise
+
+        self.breaker.record_success()
+        self._record_latency(time.monotonic() - start)
+        return result
+
+    def _call_hedged(self, fn: Callable[..., Any], args: tuple, kwargs: dict) -> Any:
+        deadline = self.slo.deadline_s or None
+        start = time.monotonic()
+        first = _POOL.submit(fn, *args, **kwargs)
+        done, _ = wait([first], timeout=self.hedge_delay())
+        if done:
+            return first.result()
+
+        # First attempt is in the tail — race a second identical request
+        self.hedges_sent += 1
+        second = _POOL.submit(fn, *args, **kwargs)
+        pending: set[Future] = {first, second}
+        error: Optional[BaseException] = None
+        while pending:
+            remaining = None if deadline is None else deadline - (time.monotonic() - start)
+            if remaining is not None and remaining <= 0:
+                break
+            done, pending = wait(pending, timeout=remaining, return_when=FIRST_COMPLETED)
+            for fut in done:
+                exc = fut.exception()
+                if exc is None:
+                    return fut.result()
+                error = exc
+        if error is not None and not pending:
+            raise error
+        raise TimeoutError(f"{self.name} exceeded {deadline:.1f}s deadline")
+
+    async def acall(
+        self, fn: Callable[..., Awaitable[Any]], *args, hedge: bool = False, **kwargs,
+    ) -> Any:
+        """Async twin of call() for coroutine functions — same breaker, hedge and deadline."""
+        if not self.breaker.allow():
+            raise CircuitOpenError(f"{self.name} circuit open")
+
+        start = time.monotonic()
+        try:
+            if hedge:
+                result = await self._acall_hedged(fn, args, kwargs)
+            else:
+                result = await fn(*args, **kwargs)
+        except Exception as e:
+            self._record_error(e)
+            raise
+
+        self.breaker.record_success()
+        self._record_latency(time.monotonic() - start)
+        return result
+
+    async def _acall_hedged(
+        self, fn: Callable[..., Awaitable[Any]], args: tuple, kwargs: dict,
+    ) -> Any:
+        deadline = self.slo.deadline_s or None
+        start = time.monotonic()
+        first = asyncio.ensure_future(fn(*args, **kwargs))
+        done, _ = await asyncio.wait([first], timeout=self.hedge_delay())
+        if done:
+            return first.result()
+
+        self.hedges_sent += 1
+        second = asyncio.ensure_future(fn(*args, **kwargs))
+        pending: set[asyncio.Future] = {first, second}
+        error: Optional[BaseException] = None
+        try:
+            while pending:
+                remaining = None if deadline is None else deadline - (time.monotonic() - start)
+                if remaining is not None and remaining <= 0:
+                    break
+                done, pending = await asyncio.wait(
+                    pending, timeout=remaining, return_when=asyncio.FIRST_COMPLETED,
+                )
+                for fut in done:
+                    exc = fut.exception()
+                    if exc is None:
+                        return fut.result()
+                    error = exc
+        finally:
+            for fut in pending:
+                fut.cancel()
+        if error is not None and not pending:
+            raise error
+        raise TimeoutError(f"{self.name} exceeded {deadline:.1f}s deadline")
+
+    def _record_error(self, exc: BaseException) -> None:
+        if self.is_failure(exc):
+            self.breaker.record_failure()
+        else:
+            self.breaker.record_success()  # a rejection still means the endpoint answered
+
+    def _record_latency(self, seconds: float) -> None:
+        self.latency.record(seconds)
+        if len(self.latency) < MIN_SAMPLES_FOR_P95:
+            return
+        now = time.monotonic()
+        if now - self._last_slo_log < SLO_LOG_INTERVAL_S:
+            return
+        p95 = self.latency.percentile(0.95) or 0.0
+        if p95 * 1000 > self.slo.p95_ms:
+            self._last_slo_log = now
+            log.warning(
+                "SLO_BREACH │ %s │ p95=%.0fms > target %.0fms │ hedges=%d",
+                self.name, p95 * 1000, self.slo.p95_ms, self.hedges_sent,
+            )
+
+    def stats(self) -> dict[str, Any]:
+        def ms(q: float) -> Optional[float]:
+            v = self.latency.percentile(q)
+            return round(v * 1000, 1) if v is not None else None
+
+        return {
+            "state": self.breaker.state,
+            "samples": len(self.latency),
+            "p50_ms": ms(0.50),
+            "p95_ms": ms(0.95),
+            "p99_ms": ms(0.99),
+            "slo_p95_ms": self.slo.p95_ms,
+            "hedges": self.hedges_sent,
+        }
+
+
+_endpoints: dict[str, Endpoint] = {}
+_endpoints_lock = threading.Lock()
+
+
+def get_endpoint(name: str) -> Endpoint:
+    """Return the process-wide Endpoint for ``name``, creating it on first use."""
+    endpoint = _endpoints.get(name)
+    if endpoint is None:
+        with _endpoints_lock:
+            endpoint = _endpoints.get(name)
+            if endpoint is None:
+                endpoint = Endpoint(name, ENDPOINT_SLOS.get(name, _DEFAULT_SLO))
+                _endpoints[name] = endpoint
+    return endpoint
+
+
+def endpoint_stats() -> dict[str, dict[str, Any]]:
+    """Snapshot of latency/breaker stats for every endpoint used so far."""
+    return {name: ep.stats() for name, ep in list(_endpoints.items())}
+
+
+def reset_endpoints() -> None:
+    """Drop all breaker and latency state (tests, or after a config reload)."""
+    with _endpoints_lock:
+        _endpoints.clear()
@@ -1,4 +1,4 @@
-"""Shared fixtures for grid-maker and order_mgr tests."""
+"""Shared fixtures and fakes for the test suite."""
 
 from __future__ import annotations
 
@@ -8,10 +8,41 @@ from decimal import Decimal
 import pytest
 
 from shared.models import Direction, GabagoolMarket, OrderState
+from shared.redeem import nonce_manager
+from shared.resilience import reset_endpoints
 
 ZERO = Decimal("0")
 
 
+class FakeResponse:
+    """Stands in for a requests.Response carrying a JSON body."""
+
+    def __init__(self, body):
+        self._body = body
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return self._body
+
+
+@pytest.fixture(autouse=True)
+def _fresh_endpoints():
+    """Breaker/latency state is process-wide — isolate it per test."""
+    reset_endpoints()
+    yield
+    reset_endpoints()
+
+
+@pytest.fixture(autouse=True)
+def _fresh_nonces():
+    """Locally cached nonces are process-wide too."""
+    nonce_manager.reset()
+    yield
+    nonce_manager.reset()
+
+
 @pytest.fixture
 def sample_market() -> GabagoolMarket:
     return GabagoolMarket(
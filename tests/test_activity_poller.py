@@ -0,0 +1,85 @@
+"""Tests for the observer's cursor-based ActivityPoller."""
+
+from __future__ import annotations
+
+import threading
+
+from conftest import FakeResponse
+
+from observer.poller import ACTIVITY_MAX_LIMIT, ActivityPoller
+
+
+def _item(ts: int, tx: str, asset: str = "tok", size: float = 10.0) -> dict:
+    return {
+        "timestamp": ts, "transactionHash": tx, "asset": asset, "side": "BUY",
+        "size": size, "price": 0.5, "usdcSize": size / 2, "outcome": "Up",
+        "outcomeIndex": 0, "slug": "btc-updown-15m-1",
+    }
+
+
+class _FakeApi:
+    """Serves /activity pages newest-first, honouring limit/offset/start/end."""
+
+    def __init__(self, items: list[dict]):
+        self.items = items
+        self.requests: list[dict] = []
+        self._lock = threading.Lock()
+
+    def get(self, url, params, timeout):
+        with self._lock:
+            self.requests.append(dict(params))
+        rows = sorted(self.items, key=lambda it: it["timestamp"], reverse=True)
+        if "start" in params:
+            rows = [r for r in rows if r["timestamp"] >= params["start"]]
+        if "end" in params:
+            rows = [r for r in rows if r["timestamp"] <= params["end"]]
+        page = rows[params["offset"]:params["offset"] + params["limit"]]
+        return FakeResponse(page)
+
+
+class TestActivityPoller:
+    def test_burst_larger_than_a_page_is_not_lost(self):
+        api = _FakeApi([_item(1000, "0xold")])
+        poller = ActivityPoller("0xproxy", limit=5, session=api)
+        assert [t.tx_hash for t in poller.poll()] == ["0xold"]
+
+        api.items += [_item(1000 + i, f"0x{i:03d}") for i in range(1, 13)]
+        trades = poller.poll()
+
+        assert [t.tx_hash for t in trades] == [f"0x{i:03d}" for i in range(1, 13)]  # oldest first
+        assert poller.cursor_ts == 1012
+        assert poller.poll() == []
+        assert all(r.get("start") == 1000 for r in api.requests[1:4])
+
+    def test_same_tx_different_fills_both_kept(self):
+        api = _FakeApi([_item(1000, "0xa", asset="up"), _item(1000, "0xa", asset="down")])
+        poller = ActivityPoller("0xproxy", session=api)
+        assert len(poller.poll()) == 2
+        assert poller.poll() == []
+
+    def test_dedup_window_is_time_bounded(self):
+        api = _FakeApi([_item(1000, "0xa")])
+        poller = ActivityPoller("0xproxy", dedup_window_s=60, session=api)
+        poller.poll()
+        api.items.append(_item(2000, "0xb"))
+        poller.poll()
+        assert poller.seen_count == 2
+        assert list(poller._seen) == ["0xb|tok|BUY|10.0|0.5"]
+
+    def test_deep_backfill_pages_slices_in_parallel(self, monkeypatch):
+        now = 100_000
+        monkeypatch.setattr("observer.poller.time.time", lambda: now)
+        items = [_item(now - 3 * 3600 + i * 10, f"0x{i:05d}") for i in range(3 * 360)]
+        items += [
+            _item(now - 2 * 3600 + 1, f"0xextra{i}", size=1.0 + i)
+            for i in range(ACTIVITY_MAX_LIMIT)
+        ]
+        api = _FakeApi(items)
+        poller = ActivityPoller("0xproxy", session=api)
+
+        trades = poller.backfill(hours=3, workers=4)
+
+        assert len(trades) == len(items)
+        assert [t.timestamp for t in trades] == sorted(t.timestamp for t in trades)
+        assert poller.cursor_ts == max(it["timestamp"] for it in items)
+        assert {r["start"] for r in api.requests} == {now - 3 * 3600, now - 2 * 3600, now - 3600}
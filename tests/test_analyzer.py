@@ -0,0 +1,127 @@
+"""Tests for the observer's TradeAnalyzer window bookkeeping."""
+
+from __future__ import annotations
+
+from observer.analyzer import TradeAnalyzer
+from observer.models import ObservedMerge, ObservedTrade
+
+
+def _trade(ts: int, outcome: str, asset: str, slug: str = "btc-updown-15m-1000",
+           side: str = "BUY", size: float = 10.0, price: float = 0.5) -> ObservedTrade:
+    return ObservedTrade(
+        timestamp=str(ts), side=side, price=price, size=size, usdc_size=price * size,
+        outcome=outcome, outcome_index=0 if outcome == "Up" else 1, tx_hash=f"0x{ts}{asset}",
+        slug=slug, event_slug="", condition_id="", asset=asset, title="",
+    )
+
+
+def _merge(token_id: str, shares: float) -> ObservedMerge:
+    return ObservedMerge(
+        timestamp=0, tx_hash="0xm", token_id=token_id, shares=shares, block_number=1,
+    )
+
+
+class TestIncrementalWindows:
+    def test_hedge_flags_and_delay(self):
+        analyzer = TradeAnalyzer()
+        analyzer.ingest_trades([_trade(100, "Down", "dn", side="SELL"), _trade(105, "Up", "up")])
+        window = analyzer.get_window("btc-updown-15m-1000")
+        assert window.status == "OPEN"
+        assert (window.first_up_at, window.first_down_at) == ("105", "")
+
+        analyzer.ingest_trades([_trade(130, "Down", "dn"), _trade(140, "Down", "dn")])
+        assert window.status == "HEDGED"
+        assert window.first_down_at == "130"
+        assert window.hedge_delay_sec == 25
+
+    def test_merge_matched_through_token_index(self):
+        analyzer = TradeAnalyzer()
+        analyzer.ingest_trades([
+            _trade(100, "Up", "up-a", slug="a"), _trade(100, "Up", "up-b", slug="b"),
+        ])
+
+        analyzer.ingest_merges([_merge("up-b", 5.0), _merge("unknown", 1.0)])
+        assert analyzer.get_window("b").merged_shares == 5.0
+        assert analyzer.get_window("b").status == "MERGED"
+        assert analyzer.get_window("a").merged_shares == 0.0
+
+        analyzer.close_window("b")
+        analyzer.ingest_merges([_merge("up-b", 5.0)])
+        assert analyzer.get_closed_windows()[0].merged_shares == 5.0
+
+
+class TestWindowExpiry:
+    def test_expire_closes_compacts_and_bounds(self):
+        analyzer = TradeAnalyzer(max_closed=2, close_grace_s=60)
+        for start in (1000, 1900, 2800):
+            slug = f"btc-updown-15m-{start}"
+            analyzer.ingest_trades([_trade(start + 5, "Up", f"up{start}", slug=slug)])
+        analyzer.ingest_trades([_trade(10, "Up", "x", slug="will-it-rain")])  # no parseable end
+
+        assert analyzer.expire(now=1000 + 900 + 59) == []
+        closed = analyzer.expire(now=10_000)
+        assert [w.slug for w in closed] == [f"btc-updown-15m-{s}" for s in (1000, 1900, 2800)]
+        assert all(w.trades == [] and w.trade_count == 1 for w in closed)
+        assert [w.slug for w in analyzer.get_closed_windows()] == [
+            "btc-updown-15m-1900", "btc-updown-15m-2800",
+        ]
+        assert analyzer.active_count == 1
+
+        analyzer.set_end_time("will-it-rain", "2024-01-01T00:00:00Z")
+        assert [w.slug for w in analyzer.expire()] == ["will-it-rain"]
+
+    def test_late_trade_for_closed_window_is_ignored(self):
+        analyzer = TradeAnalyzer(close_grace_s=0)
+        slug = "eth-updown-5m-1000"
+        analyzer.ingest_trades([_trade(1001, "Up", "u", slug=slug)])
+        analyzer.expire(now=2000)
+        analyzer.ingest_trades([_trade(1400, "Down", "d", slug=slug)])
+        assert analyzer.active_count == 0
+        assert analyzer.get_closed_windows()[0].trade_count == 1
+
+    def test_closed_guard_outlives_closed_list_until_end_time(self):
+        analyzer = TradeAnalyzer(max_closed=1, close_grace_s=0, closed_guard_s=3600)
+        for start in (1000, 1300):
+            slug = f"eth-updown-5m-{start}"
+            analyzer.ingest_trades([_trade(start + 1, "Up", f"u{start}", slug=slug)])
+        analyzer.expire(now=2000)
+        assert [w.slug for w in analyzer.get_closed_windows()] == ["eth-updown-5m-1300"]
+
+        # Evicted from the closed list, but its market ended under an hour ago
+        analyzer.ingest_trades([_trade(1200, "Down", "d", slug="eth-updown-5m-1000")])
+        assert analyzer.active_count == 0
+
+        analyzer.expire(now=1000 + 300 + 3600)  # guard for the first window lapses
+        analyzer.ingest_trades([_trade(1200, "Down", "d", slug="eth-updown-5m-1000")])
+        assert analyzer.active_count == 1
+
+
+def test_writer_skips_unchanged_windows():
+    import asyncio
+
+    from observer.persistence.writer import ObserverWriter
+
+    analyzer = TradeAnalyzer(close_grace_s=0)
+    analyzer.ingest_trades([_trade(1001, "Up", "u", slug="a"), _trade(1001, "Up", "v", slug="b")])
+    writer = ObserverWriter("s1")
+
+    async def enqueue(windows):
+        await writer.enqueue_market_windows(windows)
+        queued = [
+            (tag if isinstance(tag, str) else tag.name, row["slug"]) for tag, row in writer._buffer
+        ]
+        writer._buffer.clear()
+        return queued
+
+    assert asyncio.run(enqueue(analyzer.get_all_windows())) == [
+        ("obs_market_windows", "a"), ("obs_market_windows", "b"),
+    ]
+    assert asyncio.run(enqueue(analyzer.get_all_windows())) == []
+    analyzer.ingest_trades([_trade(1002, "Down", "w", slug="b")])
+    assert asyncio.run(enqueue(analyzer.get_all_windows())) == [("__update_window__", "b")]
+    closed = analyzer.close_window("a")
+    assert asyncio.run(enqueue(analyzer.get_all_windows() + [closed])) == [
+        ("__update_window__", "a"),
+    ]
+    assert "a" not in writer._window_rows
+    assert writer._known_window_slugs == {"b"}
@@ -0,0 +1,136 @@
+"""Tests for AsyncClobClient and concurrent order placement."""
+
+from __future__ import annotations
+
+import asyncio
+import json
+from decimal import Decimal
+from unittest.mock import MagicMock
+
+import httpx
+
+from shared.async_client import MAX_BOOKS_PER_REQUEST, AsyncClobClient
+from shared.models import Direction, OrderIntent
+from shared.order_mgr import OrderManager
+
+
+def _client(handler) -> AsyncClobClient:
+    return AsyncClobClient(host="https://clob.test", transport=httpx.MockTransport(handler))
+
+
+class TestBooks:
+    def test_chunks_fetched_concurrently(self):
+        seen: list[int] = []
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            body = json.loads(request.content)
+            seen.append(len(body))
+            return httpx.Response(200, json=[{"asset_id": b["token_id"]} for b in body])
+
+        async def run():
+            aclient = _client(handler)
+            try:
+                ids = [str(i) for i in range(MAX_BOOKS_PER_REQUEST + 10)]
+                return await aclient.get_order_books(ids)
+            finally:
+                await aclient.aclose()
+
+        books = asyncio.run(run())
+        assert len(books) == MAX_BOOKS_PER_REQUEST + 10
+        assert sorted(seen) == [10, MAX_BOOKS_PER_REQUEST]
+
+    def test_http_error_raises(self):
+        async def run():
+            aclient = _client(lambda r: httpx.Response(503, text="busy"))
+            try:
+                await aclient.get_order_book("1")
+            finally:
+                await aclient.aclose()
+
+        try:
+            asyncio.run(run())
+            assert False, "expected ClobHTTPError"
+        except RuntimeError as e:
+            assert "503" in str(e)
+
+
+class TestGetOrders:
+    def test_follows_cursor(self):
+        pages = {
+            "MA==": {"data": [{"id": "a"}], "next_cursor": "MQ=="},
+            "MQ==": {"data": [{"id": "b"}], "next_cursor": "LTE="},
+        }
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            assert request.headers.get("POLY_API_KEY") == "k"
+            return httpx.Response(200, json=pages[request.url.params["next_cursor"]])
+
+        async def run():
+            aclient = _client(handler)
+            aclient._l2_headers = lambda *a, **kw: {"POLY_API_KEY": "k"}
+            try:
+                return await aclient.get_orders()
+            finally:
+                await aclient.aclose()
+
+        assert [o["id"] for o in asyncio.run(run())] == ["a", "b"]
+
+
+class TestPlaceOrdersAsync:
+    def _intents(self, market, n):
+        return [
+            OrderIntent(
+                market=market, token_id="111111", direction=Direction.UP,
+                price=Decimal("0.40") + Decimal(i) / 1000, size=Decimal("5"),
+                seconds_to_end=300, reason="GRID_INIT",
+            )
+            for i in range(n)
+        ]
+
+    def test_posts_fan_out_concurrently(self, sample_market):
+        in_flight = 0
+        peak = 0
+
+        async def post_order(order, ot):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+            return {"orderID": f"o-{id(order)}"}
+
+        aclient = MagicMock()
+        aclient.post_order = post_order
+        client = MagicMock()
+        client.create_order.side_effect = lambda args: object()
+
+        mgr = OrderManager(dry_run=False)
+        intents = self._intents(sample_market, 200)
+        placed = asyncio.run(mgr.place_orders_async(client, aclient, intents))
+
+        assert placed == 200
+        assert peak > 1
+        assert len(mgr._orders["111111"]) == 200
+
+    def test_failures_match_sync_bookkeeping(self, sample_market):
+        async def post_order(order, ot):
+            if order == "balance":
+                raise RuntimeError("not enough balance / allowance")
+            if order == "net":
+                raise RuntimeError("connection reset")
+            return {"status": "ok"}  # null orderId
+
+        aclient = MagicMock()
+        aclient.post_order = post_order
+        client = MagicMock()
+        client.create_order.side_effect = ["balance", "net", "nullid"]
+
+        mgr = OrderManager(dry_run=False)
+        intents = self._intents(sample_market, 3)
+        placed = asyncio.run(mgr.place_orders_async(client, aclient, intents))
+
+        assert placed == 0
+        # Network error and null orderId each leave a sentinel; balance error doesn't
+        states = mgr._orders["111111"]
+        assert len(states) == 2
+        assert all(s.order_id == "" for s in states)
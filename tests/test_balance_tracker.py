@@ -0,0 +1,189 @@
+"""Tests for the observer's chunked USDC transfer scanner."""
+
+from __future__ import annotations
+
+import threading
+
+from hexbytes import HexBytes
+
+from observer.balance_tracker import POLYMARKET_ADDRESSES, TRANSFER_TOPIC, BalanceTracker
+from observer.persistence.db import init_db, load_scan_cursor
+
+PROXY = "0x" + "ab" * 20
+OTHER = "0x" + "cd" * 20
+EXCHANGE = sorted(POLYMARKET_ADDRESSES)[0]
+
+
+def _topic(addr: str) -> HexBytes:
+    return HexBytes("0x" + "0" * 24 + addr[2:])
+
+
+def _log(block: int, tx: str, src: str, dst: str, amount: int, index: int = 0) -> dict:
+    return {"blockNumber": block, "transactionHash": HexBytes(tx), "logIndex": index,
+            "topics": [HexBytes(TRANSFER_TOPIC), _topic(src), _topic(dst)],
+            "data": HexBytes(amount.to_bytes(32, "big"))}
+
+
+class _FakeEth:
+    """get_logs honouring topic filters; rejects ranges over ``max_span`` blocks."""
+
+    def __init__(self, logs: list[dict], tip: int, max_span: int):
+        self.logs = logs
+        self.block_number = tip
+        self.max_span = max_span
+        self.queries: list[tuple[int, int]] = []
+        self.blocks_fetched: list[int] = []
+        self._lock = threading.Lock()
+
+    def get_logs(self, params):
+        a, b = params["fromBlock"], params["toBlock"]
+        with self._lock:
+            self.queries.append((a, b))
+        if b - a + 1 > self.max_span:
+            raise ValueError("query returned more than 10000 results")
+        topics = params["topics"]
+        out = []
+        for entry in self.logs:
+            if not a <= entry["blockNumber"] <= b:
+                continue
+            if all(t is None or HexBytes(t) == entry["topics"][i] for i, t in enumerate(topics)):
+                out.append(entry)
+        return out
+
+    def get_block(self, number):
+        with self._lock:
+            self.blocks_fetched.append(number)
+        return {"timestamp": 1_700_000_000 + number}
+
+
+class _FakeW3:
+    def __init__(self, eth):
+        self.eth = eth
+
+
+def _tracker(eth: _FakeEth, **kwargs) -> BalanceTracker:
+    tracker = BalanceTracker(PROXY, **kwargs)
+    tracker._w3 = _FakeW3(eth)
+    tracker._usdc_contract = object()
+    return tracker
+
+
+class TestTransferScan:
+    def test_filters_server_side_and_classifies(self, monkeypatch):
+        monkeypatch.delenv("POLYGON_RPC_URL", raising=False)
+        eth = _FakeEth([
+            _log(100, "0x01", EXCHANGE, PROXY, 2_500_000),
+            _log(150, "0x02", PROXY, OTHER, 10_000_000),
+            _log(150, "0x03", OTHER, "0x" + "ee" * 20, 1),     # not ours
+            _log(160, "0x04", PROXY, PROXY, 1_000_000, index=3),  # self-transfer, both filters
+        ], tip=200, max_span=10_000)
+        tracker = _tracker(eth, chunk_blocks=1000)
+
+        transfers = tracker.scan_transfers(0, 200)
+
+        assert [(t["tx_hash"], t["transfer_type"], t["amount"]) for t in transfers] == [
+            ("0x01", "rebate", 2.5), ("0x02", "withdrawal", 10.0), ("0x04", "withdrawal", 1.0),
+        ]
+        assert transfers[0]["ts"] == 1_700_000_100
+        assert transfers[2]["log_index"] == 3
+        assert sorted(eth.blocks_fetched) == [100, 150, 160]
+        assert len(eth.queries) == 2  # one range, two topic filters
+
+        tracker.scan_transfers(0, 200)
+        assert sorted(eth.blocks_fetched) == [100, 150, 160]  # timestamps cached
+
+    def test_adaptive_chunks_and_cursor(self, monkeypatch):
+        monkeypatch.delenv("POLYGON_RPC_URL", raising=False)
+        logs = [_log(b, f"0x{b:04x}", OTHER, PROXY, 1_000_000) for b in range(1000, 5000, 250)]
+        eth = _FakeEth(logs, tip=4999, max_span=500)
+        tracker = _tracker(eth, chunk_blocks=2000, lookback_blocks=4000)
+
+        transfers = tracker.scan_new_transfers()
+
+        assert len(transfers) == len(logs)
+        assert tracker.transfer_cursor == 5000
+        assert tracker._chunk_blocks == 500  # shrunk to the span that worked
+
+        eth.block_number = 5999
+        eth.logs.append(_log(5500, "0x5500", OTHER, PROXY, 1_000_000))
+        eth.queries.clear()
+        assert [t["tx_hash"] for t in tracker.scan_new_transfers()] == ["0x5500"]
+        assert min(a for a, _ in eth.queries) == 5000
+        assert tracker.transfer_cursor == 6000
+
+    def test_failed_chunk_holds_cursor(self, monkeypatch):
+        monkeypatch.delenv("POLYGON_RPC_URL", raising=False)
+        eth = _FakeEth([_log(50, "0x01", OTHER, PROXY, 1)], tip=299, max_span=10_000)
+        real = eth.get_logs
+
+        def flaky(params):
+            if params["fromBlock"] == 100:
+                raise ConnectionError("node unavailable")
+            return real(params)
+
+        eth.get_logs = flaky
+        tracker = _tracker(eth, chunk_blocks=100, lookback_blocks=300)
+
+        assert [t["tx_hash"] for t in tracker.scan_new_transfers()] == ["0x01"]
+        assert tracker.transfer_cursor == 100
+
+
+def test_scan_cursor_round_trip(tmp_path):
+    import asyncio
+
+    from observer.persistence.writer import ObserverWriter
+
+    engine = init_db(f"sqlite:///{tmp_path / 'obs.db'}")
+    writer = ObserverWriter("s1")
+
+    async def write():
+        await writer.enqueue_scan_cursor("usdc_transfers:0xab", 100)
+        await writer.enqueue_scan_cursor("usdc_transfers:0xab", 250)
+        await writer._flush()
+
+    asyncio.run(write())
+    assert load_scan_cursor(engine, "usdc_transfers:0xab") == 250
+    assert load_scan_cursor(engine, "other") == 0
+
+
+def test_transfers_keyed_by_tx_and_log_index(tmp_path):
+    import asyncio
+
+    from sqlalchemy import create_engine, func, select, text
+
+    from observer.persistence.schema import obs_usdc_transfers
+    from observer.persistence.writer import ObserverWriter
+
+    url = f"sqlite:///{tmp_path / 'obs.db'}"
+    legacy = create_engine(url)
+    with legacy.begin() as conn:  # schema from before log_index existed
+        conn.execute(text(
+            "CREATE TABLE obs_usdc_transfers (id INTEGER PRIMARY KEY, ts FLOAT NOT NULL, "
+            "tx_hash VARCHAR(80) UNIQUE, from_address VARCHAR(50), to_address VARCHAR(50), "
+            "amount FLOAT, block_number INTEGER, transfer_type VARCHAR(20), "
+            "session_id VARCHAR(50))"
+        ))
+        conn.execute(text("INSERT INTO obs_usdc_transfers (ts, tx_hash) VALUES (1, '0xold')"))
+    legacy.dispose()
+
+    engine = init_db(url)
+    writer = ObserverWriter("s1")
+    two_in_one_tx = [
+        {"ts": 2, "tx_hash": "0x01", "log_index": 3, "amount": 1.0},
+        {"ts": 2, "tx_hash": "0x01", "log_index": 7, "amount": 2.0},
+    ]
+
+    async def write():
+        await writer.enqueue_usdc_transfers(two_in_one_tx)
+        await writer._flush()
+        await writer.enqueue_usdc_transfers(two_in_one_tx[:1])  # re-scanned duplicate
+        await writer._flush()
+
+    asyncio.run(write())
+    with engine.connect() as conn:
+        rows = conn.execute(
+            select(obs_usdc_transfers.c.tx_hash, obs_usdc_transfers.c.log_index)
+            .order_by(obs_usdc_transfers.c.id)
+        ).all()
+        assert conn.execute(select(func.count()).select_from(obs_usdc_transfers)).scalar() == 3
+    assert [tuple(r) for r in rows] == [("0xold", None), ("0x01", 3), ("0x01", 7)]
@@ -0,0 +1,64 @@
+"""Tests for ClockSync offset/RTT estimation."""
+
+from __future__ import annotations
+
+import time
+from unittest.mock import patch
+
+import pytest
+
+from shared.clock import MAX_SAMPLE_RTT_SEC, ClockSource, ClockSync
+
+
+def _sync(**resolutions):
+    return ClockSync([
+        ClockSource(name, lambda: None, resolution_s=res) for name, res in resolutions.items()
+    ])
+
+
+class TestClockSync:
+    def test_offset_from_midpoint(self):
+        clock = _sync(clob=0.0)
+        # Request left at 100.0, came back at 100.2; server said 105.1 at the midpoint
+        assert clock.record("clob", 100.0, 105.1, 100.2)
+        assert clock.offset_s == pytest.approx(5.0)
+        assert clock.estimate("clob").rtt_s == pytest.approx(0.2)
+
+    def test_whole_second_truncation_corrected(self):
+        clock = _sync(clob=1.0)
+        # True offset 0; server truncates 100.7 → 100
+        clock.record("clob", 100.6, 100.0, 100.8)
+        assert clock.offset_s == pytest.approx(-0.2)
+
+    def test_ewma_converges(self):
+        clock = _sync(clob=0.0)
+        clock.record("clob", 0.0, 10.0, 0.0)  # outlier first sample
+        for i in range(50):
+            t = 1000.0 + i
+            clock.record("clob", t, t + 2.0, t)
+        assert clock.offset_s == pytest.approx(2.0, abs=0.01)
+
+    def test_slow_samples_rejected(self):
+        clock = _sync(clob=0.0)
+        assert not clock.record("clob", 0.0, 50.0, MAX_SAMPLE_RTT_SEC + 0.1)
+        assert clock.estimate("clob").samples == 0
+        assert clock.offset_s == 0.0
+
+    def test_precise_source_dominates(self):
+        clock = _sync(clob=0.0, rpc=2.0)
+        clock.record("clob", 100.0, 101.0, 100.0)   # offset +1.0, tight
+        clock.record("rpc", 100.0, 99.0, 100.0)     # offset 0.0 after +1s bias, coarse
+        assert 0.9 < clock.offset_s <= 1.0
+
+    def test_now_applies_offset(self):
+        clock = _sync(clob=0.0)
+        clock.record("clob", 100.0, 103.0, 100.0)
+        with patch("shared.clock.time.time", return_value=500.0):
+            assert clock.now() == pytest.approx(503.0)
+
+    def test_failed_fetch_ignored(self):
+        def boom():
+            raise ConnectionError("down")
+        clock = ClockSync([ClockSource("clob", boom)])
+        assert clock.sample("clob") is False
+        assert clock.now() == pytest.approx(time.time(), abs=0.5)
@@ -0,0 +1,135 @@
+"""Tests for GasOracle and EIP-1559 pricing in the Safe send path."""
+
+from __future__ import annotations
+
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from shared.gas import MIN_PRIORITY_FEE_WEI, GasOracle, batch_gas_kind, gas_kind
+
+GWEI = 10**9
+
+
+def _w3(base_gwei=40, tips_gwei=((30, 35, 60), (32, 40, 80), (31, 38, 70))):
+    w3 = MagicMock()
+    w3.eth.fee_history.return_value = {
+        "baseFeePerGas": [base_gwei * GWEI] * len(tips_gwei) + [base_gwei * GWEI],
+        "reward": [[t * GWEI for t in row] for row in tips_gwei],
+    }
+    return w3
+
+
+class TestFees:
+    def test_urgency_picks_percentile(self):
+        oracle = GasOracle(_w3())
+        normal = oracle.fees()
+        high = oracle.fees("high")
+
+        assert normal.max_priority_fee_per_gas == 38 * GWEI  # median of 35/40/38
+        assert high.max_priority_fee_per_gas == 70 * GWEI
+        assert normal.max_fee_per_gas == 2 * 40 * GWEI + 38 * GWEI
+        assert normal.expected_price == 78 * GWEI
+
+    def test_priority_floor(self):
+        oracle = GasOracle(_w3(tips_gwei=((1, 1, 1),)))
+        assert oracle.fees("low").max_priority_fee_per_gas == MIN_PRIORITY_FEE_WEI
+
+    def test_history_cached_within_ttl(self):
+        w3 = _w3()
+        oracle = GasOracle(w3, fee_ttl_s=60)
+        oracle.fees()
+        oracle.fees("high")
+        assert w3.eth.fee_history.call_count == 1
+
+    def test_unknown_urgency_rejected(self):
+        with pytest.raises(ValueError):
+            GasOracle(_w3(), urgency="ludicrous")
+
+
+class TestGasLimits:
+    def test_estimate_cached_per_kind(self):
+        oracle = GasOracle(_w3())
+        estimate = MagicMock(return_value=100_000)
+
+        assert oracle.gas_limit(gas_kind("merge", False), estimate, 500_000) == 125_000
+        assert oracle.gas_limit(gas_kind("merge", False), estimate, 500_000) == 125_000
+        assert estimate.call_count == 1
+        # Neg-risk merges are a different kind
+        oracle.gas_limit(gas_kind("merge", True), estimate, 500_000)
+        assert estimate.call_count == 2
+
+    def test_reestimates_after_ttl(self):
+        oracle = GasOracle(_w3(), estimate_ttl_s=60)
+        with patch("shared.gas.time.monotonic", return_value=100.0):
+            oracle.gas_limit("merge:ctf", MagicMock(return_value=100_000), 500_000)
+        with patch("shared.gas.time.monotonic", return_value=159.0):
+            assert oracle.gas_limit("merge:ctf", MagicMock(return_value=200_000),
+                                    500_000) == 125_000
+        with patch("shared.gas.time.monotonic", return_value=161.0):
+            assert oracle.gas_limit("merge:ctf", MagicMock(return_value=200_000),
+                                    500_000) == 250_000
+
+    def test_batch_kind_counts_calls_per_kind(self):
+        assert batch_gas_kind(["merge:ctf", "merge:negrisk", "merge:ctf"]) == (
+            "multisend:merge:ctf*2,merge:negrisk*1"
+        )
+        assert batch_gas_kind(["merge:ctf", ""]) == ""
+
+    def test_revert_invalidates_cached_limit(self):
+        from shared.redeem import NonceManager, PendingTx, _wait_for_receipt
+
+        w3 = _w3()
+        w3.eth.get_transaction_receipt.return_value = {"status": 0, "gasUsed": 125_000}
+        oracle = GasOracle(w3)
+        oracle.gas_limit("redeem:ctf", MagicMock(return_value=100_000), 400_000)
+        pending = PendingTx("0x1", GWEI, "0x" + "bb" * 20, "0x" + "aa" * 20, "redeem:ctf")
+        with patch("shared.redeem.time.sleep"), pytest.raises(RuntimeError, match="reverted"):
+            _wait_for_receipt(w3, pending, NonceManager(), oracle)
+
+        assert oracle.gas_limit("redeem:ctf", None, 400_000) == 400_000
+
+    def test_failed_estimate_not_cached(self):
+        oracle = GasOracle(_w3())
+        failing = MagicMock(side_effect=ValueError("GS026"))
+        assert oracle.gas_limit("redeem:ctf", failing, 400_000) == 400_000
+        assert oracle.gas_limit("redeem:ctf", None, 400_000) == 400_000
+
+
+class TestSendWithOracle:
+    def test_eip1559_fields_and_cached_limit(self):
+        from shared.redeem import _send_safe_tx
+
+        w3 = _w3()
+        w3.eth.get_transaction_count.return_value = 0
+        w3.eth.estimate_gas.return_value = 100_000
+        w3.eth.send_raw_transaction.return_value = b"\x01" * 32
+        w3.eth.get_transaction_receipt.return_value = {
+            "status": 1, "gasUsed": 90_000, "effectiveGasPrice": 70 * GWEI,
+        }
+        safe = MagicMock()
+        safe.functions.nonce.return_value.call.return_value = 0
+        safe.functions.getTransactionHash.return_value.call.return_value = b"\x00" * 32
+        safe.encode_abi.return_value = "0x" + "00" * 32
+        w3.eth.contract.return_value = safe
+        account = MagicMock()
+        account.address = "0x" + "aa" * 20
+        account.sign_transaction.return_value = MagicMock(raw_transaction=b"\x00")
+
+        oracle = GasOracle(w3, fee_ttl_s=60)
+        with patch("shared.redeem.Account") as mock_account, \
+             patch("shared.redeem.time.sleep"):
+            mock_account.unsafe_sign_hash.return_value = MagicMock(r=1, s=2, v=27)
+            for _ in range(2):
+                result = _send_safe_tx(
+                    w3, account, "0x" + "bb" * 20, "0x" + "cc" * 20, b"\x00",
+                    gas_oracle=oracle, kind="redeem:ctf",
+                )
+
+        tx = account.sign_transaction.call_args.args[0]
+        assert "gasPrice" not in tx
+        assert tx["maxPriorityFeePerGas"] == 38 * GWEI
+        assert tx["gas"] == 125_000
+        assert w3.eth.estimate_gas.call_count == 1  # second tx reuses the cached limit
+        assert w3.eth.fee_history.call_count == 1
+        assert result.gas_cost_wei == 90_000 * 70 * GWEI  # effective, not max fee
@@ -364,3 +364,149 @@ class TestCheckPendingOrdersBulk:
         with patch.object(mgr, "check_pending_orders") as mock_check:
             mgr.check_pending_orders_bulk(mock_client, on_fill=None)
             mock_check.assert_called_once_with(mock_client, on_fill=None)
+
+
+# -----------------------------------------------------------------
+# Warm start from market cache
+# -----------------------------------------------------------------
+
+
+class TestWarmStart:
+    def _market(self, slug: str, end_offset: float) -> GabagoolMarket:
+        return GabagoolMarket(
+            slug=slug,
+            up_token_id=f"{slug}-up",
+            down_token_id=f"{slug}-down",
+            end_time=time.time() + end_offset,
+            market_type="updown-15m",
+            condition_id="0xabc",
+            neg_risk=True,
+        )
+
+    def test_cache_roundtrip_keeps_first_seen(self, tmp_path):
+        from shared.market_cache import MarketCache
+
+        cache = MarketCache(str(tmp_path / "markets.db"))
+        market = self._market("btc-updown-15m-1", 600)
+        cache.save([market], now=100.0)
+        cache.save([market], now=200.0)  # re-discovery must not reset first_seen
+
+        loaded = cache.load(time.time())
+        assert loaded == [(market, 100.0)]
+
+    def test_expired_markets_not_loaded(self, tmp_path):
+        from shared.market_cache import MarketCache
+
+        cache = MarketCache(str(tmp_path / "markets.db"))
+        cache.save([self._market("btc-updown-15m-old", -60)])
+        assert cache.load(time.time()) == []
+
+    def test_engine_restores_markets_without_discovery(self, tmp_path):
+        from grid_maker.engine import GridMakerEngine
+        from shared.market_cache import MarketCache
+
+        path = str(tmp_path / "markets.db")
+        market = self._market("btc-updown-15m-2", 600)
+        MarketCache(path).save([market], now=time.time() - 60)
+
+        engine = GridMakerEngine(None, GridMakerConfig(market_cache_path=path))
+        with patch("grid_maker.engine.discover_markets") as mock_discover:
+            engine._warm_start(time.time())
+            mock_discover.assert_not_called()
+
+        assert engine._markets == [market]
+        # Entry delay already elapsed for a market seen before the restart
+        assert time.time() - engine._first_seen_at[market.slug] >= 60
+
+    def test_market_ended_offline_queues_redemption(self, tmp_path):
+        from grid_maker.engine import GridMakerEngine
+        from shared.market_cache import MarketCache
+
+        path = str(tmp_path / "markets.db")
+        ended = self._market("btc-updown-15m-ended", -600)
+        empty = self._market("btc-updown-15m-empty", -300)
+        MarketCache(path).save([ended, empty])
+
+        engine = GridMakerEngine(None, GridMakerConfig(market_cache_path=path))
+        engine._filled_shares[ended.up_token_id] = Decimal("5")  # replayed from the journal
+        engine._warm_start(time.time())
+
+        assert engine._markets == []
+        assert list(engine._pending_redemptions) == [ended.slug]
+        assert engine._pending_redemptions[ended.slug].up_shares == Decimal("5")
+
+
+class TestChainBatch:
+    """Merges and redeems due in the same tick ride one MultiSend job."""
+
+    def _engine(self):
+        from grid_maker.engine import GridMakerEngine
+
+        cfg = GridMakerConfig(dry_run=False, market_cache_path="", min_merge_shares=Decimal("1"))
+        return GridMakerEngine(MagicMock(), cfg, w3=MagicMock(), account=MagicMock(),
+                               funder_address="0x" + "bb" * 20)
+
+    def _market(self, i):
+        return GabagoolMarket(
+            slug=f"btc-updown-15m-{i}", up_token_id=f"u{i}", down_token_id=f"d{i}",
+            end_time=time.time() - 600, market_type="updown-15m",
+            condition_id="0x" + f"{i:02x}" * 32,
+        )
+
+    def test_merges_and_redeems_share_one_job(self):
+        from concurrent.futures import Future
+
+        from grid_maker.engine import _PendingRedemption
+        from shared.redeem import BatchResult, TxResult
+
+        engine = self._engine()
+        markets = [self._market(i) for i in range(20)]
+        engine._markets = markets
+        for m in markets:
+            engine._filled_shares[m.up_token_id] = Decimal("10")
+            engine._filled_shares[m.down_token_id] = Decimal("10")
+        redeem_market = self._market(99)
+        engine._pending_redemptions[redeem_market.slug] = _PendingRedemption(
+            market=redeem_market, up_shares=Decimal("5"), down_shares=ZERO,
+            eligible_at=0.0,
+        )
+
+        fut: Future = Future()
+        with patch.object(engine._chain_executor, "submit", return_value=fut) as submit:
+            now = time.time()
+            engine._batch_merge(now)
+            engine._check_redemptions(now)
+            engine._submit_chain_batch()
+
+        assert submit.call_count == 1
+        calls = submit.call_args[0][4]
+        assert len(calls) == 21
+        # Nothing settled until the tx confirms
+        assert engine._filled_shares[markets[0].up_token_id] == Decimal("10")
+
+        fut.set_result([BatchResult(calls, TxResult("0xabc", 0), None)])
+        engine._harvest_chain_job(time.time())
+
+        assert engine._chain_job is None
+        assert all(engine._filled_shares[m.up_token_id] == ZERO for m in markets)
+        assert redeem_market.slug not in engine._pending_redemptions
+        assert engine._session_pnl == Decimal("205")
+
+    def test_failed_batch_counts_redeem_attempt(self):
+        from concurrent.futures import Future
+
+        from grid_maker.engine import _PendingRedemption
+
+        engine = self._engine()
+        m = self._market(1)
+        engine._pending_redemptions[m.slug] = _PendingRedemption(
+            market=m, up_shares=Decimal("5"), down_shares=ZERO, eligible_at=0.0,
+        )
+        fut: Future = Future()
+        with patch.object(engine._chain_executor, "submit", return_value=fut):
+            engine._check_redemptions(time.time())
+            engine._submit_chain_batch()
+        fut.set_exception(RuntimeError("approval failed"))
+        engine._harvest_chain_job(time.time())
+
+        assert engine._pending_redemptions[m.slug].attempts == 1
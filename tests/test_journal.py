@@ -0,0 +1,144 @@
+"""Tests for the engine state journal and restart restore."""
+
+from __future__ import annotations
+
+from decimal import Decimal
+from unittest.mock import MagicMock
+
+from grid_maker.config import GridMakerConfig
+from grid_maker.journal import StateJournal, decode_value, encode_value, frame, read_frames
+from shared.models import Direction, GabagoolMarket, OrderState
+
+
+def _journal(tmp_path, **kwargs) -> StateJournal:
+    journal = StateJournal(str(tmp_path), **kwargs)
+    journal.load()
+    return journal
+
+
+class TestCodec:
+    def test_round_trip(self):
+        value = {
+            "a": [None, True, False, 0, -1, 2**70, -(2**40), 1.5, "ü", Decimal("0.0100")],
+            7: {"nested": []},
+        }
+        assert decode_value(encode_value(value)) == value
+        assert str(decode_value(encode_value(Decimal("0.0100")))) == "0.0100"
+
+    def test_read_frames_stops_at_torn_or_corrupt_tail(self):
+        good = frame(b"one") + frame(b"two")
+        assert read_frames(good + frame(b"three")[:-1]) == ([b"one", b"two"], len(good))
+        corrupt = bytearray(frame(b"xyz"))
+        corrupt[-1] ^= 0xFF
+        assert read_frames(good + bytes(corrupt)) == ([b"one", b"two"], len(good))
+
+
+class TestStateJournal:
+    def test_diff_writes_only_changes_and_replays(self, tmp_path):
+        journal = _journal(tmp_path)
+        journal.start()
+        journal.submit({"filled": {"a": Decimal("1"), "b": Decimal("2")}})
+        journal.close()
+        assert journal.records_written == 2
+
+        journal = _journal(tmp_path)
+        assert journal.load() == {"filled": {"a": Decimal("1"), "b": Decimal("2")}}
+        journal.start()
+        journal.submit({"filled": {"a": Decimal("1"), "c": Decimal("3")}})
+        journal.close()
+        assert journal.records_written == 2  # put c, del b
+
+        assert StateJournal(str(tmp_path)).load() == {
+            "filled": {"a": Decimal("1"), "c": Decimal("3")},
+        }
+
+    def test_recovers_from_torn_journal_without_snapshot(self, tmp_path):
+        journal = _journal(tmp_path)
+        journal._file = open(journal._journal_path, "ab")  # writer thread not needed
+        journal.submit({"meta": {"pnl": Decimal("5")}})
+        journal._drain()
+        journal.submit({"meta": {"pnl": Decimal("6")}})
+        journal._drain()
+        journal._file.close()
+        # Simulate a crash mid-append
+        with open(journal._journal_path, "ab") as f:
+            f.write(frame(encode_value(["p", "meta", "pnl", Decimal("7")]))[:-2])
+
+        size_before = journal._journal_path.stat().st_size
+        state = StateJournal(str(tmp_path)).load()
+        assert state == {"meta": {"pnl": Decimal("6")}}
+        assert journal._journal_path.stat().st_size < size_before
+
+    def test_compaction_truncates_journal(self, tmp_path):
+        journal = _journal(tmp_path, snapshot_every=3)
+        journal._file = open(journal._journal_path, "ab")
+        journal.submit({"filled": {str(i): Decimal(i) for i in range(5)}})
+        journal._drain()
+        assert journal.snapshots_written == 1
+        assert journal._journal_path.stat().st_size == 0
+        journal._file.close()
+
+        assert StateJournal(str(tmp_path)).load() == {
+            "filled": {str(i): Decimal(i) for i in range(5)},
+        }
+
+
+class TestEngineRestore:
+    def _engine(self, **overrides):
+        from grid_maker.engine import GridMakerEngine
+
+        cfg = GridMakerConfig(dry_run=False, market_cache_path="", **overrides)
+        return GridMakerEngine(MagicMock(), cfg)
+
+    def test_state_round_trips_through_journal(self, tmp_path):
+        from grid_maker.engine import _PendingRedemption
+
+        market = GabagoolMarket(
+            slug="btc-updown-15m-1", up_token_id="u1", down_token_id="d1",
+            end_time=1000.0, market_type="updown-15m", condition_id="0x01", neg_risk=True,
+        )
+        engine = self._engine()
+        engine._filled_shares = {"u1": Decimal("12.5")}
+        engine._grid_spec = {"u1": [(Decimal("0.01"), Decimal("5"))]}
+        engine._pending_redemptions["btc-updown-15m-1"] = _PendingRedemption(
+            market=market, up_shares=Decimal("12.5"), down_shares=Decimal("0"),
+            eligible_at=1060.0, attempts=1, last_attempt_at=1061.0,
+        )
+        engine._first_seen_at = {"btc-updown-15m-1": 900.0}
+        engine._completed_markets = {"btc-updown-15m-1"}
+        engine._session_pnl = Decimal("3.21")
+        engine._order_mgr._track(OrderState(
+            order_id="0xabc", market=market, token_id="d1", direction=Direction.DOWN,
+            price=Decimal("0.42"), size=Decimal("5"), placed_at=950.0,
+            matched_size=Decimal("2"),
+        ))
+        engine._order_mgr._track(OrderState(
+            order_id="", market=market, token_id="d1", direction=Direction.DOWN,
+            price=Decimal("0.43"), size=Decimal("5"), placed_at=950.0,
+        ))
+
+        journal = _journal(tmp_path)
+        journal.start()
+        journal.submit(engine._state_view())
+        journal.close()
+
+        restored = self._engine()
+        restored._apply_journal_state(StateJournal(str(tmp_path)).load())
+
+        assert restored._filled_shares == engine._filled_shares
+        assert restored._grid_spec == engine._grid_spec
+        assert restored._pending_redemptions == engine._pending_redemptions
+        assert restored._first_seen_at == engine._first_seen_at
+        assert restored._completed_markets == engine._completed_markets
+        assert restored._session_pnl == Decimal("3.21")
+        orders = restored._order_mgr.get_all_orders_for_token("d1")
+        assert [(o.order_id, o.market, o.direction, o.matched_size) for o in orders] == [
+            ("0xabc", market, Direction.DOWN, Decimal("2")),
+        ]
+
+    def test_changed_bankroll_not_overridden(self):
+        engine = self._engine(bankroll_usd=Decimal("500"))
+        engine._apply_journal_state({"meta": {
+            "bankroll_usd": Decimal("200"), "effective_bankroll": Decimal("250"),
+        }})
+        assert engine._effective_bankroll == Decimal("500")
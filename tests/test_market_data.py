@@ -0,0 +1,136 @@
+"""Tests for shared market discovery — bulk Gamma lookup and slug prediction."""
+
+from __future__ import annotations
+
+import time
+from unittest.mock import MagicMock, patch
+
+from shared.market_data import SlugPredictor, fetch_markets_by_slugs
+
+
+def _event(slug: str, closed: bool = False) -> dict:
+    return {
+        "slug": slug,
+        "closed": closed,
+        "endDate": None,
+        "markets": [{
+            "clobTokenIds": f'["{slug}-up", "{slug}-down"]',
+            "outcomes": '["Up", "Down"]',
+            "conditionId": f"0x{slug}",
+            "negRisk": False,
+        }],
+    }
+
+
+def _resp(events: list[dict], status: int = 200) -> MagicMock:
+    resp = MagicMock()
+    resp.status_code = status
+    resp.json.return_value = events
+    return resp
+
+
+class TestFetchMarketsBySlugs:
+    @patch("shared.market_data.requests.get")
+    def test_single_request_for_all_slugs(self, mock_get):
+        now = int(time.time()) // 300 * 300
+        slugs = [f"btc-updown-5m-{now + i * 300}" for i in range(4)]
+        mock_get.return_value = _resp([_event(slugs[0]), _event(slugs[1])])
+
+        found = fetch_markets_by_slugs(slugs)
+
+        assert mock_get.call_count == 1
+        params = mock_get.call_args.kwargs["params"]
+        assert [v for k, v in params if k == "slug"] == slugs
+        assert set(found) == {slugs[0], slugs[1]}
+        assert found[slugs[0]].up_token_id == f"{slugs[0]}-up"
+
+    @patch("shared.market_data.requests.get")
+    def test_closed_event_maps_to_none(self, mock_get):
+        slug = f"btc-updown-5m-{int(time.time()) // 300 * 300}"
+        mock_get.return_value = _resp([_event(slug, closed=True)])
+        found = fetch_markets_by_slugs([slug])
+        assert slug in found and found[slug] is None
+
+    @patch("shared.market_data.requests.get")
+    def test_http_error_returns_none(self, mock_get):
+        mock_get.return_value = _resp([], status=500)
+        assert fetch_markets_by_slugs(["btc-updown-5m-1"]) is None
+
+
+class TestSlugPredictor:
+    @patch("shared.market_data.requests.get")
+    def test_known_slugs_not_requeried(self, mock_get):
+        now = time.time()
+        start = int(now) // 300 * 300
+        slugs = [f"btc-updown-5m-{start + i * 300}" for i in range(3)]
+        mock_get.return_value = _resp([_event(s) for s in slugs])
+
+        predictor = SlugPredictor()
+        first = predictor.resolve(slugs, now)
+        second = predictor.resolve(slugs, now + 1)
+
+        assert mock_get.call_count == 1
+        assert [m.slug for m in first] == [m.slug for m in second]
+
+    @patch("shared.market_data.requests.get")
+    def test_missing_slug_retried_after_backoff(self, mock_get):
+        now = time.time()
+        slug = f"btc-updown-5m-{int(now) // 300 * 300 + 600}"
+        mock_get.return_value = _resp([])
+
+        predictor = SlugPredictor(miss_retry_sec=30)
+        predictor.resolve([slug], now)
+        predictor.resolve([slug], now + 10)
+        assert mock_get.call_count == 1
+
+        predictor.resolve([slug], now + 31)
+        assert mock_get.call_count == 2
+
+    @patch("shared.market_data.requests.get")
+    def test_incomplete_event_resolves_on_later_lookup(self, mock_get):
+        now = time.time()
+        slug = f"btc-updown-5m-{int(now) // 300 * 300 + 600}"
+        incomplete = _event(slug)
+        del incomplete["markets"][0]["clobTokenIds"]
+        mock_get.return_value = _resp([incomplete])
+
+        predictor = SlugPredictor(miss_retry_sec=30)
+        assert predictor.resolve([slug], now) == []
+        assert predictor.pending([slug], now + 10) == []
+
+        mock_get.return_value = _resp([_event(slug)])
+        markets = predictor.resolve([slug], now + 31)
+        assert mock_get.call_count == 2
+        assert [m.up_token_id for m in markets] == [f"{slug}-up"]
+
+    def test_failed_lookup_does_not_record_miss(self):
+        predictor = SlugPredictor()
+        with patch("shared.market_data.fetch_markets_by_slugs", return_value=None):
+            predictor.resolve(["btc-updown-5m-1"], 0.0)
+        assert predictor.pending(["btc-updown-5m-1"], 1.0) == ["btc-updown-5m-1"]
+
+
+def test_tag_search_results_feed_the_predictor(monkeypatch):
+    from grid_maker import market_data as gm_md
+    from shared.models import GabagoolMarket
+
+    now = time.time()
+    hour = int(now // 3600) * 3600
+    found = GabagoolMarket(
+        slug=f"btc-updown-1h-{hour}", up_token_id="u", down_token_id="d",
+        end_time=now + 600, market_type="updown-1h", condition_id="0xc",
+    )
+    predictor = SlugPredictor(miss_retry_sec=0.0)
+    queried: list[list[str]] = []
+    monkeypatch.setattr(gm_md, "_predictor", predictor)
+    monkeypatch.setattr(gm_md, "_tag_search_cache", {})
+    monkeypatch.setattr(gm_md, "_search_1h_markets", lambda asset: [found])
+    monkeypatch.setattr(
+        "shared.market_data.fetch_markets_by_slugs",
+        lambda slugs: queried.append(slugs) or {},
+    )
+
+    assert gm_md.discover_markets(("bitcoin",), ("1h",)) == [found]
+    gm_md.discover_markets(("bitcoin",), ("1h",))
+    assert found.slug in queried[0]
+    assert found.slug not in queried[1]  # known from the tag search
@@ -0,0 +1,129 @@
+"""Tests for the gas-aware merge scheduler and its replay harness."""
+
+from __future__ import annotations
+
+import time
+from decimal import Decimal
+from unittest.mock import MagicMock
+
+from grid_maker.config import GridMakerConfig
+from grid_maker.merge_scheduler import (
+    FillEvent,
+    MergeCandidate,
+    MergePolicy,
+    batch_gas,
+    decide_merge,
+    fills_from_csv_rows,
+    fixed_interval_policy,
+    replay,
+)
+from shared.models import GabagoolMarket
+
+GWEI = 10**9
+
+
+def _decide(candidates, since_last_s=600.0, bankroll=Decimal("500"), gwei=30, **policy):
+    return decide_merge(
+        candidates,
+        since_last_s=since_last_s,
+        bankroll=bankroll,
+        gas_price_wei=None if gwei is None else gwei * GWEI,
+        native_price_usd=Decimal("0.40"),
+        policy=MergePolicy(**policy),
+    )
+
+
+class TestDecideMerge:
+    def test_batch_gas_pays_overhead_per_chunk(self):
+        assert batch_gas([100, 100], overhead=50, max_batch_gas=1000) == 250
+        assert batch_gas([400, 400, 400], overhead=100, max_batch_gas=1000) == 1400
+
+    def test_nothing_eligible(self):
+        assert _decide([MergeCandidate("a", Decimal("5"))]).reason == "none"
+
+    def test_cheap_gas_merges_early(self):
+        # 260k gas × 30 gwei × $0.40 ≈ $0.003 against $100 freed
+        d = _decide([MergeCandidate("a", Decimal("100"))])
+        assert (d.merge, d.reason, d.slugs) == (True, "cheap", ("a",))
+
+    def test_expensive_gas_waits_unless_capital_bound(self):
+        small = [MergeCandidate("a", Decimal("20"))]
+        d = _decide(small, gwei=500, cheap_gas_ratio=Decimal("0.001"))
+        assert (d.merge, d.reason) == (False, "expensive")
+        # Same gas, but the pairs tie up most of a small bankroll
+        d = _decide(small, gwei=500, bankroll=Decimal("40"))
+        assert (d.merge, d.reason) == (True, "capital")
+
+    def test_batching_amortizes_overhead(self):
+        one = _decide([MergeCandidate("a", Decimal("10"))], gwei=200)
+        many = _decide([MergeCandidate(str(i), Decimal("10")) for i in range(20)], gwei=200)
+        assert many.gas_ratio < one.gas_ratio
+
+    def test_interval_backstop_and_cooldown(self):
+        c = [MergeCandidate("a", Decimal("20"))]
+        assert _decide(c, since_last_s=30).reason == "cooldown"
+        d = _decide(c, since_last_s=3600, gwei=None)
+        assert (d.merge, d.reason) == (True, "interval")
+        assert _decide(c, gwei=None).reason == "no_gas_quote"
+
+
+class TestReplay:
+    def _fills(self):
+        return [
+            FillEvent(0, "m1", "UP", Decimal("60")),
+            FillEvent(5, "m1", "DOWN", Decimal("60")),
+            FillEvent(100, "m2", "UP", Decimal("30")),
+            FillEvent(1000, "m2", "DOWN", Decimal("30")),
+        ]
+
+    def test_fixed_interval_matches_old_sweep(self):
+        r = replay(
+            self._fills(), fixed_interval_policy(3600), bankroll=Decimal("500"),
+            gas_price_wei=30 * GWEI, native_price_usd=Decimal("0.40"),
+        )
+        assert r.merged_shares == Decimal("90")
+        assert r.end_locked_usd == 0
+
+    def test_scheduler_frees_capital_sooner(self):
+        kwargs = dict(bankroll=Decimal("500"), gas_price_wei=30 * GWEI,
+                      native_price_usd=Decimal("0.40"))
+        fixed = replay(self._fills(), fixed_interval_policy(3600), **kwargs)
+        sched = replay(self._fills(), MergePolicy(), **kwargs)
+        assert sched.merged_shares == fixed.merged_shares
+        assert sched.locked_usd_hours < fixed.locked_usd_hours
+
+    def test_fills_from_csv_rows(self):
+        rows = [
+            {"timestamp": ts, "marketName": "m", "action": action, "tokenName": token,
+             "tokenAmount": amount}
+            for ts, action, token, amount in [
+                ("20", "Buy", "Down", "3"), ("10", "Buy", "Up", "2.5"), ("30", "Merge", "", "2"),
+            ]
+        ]
+        assert fills_from_csv_rows(rows) == [
+            FillEvent(10.0, "m", "UP", Decimal("2.5")),
+            FillEvent(20.0, "m", "DOWN", Decimal("3")),
+        ]
+
+
+class TestEngineBatchMerge:
+    def test_waits_on_expensive_gas_then_merges_on_interval(self):
+        from grid_maker.engine import GridMakerEngine
+
+        cfg = GridMakerConfig(market_cache_path="", bankroll_usd=Decimal("10000"))
+        engine = GridMakerEngine(MagicMock(), cfg)
+        engine._merge_gas_price = lambda: 5000 * GWEI
+        m = GabagoolMarket(
+            slug="btc-updown-15m-1", up_token_id="u1", down_token_id="d1",
+            end_time=time.time() + 600, market_type="updown-15m", condition_id="0x01",
+        )
+        engine._markets = [m]
+        engine._filled_shares = {"u1": Decimal("20"), "d1": Decimal("25")}
+        now = time.time()
+        engine._last_batch_merge_at = now - 600
+
+        engine._batch_merge(now)
+        assert engine._filled_shares["u1"] == Decimal("20")
+
+        engine._batch_merge(now + 3000)  # hourly backstop
+        assert engine._filled_shares == {"u1": Decimal("0"), "d1": Decimal("5")}
@@ -0,0 +1,195 @@
+"""Tests for the observer's per-source scheduler."""
+
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+from observer.config import load_observer_config
+from observer.scheduler import RateBudget, SourceScheduler, next_delay
+
+
+class TestNextDelay:
+    def test_start_to_start_cadence(self):
+        assert next_delay(10, 2.5, 0, 0.0, 300) == 7.5
+        assert next_delay(10, 12.0, 0, 0.0, 300) == 0.0
+
+    def test_backoff_doubles_and_caps(self):
+        assert next_delay(10, 1.0, 1, 0.0, 300) == 20
+        assert next_delay(10, 1.0, 3, 0.0, 300) == 80
+        assert next_delay(10, 1.0, 10, 0.0, 300) == 300
+
+    def test_jitter_bounds(self):
+        assert next_delay(10, 0, 0, 0.1, 300, rng=lambda lo, hi: lo) == pytest.approx(9.0)
+        assert next_delay(10, 0, 0, 0.1, 300, rng=lambda lo, hi: hi) == pytest.approx(11.0)
+
+
+class TestSourceScheduler:
+    def test_slow_source_does_not_delay_fast_one(self):
+        fast_runs = 0
+        slow_started = asyncio.Event()
+
+        async def fast():
+            nonlocal fast_runs
+            fast_runs += 1
+
+        async def slow():
+            slow_started.set()
+            await asyncio.sleep(10)
+
+        async def main():
+            sched = SourceScheduler(jitter=0)
+            sched.add("fast", fast, 0.01, initial_delay_s=0)
+            sched.add("slow", slow, 0.01, initial_delay_s=0)
+            task = asyncio.create_task(sched.run())
+            await asyncio.sleep(0.2)
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+            return sched
+
+        sched = asyncio.run(main())
+        assert fast_runs >= 5
+        assert slow_started.is_set()
+        assert sched.stats()["slow"]["runs"] == 0
+
+    def test_failures_back_off_and_recover(self):
+        calls = 0
+
+        async def flaky():
+            nonlocal calls
+            calls += 1
+            if calls <= 2:
+                raise RuntimeError("etherscan 502")
+
+        async def main():
+            sched = SourceScheduler(jitter=0, max_backoff_s=0.04)
+            sched.add("flaky", flaky, 0.01, initial_delay_s=0)
+            task = asyncio.create_task(sched.run())
+            await asyncio.sleep(0.15)
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+            return sched.stats()["flaky"]
+
+        st = asyncio.run(main())
+        assert st["total_failures"] == 2
+        assert st["failures"] == 0
+        assert st["runs"] > 2
+
+
+class TestRateBudget:
+    def test_burst_then_sustained_rate(self, monkeypatch):
+        clock = [0.0]
+        slept: list[float] = []
+
+        async def fake_sleep(s):
+            slept.append(s)
+            clock[0] += s
+
+        async def main():
+            budget = RateBudget(2.0, burst=3, clock=lambda: clock[0])
+            for _ in range(5):
+                await budget.acquire()
+            return budget
+
+        monkeypatch.setattr("observer.scheduler.asyncio.sleep", fake_sleep)
+        budget = asyncio.run(main())
+        assert slept == [0.5, 0.5]
+        assert budget.waited_s == 1.0
+
+    def test_adapter_charges_every_request(self, monkeypatch):
+        import requests
+        from requests.adapters import HTTPAdapter
+
+        from observer.scheduler import BudgetAdapter
+
+        slept: list[float] = []
+        monkeypatch.setattr("observer.scheduler.time.sleep", slept.append)
+
+        def send(self, request, **kw):
+            resp = requests.Response()
+            resp.status_code, resp._content, resp.request = 200, b"ok", request
+            return resp
+
+        monkeypatch.setattr(HTTPAdapter, "send", send)
+        budget = RateBudget(1.0, burst=2, clock=lambda: 0.0)
+        http = requests.Session()
+        http.mount("https://", BudgetAdapter(budget))
+
+        for page in range(4):  # e.g. one poll paging through four requests
+            resp = http.get("https://data-api.example/activity", params={"offset": page})
+            assert resp.text == "ok"
+
+        assert budget.acquired == 4
+        assert slept == [1.0, 2.0]
+
+    def test_wallet_sources_share_one_budget(self):
+        runs = {"a": 0, "b": 0}
+
+        def source(name):
+            async def fn():
+                runs[name] += 1
+            return fn
+
+        async def main():
+            sched = SourceScheduler(jitter=0, budget=RateBudget(20.0, burst=2))
+            sched.add("a", source("a"), 0.001, initial_delay_s=0, cost=1)
+            sched.add("b", source("b"), 0.001, initial_delay_s=0, cost=1)
+            task = asyncio.create_task(sched.run())
+            await asyncio.sleep(0.25)
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+
+        asyncio.run(main())
+        assert runs["a"] >= 1 and runs["b"] >= 1
+        assert runs["a"] + runs["b"] <= 2 + 0.25 * 20 + 1
+
+
+def test_config_wallets():
+    cfg = load_observer_config({"observer": {"proxy_addresses": ["0xAA", "0xbb", "0xaa"]}})
+    assert cfg.wallets == ("0xaa", "0xbb")
+    assert load_observer_config({"observer": {"proxy_address": "0xCC"}}).wallets == ("0xcc",)
+
+
+def test_failing_activity_source_backs_off():
+    from types import SimpleNamespace
+    from unittest.mock import MagicMock
+
+    import requests
+
+    from observer.bot import _add_wallet_sources, _Wallet
+    from observer.poller import ActivityPoller
+
+    class _DownApi:
+        def __init__(self):
+            self.calls = 0
+
+        def get(self, url, params, timeout):
+            self.calls += 1
+            raise requests.ConnectionError("data-api unreachable")
+
+    api = _DownApi()
+    fields = {f: MagicMock() for f in _Wallet.__dataclass_fields__}
+    w = _Wallet(**{**fields, "proxy": "0xproxy", "poller": ActivityPoller("0xproxy", session=api)})
+    cfg = SimpleNamespace(
+        poll_interval_sec=0.01, role_decode_interval_sec=60,
+        balance_poll_interval_sec=60, transfer_scan_interval_sec=0,
+    )
+
+    async def main():
+        sched = SourceScheduler(jitter=0, max_backoff_s=10)
+        _add_wallet_sources(sched, cfg, w, tagged=False)
+        sched._sources = [s for s in sched._sources if s.name == "activity"]
+        sched._sources[0].initial_delay_s = 0
+        task = asyncio.create_task(sched.run())
+        await asyncio.sleep(0.2)
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+        return sched.stats()["activity"]
+
+    st = asyncio.run(main())
+    # 0.01s cadence would be ~20 polls; backing off 0.02, 0.04, 0.08 allows 4
+    assert st["failures"] == st["runs"] == api.calls
+    assert 2 <= api.calls <= 5
+    w.writer.enqueue_trades.assert_not_called()
@@ -0,0 +1,192 @@
+"""Tests for batched, cached role decoding in the observer's MergeDetector."""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+
+from conftest import FakeResponse
+
+from observer.models import ObservedTrade
+from observer.onchain import ORDER_FILLED_TOPIC, MergeDetector, RoleDecodeQueue
+
+PROXY = "0x" + "ab" * 20
+OTHER = "0x" + "cd" * 20
+
+
+def _topic(addr: str) -> str:
+    return "0x" + "0" * 24 + addr[2:]
+
+
+def _receipt(maker: str, taker: str) -> dict:
+    return {"logs": [{"topics": [ORDER_FILLED_TOPIC, "0x0", _topic(maker), _topic(taker)],
+                      "data": "0x" + "0" * 320}]}
+
+
+class _FakeRpc:
+    """Answers eth_getTransactionReceipt batches from a hash -> receipt map."""
+
+    def __init__(self, receipts: dict):
+        self.receipts = receipts
+        self.batches: list[list[str]] = []
+
+    def post(self, url, json, timeout):
+        self.batches.append([req["params"][0] for req in json])
+        body = [{"jsonrpc": "2.0", "id": req["id"], "result": self.receipts.get(req["params"][0])}
+                for req in json]
+        return FakeResponse(body)
+
+
+def _detector(monkeypatch, receipts, **kwargs) -> tuple[MergeDetector, _FakeRpc]:
+    monkeypatch.setenv("POLYGON_RPC_URL", "http://rpc")
+    detector = MergeDetector(PROXY, **kwargs)
+    rpc = _FakeRpc(receipts)
+    detector._rpc = rpc
+    return detector, rpc
+
+
+def _trade(tx_hash: str) -> ObservedTrade:
+    return ObservedTrade(
+        timestamp="2025-01-01T00:00:00Z", side="BUY", price=0.5, size=10.0, usdc_size=5.0,
+        outcome="Up", outcome_index=0, tx_hash=tx_hash, slug="btc-updown-15m-1",
+        event_slug="", condition_id="", asset="", title="",
+    )
+
+
+class TestMergeDetectorReceipts:
+    def test_batches_dedupes_and_caches(self, monkeypatch):
+        receipts = {f"0x{i:02x}": _receipt(PROXY if i % 2 else OTHER, OTHER if i % 2 else PROXY)
+                    for i in range(5)}
+        detector, rpc = _detector(monkeypatch, receipts, receipt_batch_size=2)
+
+        roles = detector.decode_roles(["0x00", "0x01", "0x01", "0x02", "0x03", "0x04"])
+
+        assert roles == {"0x00": "TAKER", "0x01": "MAKER", "0x02": "TAKER",
+                         "0x03": "MAKER", "0x04": "TAKER"}
+        assert rpc.batches == [["0x00", "0x01"], ["0x02", "0x03"], ["0x04"]]
+        # Fill details reuse the cached receipt
+        assert detector.decode_fill_details("0x01")["role"] == "MAKER"
+        assert detector.decode_role("0x02") == "TAKER"
+        assert len(rpc.batches) == 3
+
+    def test_lru_evicts_oldest_and_skips_pending(self, monkeypatch):
+        receipts = {h: _receipt(PROXY, OTHER) for h in ("0xa", "0xb", "0xc")}
+        detector, rpc = _detector(monkeypatch, receipts, receipt_cache_size=2)
+
+        assert detector.decode_roles(["0xa", "0xb", "0xc", "0xpending"]) == {
+            "0xa": "MAKER", "0xb": "MAKER", "0xc": "MAKER",
+        }
+        assert list(detector._receipts) == ["0xb", "0xc"]
+        detector.decode_roles(["0xa"])
+        assert rpc.batches[-1] == ["0xa"]
+
+
+class TestRoleDecodeQueue:
+    def test_drain_decodes_and_retries_unmined(self, monkeypatch):
+        detector, rpc = _detector(monkeypatch, {"0x1": _receipt(OTHER, PROXY)})
+        queue = RoleDecodeQueue(detector, batch_size=10, max_attempts=2)
+        queue.submit([_trade("0x1"), _trade("0x2")])
+
+        decoded = asyncio.run(queue.drain())
+        assert [(t.tx_hash, role) for t, role in decoded] == [("0x1", "TAKER")]
+        assert queue.pending == 1
+
+        rpc.receipts["0x2"] = _receipt(PROXY, OTHER)
+        decoded = asyncio.run(queue.drain())
+        assert [(t.tx_hash, role) for t, role in decoded] == [("0x2", "MAKER")]
+        assert queue.pending == 0
+        assert len(rpc.batches) == 2
+
+
+def _burn(block: int, tx: str, token: str = "1") -> dict:
+    return {"hash": tx, "to": "0x0000000000000000000000000000000000000000", "tokenID": token,
+            "tokenValue": "5000000", "blockNumber": str(block), "timeStamp": "1700000000"}
+
+
+class _FakeEtherscan:
+    """token1155tx pages, ascending from startblock or newest-first."""
+
+    def __init__(self, transfers: list[dict]):
+        self.transfers = transfers
+        self.requests: list[dict] = []
+        self._lock = threading.Lock()
+
+    def get(self, url, params, timeout):
+        with self._lock:
+            self.requests.append(dict(params))
+        rows = sorted(self.transfers, key=lambda t: int(t["blockNumber"]),
+                      reverse=params["sort"] == "desc")
+        if "startblock" in params:
+            rows = [r for r in rows if int(r["blockNumber"]) >= params["startblock"]]
+        n = params["offset"]
+        page = rows[(params["page"] - 1) * n:params["page"] * n]
+        return FakeResponse(
+            {"status": "1", "result": page} if page else {"status": "0", "result": []}
+        )
+
+
+class TestMergeScanning:
+    def test_etherscan_cursor_and_parallel_gap_paging(self, monkeypatch):
+        monkeypatch.setenv("ETHERSCAN_API_KEY", "key")
+        api = _FakeEtherscan([_burn(100, "0xfirst")])
+        detector = MergeDetector(PROXY, page_size=10, scan_workers=3)
+        detector._http = api
+
+        assert [m.tx_hash for m in detector.poll_merges()] == ["0xfirst"]
+        assert detector.merge_cursor == 100
+
+        # A burst far larger than one page between polls
+        api.transfers += [_burn(101 + i, f"0x{i:03d}") for i in range(45)]
+        merges = detector.poll_merges()
+
+        assert len(merges) == 45
+        assert detector.merge_cursor == 145
+        pages = sorted(r["page"] for r in api.requests[1:])
+        assert pages[:5] == [1, 2, 3, 4, 5]
+        assert detector.poll_merges() == []
+        assert api.requests[-1]["startblock"] == 145
+
+    def test_rpc_logs_backend(self, monkeypatch):
+        from eth_abi import encode
+
+        from observer.onchain import CTF_ADDRESS, TRANSFER_BATCH_TOPIC, TRANSFER_SINGLE_TOPIC
+
+        monkeypatch.setenv("POLYGON_RPC_URL", "http://rpc")
+        proxy_topic = _topic(PROXY)
+        single = {"blockNumber": hex(1500), "transactionHash": "0xs", "address": CTF_ADDRESS,
+                  "topics": [TRANSFER_SINGLE_TOPIC, "0x0", proxy_topic, "0x" + "0" * 64],
+                  "data": "0x" + encode(["uint256", "uint256"], [7, 3_000_000]).hex()}
+        batch = {"blockNumber": hex(2600), "transactionHash": "0xb", "address": CTF_ADDRESS,
+                 "topics": [TRANSFER_BATCH_TOPIC, "0x0", proxy_topic, "0x" + "0" * 64],
+                 "data": "0x" + encode(["uint256[]", "uint256[]"], [[8, 9], [2, 2]]).hex()}
+        calls: list[list[tuple]] = []
+
+        class _Rpc:
+            def post(self, url, json, timeout):
+                calls.append([(r["method"], r["params"]) for r in json])
+                out = []
+                for r in json:
+                    if r["method"] == "eth_blockNumber":
+                        result = hex(3000)
+                    elif r["method"] == "eth_getLogs":
+                        span = r["params"][0]
+                        lo, hi = int(span["fromBlock"], 16), int(span["toBlock"], 16)
+                        result = [
+                            e for e in (single, batch) if lo <= int(e["blockNumber"], 16) <= hi
+                        ]
+                    else:
+                        result = {"timestamp": hex(1_700_000_000 + int(r["params"][0], 16))}
+                    out.append({"jsonrpc": "2.0", "id": r["id"], "result": result})
+                return FakeResponse(out)
+
+        detector = MergeDetector(PROXY, backend="rpc", logs_chunk_blocks=1000)
+        detector._rpc = _Rpc()
+        merges = detector.poll_merges()
+
+        assert [(m.tx_hash, m.token_id, m.shares, m.block_number) for m in merges] == [
+            ("0xs", "7", 3_000_000.0, 1500), ("0xb", "8", 2.0, 2600),
+        ]
+        assert merges[0].timestamp == 1_700_001_500
+        get_logs = [c for c in calls[1] if c[0] == "eth_getLogs"]
+        assert len(get_logs) == 3  # blocks 1000..3000 in 1000-block chunks, one request
+        assert detector.merge_cursor == 3001
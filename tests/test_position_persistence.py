@@ -0,0 +1,94 @@
+"""Tests for change-only obs_positions rows and point-in-time reconstruction."""
+
+from __future__ import annotations
+
+import asyncio
+
+from sqlalchemy import select
+
+from observer.models import ObservedPosition
+from observer.persistence.db import init_db, positions_at
+from observer.persistence.schema import obs_positions
+from observer.persistence.writer import ObserverWriter
+
+
+def _pos(asset: str, size: float, price: float = 0.5) -> ObservedPosition:
+    return ObservedPosition(
+        asset=asset, size=size, avg_price=0.5, cash_pnl=0.0, current_value=size * price,
+        cur_price=price, redeemable=False, mergeable=False, slug="btc-updown-15m-1",
+        outcome="Up", outcome_index=0, opposite_asset="", end_date="",
+    )
+
+
+def test_snapshot_then_deltas_reconstruct(tmp_path, monkeypatch):
+    engine = init_db(f"sqlite:///{tmp_path / 'obs.db'}")
+    clock = [1000.0]
+    monkeypatch.setattr("observer.persistence.writer.time.time", lambda: clock[0])
+    writer = ObserverWriter("s1", position_snapshot_interval_s=100)
+
+    async def tick(positions, changes=None):
+        await writer.enqueue_positions(positions, changes)
+        await writer._flush()
+        clock[0] += 10
+
+    asyncio.run(tick([_pos("a", 10), _pos("b", 5)]))                      # 1000 snapshot
+    asyncio.run(tick([_pos("a", 10), _pos("b", 5)]))                      # 1010 nothing
+    asyncio.run(tick([_pos("a", 12), _pos("b", 5)]))                      # 1020 delta a
+    asyncio.run(tick([_pos("a", 12)], [{"field": "CLOSED", "asset": "b"}]))  # 1030 closed b
+    clock[0] = 1100
+    asyncio.run(tick([_pos("a", 12), _pos("c", 1)]))                      # 1100 snapshot
+
+    with engine.connect() as conn:
+        kinds = [(r.ts, r.asset, r.kind) for r in conn.execute(
+            select(obs_positions).order_by(obs_positions.c.id))]
+    assert kinds == [
+        (1000, "a", "snapshot"), (1000, "b", "snapshot"),
+        (1020, "a", "delta"), (1030, "b", "closed"),
+        (1100, "a", "snapshot"), (1100, "c", "snapshot"),
+    ]
+
+    def sizes(ts):
+        return {a: r["size"] for a, r in positions_at(engine, "s1", ts).items()}
+
+    assert sizes(999) == {}
+    assert sizes(1015) == {"a": 10, "b": 5}
+    assert sizes(1025) == {"a": 12, "b": 5}
+    assert sizes(1035) == {"a": 12}
+    assert sizes(2000) == {"a": 12, "c": 1}
+    assert positions_at(engine, "other", 2000) == {}
+
+
+def test_flat_wallet_on_snapshot_tick_writes_closed_row(tmp_path, monkeypatch):
+    engine = init_db(f"sqlite:///{tmp_path / 'obs.db'}")
+    clock = [1000.0]
+    monkeypatch.setattr("observer.persistence.writer.time.time", lambda: clock[0])
+    writer = ObserverWriter("s1", position_snapshot_interval_s=100)
+
+    asyncio.run(writer.enqueue_positions([_pos("a", 10)]))
+    clock[0] = 1200  # snapshot due, but nothing is held any more
+    asyncio.run(writer.enqueue_positions([], [{"field": "CLOSED", "asset": "a"}]))
+    asyncio.run(writer._flush())
+
+    with engine.connect() as conn:
+        kinds = [(r.ts, r.asset, r.kind) for r in conn.execute(
+            select(obs_positions).order_by(obs_positions.c.id))]
+    assert kinds == [(1000, "a", "snapshot"), (1200, "a", "closed")]
+    assert {a: r["size"] for a, r in positions_at(engine, "s1", 1100).items()} == {"a": 10}
+    assert positions_at(engine, "s1", 1300) == {}
+
+
+def test_price_moves_alone_wait_for_the_snapshot(tmp_path, monkeypatch):
+    engine = init_db(f"sqlite:///{tmp_path / 'obs.db'}")
+    clock = [1000.0]
+    monkeypatch.setattr("observer.persistence.writer.time.time", lambda: clock[0])
+    writer = ObserverWriter("s1", position_snapshot_interval_s=100)
+
+    for ts, price in ((1000, 0.50), (1010, 0.55), (1020, 0.61), (1100, 0.70)):
+        clock[0] = ts
+        asyncio.run(writer.enqueue_positions([_pos("a", 10, price=price)]))
+    asyncio.run(writer._flush())
+
+    with engine.connect() as conn:
+        rows = [(r.ts, r.kind, r.cur_price) for r in conn.execute(
+            select(obs_positions).order_by(obs_positions.c.id))]
+    assert rows == [(1000, "snapshot", 0.50), (1100, "snapshot", 0.70)]
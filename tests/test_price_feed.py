@@ -0,0 +1,167 @@
+"""Tests for the streaming price feed and its incremental rolling windows."""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import random
+import threading
+from statistics import stdev
+
+import pytest
+from conftest import FakeResponse
+
+from observer.btc_price import BtcPriceTracker
+from shared.price_feed import BinanceStream, PriceSeries, RollingWindow
+
+
+def _brute(
+    points: list[tuple[float, float]],
+    returns: list[tuple[float, float]],
+    now: float,
+    span: float,
+):
+    prices = [p for ts, p in points if ts >= now - span]
+    rets = [r for ts, r in returns if ts >= now - span]
+    pct = (prices[-1] - prices[0]) / prices[0] * 100 if len(prices) >= 2 else 0.0
+    rng = (max(prices) - min(prices)) / (sum(prices) / len(prices)) * 100
+    vol = stdev(rets) if len(rets) >= 2 else 0.0
+    return pct, vol, rng
+
+
+class TestRollingWindow:
+    def test_matches_brute_force_over_random_walk(self):
+        rnd = random.Random(7)
+        window = RollingWindow(30.0)
+        points, returns = [], []
+        ts, price = 0.0, 100.0
+        for _ in range(2000):
+            ts += rnd.uniform(0.05, 2.0)
+            ret = rnd.gauss(0, 0.1)
+            price *= 1 + ret / 100
+            window.add_price(ts, price)
+            window.add_return(ts, ret)
+            points.append((ts, price))
+            returns.append((ts, ret))
+
+            st = window.stats()
+            pct, vol, rng = _brute(points, returns, ts, 30.0)
+            assert st.pct_change == pytest.approx(pct, abs=1e-9)
+            assert st.range_pct == pytest.approx(rng, abs=1e-9)
+            assert st.vol == pytest.approx(vol, rel=1e-6, abs=1e-9)
+
+    def test_series_samples_returns_at_fixed_interval(self):
+        series = PriceSeries(windows_s=(60,), return_interval_s=1.0)
+        for i in range(40):  # 10 updates per second
+            series.update(i * 0.1, 100.0 + i)
+        st = series.stats(60)
+        assert st.samples == 40
+        assert series.last_price == 139.0
+        assert st.vol > 0
+        assert series.ewma_vol > 0
+
+    def test_series_safe_across_threads(self):
+        series = PriceSeries(windows_s=(1,), return_interval_s=0.0)
+        errors = []
+
+        def read():
+            try:
+                for _ in range(20_000):
+                    series.stats(1)
+                    series.ewma_vol
+            except Exception as e:  # pragma: no cover - only on a race
+                errors.append(e)
+
+        reader = threading.Thread(target=read)
+        reader.start()
+        for i in range(20_000):
+            series.update(i * 0.01, 100.0 + (i % 7))
+        reader.join()
+        assert errors == []
+        assert series.updates == 20_000
+
+
+class TestBinanceStream:
+    def _msg(self, symbol: str, price: float, ms: int) -> str:
+        return json.dumps({"stream": f"{symbol.lower()}@aggTrade",
+                           "data": {"e": "aggTrade", "s": symbol, "p": str(price), "T": ms}})
+
+    def test_replay_through_stand_in_socket(self):
+        messages = [self._msg("BTCUSDT", 100.0 + i, 1_000_000 + i * 500) for i in range(10)]
+        messages += [
+            self._msg("ETHUSDT", 10.0, 1_000_000), "not json", self._msg("XRPUSDT", 1.0, 1),
+        ]
+
+        class _Socket:
+            def __init__(self, url):
+                self.url = url
+
+            async def __aenter__(self):
+                return self
+
+            async def __aexit__(self, *exc):
+                return False
+
+            def __aiter__(self):
+                return self._iter()
+
+            async def _iter(self):
+                for m in messages:
+                    yield m
+                raise asyncio.CancelledError  # end the test instead of reconnecting
+
+        urls = []
+
+        def connect(url):
+            urls.append(url)
+            return _Socket(url)
+
+        stream = BinanceStream(["BTCUSDT", "ETHUSDT"], url="ws://localhost:9000/", connect=connect)
+        with pytest.raises(asyncio.CancelledError):
+            asyncio.run(stream.run())
+
+        assert urls == ["ws://localhost:9000/stream?streams=btcusdt@aggTrade/ethusdt@aggTrade"]
+        assert stream.messages == 11
+        btc = stream.series("BTCUSDT")
+        assert btc.last_price == 109.0
+        assert btc.last_ts == pytest.approx(1004.5)
+        assert btc.stats(60).pct_change == pytest.approx(9.0)
+
+
+class TestBtcPriceTracker:
+    def test_rest_feed_one_request_per_tick(self, monkeypatch):
+        clock = [1000.0]
+        monkeypatch.setattr("observer.btc_price.time.time", lambda: clock[0])
+        calls = []
+
+        class _Session:
+            def get(self, url, params, timeout):
+                calls.append(params)
+                btc = 100.0 + len(calls)
+                return FakeResponse([{"symbol": "BTCUSDT", "price": str(btc)},
+                                     {"symbol": "ETHUSDT", "price": "10"}])
+
+        tracker = BtcPriceTracker(session=_Session())
+        tracker.snapshot()
+        for _ in range(6):
+            clock[0] += 10
+            snap = tracker.poll()
+
+        assert len(calls) == 7
+        assert calls[0] == {"symbols": '["BTCUSDT","ETHUSDT"]'}
+        assert snap.btc_price == 107.0
+        assert snap.btc_pct_change_1m == pytest.approx((107 - 101) / 101 * 100)
+        assert snap.eth_pct_change_5m == 0.0
+
+    def test_stream_feed_skips_rest_while_fresh(self, monkeypatch):
+        monkeypatch.setattr("observer.btc_price.time.time", lambda: 2000.0)
+
+        class _NoSession:
+            def get(self, *a, **kw):
+                raise AssertionError("REST used while stream is live")
+
+        tracker = BtcPriceTracker(feed="stream", session=_NoSession())
+        tracker.stream.feed({"data": {"s": "BTCUSDT", "p": "50000", "T": 1_995_000}})
+        tracker.stream.feed({"data": {"s": "ETHUSDT", "p": "3000", "T": 1_995_000}})
+        snap = tracker.poll()
+        assert (snap.btc_price, snap.eth_price) == (50000.0, 3000.0)
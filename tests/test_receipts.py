@@ -0,0 +1,130 @@
+"""Tests for the batched async ReceiptWatcher."""
+
+from __future__ import annotations
+
+import asyncio
+import json
+from unittest.mock import MagicMock, patch
+
+import httpx
+import pytest
+
+from shared.receipts import ReceiptWatcher
+
+
+def _watcher(handler, **kw) -> ReceiptWatcher:
+    return ReceiptWatcher("https://rpc.test", transport=httpx.MockTransport(handler), **kw)
+
+
+def _receipt(status=1, gas=50_000):
+    return {"status": hex(status), "gasUsed": hex(gas), "blockNumber": "0x10"}
+
+
+class TestReceiptWatcher:
+    def test_one_batch_for_many_hashes(self):
+        batches: list[int] = []
+        mined = {"0x01", "0x02"}
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            body = json.loads(request.content)
+            batches.append(len(body))
+            return httpx.Response(200, json=[
+                {"jsonrpc": "2.0", "id": r["id"],
+                 "result": _receipt() if r["params"][0] in mined else None}
+                for r in body
+            ])
+
+        async def run():
+            watcher = _watcher(handler)
+            try:
+                futs = [watcher.watch(h) for h in ("0x01", "0x02", "0x03")]
+                resolved = await watcher.poll_once()
+                return resolved, [f.done() for f in futs], futs[0].result(), watcher.pending
+            finally:
+                await watcher.aclose()
+
+        resolved, done, receipt, pending = asyncio.run(run())
+        assert batches == [3]
+        assert resolved == 2
+        assert done == [True, True, False]
+        assert receipt["status"] == 1 and receipt["gasUsed"] == 50_000
+        assert pending == 1
+
+    def test_run_resolves_waiters(self):
+        polls = []
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            body = json.loads(request.content)
+            polls.append(len(body))
+            ready = len(polls) >= 2
+            return httpx.Response(200, json=[
+                {"jsonrpc": "2.0", "id": r["id"], "result": _receipt() if ready else None}
+                for r in body
+            ])
+
+        async def run():
+            watcher = _watcher(handler, poll_interval=0.01, max_poll_interval=0.02)
+            task = asyncio.create_task(watcher.run())
+            try:
+                return await asyncio.wait_for(
+                    asyncio.gather(watcher.wait("aa"), watcher.wait("bb")), timeout=2,
+                )
+            finally:
+                task.cancel()
+                await watcher.aclose()
+
+        receipts = asyncio.run(run())
+        assert [r["status"] for r in receipts] == [1, 1]
+        assert polls == [2, 2]  # both hashes in every poll
+
+    def test_timeout_fails_future(self):
+        def handler(request: httpx.Request) -> httpx.Response:
+            body = json.loads(request.content)
+            return httpx.Response(200, json=[{"id": r["id"], "result": None} for r in body])
+
+        async def run():
+            watcher = _watcher(handler, timeout_s=0)
+            try:
+                fut = watcher.watch("0x01")
+                await watcher.poll_once()
+                return fut
+            finally:
+                await watcher.aclose()
+
+        fut = asyncio.run(run())
+        with pytest.raises(TimeoutError):
+            fut.result()
+
+
+class TestExecuteBatchAsync:
+    COND = "0x" + "ab" * 32
+
+    def test_reverted_chunk_reported(self):
+        from shared.redeem import (
+            SAFE_TX_OVERHEAD_GAS,
+            PendingTx,
+            build_merge_call,
+            execute_batch_async,
+        )
+
+        call = build_merge_call(self.COND, 1, neg_risk=False)
+        pendings = iter([
+            PendingTx("0x01", 10, "0x" + "bb" * 20, "0x" + "aa" * 20),
+            PendingTx("0x02", 10, "0x" + "bb" * 20, "0x" + "aa" * 20),
+        ])
+        watcher = MagicMock()
+
+        async def wait(tx_hash):
+            return {"status": 1 if tx_hash == "0x01" else 0, "gasUsed": 1000}
+
+        watcher.wait = wait
+        with patch("shared.redeem._ensure_approval"), \
+             patch("shared.redeem._submit_safe_tx", side_effect=lambda *a, **k: next(pendings)):
+            results = asyncio.run(execute_batch_async(
+                MagicMock(), MagicMock(), "0x" + "bb" * 20, [call] * 4, watcher,
+                max_batch_gas=SAFE_TX_OVERHEAD_GAS + 2 * call.gas,
+            ))
+
+        assert results[0].error is None
+        assert results[0].result.gas_cost_wei == 10_000
+        assert "reverted" in str(results[1].error)
@@ -0,0 +1,111 @@
+"""Tests for the chain-state reconciler and its engine wiring."""
+
+from __future__ import annotations
+
+import time
+from decimal import Decimal
+from unittest.mock import MagicMock
+
+from grid_maker.config import GridMakerConfig
+from grid_maker.reconciler import Reconciler
+from shared.models import ZERO, GabagoolMarket
+
+
+def _reader(balances: dict[str, int]):
+    calls: list[list[str]] = []
+
+    def read(token_ids: list[str]) -> dict[str, int]:
+        calls.append(list(token_ids))
+        return {t: balances.get(t, 0) for t in token_ids}
+
+    return read, calls
+
+
+class TestReconciler:
+    def test_full_pass_reports_drift(self):
+        read, calls = _reader({"a": 12_500_000, "b": 3_000_000})
+        rec = Reconciler(read, settle_grace_s=0)
+        filled = {"a": Decimal("10"), "b": Decimal("3")}
+
+        assert rec.due(1000.0) == "full"
+        corrections = rec.reconcile(filled, ["a", "b"], 1000.0, full=True)
+
+        assert calls == [["a", "b"]]  # one batched read
+        assert [(c.token_id, c.engine, c.chain) for c in corrections] == [
+            ("a", Decimal("10"), Decimal("12.5")),
+        ]
+        assert rec.due(1001.0) is None
+
+    def test_incremental_reads_only_dirty(self):
+        read, calls = _reader({"a": 1_000_000})
+        rec = Reconciler(read, full_interval_s=300, incremental_interval_s=5, settle_grace_s=0)
+        rec.reconcile({}, ["a", "b", "c"], 1000.0, full=True)
+
+        rec.mark_dirty("a", 1001.0)
+        assert rec.due(1004.0) is None       # incremental interval not elapsed
+        assert rec.due(1006.0) == "incremental"
+        rec.reconcile({"a": Decimal("1")}, ["a", "b", "c"], 1006.0)
+        assert calls[-1] == ["a"]
+        assert rec.dirty == set()
+
+    def test_grace_and_busy_tokens_deferred(self):
+        read, calls = _reader({"a": 5_000_000, "b": 5_000_000})
+        rec = Reconciler(read, settle_grace_s=30)
+        rec.mark_dirty("a", 990.0)  # fill 10s ago — chain may lag
+
+        corrections = rec.reconcile({}, ["a", "b"], 1000.0, busy={"b"}, full=True)
+
+        assert corrections == []
+        assert calls == []
+        assert rec.dirty == {"a"}   # retried once settled
+        rec.reconcile({}, ["a", "b"], 1021.0)
+        assert calls == [["a"]]
+
+    def test_untracked_dirty_tokens_dropped(self):
+        read, _ = _reader({})
+        rec = Reconciler(read, settle_grace_s=0)
+        rec.mark_dirty("gone", 1.0)
+        rec.reconcile({}, ["a"], 10.0)
+        assert rec.dirty == set()
+
+
+class TestEngineReconcile:
+    def _engine(self):
+        from grid_maker.engine import GridMakerEngine
+
+        cfg = GridMakerConfig(dry_run=False, market_cache_path="", reconcile_settle_grace_sec=0)
+        return GridMakerEngine(MagicMock(), cfg, w3=MagicMock(), account=MagicMock(),
+                               funder_address="0x" + "bb" * 20)
+
+    def test_restores_fills_and_redemption_sizes(self):
+        from grid_maker.engine import _PendingRedemption
+
+        engine = self._engine()
+        active = GabagoolMarket(
+            slug="btc-updown-15m-1", up_token_id="u1", down_token_id="d1",
+            end_time=time.time() + 600, market_type="updown-15m", condition_id="0x01",
+        )
+        ended = GabagoolMarket(
+            slug="btc-updown-15m-0", up_token_id="u0", down_token_id="d0",
+            end_time=time.time() - 600, market_type="updown-15m", condition_id="0x00",
+        )
+        engine._markets = [active]
+        engine._pending_redemptions[ended.slug] = _PendingRedemption(
+            market=ended, up_shares=Decimal("4"), down_shares=ZERO, eligible_at=0.0,
+        )
+        read, calls = _reader({"u1": 7_000_000, "d1": 2_000_000, "u0": 6_000_000})
+        engine._reconciler._read = read
+
+        engine._reconcile(time.time())
+
+        assert sorted(calls[0]) == ["d0", "d1", "u0", "u1"]
+        assert engine._filled_shares["u1"] == Decimal("7")
+        assert engine._filled_shares["d1"] == Decimal("2")
+        assert engine._pending_redemptions[ended.slug].up_shares == Decimal("6")
+
+    def test_dry_run_has_no_reconciler(self):
+        from grid_maker.engine import GridMakerEngine
+
+        engine = GridMakerEngine(MagicMock(), GridMakerConfig(market_cache_path=""), w3=MagicMock(),
+                                 funder_address="0x" + "bb" * 20)
+        assert engine._reconciler is None
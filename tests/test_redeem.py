@@ -1,4 +1,4 @@
-"""Tests for redeem.py — gas cap, approval check."""
+"""Tests for redeem.py — gas cap, approval check, batching, nonces."""
 
 from unittest.mock import MagicMock, patch
 
@@ -141,3 +141,469 @@ class TestApprovalCheck:
         safe_cs = Web3.to_checksum_address(safe)
         op_cs = Web3.to_checksum_address(operator)
         assert (safe_cs.lower(), op_cs.lower()) in _approved_pairs
+
+
+class TestMultiSendBatch:
+    COND = "0x" + "ab" * 32
+
+    def test_encode_multisend_packs_calls(self):
+        from shared.redeem import build_merge_call, build_redeem_call, encode_multisend
+
+        merge = build_merge_call(self.COND, 10**6, neg_risk=False)
+        redeem = build_redeem_call(self.COND, neg_risk=True, amount=5)
+        data = encode_multisend([merge, redeem])
+
+        assert data[:4].hex() == "8d80ff0a"  # multiSend(bytes)
+        length = int.from_bytes(data[36:68], "big")
+        packed = data[68:68 + length]
+        assert length == (85 + len(merge.data)) + (85 + len(redeem.data))
+        # First call: op=CALL, to=CTF, value=0, len, data
+        assert packed[0] == 0
+        assert packed[1:21].hex() == merge.to[2:].lower()
+        assert int.from_bytes(packed[21:53], "big") == 0
+        assert int.from_bytes(packed[53:85], "big") == len(merge.data)
+        assert packed[85:85 + len(merge.data)] == merge.data
+
+    def test_pack_batches_respects_gas_cap(self):
+        from shared.redeem import SAFE_TX_OVERHEAD_GAS, build_merge_call, pack_batches
+
+        call = build_merge_call(self.COND, 1, neg_risk=False)
+        cap = SAFE_TX_OVERHEAD_GAS + 3 * call.gas
+        batches = pack_batches([call] * 7, cap)
+        assert [len(b) for b in batches] == [3, 3, 1]
+
+    def test_execute_batch_one_tx_for_many_markets(self):
+        from shared.redeem import (
+            MULTISEND_CALL_ONLY,
+            OP_DELEGATECALL,
+            TxResult,
+            build_merge_call,
+            execute_batch,
+        )
+
+        calls = [
+            build_merge_call(self.COND, i + 1, neg_risk=False, label=str(i)) for i in range(20)
+        ]
+        with patch("shared.redeem._ensure_approval") as mock_approval, \
+             patch("shared.redeem._submit_safe_tx") as mock_send, \
+             patch("shared.redeem._wait_for_receipt", return_value=TxResult("0xabc", 10**15)):
+            results = execute_batch(MagicMock(), MagicMock(), "0x" + "bb" * 20, calls)
+
+        assert mock_approval.call_count == 1  # one distinct operator
+        assert mock_send.call_count == 1
+        args, kwargs = mock_send.call_args
+        assert args[3] == MULTISEND_CALL_ONLY
+        assert kwargs["operation"] == OP_DELEGATECALL
+        assert len(results) == 1 and len(results[0].calls) == 20
+        assert results[0].error is None
+
+    def test_execute_batch_reports_failed_chunk(self):
+        from shared.redeem import SAFE_TX_OVERHEAD_GAS, TxResult, build_merge_call, execute_batch
+
+        call = build_merge_call(self.COND, 1, neg_risk=False)
+        with patch("shared.redeem._ensure_approval"), \
+             patch("shared.redeem._submit_safe_tx"), \
+             patch("shared.redeem._wait_for_receipt",
+                   side_effect=[TxResult("0x1", 1), RuntimeError("reverted")]):
+            results = execute_batch(
+                MagicMock(), MagicMock(), "0x" + "bb" * 20, [call] * 4,
+                max_batch_gas=SAFE_TX_OVERHEAD_GAS + 2 * call.gas,
+            )
+
+        assert [r.error is None for r in results] == [True, False]
+
+    def test_execute_batch_submits_all_before_waiting(self):
+        from shared.redeem import SAFE_TX_OVERHEAD_GAS, TxResult, build_merge_call, execute_batch
+
+        events = []
+        call = build_merge_call(self.COND, 1, neg_risk=False)
+        with patch("shared.redeem._ensure_approval"), \
+             patch("shared.redeem._submit_safe_tx",
+                   side_effect=lambda *a, **k: events.append("submit") or MagicMock()), \
+             patch("shared.redeem._wait_for_receipt",
+                   side_effect=lambda *a, **k: events.append("wait") or TxResult("0x1", 1)):
+            results = execute_batch(
+                MagicMock(), MagicMock(), "0x" + "bb" * 20, [call] * 6,
+                max_batch_gas=SAFE_TX_OVERHEAD_GAS + 2 * call.gas,
+            )
+
+        assert events == ["submit"] * 3 + ["wait"] * 3
+        assert all(r.error is None for r in results)
+
+    def test_chunks_behind_a_revert_are_resubmitted(self):
+        from shared.redeem import SAFE_TX_OVERHEAD_GAS, TxResult, build_merge_call, execute_batch
+
+        call = build_merge_call(self.COND, 1, neg_risk=False)
+        receipts = [
+            RuntimeError("Transaction reverted on-chain (tx=0x1)"),        # chunk 1
+            RuntimeError("Transaction reverted on-chain (tx=0x2) GS026"),  # stale nonce
+            TxResult("0x2b", 1),                                           # chunk 2 re-signed
+            RuntimeError("Transaction reverted on-chain (tx=0x3) GS026"),
+            TxResult("0x3b", 1),                                           # chunk 3 re-signed
+        ]
+        with patch("shared.redeem._ensure_approval"), \
+             patch("shared.redeem._submit_safe_tx") as mock_send, \
+             patch("shared.redeem._wait_for_receipt", side_effect=receipts):
+            results = execute_batch(
+                MagicMock(), MagicMock(), "0x" + "bb" * 20, [call] * 6,
+                max_batch_gas=SAFE_TX_OVERHEAD_GAS + 2 * call.gas,
+            )
+
+        assert mock_send.call_count == 5  # 3 pipelined + 2 resubmitted
+        assert [r.error is None for r in results] == [False, True, True]
+        assert [r.result.tx_hash for r in results[1:]] == ["0x2b", "0x3b"]
+
+    def test_pack_batches_keeps_redeems_apart_from_merges(self):
+        from shared.redeem import build_merge_call, build_redeem_call, pack_batches
+
+        merge = build_merge_call(self.COND, 1, neg_risk=False, label="m")
+        redeem = build_redeem_call(self.COND, neg_risk=False, label="r")
+        batches = pack_batches([merge, redeem, merge, redeem], 10**9)
+        assert [[c.label for c in b] for b in batches] == [["m", "m"], ["r", "r"]]
+
+    def test_reverting_redeem_dropped_before_submit(self):
+        from shared.redeem import TxResult, build_merge_call, build_redeem_call, execute_batch
+
+        merges = [build_merge_call(self.COND, 1, neg_risk=False, label=f"m{i}") for i in range(2)]
+        redeem = build_redeem_call(self.COND, neg_risk=False, label="r")
+        w3 = MagicMock()
+
+        def call(tx):
+            if tx["data"] == redeem.data:
+                raise ValueError("execution reverted: result for condition not received yet")
+            return b""
+
+        w3.eth.call.side_effect = call
+        with patch("shared.redeem._ensure_approval"), \
+             patch("shared.redeem._submit_safe_tx") as mock_send, \
+             patch("shared.redeem._wait_for_receipt", return_value=TxResult("0x1", 1)):
+            results = execute_batch(w3, MagicMock(), "0x" + "bb" * 20, [*merges, redeem])
+
+        assert w3.eth.call.call_count == 3
+        assert mock_send.call_count == 1  # merges only
+        outcome = {c.label: r.error is None for r in results for c in r.calls}
+        assert outcome == {"m0": True, "m1": True, "r": False}
+
+
+def _mock_chain(safe_nonce=7, eoa_nonce=3):
+    w3 = MagicMock()
+    w3.eth.gas_price = 50_000_000_000
+    w3.eth.get_transaction_count.return_value = eoa_nonce
+    w3.eth.estimate_gas.return_value = 100_000
+    w3.eth.send_raw_transaction.return_value = b"\x01" * 32
+    safe = MagicMock()
+    safe.functions.nonce.return_value.call.return_value = safe_nonce
+    safe.functions.getTransactionHash.return_value.call.return_value = b"\x00" * 32
+    safe.encode_abi.return_value = "0x" + "00" * 32
+    w3.eth.contract.return_value = safe
+    account = MagicMock()
+    account.address = "0x" + "aa" * 20
+    account.sign_transaction.return_value = MagicMock(raw_transaction=b"\x00")
+    return w3, account, safe
+
+
+class TestNonceManager:
+    SAFE = "0x" + "bb" * 20
+    EOA = "0x" + "aa" * 20
+
+    def test_reserve_reads_chain_once(self):
+        from shared.redeem import NonceManager
+
+        w3, _, safe = _mock_chain()
+        mgr = NonceManager()
+        assert mgr.reserve(w3, safe, self.SAFE, self.EOA) == (7, 3)
+        assert mgr.reserve(w3, safe, self.SAFE, self.EOA) == (8, 4)
+        assert safe.functions.nonce.return_value.call.call_count == 1
+        assert w3.eth.get_transaction_count.call_count == 1
+        w3.eth.get_transaction_count.assert_called_with(self.EOA, "pending")
+        assert mgr.in_flight(self.SAFE) == 2
+
+    def test_release_rolls_back_latest(self):
+        from shared.redeem import NonceManager
+
+        w3, _, safe = _mock_chain()
+        mgr = NonceManager()
+        mgr.reserve(w3, safe, self.SAFE, self.EOA)
+        mgr.release(self.SAFE, self.EOA, 7, 3)
+        assert mgr.reserve(w3, safe, self.SAFE, self.EOA) == (7, 3)
+        assert mgr.in_flight(self.SAFE) == 1
+
+    def test_release_out_of_order_resyncs(self):
+        from shared.redeem import NonceManager
+
+        w3, _, safe = _mock_chain()
+        mgr = NonceManager()
+        mgr.reserve(w3, safe, self.SAFE, self.EOA)
+        mgr.reserve(w3, safe, self.SAFE, self.EOA)
+        mgr.release(self.SAFE, self.EOA, 7, 3)  # a later nonce is already out
+        mgr.reserve(w3, safe, self.SAFE, self.EOA)
+        assert safe.functions.nonce.return_value.call.call_count == 2
+
+    def test_pipelined_submits_skip_estimate(self):
+        from shared.redeem import _submit_safe_tx
+
+        w3, account, _ = _mock_chain()
+        with patch("shared.redeem.Account") as mock_account:
+            mock_account.unsafe_sign_hash.return_value = MagicMock(r=1, s=2, v=27)
+            _submit_safe_tx(w3, account, self.SAFE, "0x" + "cc" * 20, b"\x00")
+            _submit_safe_tx(w3, account, self.SAFE, "0x" + "cc" * 20, b"\x00", fallback_gas=400_000)
+
+        assert w3.eth.estimate_gas.call_count == 1
+        nonces = [c.args[0]["nonce"] for c in account.sign_transaction.call_args_list]
+        assert nonces == [3, 4]
+        assert account.sign_transaction.call_args.args[0]["gas"] == 400_000
+
+    def test_stale_nonce_resyncs_and_retries(self):
+        from shared.redeem import _submit_safe_tx
+
+        w3, account, _ = _mock_chain()
+        w3.eth.send_raw_transaction.side_effect = [ValueError("nonce too low"), b"\x02" * 32]
+        w3.eth.get_transaction_count.side_effect = [3, 5]
+        with patch("shared.redeem.Account") as mock_account:
+            mock_account.unsafe_sign_hash.return_value = MagicMock(r=1, s=2, v=27)
+            pending = _submit_safe_tx(w3, account, self.SAFE, "0x" + "cc" * 20, b"\x00")
+
+        assert pending.tx_hash == (b"\x02" * 32).hex()
+        assert account.sign_transaction.call_args.args[0]["nonce"] == 5
+
+
+class TestBalanceReader:
+    WALLET = "0x" + "bb" * 20
+
+    def _w3(self, usdc=5_000_000, block=123, fail_batch=False):
+        from eth_abi import decode, encode
+
+        from shared.multicall import SEL_AGGREGATE3
+
+        w3 = MagicMock()
+
+        def call(tx, block_id):
+            assert tx["data"][:4] == SEL_AGGREGATE3
+            (calls,) = decode(["(address,bool,bytes)[]"], tx["data"][4:])
+            results = [(True, encode(["uint256"], [usdc])), (True, encode(["uint256"], [block]))]
+            for _, _, data in calls[2:]:
+                _, ids = decode(["address[]", "uint256[]"], data[4:])
+                results.append((not fail_batch, encode(["uint256[]"], [[i * 10 for i in ids]])))
+            return encode(["(bool,bytes)[]"], [results])
+
+        w3.eth.call.side_effect = call
+        return w3
+
+    def test_usdc_and_tokens_in_one_call(self):
+        from shared.redeem import BalanceReader
+
+        w3 = self._w3()
+        snap = BalanceReader(w3).read(self.WALLET, ["1", "2", "3", "2"])
+
+        assert w3.eth.call.call_count == 1
+        assert snap.usdc == 5_000_000
+        assert snap.block_number == 123
+        assert snap.tokens == {"1": 10, "2": 20, "3": 30}
+
+    def test_token_ids_chunked(self):
+        from shared.redeem import MAX_TOKENS_PER_BATCH, BalanceReader
+
+        w3 = self._w3()
+        ids = [str(i) for i in range(1, MAX_TOKENS_PER_BATCH + 3)]
+        snap = BalanceReader(w3).read(self.WALLET, ids)
+        assert w3.eth.call.call_count == 1
+        assert len(snap.tokens) == len(ids)
+
+    def test_failed_subcall_raises(self):
+        from shared.redeem import BalanceReader
+
+        with pytest.raises(RuntimeError, match="balanceOfBatch"):
+            BalanceReader(self._w3(fail_batch=True)).read(self.WALLET, ["1"])
+
+
+class TestCalldataTemplates:
+    """Fixed-byte templates must match web3's ABI encoder exactly."""
+
+    COND = "0x" + "cd" * 32
+
+    def _abi(self, address, abi, fn, args):
+        from web3 import Web3
+
+        contract = Web3().eth.contract(address=Web3.to_checksum_address(address), abi=abi)
+        return contract.encode_abi(fn, args)
+
+    @pytest.mark.parametrize("neg_risk", [False, True])
+    def test_merge_matches_abi(self, neg_risk):
+        from web3 import Web3
+
+        from shared.redeem import (
+            CTF_ADDRESS,
+            INDEX_SETS,
+            MERGE_ABI,
+            NEG_RISK_ADAPTER,
+            NEG_RISK_MERGE_ABI,
+            PARENT_COLLECTION_ID,
+            USDC_ADDRESS,
+            _encode_merge,
+        )
+
+        cond = bytes.fromhex(self.COND[2:])
+        target, data = _encode_merge(self.COND, 12_345_678, neg_risk)
+        if neg_risk:
+            expected = self._abi(
+                NEG_RISK_ADAPTER, NEG_RISK_MERGE_ABI, "mergePositions", [cond, 12_345_678],
+            )
+        else:
+            expected = self._abi(CTF_ADDRESS, MERGE_ABI, "mergePositions", [
+                Web3.to_checksum_address(USDC_ADDRESS), PARENT_COLLECTION_ID, cond, INDEX_SETS,
+                12_345_678,
+            ])
+        assert data == expected
+        assert target == Web3.to_checksum_address(NEG_RISK_ADAPTER if neg_risk else CTF_ADDRESS)
+
+    @pytest.mark.parametrize("neg_risk", [False, True])
+    def test_redeem_matches_abi(self, neg_risk):
+        from web3 import Web3
+
+        from shared.redeem import (
+            CTF_ADDRESS,
+            INDEX_SETS,
+            NEG_RISK_ADAPTER,
+            NEG_RISK_REDEEM_ABI,
+            PARENT_COLLECTION_ID,
+            REDEEM_ABI,
+            USDC_ADDRESS,
+            _encode_redeem,
+        )
+
+        cond = bytes.fromhex(self.COND[2:])
+        _, data = _encode_redeem(self.COND, neg_risk, 777)
+        if neg_risk:
+            expected = self._abi(
+                NEG_RISK_ADAPTER, NEG_RISK_REDEEM_ABI, "redeemPositions", [cond, [777, 777]],
+            )
+        else:
+            expected = self._abi(CTF_ADDRESS, REDEEM_ABI, "redeemPositions", [
+                Web3.to_checksum_address(USDC_ADDRESS), PARENT_COLLECTION_ID, cond, INDEX_SETS,
+            ])
+        assert data == expected
+
+    def test_multisend_and_approval_match_abi(self):
+        from web3 import Web3
+
+        from shared.redeem import (
+            CTF_ADDRESS,
+            ERC1155_ABI,
+            MULTISEND_ABI,
+            MULTISEND_CALL_ONLY,
+            NEG_RISK_ADAPTER,
+            _encode_set_approval,
+            build_merge_call,
+            encode_multisend,
+        )
+
+        calls = [build_merge_call(self.COND, 5, neg_risk=False)] * 3
+        data = encode_multisend(calls)
+        packed = data[68:68 + int.from_bytes(data[36:68], "big")]
+        expected = self._abi(MULTISEND_CALL_ONLY, MULTISEND_ABI, "multiSend", [packed])
+        assert "0x" + data.hex() == expected
+
+        operator = Web3.to_checksum_address(NEG_RISK_ADAPTER)
+        assert "0x" + _encode_set_approval(operator).hex() == self._abi(
+            CTF_ADDRESS, ERC1155_ABI, "setApprovalForAll", [operator, True],
+        )
+
+    def test_bad_condition_id_rejected(self):
+        from shared.redeem import _encode_merge
+
+        with pytest.raises(ValueError):
+            _encode_merge("0x1234", 1, neg_risk=False)
+
+
+class TestChainRegistry:
+    def test_contract_built_once_per_provider(self):
+        from shared.chain import get_contract
+        from shared.redeem import SAFE_ABI
+
+        w3 = MagicMock()
+        first = get_contract(w3, "0x" + "bb" * 20, SAFE_ABI)
+        again = get_contract(w3, "0x" + "BB" * 20, SAFE_ABI)
+        assert first is again
+        assert w3.eth.contract.call_count == 1
+        get_contract(MagicMock(), "0x" + "bb" * 20, SAFE_ABI)
+        assert w3.eth.contract.call_count == 1
+
+    def test_provider_shared_per_url(self):
+        from shared.chain import get_web3, reset_registry
+
+        try:
+            assert get_web3("http://rpc.test") is get_web3("http://rpc.test")
+            assert get_web3("http://rpc.test") is not get_web3("http://other.test")
+        finally:
+            reset_registry()
+
+
+class TestApprovalPreflight:
+    SAFE = "0x" + "aa" * 20
+
+    @pytest.fixture(autouse=True)
+    def _isolated(self, monkeypatch):
+        import shared.redeem as redeem
+
+        monkeypatch.setattr(redeem, "_approvals_path", None)
+        _approved_pairs.clear()
+        yield
+        _approved_pairs.clear()
+
+    def _w3(self, approved: dict[str, bool]):
+        from eth_abi import decode, encode
+
+        w3 = MagicMock()
+
+        def call(tx, block_id):
+            (calls,) = decode(["(address,bool,bytes)[]"], tx["data"][4:])
+            results = []
+            for _, _, data in calls:
+                _, operator = decode(["address", "address"], data[4:])
+                results.append((True, encode(["bool"], [approved[operator.lower()]])))
+            return encode(["(bool,bytes)[]"], [results])
+
+        w3.eth.call.side_effect = call
+        return w3
+
+    def test_approvals_persist_across_restart(self, tmp_path):
+        from shared.redeem import _remember_approval, load_approvals
+
+        path = tmp_path / "approvals.json"
+        assert load_approvals(str(path)) == 0
+        _remember_approval((self.SAFE, "0x" + "cc" * 20))
+        _approved_pairs.clear()  # "restart"
+        assert load_approvals(str(path)) == 1
+        assert (self.SAFE, "0x" + "cc" * 20) in _approved_pairs
+
+    def test_grants_missing_in_one_multisend(self):
+        from shared.redeem import (
+            CTF_ADDRESS,
+            MULTISEND_CALL_ONLY,
+            NEG_RISK_ADAPTER,
+            OP_DELEGATECALL,
+            preflight_approvals,
+        )
+
+        w3 = self._w3({CTF_ADDRESS.lower(): False, NEG_RISK_ADAPTER.lower(): False})
+        with patch("shared.redeem._send_safe_tx") as mock_send:
+            granted = preflight_approvals(w3, MagicMock(), self.SAFE)
+
+        assert w3.eth.call.call_count == 1  # both checked in one multicall
+        assert len(granted) == 2
+        mock_send.assert_called_once()
+        assert mock_send.call_args.args[3] == MULTISEND_CALL_ONLY
+        assert mock_send.call_args.kwargs["operation"] == OP_DELEGATECALL
+        # Nothing left to check or grant
+        assert preflight_approvals(w3, MagicMock(), self.SAFE) == []
+        assert w3.eth.call.call_count == 1
+
+    def test_already_approved_sends_nothing(self):
+        from shared.redeem import CTF_ADDRESS, NEG_RISK_ADAPTER, preflight_approvals
+
+        w3 = self._w3({CTF_ADDRESS.lower(): True, NEG_RISK_ADAPTER.lower(): False})
+        with patch("shared.redeem._send_safe_tx") as mock_send:
+            granted = preflight_approvals(w3, MagicMock(), self.SAFE)
+
+        assert [g.lower() for g in granted] == [NEG_RISK_ADAPTER.lower()]
+        assert mock_send.call_args.args[3] == CTF_ADDRESS  # single plain CALL
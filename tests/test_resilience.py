@@ -0,0 +1,198 @@
+"""Tests for circuit breakers, hedged reads and deadlines."""
+
+from __future__ import annotations
+
+import threading
+import time
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from shared.resilience import (
+    CircuitBreaker,
+    CircuitOpenError,
+    Endpoint,
+    EndpointSLO,
+    LatencyTracker,
+)
+
+
+class TestCircuitBreaker:
+    def test_opens_after_threshold(self):
+        cb = CircuitBreaker("t", failure_threshold=3, reset_timeout_s=60)
+        for _ in range(2):
+            cb.record_failure()
+        assert cb.allow()
+        cb.record_failure()
+        assert cb.state == CircuitBreaker.OPEN
+        assert not cb.allow()
+
+    def test_success_resets_failure_count(self):
+        cb = CircuitBreaker("t", failure_threshold=2)
+        cb.record_failure()
+        cb.record_success()
+        cb.record_failure()
+        assert cb.state == CircuitBreaker.CLOSED
+
+    def test_half_open_single_probe(self):
+        cb = CircuitBreaker("t", failure_threshold=1, reset_timeout_s=10)
+        with patch("shared.resilience.time.monotonic", return_value=100.0):
+            cb.record_failure()
+        with patch("shared.resilience.time.monotonic", return_value=111.0):
+            assert cb.allow()       # probe
+            assert not cb.allow()   # second caller waits for the probe
+        cb.record_success()
+        assert cb.state == CircuitBreaker.CLOSED
+
+    def test_failed_probe_reopens(self):
+        cb = CircuitBreaker("t", failure_threshold=5, reset_timeout_s=10)
+        with patch("shared.resilience.time.monotonic", return_value=100.0):
+            for _ in range(5):
+                cb.record_failure()
+        with patch("shared.resilience.time.monotonic", return_value=111.0):
+            assert cb.allow()
+            cb.record_failure()
+            assert cb.state == CircuitBreaker.OPEN
+            assert not cb.allow()
+
+
+class TestEndpoint:
+    def test_open_circuit_fails_fast(self):
+        ep = Endpoint("t", EndpointSLO(p95_ms=100, failure_threshold=2))
+        fn = MagicMock(side_effect=RuntimeError("down"))
+        for _ in range(2):
+            with pytest.raises(RuntimeError):
+                ep.call(fn)
+        with pytest.raises(CircuitOpenError):
+            ep.call(fn)
+        assert fn.call_count == 2
+
+    def test_only_transport_and_5xx_errors_count_as_failures(self):
+        from shared.async_client import ClobHTTPError
+
+        ep = Endpoint("t", EndpointSLO(p95_ms=100, failure_threshold=2))
+        rejected = MagicMock(side_effect=ClobHTTPError(400, "not enough balance"))
+        for _ in range(5):
+            with pytest.raises(ClobHTTPError):
+                ep.call(rejected)
+        assert ep.breaker.state == CircuitBreaker.CLOSED
+
+        for _ in range(2):
+            with pytest.raises(ClobHTTPError):
+                ep.call(MagicMock(side_effect=ClobHTTPError(503, "unavailable")))
+        assert ep.breaker.state == CircuitBreaker.OPEN
+
+    def test_hedge_returns_fastest(self):
+        ep = Endpoint("t", EndpointSLO(p95_ms=20, deadline_s=2.0))
+        calls = []
+        lock = threading.Lock()
+
+        def fn():
+            with lock:
+                calls.append(1)
+                n = len(calls)
+            if n == 1:
+                time.sleep(0.5)  # first attempt stuck in the tail
+                return "slow"
+            return "fast"
+
+        assert ep.call(fn, hedge=True) == "fast"
+        assert ep.hedges_sent == 1
+
+    def test_no_hedge_when_fast(self):
+        ep = Endpoint("t", EndpointSLO(p95_ms=500, deadline_s=2.0))
+        fn = MagicMock(return_value="ok")
+        assert ep.call(fn, hedge=True) == "ok"
+        assert fn.call_count == 1
+        assert ep.hedges_sent == 0
+
+    def test_deadline_bounds_wait(self):
+        ep = Endpoint("t", EndpointSLO(p95_ms=10, deadline_s=0.1))
+        start = time.monotonic()
+        with pytest.raises(TimeoutError):
+            ep.call(time.sleep, 0.5, hedge=True)
+        assert time.monotonic() - start < 0.4
+
+    def test_hedge_error_then_success(self):
+        """A failed hedge doesn't mask a straggler that succeeds."""
+        ep = Endpoint("t", EndpointSLO(p95_ms=20, deadline_s=2.0))
+        calls = []
+        lock = threading.Lock()
+
+        def fn():
+            with lock:
+                calls.append(1)
+                n = len(calls)
+            if n == 1:
+                time.sleep(0.1)
+                return "first"
+            raise RuntimeError("hedge failed")
+
+        assert ep.call(fn, hedge=True) == "first"
+
+    def test_writes_are_never_hedged(self):
+        ep = Endpoint("t", EndpointSLO(p95_ms=1))
+        fn = MagicMock(side_effect=lambda: time.sleep(0.02) or "ok")
+        assert ep.call(fn) == "ok"
+        assert fn.call_count == 1
+
+
+class TestLatencyTracker:
+    def test_percentiles(self):
+        lt = LatencyTracker()
+        for i in range(1, 101):
+            lt.record(i / 1000)
+        assert lt.percentile(0.5) == pytest.approx(0.051)
+        assert lt.percentile(0.95) == pytest.approx(0.096)
+        assert LatencyTracker().percentile(0.95) is None
+
+    def test_hedge_delay_tracks_observed_p95(self):
+        ep = Endpoint("t", EndpointSLO(p95_ms=300))
+        assert ep.hedge_delay() == pytest.approx(0.3)
+        for _ in range(50):
+            ep.latency.record(0.05)
+        assert ep.hedge_delay() == pytest.approx(0.05)
+
+
+class TestOrderManagerIntegration:
+    def test_open_post_order_circuit_inserts_no_sentinel(self, sample_market):
+        from decimal import Decimal
+
+        from shared.models import Direction
+        from shared.order_mgr import OrderManager
+        from shared.resilience import get_endpoint
+
+        breaker = get_endpoint("clob.post_order").breaker
+        for _ in range(10):
+            breaker.record_failure()
+
+        mgr = OrderManager(dry_run=False)
+        client = MagicMock()
+        ok = mgr.place_order(
+            client, sample_market, "111111", Direction.UP,
+            Decimal("0.45"), Decimal("10"), 300, reason="TEST",
+        )
+        assert ok is False
+        client.post_order.assert_not_called()
+        assert not mgr.has_order("111111")
+
+    def test_balance_rejections_do_not_open_post_order_circuit(self, sample_market):
+        from decimal import Decimal
+
+        from shared.async_client import ClobHTTPError
+        from shared.models import Direction
+        from shared.order_mgr import OrderManager
+        from shared.resilience import get_endpoint
+
+        mgr = OrderManager(dry_run=False)
+        client = MagicMock()
+        client.post_order.side_effect = ClobHTTPError(400, "not enough balance / allowance")
+        for _ in range(10):
+            ok = mgr.place_order(
+                client, sample_market, "111111", Direction.UP,
+                Decimal("0.45"), Decimal("10"), 300, reason="TEST",
+            )
+            assert ok is False
+        assert client.post_order.call_count == 10
+        assert get_endpoint("clob.post_order").breaker.state == CircuitBreaker.CLOSED
+        assert not mgr.has_order("111111")